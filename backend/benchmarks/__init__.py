@@ -0,0 +1,5 @@
+"""ベンチマークスクリプト群
+
+backend ディレクトリから `uv run python -m benchmarks.<name>` で実行する。
+pytest の対象外（testpaths = tests）。
+"""
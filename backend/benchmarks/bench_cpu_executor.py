@@ -0,0 +1,103 @@
+"""簡略化の同時実行ベンチマーク: 既定スレッドプール vs 専用実行枠 + ワーカープロセス
+
+同時に来た簡略化要求を、asyncio.to_thread（楽譜生成はスレッド内）と
+CpuExecutor（楽譜生成は ProcessSheetMusicGenerator のワーカープロセス）で処理し、
+イベントループの最大停止時間・応答時間・断った件数を比べる。
+
+使い方:
+    uv run python -m benchmarks.bench_cpu_executor [同時要求数] [ノート数]
+"""
+
+import asyncio
+import math
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.bench_musicxml import _make_notes
+from src.application.usecases.simplify_music import SimplifyMusicUseCase
+from src.core.exceptions import ServiceBusyError
+from src.domain.entities import Difficulty, MidiData
+from src.infrastructure.cpu_executor import CpuExecutor
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.process_sheet_music_generator import ProcessSheetMusicGenerator
+from src.infrastructure.smf_midi_processor import SmfMidiProcessor
+
+# イベントループの停止を測るティッカーの間隔（秒）
+_TICK = 0.001
+
+
+async def _serve(run, requests: int, midi: bytes) -> tuple[float, list[float], int]:
+    """requests 件を同時に処理し、(最大停止, 応答時間のリスト, 断った件数) を返す"""
+    done = False
+    max_stall = 0.0
+
+    async def ticker() -> None:
+        nonlocal max_stall
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(_TICK)
+            max_stall = max(max_stall, time.perf_counter() - before - _TICK)
+
+    async def request() -> float | None:
+        start = time.perf_counter()
+        try:
+            await run(midi)
+        except ServiceBusyError:
+            return None
+        return time.perf_counter() - start
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(_TICK)
+    results = await asyncio.gather(*(request() for _ in range(requests)))
+    done = True
+    await task
+    latencies = [r for r in results if r is not None]
+    return max_stall, latencies, len(results) - len(latencies)
+
+
+def _report(label: str, stall: float, latencies: list[float], rejected: int) -> None:
+    p95 = sorted(latencies)[math.ceil(len(latencies) * 0.95) - 1] if latencies else 0.0
+    median = statistics.median(latencies) if latencies else 0.0
+    print(
+        f"{label:<24}{stall * 1000:>10.1f} ms{median * 1000:>10.0f} ms"
+        f"{p95 * 1000:>10.0f} ms{rejected:>8}"
+    )
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    workers = os.cpu_count() or 1
+    midi_data = MidiData(notes=_make_notes(count, 120.0), tempo=120.0)
+    midi = SmfMidiProcessor().to_bytes(midi_data)
+
+    threaded = SimplifyMusicUseCase(SmfMidiProcessor(), Music21Generator())
+
+    async def run_threaded(data: bytes):
+        return await asyncio.to_thread(threaded.execute, data, Difficulty.INTERMEDIATE)
+
+    generator = ProcessSheetMusicGenerator(factory=Music21Generator, max_workers=workers)
+    pooled = SimplifyMusicUseCase(SmfMidiProcessor(), generator)
+    generator.generate_musicxml(midi_data)  # ワーカーの起動を計測から外す
+
+    print(f"同時要求: {requests} 件, ノート数: {count}, ワーカー: {workers}")
+    print(f"{'':<24}{'最大停止':>12}{'中央値':>12}{'p95':>12}{'拒否':>6}")
+    _report("to_thread", *asyncio.run(_serve(run_threaded, requests, midi)))
+    for max_queue in (requests, workers):
+        executor = CpuExecutor(max_workers=workers, max_queue=max_queue)
+
+        async def run_pooled(data: bytes, executor=executor):
+            return await executor.run(pooled.execute, data, Difficulty.INTERMEDIATE)
+
+        _report(
+            f"CpuExecutor (queue={max_queue})",
+            *asyncio.run(_serve(run_pooled, requests, midi)),
+        )
+        executor.shutdown()
+    generator.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Base64 MIDI デコードベンチマーク: pretty_midi vs 軽量 SMF デコーダ
+
+使い方:
+    uv run python -m benchmarks.bench_midi_decode [ノート数]
+"""
+
+import sys
+
+from benchmarks.bench_musicxml import _best_of, _make_notes
+from src.domain.entities import MidiData
+from src.infrastructure.pretty_midi_processor import PrettyMidiProcessor
+from src.infrastructure.smf_midi_processor import SmfMidiProcessor
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    midi_base64 = SmfMidiProcessor().to_base64(
+        MidiData(notes=_make_notes(count, 120.0), tempo=120.0)
+    )
+
+    pretty_midi_processor = PrettyMidiProcessor()
+    smf_processor = SmfMidiProcessor()
+    pretty_midi_time = _best_of(lambda: pretty_midi_processor.from_base64(midi_base64))
+    smf_time = _best_of(lambda: smf_processor.from_base64(midi_base64))
+
+    print(f"ノート数: {count}（Base64 {len(midi_base64)} 文字）")
+    print(f"pretty_midi:         {pretty_midi_time * 1000:10.2f} ms")
+    print(f"軽量 SMF デコーダ:   {smf_time * 1000:10.2f} ms")
+    print(f"速度比:              {pretty_midi_time / smf_time:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""MusicXML 生成ベンチマーク: music21 エクスポート vs 直接書き出し
+
+使い方:
+    uv run python -m benchmarks.bench_musicxml [ノート数]
+"""
+
+import random
+import sys
+import time
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+
+
+def _make_notes(count: int, tempo: float) -> list[NoteEvent]:
+    rng = random.Random(0)
+    sixteenth = 15.0 / tempo
+    notes = []
+    position = 0
+    for _ in range(count):
+        position += rng.choice([0, 1, 2, 2, 4])
+        start = position * sixteenth
+        end = start + rng.choice([1, 2, 3, 4, 6, 8]) * sixteenth
+        notes.append(NoteEvent(pitch=rng.randint(36, 96), start=start, end=end))
+    return notes
+
+
+def _best_of(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    midi_data = MidiData(notes=_make_notes(count, 120.0), tempo=120.0)
+
+    music21_generator = Music21Generator()
+    direct_generator = DirectMusicXmlGenerator(score_builder=music21_generator)
+
+    music21_time = _best_of(lambda: music21_generator.generate_musicxml(midi_data))
+    direct_time = _best_of(lambda: direct_generator.generate_musicxml(midi_data))
+
+    print(f"ノート数: {count}")
+    print(f"music21 エクスポート: {music21_time * 1000:10.2f} ms")
+    print(f"直接書き出し:         {direct_time * 1000:10.2f} ms")
+    print(f"速度比:               {music21_time / direct_time:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""ノート列の保存形式ベンチマーク: SMF vs pickle vs ノートパック
+
+使い方:
+    uv run python -m benchmarks.bench_note_pack [ノート数]
+"""
+
+import pickle
+import sys
+
+from benchmarks.bench_musicxml import _best_of, _make_notes
+from src.domain.entities import MidiData
+from src.infrastructure.note_pack import pack_notes, unpack_notes
+from src.infrastructure.smf_decoder import decode_smf
+from src.infrastructure.smf_encoder import encode_smf
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    midi_data = MidiData(notes=_make_notes(count, 120.0), tempo=120.0)
+
+    smf = encode_smf(midi_data)
+    pickled = pickle.dumps(midi_data, pickle.HIGHEST_PROTOCOL)
+    packed = pack_notes(midi_data)
+
+    rows = [
+        ("SMF", smf, lambda: encode_smf(midi_data), lambda: decode_smf(smf)),
+        (
+            "pickle",
+            pickled,
+            lambda: pickle.dumps(midi_data, pickle.HIGHEST_PROTOCOL),
+            lambda: pickle.loads(pickled),
+        ),
+        (
+            "ノートパック",
+            packed,
+            lambda: pack_notes(midi_data),
+            lambda: unpack_notes(packed).to_midi_data(),
+        ),
+    ]
+
+    print(f"ノート数: {count}")
+    print(f"{'形式':<12}{'サイズ':>12}{'保存':>12}{'読み込み':>12}")
+    for name, data, dump, load in rows:
+        print(
+            f"{name:<12}{len(data):>10} B"
+            f"{_best_of(dump) * 1000:>9.2f} ms{_best_of(load) * 1000:>9.2f} ms"
+        )
+    columns_time = _best_of(lambda: unpack_notes(packed))
+    print(f"ノートパック（列のみ、コピーなし）: {columns_time * 1_000_000:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""PDF 出力ベンチマーク: music21（build_score + write("lily.pdf")）vs LilyPond 直接書き出し
+
+LilyPond ソースの生成時間と、LilyPond の実行を含む PDF 生成全体の時間を比べる。
+LilyPond がインストールされていない場合はソース生成だけを計測する。
+
+使い方:
+    uv run python -m benchmarks.bench_pdf [ノート数]
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_musicxml import _best_of, _make_notes
+from src.domain.entities import MidiData
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+
+
+def _run_lilypond(source: str) -> float:
+    """LilyPond で PDF を生成し、かかった時間（秒）を返す"""
+    with tempfile.TemporaryDirectory() as workdir:
+        source_path = Path(workdir) / "score.ly"
+        source_path.write_text(source, encoding="utf-8")
+        start = time.perf_counter()
+        subprocess.run(
+            ["lilypond", "--pdf", "-o", str(Path(workdir) / "score"), str(source_path)],
+            check=True,
+            capture_output=True,
+        )
+        return time.perf_counter() - start
+
+
+def _music21_pdf(generator: Music21Generator, midi_data: MidiData) -> None:
+    """変更前の経路（Score 構築 → music21 の LilyPond 変換・実行）"""
+    pdf_path = Path(generator.build_score(midi_data).write("lily.pdf"))
+    pdf_path.unlink(missing_ok=True)
+    pdf_path.with_suffix("").unlink(missing_ok=True)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    midi_data = MidiData(notes=_make_notes(count, 120.0), tempo=120.0)
+
+    music21_generator = Music21Generator()
+    direct_generator = DirectMusicXmlGenerator(score_builder=music21_generator)
+
+    music21_source = music21_generator.generate_lilypond(midi_data)
+    direct_source = direct_generator.generate_lilypond(midi_data)
+    music21_time = _best_of(lambda: music21_generator.generate_lilypond(midi_data))
+    direct_time = _best_of(lambda: direct_generator.generate_lilypond(midi_data))
+
+    print(f"ノート数: {count}")
+    print("LilyPond ソース生成:")
+    print(f"  music21:   {music21_time * 1000:10.2f} ms  {len(music21_source):>9} 文字")
+    print(f"  直接書き出し: {direct_time * 1000:8.2f} ms  {len(direct_source):>9} 文字")
+    print(f"  速度比:    {music21_time / direct_time:10.1f} x")
+
+    if shutil.which("lilypond") is None:
+        print("lilypond が見つからないため PDF 生成全体の計測は省略します")
+        return
+
+    music21_lily = min(_run_lilypond(music21_source) for _ in range(2))
+    direct_lily = min(_run_lilypond(direct_source) for _ in range(2))
+    print("LilyPond 実行:")
+    print(f"  music21 のソース:   {music21_lily * 1000:10.2f} ms")
+    print(f"  直接書き出しのソース: {direct_lily * 1000:8.2f} ms")
+
+    before = _best_of(lambda: _music21_pdf(music21_generator, midi_data), repeat=2)
+    after = direct_time + direct_lily
+    print("PDF 生成全体:")
+    print(f"  変更前（build_score + write）: {before * 1000:10.2f} ms")
+    print(f"  直接書き出し + LilyPond:       {after * 1000:10.2f} ms")
+    print(f"  速度比:                        {before / after:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""量子化ベンチマーク: ノートごとの量子化 vs 拍グリッドの一括量子化
+
+どちらも NoteEvent を作り直し、その生成が所要時間の大半を占めるため全体の差は小さい。
+時刻の丸めだけを比べた値も出す。
+
+使い方:
+    uv run python -m benchmarks.bench_quantize [ノート数]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.tempo import BeatGrid, estimate_tempo
+from src.domain.transcription import quantize_notes, quantize_to_sixteenth
+
+
+def _make_notes(count: int, tempo: float) -> list[NoteEvent]:
+    rng = random.Random(0)
+    sixteenth = 15.0 / tempo
+    notes = []
+    position = 0
+    for _ in range(count):
+        position += rng.choice([1, 2, 2, 4])
+        start = position * sixteenth + rng.gauss(0.0, 0.01)
+        end = start + rng.choice([1, 2, 4, 8]) * sixteenth + rng.gauss(0.0, 0.01)
+        notes.append(NoteEvent(pitch=rng.randint(36, 96), start=max(0.0, start), end=end))
+    return notes
+
+
+def _quantize_per_note(midi_data: MidiData) -> list[NoteEvent]:
+    """従来実装（ノートごとに quantize_to_sixteenth を呼ぶ）"""
+    sixteenth = 60.0 / midi_data.tempo / 4.0
+    result = []
+    for note in midi_data.notes:
+        q_start = quantize_to_sixteenth(note.start, midi_data.tempo)
+        q_end = quantize_to_sixteenth(note.end, midi_data.tempo)
+        if q_end <= q_start:
+            q_end = q_start + sixteenth
+        result.append(NoteEvent(note.pitch, q_start, q_end, note.velocity))
+    return result
+
+
+def _round_per_note(midi_data: MidiData) -> list[tuple[float, float]]:
+    """ノートごとの時刻の丸めだけ（NoteEvent は作らない）"""
+    return [
+        (
+            quantize_to_sixteenth(n.start, midi_data.tempo),
+            quantize_to_sixteenth(n.end, midi_data.tempo),
+        )
+        for n in midi_data.notes
+    ]
+
+
+def _round_on_grid(midi_data: MidiData) -> np.ndarray:
+    """拍グリッドでの時刻の一括丸めだけ（NoteEvent は作らない）"""
+    grid = BeatGrid.uniform(midi_data.tempo, midi_data.duration)
+    starts = np.fromiter((n.start for n in midi_data.notes), dtype=np.float64)
+    ends = np.fromiter((n.end for n in midi_data.notes), dtype=np.float64)
+    q_starts = grid.quantize(starts)
+    q_ends = grid.quantize(ends)
+    return np.where(q_ends <= q_starts, grid.next_step(q_starts), q_ends)
+
+
+def _best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    midi_data = MidiData(notes=_make_notes(count, 97.0), tempo=97.0)
+
+    per_note = _best_of(lambda: _quantize_per_note(midi_data))
+    vectorized = _best_of(lambda: quantize_notes(midi_data))
+    round_per_note = _best_of(lambda: _round_per_note(midi_data))
+    round_on_grid = _best_of(lambda: _round_on_grid(midi_data))
+    onsets = [n.start for n in midi_data.notes]
+    estimation = _best_of(lambda: estimate_tempo(onsets))
+
+    print(f"ノート数: {count}")
+    print(f"ノートごとの量子化:       {per_note * 1000:8.2f} ms")
+    print(f"拍グリッドの一括量子化:   {vectorized * 1000:8.2f} ms")
+    print(f"  うち丸めのみ（ノートごと）: {round_per_note * 1000:8.2f} ms")
+    print(f"  うち丸めのみ（拍グリッド）: {round_on_grid * 1000:8.2f} ms")
+    print(f"テンポ推定:               {estimation * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""SSE 完了イベント書き出しベンチマーク: 一括 json.dumps vs 分割書き出し
+
+完了イベントを gzip ストリームとして最後まで流す間の
+イベントループの最大停止時間と、書き出しで増えたメモリのピークを測る。
+
+使い方:
+    uv run python -m benchmarks.bench_sse [ノート数]
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_musicxml import _make_notes
+from src.api.compression import gzip_stream
+from src.api.sse import sse_event, sse_event_chunks
+from src.domain.entities import MidiData
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+
+# イベントループの停止を測るティッカーの間隔（秒）
+_TICK = 0.001
+
+
+async def _whole(payload: dict):
+    yield sse_event("complete", payload)
+
+
+async def _drain(stream) -> float:
+    """ストリームを最後まで読み、その間のイベントループの最大停止時間（秒）を返す"""
+    done = False
+    max_stall = 0.0
+
+    async def ticker() -> None:
+        nonlocal max_stall
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(_TICK)
+            max_stall = max(max_stall, time.perf_counter() - before - _TICK)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(_TICK)
+    async for _ in gzip_stream(stream):
+        await asyncio.sleep(0)  # ソケットへの書き込み相当
+    done = True
+    await task
+    return max_stall
+
+
+def _measure(make_stream) -> tuple[float, int]:
+    stall = min(asyncio.run(_drain(make_stream())) for _ in range(3))
+    tracemalloc.start()
+    asyncio.run(_drain(make_stream()))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stall, peak
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    midi_data = MidiData(notes=_make_notes(count, 120.0), tempo=120.0)
+    musicxml, midi_base64 = DirectMusicXmlGenerator(
+        score_builder=Music21Generator()
+    ).generate_musicxml_and_midi(midi_data)
+    payload = {"musicxml": musicxml, "midi_base64": midi_base64, "metadata": {"note_count": count}}
+
+    whole_stall, whole_peak = _measure(lambda: _whole(payload))
+    chunk_stall, chunk_peak = _measure(lambda: sse_event_chunks("complete", payload))
+
+    mib = 1024 * 1024
+    print(f"ノート数: {count}（MusicXML {len(musicxml) / mib:.1f} MiB）")
+    print(f"{'':<16}{'最大停止':>12}{'ピークメモリ':>14}")
+    print(f"{'一括 json.dumps':<16}{whole_stall * 1000:>9.1f} ms{whole_peak / mib:>11.1f} MiB")
+    print(f"{'分割書き出し':<16}{chunk_stall * 1000:>9.1f} ms{chunk_peak / mib:>11.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
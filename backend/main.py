@@ -6,6 +6,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from src.core.config import settings
 
@@ -44,6 +45,15 @@ async def lifespan(app: FastAPI):
     yield
 
     # クリーンアップ
+    from src.api.dependencies import (
+        shutdown_cpu_executor,
+        shutdown_pdf_engine,
+        shutdown_sheet_music_generator,
+    )
+
+    await shutdown_pdf_engine()
+    shutdown_cpu_executor()
+    shutdown_sheet_music_generator()
     transcription_semaphore = None
     logger.info("アプリケーション終了")
 
@@ -60,8 +70,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 楽譜ページの実際の小節範囲をクライアントから読めるようにする
+    expose_headers=["X-Measure-Start", "X-Measure-End"],
 )
 
+# レスポンス圧縮（JSON。SSE はルーター側でイベントごとにフラッシュしながら圧縮する）
+app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
+
 # APIルーターの登録
 from src.api.router import router  # noqa: E402
 
@@ -0,0 +1,44 @@
+"""HTTP レスポンス圧縮
+
+JSON レスポンスは Starlette の GZipMiddleware で圧縮するが、
+SSE（text/event-stream）は対象外のため、ここでイベントごとに
+同期フラッシュしながら gzip ストリームとして圧縮する。
+フラッシュ単位で復号できるため、クライアントは各イベントを即座に受け取れる。
+1つのイベントが複数の断片に分かれて届く場合は、イベントの終わり（空行）でだけフラッシュする。
+"""
+
+import zlib
+from collections.abc import AsyncIterator
+
+# gzip コンテナ（ヘッダ + deflate + CRC32）を出力する wbits
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Accept-Encoding ヘッダが gzip を受け付けるか（q=0 は拒否とみなす）"""
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+async def gzip_stream(chunks: AsyncIterator[str], level: int = 6) -> AsyncIterator[bytes]:
+    """文字列チャンクの列を gzip 圧縮しながら流す（イベントの終わりで Z_SYNC_FLUSH）"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8"))
+        if chunk.endswith("\n\n"):
+            compressed += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if compressed:
+            yield compressed
+    yield compressor.flush(zlib.Z_FINISH)
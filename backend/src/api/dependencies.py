@@ -4,16 +4,36 @@ FastAPI の Depends を使って各ポートの具体実装を注入する。
 ライブラリを差し替える場合はここの実装クラスを変更するだけで済む。
 """
 
+import os
+import tempfile
 from functools import lru_cache
+from pathlib import Path
 
+from src.application.ports.artifact_store import ArtifactStorePort
 from src.application.ports.midi_processor import MidiProcessorPort
+from src.application.ports.pdf_engine import PdfEnginePort
+from src.application.ports.score_store import ScoreStorePort
 from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
 from src.application.ports.transcriber import TranscriberPort
+from src.application.usecases.batch_transcribe import BatchTranscribeUseCase
+from src.application.usecases.export_pdf import ExportPdfUseCase
+from src.application.usecases.score_pages import ScorePagesUseCase
 from src.application.usecases.simplify_music import SimplifyMusicUseCase
 from src.application.usecases.transcribe_music import TranscribeMusicUseCase
+from src.core.config import settings
 from src.infrastructure.basic_pitch_transcriber import BasicPitchTranscriber
+from src.infrastructure.cost_quota import CostQuota
+from src.infrastructure.cpu_executor import CpuExecutor
+from src.infrastructure.file_score_store import FileScoreStore
+from src.infrastructure.lilypond_pdf_engine import LilyPondPdfEngine
+from src.infrastructure.local_artifact_store import LocalArtifactStore
+from src.infrastructure.measure_cache import MeasureCache
 from src.infrastructure.music21_generator import Music21Generator
-from src.infrastructure.pretty_midi_processor import PrettyMidiProcessor
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+from src.infrastructure.parallel_music21_generator import ParallelMusic21Generator
+from src.infrastructure.process_sheet_music_generator import ProcessSheetMusicGenerator
+from src.infrastructure.score_store import InMemoryScoreStore
+from src.infrastructure.smf_midi_processor import SmfMidiProcessor
 
 
 @lru_cache
@@ -25,13 +45,145 @@ def get_transcriber() -> TranscriberPort:
 @lru_cache
 def get_midi_processor() -> MidiProcessorPort:
     """MidiProcessor ポートの具体実装を返す"""
-    return PrettyMidiProcessor()
+    return SmfMidiProcessor()
+
+
+def _score_store(name: str, max_entries: int, ttl_seconds: int) -> ScoreStorePort:
+    """settings.score_store_backend に応じたストアを作る（file なら name のサブディレクトリ）"""
+    if settings.score_store_backend == "file":
+        root = Path(settings.score_store_dir or _default_data_dir())
+        return FileScoreStore(root / name, max_entries=max_entries, ttl_seconds=ttl_seconds)
+    return InMemoryScoreStore(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+
+def _default_data_dir() -> Path:
+    """保存先の指定がないときに使う一時ディレクトリの下のディレクトリ"""
+    return Path(tempfile.gettempdir()) / "transcription-app"
+
+
+@lru_cache
+def get_artifact_store() -> ArtifactStorePort | None:
+    """内容アドレスの成果物ストアを返す（無効なら None）"""
+    if settings.artifact_store_max_bytes <= 0:
+        return None
+    return LocalArtifactStore(
+        Path(settings.artifact_store_dir or _default_data_dir() / "artifacts"),
+        max_bytes=settings.artifact_store_max_bytes,
+    )
+
+
+@lru_cache
+def get_cost_quota() -> CostQuota | None:
+    """採譜の処理時間の割り当てを返す（無効なら None）"""
+    if settings.quota_capacity_seconds <= 0:
+        return None
+    return CostQuota(
+        capacity_seconds=settings.quota_capacity_seconds,
+        refill_per_second=settings.quota_refill_per_second,
+        initial_ratio=settings.quota_initial_ratio,
+        max_clients=settings.quota_max_clients,
+    )
+
+
+@lru_cache
+def get_result_store() -> ScoreStorePort:
+    """小節範囲の取得用に結果を保持するストアを返す"""
+    return _score_store("results", settings.result_store_size, settings.result_store_ttl_seconds)
+
+
+@lru_cache
+def get_source_store() -> ScoreStorePort:
+    """簡略化で ID から参照する前処理済みの元MIDIデータのストアを返す"""
+    return _score_store("sources", settings.source_store_size, settings.source_store_ttl_seconds)
+
+
+@lru_cache
+def get_measure_cache() -> MeasureCache | None:
+    """music21 の書き出し済み小節キャッシュを返す（無効なら None）"""
+    if settings.measure_cache_size <= 0:
+        return None
+    return MeasureCache(max_entries=settings.measure_cache_size)
+
+
+def _cpu_workers() -> int:
+    """CPU バウンド処理の同時実行数（settings.cpu_workers、0 なら CPU 数）"""
+    return settings.cpu_workers or os.cpu_count() or 1
+
+
+@lru_cache
+def get_cpu_executor() -> CpuExecutor:
+    """簡略化・楽譜ページ生成の実行枠を返す"""
+    return CpuExecutor(max_workers=_cpu_workers(), max_queue=settings.cpu_max_queue)
+
+
+def shutdown_cpu_executor() -> None:
+    """実行枠のスレッドプールを終了する（アプリ終了時。次に使うときは作り直す）"""
+    if get_cpu_executor.cache_info().currsize == 0:
+        return
+    get_cpu_executor().shutdown()
+    get_cpu_executor.cache_clear()
 
 
 @lru_cache
 def get_sheet_music_generator() -> SheetMusicGeneratorPort:
-    """SheetMusicGenerator ポートの具体実装を返す"""
-    return Music21Generator()
+    """SheetMusicGenerator ポートの具体実装を返す
+
+    settings.sheet_music_engine で MusicXML 直接書き出しと music21（直列/並列）を切り替える。
+    settings.cpu_executor_backend が process なら、生成はワーカープロセスで行う
+    （music21-parallel は自前のプロセスプールで並列化するため対象外）。
+    プールは shutdown_sheet_music_generator() で終了するため、API 以外のプロセス
+    （CLI のワーカーなど）では使わず build_sheet_music_generator() で組み立てる。
+    """
+    if (
+        settings.cpu_executor_backend == "process"
+        and settings.sheet_music_engine != "music21-parallel"
+    ):
+        return ProcessSheetMusicGenerator(
+            factory=build_sheet_music_generator, max_workers=_cpu_workers()
+        )
+    return build_sheet_music_generator()
+
+
+def build_sheet_music_generator() -> SheetMusicGeneratorPort:
+    """settings.sheet_music_engine の楽譜生成を組み立てる（ワーカープロセスでも呼ばれる）"""
+    if settings.sheet_music_engine == "music21":
+        return Music21Generator(measure_cache=get_measure_cache())
+    if settings.sheet_music_engine == "music21-parallel":
+        return ParallelMusic21Generator(
+            chunk_measures=settings.musicxml_chunk_measures,
+            max_workers=settings.musicxml_workers or None,
+        )
+    return DirectMusicXmlGenerator(score_builder=Music21Generator())
+
+
+def shutdown_sheet_music_generator() -> None:
+    """楽譜生成が持つプロセスプールを終了する（アプリ終了時）"""
+    if get_sheet_music_generator.cache_info().currsize == 0:
+        return
+    generator = get_sheet_music_generator()
+    if isinstance(generator, ParallelMusic21Generator | ProcessSheetMusicGenerator):
+        generator.shutdown()
+
+
+@lru_cache
+def get_pdf_engine() -> PdfEnginePort:
+    """PdfEngine ポートの具体実装を返す"""
+    return LilyPondPdfEngine(
+        sheet_music_generator=get_sheet_music_generator(),
+        executable=settings.lilypond_executable,
+        max_processes=settings.pdf_max_processes,
+        max_queue=settings.pdf_max_queue,
+        timeout_seconds=settings.pdf_timeout_seconds,
+        cache_size=settings.pdf_cache_size,
+        lilypond_version=settings.lilypond_version,
+    )
+
+
+async def shutdown_pdf_engine() -> None:
+    """実行中の PDF 生成を打ち切る（アプリ終了時）"""
+    if get_pdf_engine.cache_info().currsize == 0:
+        return
+    await get_pdf_engine().aclose()
 
 
 def get_transcribe_usecase() -> TranscribeMusicUseCase:
@@ -40,6 +192,16 @@ def get_transcribe_usecase() -> TranscribeMusicUseCase:
         transcriber=get_transcriber(),
         midi_processor=get_midi_processor(),
         sheet_music_generator=get_sheet_music_generator(),
+        result_store=get_result_store(),
+        source_store=get_source_store(),
+    )
+
+
+def get_batch_transcribe_usecase() -> BatchTranscribeUseCase:
+    """一括採譜ユースケースを組み立てて返す"""
+    return BatchTranscribeUseCase(
+        transcribe_usecase=get_transcribe_usecase(),
+        max_workers=settings.batch_workers or os.cpu_count() or 1,
     )
 
 
@@ -48,4 +210,24 @@ def get_simplify_usecase() -> SimplifyMusicUseCase:
     return SimplifyMusicUseCase(
         midi_processor=get_midi_processor(),
         sheet_music_generator=get_sheet_music_generator(),
+        result_store=get_result_store(),
+        source_store=get_source_store(),
+    )
+
+
+def get_score_pages_usecase() -> ScorePagesUseCase:
+    """楽譜ページ取得ユースケースを組み立てて返す"""
+    return ScorePagesUseCase(
+        result_store=get_result_store(),
+        sheet_music_generator=get_sheet_music_generator(),
+        midi_processor=get_midi_processor(),
+    )
+
+
+def get_export_pdf_usecase() -> ExportPdfUseCase:
+    """PDF出力ユースケースを組み立てて返す"""
+    return ExportPdfUseCase(
+        midi_processor=get_midi_processor(),
+        pdf_engine=get_pdf_engine(),
+        result_store=get_result_store(),
     )
@@ -0,0 +1,50 @@
+"""HTTP の条件付き GET と Range 要求
+
+内容アドレスの成果物（/api/artifacts/...）は内容が変わらないため、
+強い ETag による If-None-Match（304）と、単一範囲の Range（206）に対応する。
+"""
+
+
+class RangeNotSatisfiableError(ValueError):
+    """Range が成果物の範囲外（416）"""
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match ヘッダが etag（引用符付き）に一致するか（弱い比較、* は常に一致）"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def parse_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """Range ヘッダを [開始, 終了]（両端を含む）に変換する
+
+    単位が bytes 以外・形式が不正・複数範囲の場合は None（全体を 200 で返す）。
+
+    Raises:
+        RangeNotSatisfiableError: 範囲が成果物と重ならない場合
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.partition("-"))
+    if not sep or not (first or last) or not all(p.isdigit() for p in (first, last) if p):
+        return None
+    if not first:
+        # 末尾から last バイト
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiableError()
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError()
+    return start, min(int(last), size - 1) if last else size - 1
@@ -0,0 +1,150 @@
+"""MIDI のバイナリ転送
+
+MIDI を Base64 文字列として JSON に埋め込むと、ペイロードが約 1/3 増え、
+pydantic が数 MB の文字列を検証・コピーする。ここでは次の形式を扱う。
+
+リクエスト（Content-Type で判別）:
+- application/json: 従来どおり midi_base64 を含む JSON
+- application/octet-stream（audio/midi）: 本文が MIDI ファイルそのもの。
+  その他のパラメータはクエリ文字列で渡す
+- multipart/form-data: file フィールドに MIDI ファイル、その他はフォームフィールド
+
+サーバー側に保持したデータの ID（score_id など）を渡す場合、MIDI は省略できる。
+
+レスポンス（Accept に FRAMES_MEDIA_TYPE を含む場合）:
+名前付きのバイト列（フレーム）を長さ付きで並べた形式で、楽譜と MIDI を
+Base64 にせずそのまま返す。
+
+    "TAFR" | バージョン (u8) | フレーム数 (u8)
+    フレームごとに: 名前の長さ (u8) | 名前 (ASCII) | 本体の長さ (u32, ビッグエンディアン) | 本体
+"""
+
+import struct
+from typing import TypeVar
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from starlette.datastructures import UploadFile
+
+# フレーム形式の MIME タイプ
+FRAMES_MEDIA_TYPE = "application/vnd.transcription-app.frames"
+
+# 本文を MIDI ファイルそのものとして受け付ける Content-Type
+MIDI_BODY_MEDIA_TYPES = ("application/octet-stream", "audio/midi", "audio/x-midi")
+
+# multipart で MIDI ファイルを渡すフィールド名
+MIDI_FORM_FIELD = "file"
+
+_FRAMES_MAGIC = b"TAFR"
+_FRAMES_VERSION = 1
+_FRAME_LENGTH = struct.Struct(">I")
+
+OptionsT = TypeVar("OptionsT", bound=BaseModel)
+
+
+async def read_midi_request(
+    request: Request,
+    json_model: type[OptionsT],
+    options_model: type[OptionsT],
+    id_field: str | None = None,
+) -> tuple[str | bytes | None, OptionsT]:
+    """リクエストから MIDI とパラメータを取り出す
+
+    JSON なら json_model で検証して midi_base64（文字列）を、
+    バイナリ・multipart なら MIDI ファイルのバイト列を返す。
+
+    Args:
+        request: リクエスト
+        json_model: JSON 本文のモデル（options_model に midi_base64 を加えたサブクラス）
+        options_model: MIDI 以外のパラメータのモデル
+        id_field: 保持データの ID のフィールド名。指定されていれば MIDI を省略できる
+
+    Returns:
+        (Base64 文字列・MIDI のバイト列、省略時は None, パラメータ)
+
+    Raises:
+        RequestValidationError: 本文・パラメータが不正な場合（422）
+    """
+    media_type = _media_type(request.headers.get("content-type"))
+
+    if media_type in MIDI_BODY_MEDIA_TYPES:
+        midi: str | bytes = await request.body()
+        fields = dict(request.query_params)
+    elif media_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get(MIDI_FORM_FIELD)
+        midi = await upload.read() if isinstance(upload, UploadFile) else b""
+        fields = {key: value for key, value in form.items() if key != MIDI_FORM_FIELD}
+    else:
+        body = _validate(json_model, await request.body(), json=True)
+        return body.midi_base64, body
+
+    options = _validate(options_model, fields)
+    if midi:
+        return midi, options
+    if id_field is not None and getattr(options, id_field) is not None:
+        return None, options
+    raise RequestValidationError(
+        [{"type": "missing", "loc": ("body",), "msg": "MIDI データがありません", "input": None}]
+    )
+
+
+def accepts_frames(accept: str | None) -> bool:
+    """Accept ヘッダがフレーム形式を求めているか"""
+    if not accept:
+        return False
+    return any(
+        item.partition(";")[0].strip().lower() == FRAMES_MEDIA_TYPE for item in accept.split(",")
+    )
+
+
+def encode_frames(frames: list[tuple[str, bytes]]) -> bytes:
+    """名前付きのバイト列をフレーム形式に詰める"""
+    if len(frames) > 0xFF:
+        raise ValueError("フレームが多すぎます")
+    parts = [_FRAMES_MAGIC, bytes((_FRAMES_VERSION, len(frames)))]
+    for name, body in frames:
+        encoded = name.encode("ascii")
+        parts += [bytes((len(encoded),)), encoded, _FRAME_LENGTH.pack(len(body)), body]
+    return b"".join(parts)
+
+
+def decode_frames(data: bytes) -> dict[str, bytes]:
+    """フレーム形式を名前 → バイト列に戻す
+
+    Raises:
+        ValueError: フレーム形式として読み取れない場合
+    """
+    view = memoryview(data)
+    if len(view) < 6 or view[:4] != _FRAMES_MAGIC or view[4] != _FRAMES_VERSION:
+        raise ValueError("フレーム形式ではありません")
+    frames: dict[str, bytes] = {}
+    position = 6
+    for _ in range(view[5]):
+        name_end = position + 1 + view[position]
+        name = bytes(view[position + 1 : name_end]).decode("ascii")
+        (length,) = _FRAME_LENGTH.unpack_from(view, name_end)
+        body_start = name_end + _FRAME_LENGTH.size
+        if body_start + length > len(view):
+            raise ValueError("フレームが途中で終わっています")
+        frames[name] = bytes(view[body_start : body_start + length])
+        position = body_start + length
+    return frames
+
+
+def _media_type(content_type: str | None) -> str:
+    return (content_type or "").partition(";")[0].strip().lower()
+
+
+def _validate(model: type[OptionsT], data, json: bool = False) -> OptionsT:
+    """モデルで検証し、失敗したら FastAPI と同じ 422 のエラーにする"""
+    try:
+        if json:
+            return model.model_validate_json(data)
+        return model.model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError(
+            e.errors(include_url=False, include_context=False),
+            body=data if json else None,
+        ) from e
@@ -1,35 +1,110 @@
 """API ルーター
 
-SSE採譜エンドポイント + 難易度変更エンドポイント。
-ファイルバリデーション・レート制限・Semaphore制御を含む。
+SSE採譜エンドポイント（1件・一括）+ 難易度変更エンドポイント。
+ファイルバリデーション・レート制限・処理時間の割り当て・Semaphore制御を含む。
+MIDI は JSON 内の Base64 のほか、バイナリ本文・multipart でも受け付け、
+Accept でフレーム形式を求められたら楽譜と MIDI をバイナリのまま返す（src.api.midi_transport）。
 """
 
 import asyncio
+import base64
 import json
 import logging
+import math
+import os
+import shutil
 import tempfile
+import time
+import zipfile
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
 from pathlib import Path
+from typing import BinaryIO
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.background import BackgroundTask
 
-from src.api.dependencies import get_midi_processor, get_sheet_music_generator, get_simplify_usecase, get_transcribe_usecase
-from src.application.ports.midi_processor import MidiProcessorPort
-from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
-from src.api.schemas import ExportPdfRequest, MetadataResponse, SimplifyRequest, SimplifyResponse
+from src.api.compression import accepts_gzip, gzip_stream
+from src.api.dependencies import (
+    get_artifact_store,
+    get_batch_transcribe_usecase,
+    get_cost_quota,
+    get_cpu_executor,
+    get_export_pdf_usecase,
+    get_pdf_engine,
+    get_score_pages_usecase,
+    get_simplify_usecase,
+    get_transcribe_usecase,
+)
+from src.api.http_cache import RangeNotSatisfiableError, etag_matches, parse_range
+from src.api.midi_transport import (
+    FRAMES_MEDIA_TYPE,
+    MIDI_FORM_FIELD,
+    accepts_frames,
+    encode_frames,
+    read_midi_request,
+)
+from src.api.schemas import (
+    ExportPdfOptions,
+    ExportPdfRequest,
+    MetadataResponse,
+    ScoreIndexResponse,
+    SimplifyOptions,
+    SimplifyRegionOptions,
+    SimplifyRegionRequest,
+    SimplifyRegionResponse,
+    SimplifyRequest,
+    SimplifyResponse,
+)
+from src.api.sse import sse_event, sse_event_chunks
+from src.application.ports.artifact_store import ARTIFACT_MEDIA_TYPES, ArtifactStorePort
+from src.application.usecases.batch_transcribe import BatchTranscribeUseCase
+from src.application.usecases.export_pdf import ExportPdfUseCase
+from src.application.usecases.score_pages import ScorePagesUseCase
 from src.application.usecases.simplify_music import SimplifyMusicUseCase
 from src.application.usecases.transcribe_music import TranscribeMusicUseCase
+from src.core import metrics, profiling
 from src.core.config import settings
 from src.core.exceptions import (
     InvalidFileError,
+    InvalidMidiError,
+    PdfTimeoutError,
+    QuotaExceededError,
+    ScoreNotFoundError,
+    ServiceBusyError,
     TranscriptionAppError,
 )
-from src.domain.entities import Difficulty
+from src.domain.entities import Difficulty, ScoreFormat, TranscriptionResult
+from src.infrastructure.audio_duration import estimate_audio_seconds
+from src.infrastructure.cost_quota import CostQuota, QuotaReservation
+from src.infrastructure.cpu_executor import CpuExecutor
+from src.infrastructure.musicxml_packaging import minify_musicxml, to_mxl
+from src.infrastructure.note_pack import NOTE_PACK_MEDIA_TYPE, pack_notes
 
 logger = logging.getLogger(__name__)
 
+# MusicXML（非圧縮）の MIME タイプ
+MUSICXML_MEDIA_TYPE = "application/vnd.recordare.musicxml+xml"
+
+# プロファイルを求める要求ヘッダ（settings.profiling_enabled のときだけ有効）
+PROFILE_HEADER = "X-Profile"
+# 応答ヘッダに入れるプロファイルの関数の件数（全件は SSE・保存先で返す）
+_PROFILE_HEADER_HOTSPOTS = 10
+
+# Prometheus テキスト形式の MIME タイプ
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# MIDI ファイルの MIME タイプ
+MIDI_MEDIA_TYPE = "audio/midi"
+
+# split_artifacts で artifact イベントとして送る完了イベントのフィールドと、送った後の値
+_ARTIFACT_FIELDS = {"musicxml": "", "mxl_base64": None, "midi_base64": None}
+
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
 
@@ -87,19 +162,60 @@ def _sanitize_filename(filename: str) -> str:
     return sanitized or "upload"
 
 
+def _midi_request_body(json_model: type[BaseModel]) -> dict:
+    """JSON・バイナリ本文・multipart の3形式の本文を OpenAPI に記述する
+
+    列挙型はレスポンスのスキーマとして components に登録済みのものを参照する。
+    """
+    schema = json_model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {MIDI_FORM_FIELD: {"type": "string", "format": "binary"}},
+                        "required": [MIDI_FORM_FIELD],
+                    }
+                },
+            },
+        }
+    }
+
+
 @router.post("/transcribe")
 @limiter.limit(settings.rate_limit)
 async def transcribe(
     request: Request,
     file: UploadFile = File(...),  # noqa: B008
     difficulty: Difficulty = Form(Difficulty.ORIGINAL),  # noqa: B008
+    score_format: ScoreFormat = Form(ScoreFormat.MUSICXML),  # noqa: B008
+    minify: bool = Form(False),  # noqa: B008
+    include_midi: bool = Form(True),  # noqa: B008
+    split_artifacts: bool = Form(False),  # noqa: B008
     usecase: TranscribeMusicUseCase = Depends(get_transcribe_usecase),  # noqa: B008
+    artifact_store: ArtifactStorePort | None = Depends(get_artifact_store),  # noqa: B008
+    quota: CostQuota | None = Depends(get_cost_quota),  # noqa: B008
 ):
     """音声ファイルを採譜してSSEで結果を返す
 
     - 対応形式: MP3, WAV
     - 同時処理制限: 1件（ビジー時は503）
-    - レート制限: 1分あたり3リクエスト
+    - レート制限: settings.rate_limit（リクエスト数）
+    - 処理時間の割り当て: 音声の長さから処理時間を見積もってクライアントの残高から予約し、
+      足りなければ 429（Retry-After 付き）を返す。処理後に実際の処理時間で精算する
+    - プロファイル（デバッグ用）: settings.profiling_enabled のとき X-Profile: 1 を付けると、
+      完了イベントの前に profile イベント（処理段階・関数ごとの所要時間）を送る
+    - Accept-Encoding: gzip ならイベントごとにフラッシュする gzip ストリームで返す
+    - include_midi=false なら完了イベントに MIDI Base64 を含めず、
+      midi_url（/api/scores/{result_id}/midi）からバイナリで取得させる
+    - split_artifacts=true なら楽譜・MIDI を完了イベントの前に1つずつ artifact イベント
+      （name: 完了イベントのフィールド名, data: 値）で送り、完了イベントのそれらは空にする
+    - 大きなイベントはワーカースレッドでエスケープし、sse_chunk_size 文字ずつ流す
     """
     # ファイルバリデーション
     try:
@@ -114,16 +230,21 @@ async def transcribe(
     if transcription_semaphore is None:
         raise HTTPException(status_code=500, detail="サーバー初期化中です")
 
+    reservation = _reserve_quota(quota, request, await asyncio.to_thread(_audio_seconds, file.file))
+    profile_requested = _profile_requested(request)
+
     async def event_stream():
         """SSE イベントストリーム"""
         tmp_path: Path | None = None
+        processing_seconds = 0.0
+        completed = False
 
         try:
             # Semaphore 取得を試みる（即座に）
             transcription_semaphore.locked()
             if transcription_semaphore._value == 0:  # noqa: SLF001
                 msg = "サーバーがビジーです。しばらく待ってから再試行してください"
-                yield _sse_event(
+                yield sse_event(
                     "error",
                     {"code": "SERVICE_BUSY", "message": msg},
                 )
@@ -131,32 +252,34 @@ async def transcribe(
 
             async with transcription_semaphore:
                 # 進捗: アップロード受信
-                yield _sse_event(
+                yield sse_event(
                     "progress",
                     {"step": "upload", "progress_percent": 5, "message": "ファイルを受信しました"},
                 )
 
-                # 一時ファイルに保存
-                suffix = Path(file.filename or "upload").suffix
-                with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                # 一時ファイルに保存（サイズ超過なら保存しない）
+                with metrics.labels(endpoint="transcribe"), metrics.stage("upload"):
                     content = await file.read()
+                    metrics.observe(metrics.PAYLOAD_BYTES, len(content), kind="upload")
+                    too_large = len(content) > settings.max_file_size
+                    if not too_large:
+                        suffix = Path(file.filename or "upload").suffix
+                        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                            tmp.write(content)
+                            tmp_path = Path(tmp.name)
 
-                    # サイズチェック
-                    if len(content) > settings.max_file_size:
-                        max_mb = settings.max_file_size // 1024 // 1024
-                        yield _sse_event(
-                            "error",
-                            {
-                                "code": "FILE_TOO_LARGE",
-                                "message": f"ファイルサイズが上限（{max_mb}MB）を超えています",
-                            },
-                        )
-                        return
-
-                    tmp.write(content)
-                    tmp_path = Path(tmp.name)
+                if too_large:
+                    max_mb = settings.max_file_size // 1024 // 1024
+                    yield sse_event(
+                        "error",
+                        {
+                            "code": "FILE_TOO_LARGE",
+                            "message": f"ファイルサイズが上限（{max_mb}MB）を超えています",
+                        },
+                    )
+                    return
 
-                yield _sse_event(
+                yield sse_event(
                     "progress",
                     {
                         "step": "transcription",
@@ -165,76 +288,341 @@ async def transcribe(
                     },
                 )
 
-                # 採譜実行
-                result = await usecase.execute(tmp_path, difficulty)
+                # 採譜実行（割り当ての精算のため処理時間を測る）
+                started = time.perf_counter()
+                try:
+                    with (
+                        _maybe_profile(profile_requested) as profile,
+                        metrics.labels(endpoint="transcribe"),
+                    ):
+                        result = await usecase.execute(tmp_path, difficulty)
+                    completed = True
+                finally:
+                    processing_seconds = time.perf_counter() - started
 
-                yield _sse_event(
+                yield sse_event(
                     "progress",
                     {"step": "complete", "progress_percent": 100, "message": "完了しました"},
                 )
+                if profile is not None:
+                    yield sse_event("profile", await _finish_profile(profile))
 
                 # 完了イベント
-                yield _sse_event(
-                    "complete",
-                    {
-                        "musicxml": result.musicxml,
-                        "midi_base64": result.midi_base64,
-                        "metadata": {
-                            "duration_seconds": result.metadata.duration_seconds,
-                            "note_count": result.metadata.note_count,
-                            "tempo": result.metadata.tempo,
-                            "difficulty": result.metadata.difficulty.value,
-                        },
-                    },
+                complete = await _result_payload(
+                    result, score_format, minify, include_midi, artifact_store
                 )
+                if split_artifacts:
+                    # 大きなフィールドを1つずつ artifact イベントで先に送り、完了イベントは軽くする
+                    names = []
+                    for name in _ARTIFACT_FIELDS:
+                        if complete[name]:
+                            names.append(name)
+                            async for chunk in sse_event_chunks(
+                                "artifact",
+                                {"name": name, "data": complete[name]},
+                                settings.sse_chunk_size,
+                            ):
+                                yield chunk
+                            complete[name] = _ARTIFACT_FIELDS[name]
+                    complete["artifacts"] = names
+                async for chunk in sse_event_chunks("complete", complete, settings.sse_chunk_size):
+                    yield chunk
 
         except TranscriptionAppError as e:
             logger.error("採譜エラー: %s", e.message)
-            yield _sse_event("error", {"code": e.code, "message": e.message})
+            yield sse_event("error", {"code": e.code, "message": e.message})
         except Exception:
             logger.exception("予期しないエラー")
-            yield _sse_event(
+            yield sse_event(
                 "error",
                 {"code": "INTERNAL_ERROR", "message": "予期しないエラーが発生しました"},
             )
         finally:
+            # 処理しなかった分（ビジー・サイズ超過など）は返す
+            if reservation is not None:
+                reservation.settle(processing_seconds, completed)
             # 一時ファイルの即時削除（権利関係リスク回避）
             if tmp_path and tmp_path.exists():
                 tmp_path.unlink()
                 logger.info("一時ファイル削除: %s", tmp_path)
 
-    return StreamingResponse(
-        event_stream(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
+    return _event_stream_response(request, event_stream(), reservation)
+
+
+@router.post("/batch")
+@limiter.limit(settings.rate_limit)
+async def batch_transcribe(
+    request: Request,
+    files: list[UploadFile] = File(...),  # noqa: B008
+    difficulties: list[Difficulty] = Form([Difficulty.ORIGINAL]),  # noqa: B006, B008
+    score_format: ScoreFormat = Form(ScoreFormat.MUSICXML),  # noqa: B008
+    minify: bool = Form(False),  # noqa: B008
+    include_midi: bool = Form(True),  # noqa: B008
+    usecase: BatchTranscribeUseCase = Depends(get_batch_transcribe_usecase),  # noqa: B008
+    artifact_store: ArtifactStorePort | None = Depends(get_artifact_store),  # noqa: B008
+    quota: CostQuota | None = Depends(get_cost_quota),  # noqa: B008
+):
+    """複数の音声ファイルを複数の難易度で一括採譜し、SSEで項目ごとに結果を返す
+
+    - files: 音声ファイル（MP3, WAV）または音声ファイルをまとめた zip。複数指定できる
+    - difficulties: 難易度（複数指定できる）。ファイルごとに全難易度の楽譜を作る
+    - 推論・前処理はファイルごとに1回だけ行い、難易度ごとの楽譜生成は並行に行う
+    - 完了した項目から item イベント（/api/transcribe の完了イベントのフィールドに
+      index・file・difficulty・completed・total を加えたもの）で返し、失敗した項目は
+      item_error イベントで返す。最後に complete イベント（items・failed）を送る
+    - 同時処理制限は /api/transcribe と共有する（ビジー時は error イベント）
+    - 処理時間の割り当ては全ファイルの音声の長さ × 難易度数で見積もって予約する（足りなければ 429）
+    """
+    from main import transcription_semaphore
+
+    if transcription_semaphore is None:
+        raise HTTPException(status_code=500, detail="サーバー初期化中です")
+
+    # 処理を始める前に全ファイルを検証して一時ディレクトリに置く（不正なら 400）
+    directory = Path(tempfile.mkdtemp(prefix="batch-"))
+    try:
+        with metrics.labels(endpoint="batch"), metrics.stage("upload"):
+            inputs = await asyncio.to_thread(_stage_batch_files, files, directory)
+    except InvalidFileError as e:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=e.message) from e
+    levels = list(dict.fromkeys(difficulties))
+
+    try:
+        audio_seconds = await asyncio.to_thread(
+            lambda: sum(_path_audio_seconds(path) for _, path in inputs)
+        )
+        # 推論はファイルごとに1回だが、楽譜生成は難易度ごとに行うため難易度数で重み付けする
+        reservation = _reserve_quota(quota, request, audio_seconds * len(levels))
+    except HTTPException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    async def event_stream():
+        """SSE イベントストリーム"""
+        processing_seconds = 0.0
+        try:
+            if transcription_semaphore._value == 0:  # noqa: SLF001
+                msg = "サーバーがビジーです。しばらく待ってから再試行してください"
+                yield sse_event("error", {"code": "SERVICE_BUSY", "message": msg})
+                return
+
+            async with transcription_semaphore:
+                yield sse_event(
+                    "progress",
+                    {
+                        "step": "upload",
+                        "progress_percent": 5,
+                        "message": f"{len(inputs)} 件のファイルを受信しました",
+                    },
+                )
+                total = len(inputs) * len(levels)
+                failed = 0
+                finished = 0
+                started = time.perf_counter()
+                # 一括採譜のタスク・スレッドはラベルを付けたコンテキストを引き継ぐ
+                with metrics.labels(endpoint="batch"):
+                    async for item in usecase.execute(inputs, levels):
+                        finished += 1
+                        processing_seconds = time.perf_counter() - started
+                        head = {
+                            "index": item.file_index,
+                            "file": item.filename,
+                            "difficulty": item.difficulty.value,
+                            "completed": finished,
+                            "total": total,
+                        }
+                        if item.result is None:
+                            failed += 1
+                            yield sse_event(
+                                "item_error",
+                                {**head, "code": item.error_code, "message": item.error_message},
+                            )
+                            continue
+                        payload = await _result_payload(
+                            item.result, score_format, minify, include_midi, artifact_store
+                        )
+                        async for chunk in sse_event_chunks(
+                            "item", {**head, **payload}, settings.sse_chunk_size
+                        ):
+                            yield chunk
+                yield sse_event("complete", {"items": total, "failed": failed})
+
+        except Exception:
+            logger.exception("予期しないエラー")
+            yield sse_event(
+                "error",
+                {"code": "INTERNAL_ERROR", "message": "予期しないエラーが発生しました"},
+            )
+        finally:
+            if reservation is not None:
+                # 複数ファイル・難易度を並行に処理した経過時間は1件あたりの実績にならないため、
+                # 差し引くだけで見積もりの比率（/api/transcribe の実績で更新する）には使わない
+                reservation.settle(processing_seconds, completed=False)
+            # 一時ファイルの即時削除（権利関係リスク回避）
+            shutil.rmtree(directory, ignore_errors=True)
+            logger.info("一時ディレクトリ削除: %s", directory)
+
+    return _event_stream_response(request, event_stream(), reservation)
+
+
+def _stats_metrics(prefix: str, values: dict[str, float], gauges: tuple[str, ...]) -> str:
+    """統計のスナップショットを Prometheus のゲージ（gauges の項目）とカウンタにする"""
+    parts = []
+    for field, value in values.items():
+        if field in gauges:
+            parts.append(
+                metrics.render_gauges(f"{prefix}_{field}", f"{prefix} の {field}", [({}, value)])
+            )
+            continue
+        name = f"{prefix}_{field}" if field.endswith("_total") else f"{prefix}_{field}_total"
+        parts.append(metrics.render_gauges(name, f"{prefix} の {field}", [({}, value)], "counter"))
+    return "".join(parts)
+
+
+def _reserve_quota(
+    quota: CostQuota | None, request: Request, audio_seconds: float
+) -> QuotaReservation | None:
+    """クライアントの処理時間の割り当てから予約する（足りなければ 429 + Retry-After）"""
+    if quota is None:
+        return None
+    try:
+        return quota.reserve(get_remote_address(request), audio_seconds)
+    except QuotaExceededError as e:
+        headers = None
+        if e.retry_after is not None:
+            headers = {"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        raise HTTPException(status_code=429, detail=e.message, headers=headers) from e
+
+
+def _audio_seconds(source: BinaryIO) -> float:
+    """音声ファイルの長さを見積もる（読み取り位置は先頭に戻す）"""
+    size = source.seek(0, os.SEEK_END)
+    return estimate_audio_seconds(source, size)
+
+
+def _path_audio_seconds(path: Path) -> float:
+    with open(path, "rb") as f:
+        return _audio_seconds(f)
+
+
+def _stage_batch_files(files: list[UploadFile], directory: Path) -> list[tuple[str, Path]]:
+    """一括採譜の入力を検証し、音声ファイルを directory に書き出す（同期処理）
+
+    zip は許可された拡張子のメンバーだけを取り出す。
+
+    Returns:
+        (ファイル名, 書き出したパス) のリスト
+
+    Raises:
+        InvalidFileError: 不正なファイル・件数やサイズの上限超過
+    """
+    staged: list[tuple[str, Path]] = []
+
+    def stage(source: BinaryIO, filename: str) -> None:
+        if len(staged) >= settings.batch_max_files:
+            raise InvalidFileError(
+                f"ファイル数が上限（{settings.batch_max_files} 件）を超えています"
+            )
+        name = _sanitize_filename(filename)
+        header = source.read(4)
+        if not any(header.startswith(magic) for magic in MAGIC_BYTES):
+            raise InvalidFileError(f"{name}: ファイルの内容が音声ファイルとして認識できません")
+        path = directory / f"{len(staged):03d}-{name}"
+        size = len(header)
+        with open(path, "wb") as out:
+            out.write(header)
+            while chunk := source.read(1024 * 1024):
+                size += len(chunk)
+                if size > settings.max_file_size:
+                    max_mb = settings.max_file_size // 1024 // 1024
+                    raise InvalidFileError(
+                        f"{name}: ファイルサイズが上限（{max_mb}MB）を超えています"
+                    )
+                out.write(chunk)
+        staged.append((name, path))
+
+    for upload in files:
+        if Path(upload.filename or "").suffix.lower() != ".zip":
+            _validate_file(upload)
+            upload.file.seek(0)
+            stage(upload.file, upload.filename or "upload")
+            continue
+        try:
+            archive = zipfile.ZipFile(upload.file)
+        except zipfile.BadZipFile as e:
+            raise InvalidFileError(f"zip として読み取れません: {upload.filename}") from e
+        with archive:
+            for info in archive.infolist():
+                suffix = Path(info.filename).suffix.lower()
+                if info.is_dir() or suffix not in settings.allowed_extensions:
+                    continue
+                with archive.open(info) as member:
+                    stage(member, info.filename)
+
+    if not staged:
+        raise InvalidFileError("音声ファイルがありません")
+    return staged
 
 
-@router.post("/simplify", response_model=SimplifyResponse)
+@router.post(
+    "/simplify",
+    response_model=SimplifyResponse,
+    openapi_extra=_midi_request_body(SimplifyRequest),
+    responses={200: {"content": {FRAMES_MEDIA_TYPE: {}}}},
+)
 async def simplify_endpoint(
-    request_body: SimplifyRequest,
+    request: Request,
+    response: Response,
     usecase: SimplifyMusicUseCase = Depends(get_simplify_usecase),  # noqa: B008
+    artifact_store: ArtifactStorePort | None = Depends(get_artifact_store),  # noqa: B008
+    cpu_executor: CpuExecutor = Depends(get_cpu_executor),  # noqa: B008
 ):
-    """難易度を変更する（同期API、< 1秒）"""
+    """難易度を変更する（同期API、< 1秒）
+
+    MIDI は JSON（midi_base64）・バイナリ本文・multipart のいずれかで渡す。
+    採譜・簡略化の結果の score_id を渡せば MIDI は省略でき、
+    期限切れで元データがなければ 404 を返す（MIDI も渡されていればそちらを使う）。
+    簡略化・楽譜生成は専用の実行枠で行い、空き待ちが一杯なら 503（Retry-After 付き）を返す。
+    プロファイル（デバッグ用）: settings.profiling_enabled のとき X-Profile: 1 を付けると、
+    処理段階の所要時間を Server-Timing、関数ごとの所要時間を X-Profile-Summary で返す。
+    """
+    midi, options = await read_midi_request(
+        request, SimplifyRequest, SimplifyOptions, id_field="score_id"
+    )
     try:
-        result = await asyncio.to_thread(
-            usecase.execute, request_body.midi_base64, request_body.difficulty
-        )
+        with _maybe_profile(_profile_requested(request)) as profile:
+            with metrics.labels(endpoint="simplify"):
+                result = await cpu_executor.run(
+                    usecase.execute, midi, options.difficulty, options.score_id
+                )
+        profile_headers = {}
+        if profile is not None:
+            profile_headers = _profile_headers(await _finish_profile(profile))
+            response.headers.update(profile_headers)
+        artifact_urls = await asyncio.to_thread(_publish_artifacts, artifact_store, result)
+        if accepts_frames(request.headers.get("accept")):
+            frames = await asyncio.to_thread(
+                _frames_response, result, options, {"artifact_urls": artifact_urls}
+            )
+            frames.headers.update(profile_headers)
+            return frames
 
+        score = await asyncio.to_thread(
+            _score_payload, result.musicxml, options.score_format, options.minify
+        )
         return SimplifyResponse(
-            musicxml=result.musicxml,
+            **score,
             midi_base64=result.midi_base64,
-            metadata=MetadataResponse(
-                duration_seconds=result.metadata.duration_seconds,
-                note_count=result.metadata.note_count,
-                tempo=result.metadata.tempo,
-                difficulty=result.metadata.difficulty,
-            ),
+            result_id=result.result_id,
+            score_id=result.score_id,
+            artifact_urls=artifact_urls,
+            metadata=_metadata(result),
         )
+    except ScoreNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message) from e
+    except ServiceBusyError as e:
+        raise _busy(e) from e
     except TranscriptionAppError as e:
         raise HTTPException(status_code=400, detail=e.message) from e
     except Exception as exc:
@@ -245,34 +633,192 @@ async def simplify_endpoint(
         ) from exc
 
 
-@router.post("/export-pdf")
-async def export_pdf(
-    request_body: ExportPdfRequest,
-    midi_processor: MidiProcessorPort = Depends(get_midi_processor),  # noqa: B008
-    sheet_music_generator: SheetMusicGeneratorPort = Depends(get_sheet_music_generator),  # noqa: B008
+@router.post(
+    "/simplify-region",
+    response_model=SimplifyRegionResponse,
+    openapi_extra=_midi_request_body(SimplifyRegionRequest),
+    responses={200: {"content": {FRAMES_MEDIA_TYPE: {}}}},
+)
+async def simplify_region_endpoint(
+    request: Request,
+    usecase: SimplifyMusicUseCase = Depends(get_simplify_usecase),  # noqa: B008
+    artifact_store: ArtifactStorePort | None = Depends(get_artifact_store),  # noqa: B008
+    cpu_executor: CpuExecutor = Depends(get_cpu_executor),  # noqa: B008
 ):
-    """MIDI Base64 から PDF を生成して返す
+    """小節範囲 [start_measure, end_measure) だけ難易度を変更する
 
-    converter.parse() による MusicXML 再パースを回避するため、
-    _build_score() と同じパスで Score を構築してから PDF を書き出す。
+    mode=fragment は範囲のみの MusicXML/MIDI 断片を、
+    mode=splice は範囲を差し替えた曲全体を返す。
+    実行枠の空き待ちが一杯なら 503（Retry-After 付き）を返す。
     """
+    midi, options = await read_midi_request(
+        request, SimplifyRegionRequest, SimplifyRegionOptions, id_field="score_id"
+    )
+    region = {
+        "start_measure": options.start_measure,
+        "end_measure": options.end_measure,
+        "mode": options.mode,
+    }
     try:
-        def _generate_pdf() -> bytes:
-            # Base64 → MidiData（ブラウザ表示と同じデータソース）
-            midi_data = midi_processor.from_base64(request_body.midi_base64)
-            # _build_score() と同じパスで Score 構築（再パース回避）
-            score = sheet_music_generator.build_score(midi_data)
-            pdf_path = score.write("lily.pdf")
-            pdf_bytes = Path(pdf_path).read_bytes()
-            return pdf_bytes
-
-        pdf_bytes = await asyncio.to_thread(_generate_pdf)
-
-        return StreamingResponse(
-            iter([pdf_bytes]),
-            media_type="application/pdf",
-            headers={"Content-Disposition": 'attachment; filename="score.pdf"'},
+        with metrics.labels(endpoint="simplify_region"):
+            result = await cpu_executor.run(
+                usecase.execute_region,
+                midi,
+                options.difficulty,
+                options.start_measure,
+                options.end_measure,
+                options.mode,
+                options.score_id,
+            )
+        artifact_urls = await asyncio.to_thread(_publish_artifacts, artifact_store, result)
+        if accepts_frames(request.headers.get("accept")):
+            return await asyncio.to_thread(
+                _frames_response, result, options, {**region, "artifact_urls": artifact_urls}
+            )
+
+        score = await asyncio.to_thread(
+            _score_payload, result.musicxml, options.score_format, options.minify
+        )
+        return SimplifyRegionResponse(
+            **score,
+            midi_base64=result.midi_base64,
+            result_id=result.result_id,
+            score_id=result.score_id,
+            artifact_urls=artifact_urls,
+            metadata=_metadata(result),
+            **region,
         )
+    except ScoreNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message) from e
+    except ServiceBusyError as e:
+        raise _busy(e) from e
+    except TranscriptionAppError as e:
+        raise HTTPException(status_code=400, detail=e.message) from e
+    except Exception as exc:
+        logger.exception("範囲簡略化エラー")
+        raise HTTPException(
+            status_code=500,
+            detail="簡略化処理中にエラーが発生しました",
+        ) from exc
+
+
+@router.get("/scores/{result_id}/index", response_model=ScoreIndexResponse)
+async def score_index(
+    result_id: str,
+    usecase: ScorePagesUseCase = Depends(get_score_pages_usecase),  # noqa: B008
+):
+    """保持した結果の小節数と各小節の開始時刻を返す（楽譜本体は含まない）"""
+    try:
+        index = usecase.index(result_id)
+    except ScoreNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message) from e
+
+    return ScoreIndexResponse(
+        result_id=result_id,
+        measure_count=index.measure_count,
+        measure_duration=index.measure_duration,
+        measure_offsets=list(index.measure_offsets),
+        tempo=index.tempo,
+        time_signature_numerator=index.time_signature_numerator,
+        time_signature_denominator=index.time_signature_denominator,
+        note_count=index.note_count,
+        duration_seconds=index.duration_seconds,
+    )
+
+
+@router.get("/scores/{result_id}/measures")
+async def score_measures(
+    result_id: str,
+    start: int = Query(0, ge=0, description="開始小節（0始まり、含む）"),
+    end: int | None = Query(None, gt=0, description="終了小節（含まない）。省略時は曲の終わり"),
+    usecase: ScorePagesUseCase = Depends(get_score_pages_usecase),  # noqa: B008
+    cpu_executor: CpuExecutor = Depends(get_cpu_executor),  # noqa: B008
+):
+    """保持した結果の小節範囲 [start, end) だけの MusicXML を返す
+
+    範囲と重なるノートだけから記譜するため、長い曲でも範囲の長さに比例した時間で返る。
+    end は曲の小節数で打ち切り、実際の範囲は X-Measure-Start / X-Measure-End で返す。
+    """
+    try:
+        with metrics.labels(endpoint="score_measures"):
+            musicxml, first, last = await cpu_executor.run(usecase.page, result_id, start, end)
+    except ScoreNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message) from e
+    except ServiceBusyError as e:
+        raise _busy(e) from e
+    except TranscriptionAppError as e:
+        raise HTTPException(status_code=400, detail=e.message) from e
+
+    return Response(
+        content=musicxml,
+        media_type=MUSICXML_MEDIA_TYPE,
+        headers={
+            "X-Measure-Start": str(first),
+            "X-Measure-End": str(last),
+        },
+    )
+
+
+@router.get("/scores/{result_id}/midi")
+async def score_midi(
+    result_id: str,
+    usecase: ScorePagesUseCase = Depends(get_score_pages_usecase),  # noqa: B008
+):
+    """保持した結果の再生用 MIDI ファイルをバイナリのまま返す"""
+    try:
+        midi = await asyncio.to_thread(usecase.midi, result_id)
+    except ScoreNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message) from e
+
+    return Response(content=midi, media_type=MIDI_MEDIA_TYPE)
+
+
+@router.get("/scores/{result_id}/notes")
+async def score_notes(
+    result_id: str,
+    usecase: ScorePagesUseCase = Depends(get_score_pages_usecase),  # noqa: B008
+):
+    """保持した結果の再生用ノートをノートパック（固定幅の列形式）で返す
+
+    MIDI と同じノートを、クライアントが可変長イベントを解析せずに
+    型付き配列としてそのまま読める形で返す。
+    """
+    try:
+        notes = await asyncio.to_thread(usecase.notes, result_id)
+    except ScoreNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message) from e
+
+    return Response(content=pack_notes(notes), media_type=NOTE_PACK_MEDIA_TYPE)
+
+
+@router.post("/export-pdf", openapi_extra=_midi_request_body(ExportPdfRequest))
+async def export_pdf(
+    request: Request,
+    usecase: ExportPdfUseCase = Depends(get_export_pdf_usecase),  # noqa: B008
+    artifact_store: ArtifactStorePort | None = Depends(get_artifact_store),  # noqa: B008
+):
+    """MIDI（JSON の Base64・バイナリ本文・multipart）から PDF を生成して返す
+
+    採譜・簡略化の結果の result_id を渡せば MIDI は省略できる（期限切れなら 404）。
+
+    同じ内容の PDF はキャッシュから返す。LilyPond の同時実行数と待ち行列には
+    上限があり、一杯のときは 503、時間内に終わらないときは 504 を返す。
+    生成した PDF は成果物として保存し、Content-Location でその URL を返す。
+    """
+    midi, options = await read_midi_request(
+        request, ExportPdfRequest, ExportPdfOptions, id_field="result_id"
+    )
+    try:
+        with metrics.labels(endpoint="export_pdf"):
+            pdf_bytes = await usecase.execute(midi, options.result_id)
+    except ScoreNotFoundError as e:
+        raise HTTPException(status_code=404, detail=e.message) from e
+    except InvalidMidiError as e:
+        raise HTTPException(status_code=400, detail=e.message) from e
+    except ServiceBusyError as e:
+        raise _busy(e) from e
+    except PdfTimeoutError as e:
+        raise HTTPException(status_code=504, detail=e.message) from e
     except Exception as exc:
         logger.exception("PDF生成エラー")
         raise HTTPException(
@@ -280,7 +826,290 @@ async def export_pdf(
             detail="PDF生成中にエラーが発生しました",
         ) from exc
 
+    headers = {"Content-Disposition": 'attachment; filename="score.pdf"'}
+    if artifact_store is not None:
+        name = await asyncio.to_thread(artifact_store.put, pdf_bytes, "pdf")
+        headers["Content-Location"] = _artifact_url(name)
+        headers["ETag"] = _artifact_etag(name)
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
+
+@router.get("/stats")
+async def stats(
+    cpu_executor: CpuExecutor = Depends(get_cpu_executor),  # noqa: B008
+):
+    """実行枠（cpu）と PDF 生成（pdf）の統計を返す"""
+    return {"cpu": asdict(cpu_executor.stats()), "pdf": asdict(get_pdf_engine().stats())}
+
+
+@router.get("/metrics")
+async def prometheus_metrics(
+    cpu_executor: CpuExecutor = Depends(get_cpu_executor),  # noqa: B008
+):
+    """計測値を Prometheus テキスト形式で返す
+
+    - transcription_stage_seconds: 処理段階（upload・inference・tempo・preprocess・decode・
+      simplify・score_build・musicxml_write・midi_write・pdf_export）の所要時間
+    - transcription_notes / transcription_payload_bytes: 楽譜のノート数・データの大きさ
+    - いずれも endpoint・difficulty ラベル付き。実行枠・PDF 生成の待ち行列と統計、
+      採譜の同時実行枠の使用数、プロセスの常駐メモリも返す
+    """
+    from main import transcription_semaphore
+
+    in_use = 0
+    if transcription_semaphore is not None:
+        in_use = settings.max_concurrent_transcriptions - transcription_semaphore._value  # noqa: SLF001
+    body = "".join(
+        [
+            metrics.registry.render(),
+            _stats_metrics(
+                "cpu_executor",
+                asdict(cpu_executor.stats()),
+                ("workers", "queued", "running", "utilization"),
+            ),
+            _stats_metrics("pdf_engine", asdict(get_pdf_engine().stats()), ("queued", "running")),
+            metrics.render_gauges(
+                "transcription_slots",
+                "採譜の同時実行枠（state=in_use は使用中、limit は上限）",
+                [
+                    ({"state": "in_use"}, in_use),
+                    ({"state": "limit"}, settings.max_concurrent_transcriptions),
+                ],
+            ),
+            metrics.render_gauges(
+                "process_resident_memory_bytes",
+                "プロセスの常駐メモリ（バイト）",
+                [({}, metrics.process_rss_bytes())],
+            ),
+        ]
+    )
+    return Response(content=body, media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@router.get("/artifacts/{name}")
+async def artifact(
+    name: str,
+    request: Request,
+    artifact_store: ArtifactStorePort | None = Depends(get_artifact_store),  # noqa: B008
+):
+    """内容アドレスの成果物（<sha256>.musicxml / .mxl / .mid / .pdf）を返す
+
+    内容は名前から一意に決まるため、ブラウザ・プロキシに長期間キャッシュさせる。
+    強い ETag（ハッシュ）で If-None-Match に 304、単一範囲の Range に 206 を返す。
+    ETag と Range のバイト位置を保存された内容に対応させるため、GZipMiddleware には
+    圧縮させない（.mxl・.pdf はもともと圧縮済み）。
+    """
+    extension = name.rpartition(".")[2]
+    if extension not in ARTIFACT_MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="成果物が見つかりません")
+    etag = _artifact_etag(name)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes",
+        # Content-Encoding があれば GZipMiddleware は圧縮しない
+        "Content-Encoding": "identity",
+    }
+    # 同じ名前なら内容も同じため、手元の版と一致すれば読み出さずに 304 を返す
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    data = None
+    if artifact_store is not None:
+        data = await asyncio.to_thread(artifact_store.get, name)
+    if data is None:
+        raise HTTPException(status_code=404, detail="成果物が見つかりません")
+
+    media_type = ARTIFACT_MEDIA_TYPES[extension]
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = (
+            parse_range(request.headers.get("range"), len(data))
+            if if_range is None or if_range == etag
+            else None
+        )
+    except RangeNotSatisfiableError:
+        headers["Content-Range"] = f"bytes */{len(data)}"
+        return Response(status_code=416, headers=headers)
+    if byte_range is None:
+        return Response(content=data, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    return Response(
+        content=data[start : end + 1], status_code=206, media_type=media_type, headers=headers
+    )
+
+
+def _score_payload(musicxml: str, score_format: ScoreFormat, minify: bool) -> dict:
+    """配信形式に応じた楽譜のフィールド（musicxml / mxl_base64 / score_format）"""
+    if minify:
+        musicxml = minify_musicxml(musicxml)
+    if score_format == ScoreFormat.MXL:
+        mxl_base64 = base64.b64encode(to_mxl(musicxml)).decode("ascii")
+        return {"musicxml": "", "mxl_base64": mxl_base64, "score_format": score_format.value}
+    return {"musicxml": musicxml, "mxl_base64": None, "score_format": score_format.value}
+
+
+def _frames_response(
+    result: TranscriptionResult, options: SimplifyOptions, extra: dict | None = None
+) -> Response:
+    """結果をフレーム形式で返す
+
+    フレーム:
+    - metadata: score_format・result_id・metadata（と extra）の JSON
+    - score: MusicXML（UTF-8）または score_format=mxl なら圧縮 MusicXML
+    - midi: MIDI ファイル
+    """
+    musicxml = minify_musicxml(result.musicxml) if options.minify else result.musicxml
+    if options.score_format == ScoreFormat.MXL:
+        score = to_mxl(musicxml)
+    else:
+        score = musicxml.encode("utf-8")
+    header = {
+        "score_format": options.score_format.value,
+        "result_id": result.result_id,
+        "score_id": result.score_id,
+        "metadata": _metadata(result).model_dump(mode="json"),
+        **{key: getattr(value, "value", value) for key, value in (extra or {}).items()},
+    }
+    body = encode_frames(
+        [
+            ("metadata", json.dumps(header, ensure_ascii=False).encode("utf-8")),
+            ("score", score),
+            ("midi", base64.b64decode(result.midi_base64)),
+        ]
+    )
+    return Response(content=body, media_type=FRAMES_MEDIA_TYPE)
+
+
+async def _result_payload(
+    result: TranscriptionResult,
+    score_format: ScoreFormat,
+    minify: bool,
+    include_midi: bool,
+    artifact_store: ArtifactStorePort | None,
+) -> dict:
+    """採譜結果を SSE の完了イベントのフィールドにする"""
+    score = await asyncio.to_thread(_score_payload, result.musicxml, score_format, minify)
+    midi_url = _midi_url(result.result_id)
+    return {
+        **score,
+        # 結果を保持していなければ URL で取得できないため、常に埋め込む
+        "midi_base64": result.midi_base64 if include_midi or midi_url is None else None,
+        "midi_url": midi_url,
+        "result_id": result.result_id,
+        "score_id": result.score_id,
+        "artifact_urls": await asyncio.to_thread(_publish_artifacts, artifact_store, result),
+        "metadata": _metadata(result).model_dump(mode="json"),
+    }
+
+
+def _event_stream_response(
+    request: Request, body: AsyncIterator[str], reservation: QuotaReservation | None = None
+) -> StreamingResponse:
+    """SSE のレスポンス（Accept-Encoding: gzip ならイベントごとにフラッシュする gzip）
+
+    reservation はストリームの finally で精算するが、ストリームが始まる前に切断されると
+    finally は実行されない。その場合に備えてレスポンス後のタスクで全額を返す
+    （精算済みなら何もしない）。
+    """
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_stream(body)
+    background = (
+        BackgroundTask(reservation.settle, 0.0, completed=False)
+        if reservation is not None
+        else None
+    )
+    return StreamingResponse(
+        body, media_type="text/event-stream", headers=headers, background=background
+    )
+
+
+def _publish_artifacts(
+    artifact_store: ArtifactStorePort | None, result: TranscriptionResult
+) -> dict[str, str] | None:
+    """結果の MusicXML と MIDI を成果物として保存し、種類 → URL を返す（ストアがなければ None）"""
+    if artifact_store is None:
+        return None
+    return {
+        "musicxml": _artifact_url(artifact_store.put(result.musicxml.encode("utf-8"), "musicxml")),
+        "mid": _artifact_url(artifact_store.put(base64.b64decode(result.midi_base64), "mid")),
+    }
+
+
+def _artifact_url(name: str) -> str:
+    return f"/api/artifacts/{name}"
+
+
+def _artifact_etag(name: str) -> str:
+    """成果物の強い ETag（内容のハッシュ）"""
+    return f'"{name.partition(".")[0]}"'
+
+
+def _profile_requested(request: Request) -> bool:
+    """デバッグ用のプロファイルを求められたか（settings.profiling_enabled のときだけ）"""
+    return settings.profiling_enabled and request.headers.get(PROFILE_HEADER, "0") not in ("", "0")
+
+
+@contextmanager
+def _maybe_profile(enabled: bool) -> Iterator[profiling.RequestProfile | None]:
+    """enabled なら囲んだ処理をプロファイルする"""
+    if not enabled:
+        yield None
+        return
+    with profiling.profile_request() as profile:
+        yield profile
+
+
+async def _finish_profile(profile: profiling.RequestProfile) -> dict:
+    """プロファイルの要約を返す（保存先が設定されていれば保存する）"""
+    if settings.profiling_dir:
+        path = await asyncio.to_thread(profile.dump, settings.profiling_dir, settings.profiling_top)
+        logger.info("プロファイルを保存しました: %s", path)
+    return profile.summary(settings.profiling_top)
+
+
+def _profile_headers(summary: dict) -> dict[str, str]:
+    """プロファイルの要約を Server-Timing（処理段階）と X-Profile-Summary（関数）にする"""
+    timings = [
+        f"{name};dur={stage['seconds'] * 1000:.1f}" for name, stage in summary["stages"].items()
+    ]
+    timings.append(f"total;dur={summary['wall_seconds'] * 1000:.1f}")
+    hotspots = summary["hotspots"][:_PROFILE_HEADER_HOTSPOTS]
+    return {
+        "Server-Timing": ", ".join(timings),
+        "X-Profile-Id": summary["id"],
+        "X-Profile-Summary": json.dumps({"hotspots": hotspots}, separators=(",", ":")),
+    }
+
+
+def _busy(error: ServiceBusyError) -> HTTPException:
+    """混雑で断るときの 503（再試行までの目安がわかれば Retry-After を付ける）"""
+    headers = None
+    if error.retry_after is not None:
+        headers = {"Retry-After": str(math.ceil(error.retry_after))}
+    return HTTPException(status_code=503, detail=error.message, headers=headers)
+
+
+def _metadata(result: TranscriptionResult) -> MetadataResponse:
+    return MetadataResponse(
+        duration_seconds=result.metadata.duration_seconds,
+        note_count=result.metadata.note_count,
+        tempo=result.metadata.tempo,
+        difficulty=result.metadata.difficulty,
+    )
+
 
-def _sse_event(event: str, data: dict) -> str:
-    """SSE フォーマットのイベント文字列を生成する"""
-    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+def _midi_url(result_id: str | None) -> str | None:
+    """保持した結果の MIDI を取得する URL（保持していなければ None）"""
+    if result_id is None:
+        return None
+    return f"/api/scores/{result_id}/midi"
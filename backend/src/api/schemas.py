@@ -3,24 +3,95 @@
 APIリクエスト/レスポンスのスキーマを定義する。
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
-from src.domain.entities import Difficulty
+from src.domain.entities import Difficulty, RegionMode, ScoreFormat
 
 
-class SimplifyRequest(BaseModel):
-    """難易度変更リクエスト"""
+class SimplifyOptions(BaseModel):
+    """難易度変更のパラメータ（MIDI をバイナリで送るときはクエリ・フォームで渡す）"""
 
-    midi_base64: str = Field(..., description="Base64エンコードされた元MIDIデータ")
     difficulty: Difficulty = Field(..., description="目標の難易度")
+    score_format: ScoreFormat = Field(
+        ScoreFormat.MUSICXML, description="楽譜の配信形式（musicxml / mxl）"
+    )
+    minify: bool = Field(False, description="MusicXML の空白・既定値要素を取り除く")
+    score_id: str | None = Field(
+        None,
+        description="採譜・簡略化の結果の score_id。保持されていれば MIDI の代わりに使う",
+    )
+
+
+class SimplifyRequest(SimplifyOptions):
+    """難易度変更リクエスト（midi_base64 か score_id のどちらかが必要）"""
+
+    midi_base64: str | None = Field(
+        None, description="Base64エンコードされた元MIDIデータ（score_id の期限切れ時の代わり）"
+    )
+
+    @model_validator(mode="after")
+    def _check_source(self) -> "SimplifyRequest":
+        _require_midi(self.midi_base64, self.score_id, "score_id")
+        return self
+
+
+class SimplifyRegionOptions(SimplifyOptions):
+    """小節範囲の難易度変更のパラメータ"""
+
+    start_measure: int = Field(..., ge=0, description="開始小節（0始まり、含む）")
+    end_measure: int = Field(..., gt=0, description="終了小節（含まない）")
+    mode: RegionMode = Field(
+        RegionMode.FRAGMENT, description="fragment: 範囲のみの断片 / splice: 曲全体に差し戻す"
+    )
+
+    @model_validator(mode="after")
+    def _check_range(self) -> "SimplifyRegionOptions":
+        if self.end_measure <= self.start_measure:
+            raise ValueError("end_measure は start_measure より大きい必要があります")
+        return self
+
+
+class SimplifyRegionRequest(SimplifyRegionOptions):
+    """小節範囲の難易度変更リクエスト（midi_base64 か score_id のどちらかが必要）"""
+
+    midi_base64: str | None = Field(
+        None, description="Base64エンコードされた元MIDIデータ（score_id の期限切れ時の代わり）"
+    )
+
+    @model_validator(mode="after")
+    def _check_source(self) -> "SimplifyRegionRequest":
+        _require_midi(self.midi_base64, self.score_id, "score_id")
+        return self
 
 
 class SimplifyResponse(BaseModel):
     """難易度変更レスポンス"""
 
-    musicxml: str = Field(..., description="MusicXML文字列")
+    musicxml: str = Field(..., description="MusicXML文字列（score_format=mxl のときは空）")
     midi_base64: str = Field(..., description="Base64エンコードされた簡略化後MIDIデータ")
     metadata: "MetadataResponse" = Field(..., description="メタデータ")
+    score_format: ScoreFormat = Field(ScoreFormat.MUSICXML, description="楽譜の配信形式")
+    mxl_base64: str | None = Field(
+        None, description="Base64エンコードされた圧縮MusicXML（score_format=mxl のとき）"
+    )
+    result_id: str | None = Field(
+        None, description="小節範囲の取得（/api/scores/{result_id}/...）に使う結果 ID"
+    )
+    score_id: str | None = Field(
+        None, description="次の難易度変更で MIDI の代わりに渡せる元MIDIデータの ID"
+    )
+    artifact_urls: dict[str, str] | None = Field(
+        None,
+        description="キャッシュ可能な成果物の URL（musicxml: MusicXML, mid: MIDI）",
+    )
+
+
+class SimplifyRegionResponse(SimplifyResponse):
+    """小節範囲の難易度変更レスポンス"""
+
+    start_measure: int = Field(..., description="開始小節（0始まり、含む）")
+    end_measure: int = Field(..., description="終了小節（含まない）")
+    mode: RegionMode = Field(..., description="結果の返し方")
 
 
 class MetadataResponse(BaseModel):
@@ -32,10 +103,46 @@ class MetadataResponse(BaseModel):
     difficulty: Difficulty = Field(..., description="難易度")
 
 
-class ExportPdfRequest(BaseModel):
-    """PDF出力リクエスト"""
+class ScoreIndexResponse(BaseModel):
+    """保持した結果の小節索引レスポンス"""
+
+    result_id: str = Field(..., description="結果 ID")
+    measure_count: int = Field(..., description="小節数")
+    measure_duration: float = Field(..., description="1小節の長さ（秒）")
+    measure_offsets: list[float] = Field(..., description="各小節の開始時刻（秒）")
+    tempo: float = Field(..., description="テンポ（BPM）")
+    time_signature_numerator: int = Field(..., description="拍子の分子")
+    time_signature_denominator: int = Field(..., description="拍子の分母")
+    note_count: int = Field(..., description="ノート数")
+    duration_seconds: float = Field(..., description="楽曲の長さ（秒）")
+
+
+class ExportPdfOptions(BaseModel):
+    """PDF出力のパラメータ"""
+
+    result_id: str | None = Field(
+        None,
+        description="採譜・簡略化の結果の result_id。保持されていれば MIDI の代わりに使う",
+    )
+
+
+class ExportPdfRequest(ExportPdfOptions):
+    """PDF出力リクエスト（midi_base64 か result_id のどちらかが必要）"""
+
+    midi_base64: str | None = Field(
+        None, description="Base64エンコードされたMIDIデータ（result_id の期限切れ時の代わり）"
+    )
+
+    @model_validator(mode="after")
+    def _check_source(self) -> "ExportPdfRequest":
+        _require_midi(self.midi_base64, self.result_id, "result_id")
+        return self
+
 
-    midi_base64: str = Field(..., description="Base64エンコードされたMIDIデータ")
+def _require_midi(midi_base64: str | None, source_id: str | None, id_field: str) -> None:
+    """MIDI と保持データの ID のどちらも指定されていなければエラーにする"""
+    if midi_base64 is None and source_id is None:
+        raise ValueError(f"midi_base64 か {id_field} のどちらかが必要です")
 
 
 class HealthResponse(BaseModel):
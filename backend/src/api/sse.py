@@ -0,0 +1,54 @@
+"""Server-Sent Events の書き出し
+
+完了イベントは MusicXML・MIDI Base64 を含むため数 MB〜数十 MB になる。
+json.dumps でイベント全体を1つの文字列にすると、その間イベントループが止まり、
+JSON 文字列・SSE 文字列・バイト列とペイロードの複製が何重にもできる。
+sse_event_chunks は大きな文字列フィールドだけを区切ってワーカースレッドで
+エスケープし、chunk_size 以下の断片として順に流す。出力を連結すると
+sse_event と同じ文字列になる。
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+# 1回のスレッド呼び出しでエスケープする文字数（断片はさらに chunk_size に分けて流す）
+_ESCAPE_BATCH = 128 * 1024
+
+
+def sse_event(event: str, data: dict) -> str:
+    """SSE フォーマットのイベント文字列を生成する"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def sse_event_chunks(
+    event: str, data: dict, chunk_size: int = 64 * 1024
+) -> AsyncIterator[str]:
+    """SSE イベントを chunk_size 文字程度の断片に分けて生成する
+
+    chunk_size を超える文字列フィールド（トップレベルのみ）は、区切ってワーカースレッドで
+    エスケープする。それ以外のフィールドは小さいためその場で json.dumps する。
+    """
+    yield f"event: {event}\ndata: {{"
+    for i, (key, value) in enumerate(data.items()):
+        prefix = f"{', ' if i else ''}{json.dumps(key, ensure_ascii=False)}: "
+        if not isinstance(value, str) or len(value) <= chunk_size:
+            yield prefix + json.dumps(value, ensure_ascii=False)
+            continue
+
+        yield prefix + '"'
+        for start in range(0, len(value), _ESCAPE_BATCH):
+            escaped = await asyncio.to_thread(_escape, value, start, start + _ESCAPE_BATCH)
+            for offset in range(0, len(escaped), chunk_size):
+                yield escaped[offset : offset + chunk_size]
+        yield '"'
+    yield "}\n\n"
+
+
+def _escape(value: str, start: int, end: int) -> str:
+    """value[start:end] を JSON 文字列の中身としてエスケープする（前後の引用符なし）
+
+    JSON のエスケープは文字ごとに決まるため、区切った断片を別々にエスケープして
+    連結しても全体をエスケープした結果と一致する。
+    """
+    return json.dumps(value[start:end], ensure_ascii=False)[1:-1]
@@ -0,0 +1,45 @@
+"""ArtifactStore ポート: 内容アドレスの成果物（楽譜・MIDI・PDF）ストアの抽象インターフェース
+
+成果物は内容のハッシュと拡張子から決まる名前（"<sha256>.<拡張子>"）で保存する。
+同じ内容は同じ名前になるため、名前ごとにブラウザ・リバースプロキシでキャッシュできる。
+具体実装は infrastructure 層で提供する（例: LocalArtifactStore）。
+"""
+
+from abc import ABC, abstractmethod
+
+# 成果物の拡張子 → MIME タイプ
+ARTIFACT_MEDIA_TYPES = {
+    "musicxml": "application/vnd.recordare.musicxml+xml",
+    "mxl": "application/vnd.recordare.musicxml",
+    "mid": "audio/midi",
+    "pdf": "application/pdf",
+}
+
+
+class ArtifactStorePort(ABC):
+    """成果物ストアポート"""
+
+    @abstractmethod
+    def put(self, data: bytes, extension: str) -> str:
+        """成果物を保存して名前を返す（同じ内容がすでにあれば保存し直さない）
+
+        Args:
+            data: 成果物の内容
+            extension: 拡張子（ARTIFACT_MEDIA_TYPES のキー）
+
+        Returns:
+            成果物の名前（"<sha256>.<拡張子>"）
+        """
+        ...
+
+    @abstractmethod
+    def get(self, name: str) -> bytes | None:
+        """名前の成果物を返す
+
+        Args:
+            name: put() が返した名前
+
+        Returns:
+            成果物の内容。存在しない・追い出された場合は None
+        """
+        ...
@@ -36,6 +36,30 @@ class MidiProcessorPort(ABC):
         """
         ...
 
+    @abstractmethod
+    def to_bytes(self, midi_data: MidiData) -> bytes:
+        """MIDIデータを MIDI ファイル（SMF）のバイト列に変換する
+
+        Args:
+            midi_data: 内部表現のMIDIデータ
+
+        Returns:
+            MIDIファイルのバイト列
+        """
+        ...
+
+    @abstractmethod
+    def from_bytes(self, data: bytes) -> MidiData:
+        """MIDI ファイル（SMF）のバイト列をMIDIデータに変換する
+
+        Args:
+            data: MIDIファイルのバイト列
+
+        Returns:
+            内部表現のMIDIデータ
+        """
+        ...
+
     @abstractmethod
     def detect_tempo(self, midi_data: MidiData) -> float:
         """MIDIデータからテンポ（BPM）を検出する
@@ -0,0 +1,68 @@
+"""PdfEngine ポート: MIDIデータ → PDF楽譜変換の抽象インターフェース
+
+具体実装は infrastructure 層で提供する（例: LilyPondPdfEngine）。
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from src.domain.entities import MidiData
+
+
+@dataclass(frozen=True)
+class PdfEngineStats:
+    """PDF生成の統計（ある時点のスナップショット）
+
+    Attributes:
+        cache_hits: キャッシュから返した件数
+        cache_misses: 新たに生成した件数（同じ内容の生成待ちに合流したものを除く）
+        queued: 実行枠の空き待ちの件数
+        running: 生成中の件数
+        completed: 生成に成功した件数
+        failed: 生成に失敗した件数（タイムアウトを含む）
+        timed_out: タイムアウトで打ち切った件数
+        rejected: 待ち行列が一杯で断った件数
+        wait_seconds_total: 実行枠の空き待ち時間の合計（秒）
+        render_seconds_total: 生成時間の合計（秒）
+    """
+
+    cache_hits: int = 0
+    cache_misses: int = 0
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    render_seconds_total: float = 0.0
+
+
+class PdfEnginePort(ABC):
+    """PDF楽譜生成ポート"""
+
+    @abstractmethod
+    async def render_pdf(self, midi_data: MidiData) -> bytes:
+        """MIDIデータから PDF 楽譜を生成する
+
+        Args:
+            midi_data: 内部表現のMIDIデータ
+
+        Returns:
+            PDF のバイト列
+
+        Raises:
+            ServiceBusyError: 同時実行数と待ち行列が上限に達している場合
+            PdfExportError: 生成に失敗した場合（タイムアウトを含む）
+        """
+        ...
+
+    @abstractmethod
+    def stats(self) -> PdfEngineStats:
+        """現在の統計を返す"""
+        ...
+
+    @abstractmethod
+    async def aclose(self) -> None:
+        """実行中の生成を打ち切って資源を解放する（アプリ終了時）"""
+        ...
@@ -0,0 +1,37 @@
+"""ScoreStore ポート: サーバー側に保持する楽譜データの抽象インターフェース
+
+生成した結果のノートデータを ID で保持し、後から小節範囲の描画などに使う。
+具体実装は infrastructure 層で提供する（例: InMemoryScoreStore, FileScoreStore）。
+"""
+
+from abc import ABC, abstractmethod
+
+from src.domain.entities import MidiData
+
+
+class ScoreStorePort(ABC):
+    """楽譜データストアポート"""
+
+    @abstractmethod
+    def save(self, midi_data: MidiData) -> str:
+        """MIDIデータを保存して ID を返す
+
+        Args:
+            midi_data: 保存するMIDIデータ
+
+        Returns:
+            保存したデータの ID
+        """
+        ...
+
+    @abstractmethod
+    def get(self, score_id: str) -> MidiData | None:
+        """ID のMIDIデータを返す
+
+        Args:
+            score_id: save() が返した ID
+
+        Returns:
+            MIDIデータ。存在しない・期限切れなら None
+        """
+        ...
@@ -1,6 +1,6 @@
 """SheetMusicGenerator ポート: MIDIデータ → MusicXML変換の抽象インターフェース
 
-具体実装は infrastructure 層で提供する（例: Music21Generator）。
+具体実装は infrastructure 層で提供する（例: Music21Generator, DirectMusicXmlGenerator）。
 """
 
 from abc import ABC, abstractmethod
@@ -26,9 +26,9 @@ class SheetMusicGeneratorPort(ABC):
 
     @abstractmethod
     def generate_musicxml_and_midi(self, midi_data: MidiData) -> tuple[str, str]:
-        """MIDIデータからMusicXMLとMIDI Base64を同一Scoreから生成する
+        """MIDIデータからMusicXMLとMIDI Base64を同一のノートデータから生成する
 
-        同じ music21 Score オブジェクトから両方を出力するため、
+        記譜用に揃えた同じノートから両方を出力するため、
         MusicXML（表示用）と MIDI（再生用）の内容が一致する。
 
         Args:
@@ -39,6 +39,39 @@ class SheetMusicGeneratorPort(ABC):
         """
         ...
 
+    @abstractmethod
+    def generate_musicxml_page(
+        self, midi_data: MidiData, start_measure: int, end_measure: int
+    ) -> str:
+        """小節範囲 [start_measure, end_measure)（0始まり）だけの MusicXML を生成する
+
+        曲全体を描画せず、範囲と重なるノートだけから記譜する。
+        小節番号は曲全体での番号のまま、先頭小節に拍子・音部記号・テンポを持つ
+        単独で表示できる文書を返す。範囲をまたぐ音はタイの途中として書く。
+
+        Args:
+            midi_data: 内部表現のMIDIデータ
+            start_measure: 開始小節（含む）
+            end_measure: 終了小節（含まない）
+
+        Returns:
+            MusicXML文字列
+        """
+        ...
+
+    @abstractmethod
+    def generate_lilypond(self, midi_data: MidiData, lilypond_version: str = "2.24") -> str:
+        """MIDIデータから PDF 出力用の LilyPond ソースを生成する
+
+        Args:
+            midi_data: 内部表現のMIDIデータ
+            lilypond_version: ソースに書く \\version（実行する LilyPond に合わせる）
+
+        Returns:
+            LilyPond ソース文字列
+        """
+        ...
+
     @abstractmethod
     def build_score(self, midi_data: MidiData) -> Any:
         """MIDIデータから music21 Score オブジェクトを構築する
@@ -0,0 +1,105 @@
+"""一括採譜ユースケース
+
+複数の音声ファイルをそれぞれ複数の難易度で採譜する。
+難易度によらない段階（推論・テンポ推定・前処理）はファイルごとに1回だけ行い、
+難易度ごとの簡略化・楽譜生成はワーカースレッドで並行に行う。
+推論は1件ずつ順に行い、あるファイルの楽譜生成と次のファイルの推論を重ねる。
+結果は完了した順に1項目ずつ返す。
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from src.application.usecases.transcribe_music import TranscribeMusicUseCase
+from src.core.exceptions import TranscriptionAppError
+from src.domain.entities import BatchItemResult, Difficulty
+
+logger = logging.getLogger(__name__)
+
+
+class BatchTranscribeUseCase:
+    """音声ファイル × 難易度の一括採譜ユースケース
+
+    Args:
+        transcribe_usecase: 1ファイルの採譜ユースケース（prepare / render を使う）
+        max_workers: 楽譜生成を並行に行う最大数
+    """
+
+    def __init__(self, transcribe_usecase: TranscribeMusicUseCase, max_workers: int = 1):
+        self._transcribe = transcribe_usecase
+        self._max_workers = max(1, max_workers)
+
+    async def execute(
+        self,
+        files: list[tuple[str, Path]],
+        difficulties: list[Difficulty],
+    ) -> AsyncIterator[BatchItemResult]:
+        """一括採譜を実行し、完了した項目から順に返す
+
+        失敗した項目は error_code・error_message を設定して返し、残りの処理は続ける。
+        反復を途中でやめると、実行中の処理を取り消す。
+
+        Args:
+            files: (ファイル名, 音声ファイルのパス) のリスト
+            difficulties: 各ファイルに適用する難易度のリスト
+        """
+        queue: asyncio.Queue[BatchItemResult] = asyncio.Queue()
+        inference_slot = asyncio.Semaphore(1)
+        render_slots = asyncio.Semaphore(self._max_workers)
+
+        async def render(index: int, filename: str, midi_data, score_id, difficulty) -> None:
+            async with render_slots:
+                try:
+                    result = await asyncio.to_thread(
+                        self._transcribe.render, midi_data, difficulty, score_id
+                    )
+                except Exception as e:
+                    queue.put_nowait(_failed(index, filename, difficulty, e))
+                    return
+            queue.put_nowait(BatchItemResult(index, filename, difficulty, result=result))
+
+        async def run_file(index: int, filename: str, audio_path: Path) -> None:
+            try:
+                async with inference_slot:
+                    midi_data, score_id = await self._transcribe.prepare(audio_path)
+            except Exception as e:
+                for difficulty in difficulties:
+                    queue.put_nowait(_failed(index, filename, difficulty, e))
+                return
+            await asyncio.gather(
+                *(
+                    render(index, filename, midi_data, score_id, difficulty)
+                    for difficulty in difficulties
+                )
+            )
+
+        tasks = [
+            asyncio.create_task(run_file(index, filename, path))
+            for index, (filename, path) in enumerate(files)
+        ]
+        try:
+            for _ in range(len(files) * len(difficulties)):
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _failed(index: int, filename: str, difficulty: Difficulty, error: Exception) -> BatchItemResult:
+    """例外を失敗した項目の結果にする"""
+    if isinstance(error, TranscriptionAppError):
+        logger.error("一括採譜エラー (%s, %s): %s", filename, difficulty.value, error.message)
+        return BatchItemResult(
+            index, filename, difficulty, error_code=error.code, error_message=error.message
+        )
+    logger.exception("一括採譜の予期しないエラー (%s, %s)", filename, difficulty.value)
+    return BatchItemResult(
+        index,
+        filename,
+        difficulty,
+        error_code="INTERNAL_ERROR",
+        error_message="予期しないエラーが発生しました",
+    )
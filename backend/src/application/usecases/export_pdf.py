@@ -0,0 +1,72 @@
+"""PDF出力ユースケース
+
+MIDIデータ（Base64 またはバイト列）から PDF 楽譜を生成する。
+ブラウザ表示・再生と同じ MIDI をデータソースにする。
+サーバー側に保持した結果（採譜・簡略化の result_id）からも生成でき、
+その場合は MIDI の送信とデコードが不要になる。
+"""
+
+import asyncio
+import logging
+
+from src.application.ports.midi_processor import MidiProcessorPort
+from src.application.ports.pdf_engine import PdfEnginePort
+from src.application.ports.score_store import ScoreStorePort
+from src.core import metrics
+from src.core.exceptions import ScoreNotFoundError
+from src.domain.entities import MidiData
+
+logger = logging.getLogger(__name__)
+
+
+class ExportPdfUseCase:
+    """PDF楽譜の出力ユースケース"""
+
+    def __init__(
+        self,
+        midi_processor: MidiProcessorPort,
+        pdf_engine: PdfEnginePort,
+        result_store: ScoreStorePort | None = None,
+    ):
+        self._midi_processor = midi_processor
+        self._pdf_engine = pdf_engine
+        self._result_store = result_store
+
+    async def execute(self, midi: str | bytes | None, result_id: str | None = None) -> bytes:
+        """PDF を生成する
+
+        Args:
+            midi: MIDIデータ（Base64 文字列または MIDI ファイルのバイト列）。
+                result_id の結果が保持されていれば使わない
+            result_id: 保持した採譜・簡略化の結果の ID
+
+        Returns:
+            PDF のバイト列
+
+        Raises:
+            ScoreNotFoundError: result_id の結果がなく、midi も渡されていない場合
+        """
+        if result_id is not None and self._result_store is not None:
+            midi_data = self._result_store.get(result_id)
+            if midi_data is not None:
+                logger.info("PDF出力開始（保持した結果）: %d ノート", midi_data.note_count)
+                return await self._render(midi_data)
+        if midi is None:
+            raise ScoreNotFoundError()
+
+        decode = (
+            self._midi_processor.from_bytes
+            if isinstance(midi, bytes)
+            else self._midi_processor.from_base64
+        )
+        with metrics.stage("decode"):
+            midi_data = await asyncio.to_thread(decode, midi)
+        logger.info("PDF出力開始: %d ノート", midi_data.note_count)
+        return await self._render(midi_data)
+
+    async def _render(self, midi_data: MidiData) -> bytes:
+        """PDF を生成し、所要時間（空き待ち・キャッシュからの応答を含む）と大きさを記録する"""
+        with metrics.stage("pdf_export"):
+            pdf = await self._pdf_engine.render_pdf(midi_data)
+        metrics.observe(metrics.PAYLOAD_BYTES, len(pdf), kind="pdf")
+        return pdf
@@ -0,0 +1,104 @@
+"""楽譜ページ取得ユースケース
+
+採譜・簡略化の結果をサーバー側に保持しておき、小節索引と
+小節範囲ごとの MusicXML を返す。長い曲でもクライアントは全体を一度に
+読み込まず、表示する範囲だけを取得できる。
+再生用の MIDI・ノート列もバイナリのまま取得できる。
+"""
+
+import logging
+
+from src.application.ports.midi_processor import MidiProcessorPort
+from src.application.ports.score_store import ScoreStorePort
+from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
+from src.core.exceptions import InvalidMeasureRangeError, ScoreNotFoundError
+from src.domain.entities import MidiData, ScoreIndex
+from src.domain.notation import layout_measure_count, snap_to_layout_grid
+from src.domain.region import measure_duration
+
+logger = logging.getLogger(__name__)
+
+
+class ScorePagesUseCase:
+    """保持した結果の小節索引・小節範囲の楽譜を返すユースケース"""
+
+    def __init__(
+        self,
+        result_store: ScoreStorePort,
+        sheet_music_generator: SheetMusicGeneratorPort,
+        midi_processor: MidiProcessorPort,
+    ):
+        self._result_store = result_store
+        self._sheet_music_generator = sheet_music_generator
+        self._midi_processor = midi_processor
+
+    def index(self, result_id: str) -> ScoreIndex:
+        """小節数と各小節の開始時刻を返す
+
+        Raises:
+            ScoreNotFoundError: 結果が存在しない・期限切れの場合
+        """
+        midi_data = self._load(result_id)
+        count = layout_measure_count(midi_data)
+        length = measure_duration(midi_data)
+        return ScoreIndex(
+            measure_count=count,
+            measure_duration=length,
+            measure_offsets=tuple(i * length for i in range(count)),
+            tempo=midi_data.tempo,
+            time_signature_numerator=midi_data.time_signature_numerator,
+            time_signature_denominator=midi_data.time_signature_denominator,
+            note_count=midi_data.note_count,
+            duration_seconds=midi_data.duration,
+        )
+
+    def page(
+        self, result_id: str, start_measure: int, end_measure: int | None = None
+    ) -> tuple[str, int, int]:
+        """小節範囲 [start_measure, end_measure)（0始まり）の MusicXML を返す
+
+        end_measure は曲の小節数で打ち切る（None なら曲の終わりまで）。
+        描画コストは曲全体ではなく範囲内のノート数に比例する。
+
+        Returns:
+            (MusicXML文字列, 実際の開始小節, 実際の終了小節)
+
+        Raises:
+            ScoreNotFoundError: 結果が存在しない・期限切れの場合
+            InvalidMeasureRangeError: 範囲が空・曲の範囲外の場合
+        """
+        midi_data = self._load(result_id)
+        count = layout_measure_count(midi_data)
+        end = count if end_measure is None else min(end_measure, count)
+        if start_measure < 0 or start_measure >= count or end <= start_measure:
+            raise InvalidMeasureRangeError(
+                f"小節範囲が不正です: [{start_measure}, {end_measure})（全 {count} 小節）"
+            )
+
+        musicxml = self._sheet_music_generator.generate_musicxml_page(midi_data, start_measure, end)
+        logger.info("楽譜ページ生成: 小節 %d-%d / %d", start_measure, end, count)
+        return musicxml, start_measure, end
+
+    def notes(self, result_id: str) -> MidiData:
+        """楽譜と同じ16分音符グリッドに揃えた再生用のノートを返す
+
+        採譜・簡略化の結果の midi_base64 と同じノートになる。
+
+        Raises:
+            ScoreNotFoundError: 結果が存在しない・期限切れの場合
+        """
+        return snap_to_layout_grid(self._load(result_id))
+
+    def midi(self, result_id: str) -> bytes:
+        """再生用のノート（notes()）の MIDI ファイルを返す
+
+        Raises:
+            ScoreNotFoundError: 結果が存在しない・期限切れの場合
+        """
+        return self._midi_processor.to_bytes(self.notes(result_id))
+
+    def _load(self, result_id: str) -> MidiData:
+        midi_data = self._result_store.get(result_id)
+        if midi_data is None:
+            raise ScoreNotFoundError()
+        return midi_data
@@ -1,18 +1,25 @@
 """簡略化ユースケース
 
-既存のMIDIデータ（Base64）を別の難易度に簡略化する。
+既存のMIDIデータ（Base64 またはバイト列）を別の難易度に簡略化する。
 採譜処理は不要（元MIDIからの再計算のみ、< 1秒）。
+元MIDIはサーバー側に保持したものを score_id で参照でき、その場合はデコード・前処理も省く。
 """
 
 import logging
 
 from src.application.ports.midi_processor import MidiProcessorPort
+from src.application.ports.score_store import ScoreStorePort
 from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
+from src.core import metrics
+from src.core.exceptions import ScoreNotFoundError, SimplificationError
 from src.domain.entities import (
     Difficulty,
+    MidiData,
+    RegionMode,
     TranscriptionMetadata,
     TranscriptionResult,
 )
+from src.domain.region import extract_region, measure_window, splice_region
 from src.domain.simplification import simplify
 from src.domain.transcription import preprocess_midi
 
@@ -20,59 +27,174 @@ logger = logging.getLogger(__name__)
 
 
 class SimplifyMusicUseCase:
-    """MIDIデータの難易度変更ユースケース"""
+    """MIDIデータの難易度変更ユースケース
+
+    result_store を渡すと描画したノートを保持し、result_id で小節範囲ごとに取得できるようにする。
+    source_store を渡すと前処理済みの元MIDIデータを score_id で参照・保持する。
+    """
 
     def __init__(
         self,
         midi_processor: MidiProcessorPort,
         sheet_music_generator: SheetMusicGeneratorPort,
+        result_store: ScoreStorePort | None = None,
+        source_store: ScoreStorePort | None = None,
     ):
         self._midi_processor = midi_processor
         self._sheet_music_generator = sheet_music_generator
+        self._result_store = result_store
+        self._source_store = source_store
 
     def execute(
         self,
-        midi_base64: str,
+        midi: str | bytes | None,
         difficulty: Difficulty,
+        score_id: str | None = None,
     ) -> TranscriptionResult:
         """難易度変更を実行する
 
         Args:
-            midi_base64: Base64エンコードされた元MIDIデータ
+            midi: 元MIDIデータ（Base64 文字列または MIDI ファイルのバイト列）。
+                score_id のデータが保持されていれば使わない
             difficulty: 目標の難易度
+            score_id: 保持した元MIDIデータの ID
 
         Returns:
             新しい難易度で簡略化された結果
+
+        Raises:
+            ScoreNotFoundError: score_id のデータがなく、midi も渡されていない場合
+        """
+        with metrics.labels(difficulty=difficulty.value):
+            # 1-2. 保持した元データを使うか、デコードして前処理する
+            midi_data, score_id = self._load_source(midi, score_id)
+
+            # 3. 難易度に応じた簡略化
+            with metrics.stage("simplify"):
+                simplified = simplify(midi_data, difficulty)
+            logger.info(
+                "簡略化完了 (%s): %d → %d ノート",
+                difficulty.value,
+                midi_data.note_count,
+                simplified.note_count,
+            )
+
+            # 4-5. MusicXML + MIDI Base64 生成・メタデータ
+            return self._render(simplified, difficulty, score_id)
+
+    def execute_region(
+        self,
+        midi: str | bytes | None,
+        difficulty: Difficulty,
+        start_measure: int,
+        end_measure: int,
+        mode: RegionMode = RegionMode.FRAGMENT,
+        score_id: str | None = None,
+    ) -> TranscriptionResult:
+        """小節範囲 [start_measure, end_measure)（0始まり）だけ難易度を変更する
+
+        範囲外のノートはそのまま残し、範囲をまたぐノートは境界で分割する。
+        FRAGMENT は範囲だけの断片（0 秒始まり）を描画するため、
+        描画コストは曲全体ではなく範囲の長さに比例する。
+
+        Args:
+            midi: 元MIDIデータ（Base64 文字列または MIDI ファイルのバイト列）。
+                score_id のデータが保持されていれば使わない
+            difficulty: 目標の難易度
+            start_measure: 開始小節（含む）
+            end_measure: 終了小節（含まない）
+            mode: 断片を返すか、曲全体に差し戻したスコアを返すか
+            score_id: 保持した元MIDIデータの ID
+
+        Returns:
+            断片または差し戻し後のスコアの結果
+
+        Raises:
+            SimplificationError: 小節範囲が不正な場合
+            ScoreNotFoundError: score_id のデータがなく、midi も渡されていない場合
+        """
+        with metrics.labels(difficulty=difficulty.value):
+            midi_data, score_id = self._load_source(midi, score_id)
+
+            try:
+                t0, t1 = measure_window(midi_data, start_measure, end_measure)
+            except ValueError as e:
+                raise SimplificationError(str(e)) from e
+
+            with metrics.stage("simplify"):
+                region = extract_region(midi_data, t0, t1)
+                simplified = simplify(region, difficulty)
+            logger.info(
+                "範囲簡略化完了 (%s, 小節 %d-%d): %d → %d ノート",
+                difficulty.value,
+                start_measure,
+                end_measure,
+                region.note_count,
+                simplified.note_count,
+            )
+
+            if mode == RegionMode.SPLICE:
+                simplified = splice_region(midi_data, t0, t1, simplified)
+
+            return self._render(simplified, difficulty, score_id)
+
+    def _load_source(
+        self, midi: str | bytes | None, score_id: str | None
+    ) -> tuple[MidiData, str | None]:
+        """前処理済みの元MIDIデータと、それを保持している ID を返す
+
+        score_id のデータが保持されていればそれを使う。なければ midi をデコードして
+        前処理し、次回から ID で参照できるよう保持する。
+
+        Raises:
+            ScoreNotFoundError: score_id のデータがなく、midi も渡されていない場合
         """
-        # 1. Base64 → MIDIデータにデコード
-        midi_data = self._midi_processor.from_base64(midi_base64)
+        if score_id is not None and self._source_store is not None:
+            midi_data = self._source_store.get(score_id)
+            if midi_data is not None:
+                logger.info("保持した元MIDIデータを使用: %d ノート", midi_data.note_count)
+                return midi_data, score_id
+        if midi is None:
+            raise ScoreNotFoundError()
+
+        with metrics.stage("decode"):
+            midi_data = self._decode(midi)
         logger.info("MIDIデコード完了: %d ノート", midi_data.note_count)
+        # 前処理（量子化済みでも冪等なので再適用して問題なし）
+        with metrics.stage("preprocess"):
+            midi_data = preprocess_midi(midi_data)
+        new_id = self._source_store.save(midi_data) if self._source_store is not None else None
+        return midi_data, new_id
 
-        # 2. 前処理（量子化済みでも冪等なので再適用して問題なし）
-        midi_data = preprocess_midi(midi_data)
+    def _decode(self, midi: str | bytes) -> MidiData:
+        """Base64 文字列または MIDI ファイルのバイト列をデコードする"""
+        if isinstance(midi, bytes):
+            return self._midi_processor.from_bytes(midi)
+        return self._midi_processor.from_base64(midi)
 
-        # 3. 難易度に応じた簡略化
-        simplified = simplify(midi_data, difficulty)
-        logger.info(
-            "簡略化完了 (%s): %d → %d ノート",
-            difficulty.value,
-            midi_data.note_count,
-            simplified.note_count,
+    def _render(
+        self, midi_data: MidiData, difficulty: Difficulty, score_id: str | None = None
+    ) -> TranscriptionResult:
+        """MusicXML + MIDI Base64 を同一 Score から生成（一致保証）し、結果を組み立てる"""
+        musicxml, new_midi_base64 = self._sheet_music_generator.generate_musicxml_and_midi(
+            midi_data
         )
+        metrics.observe_score(midi_data.note_count, musicxml, new_midi_base64)
 
-        # 4. MusicXML + MIDI Base64 を同一 Score から生成（一致保証）
-        musicxml, new_midi_base64 = self._sheet_music_generator.generate_musicxml_and_midi(simplified)
-
-        # 5. メタデータ
         metadata = TranscriptionMetadata(
-            duration_seconds=simplified.duration,
-            note_count=simplified.note_count,
-            tempo=simplified.tempo,
+            duration_seconds=midi_data.duration,
+            note_count=midi_data.note_count,
+            tempo=midi_data.tempo,
             difficulty=difficulty,
         )
 
+        # 小節範囲で取得できるよう、描画したノートを保持する
+        result_id = self._result_store.save(midi_data) if self._result_store is not None else None
+
         return TranscriptionResult(
             musicxml=musicxml,
             midi_base64=new_midi_base64,
             metadata=metadata,
+            result_id=result_id,
+            score_id=score_id,
         )
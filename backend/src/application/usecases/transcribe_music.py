@@ -8,31 +8,43 @@ import logging
 from pathlib import Path
 
 from src.application.ports.midi_processor import MidiProcessorPort
+from src.application.ports.score_store import ScoreStorePort
 from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
 from src.application.ports.transcriber import TranscriberPort
+from src.core import metrics, profiling
 from src.domain.entities import (
     Difficulty,
+    MidiData,
     TranscriptionMetadata,
     TranscriptionResult,
 )
 from src.domain.simplification import simplify
+from src.domain.tempo import align_to_beat_grid
 from src.domain.transcription import preprocess_midi
 
 logger = logging.getLogger(__name__)
 
 
 class TranscribeMusicUseCase:
-    """音声ファイルの採譜ユースケース"""
+    """音声ファイルの採譜ユースケース
+
+    result_store を渡すと結果のノートを保持し、result_id で小節範囲ごとに取得できるようにする。
+    source_store を渡すと前処理済みの元MIDIデータを保持し、score_id で簡略化できるようにする。
+    """
 
     def __init__(
         self,
         transcriber: TranscriberPort,
         midi_processor: MidiProcessorPort,
         sheet_music_generator: SheetMusicGeneratorPort,
+        result_store: ScoreStorePort | None = None,
+        source_store: ScoreStorePort | None = None,
     ):
         self._transcriber = transcriber
         self._midi_processor = midi_processor
         self._sheet_music_generator = sheet_music_generator
+        self._result_store = result_store
+        self._source_store = source_store
 
     async def execute(
         self,
@@ -48,29 +60,68 @@ class TranscribeMusicUseCase:
         Returns:
             採譜結果（MusicXML + Base64 MIDI + メタデータ）
         """
+        midi_data, score_id = await self.prepare(audio_path)
+        return self.render(midi_data, difficulty, score_id)
+
+    async def prepare(self, audio_path: Path) -> tuple[MidiData, str | None]:
+        """難易度によらない段階（採譜・テンポ推定・前処理）を実行する
+
+        1つの音声から複数の難易度を作る場合は、この結果を render() に繰り返し渡す。
+
+        Returns:
+            (前処理済みの元MIDIデータ, 保持した元データの score_id。保持しない場合は None)
+        """
         # 1. 音声 → MIDIデータ（Basic Pitch経由）
         logger.info("採譜開始: %s", audio_path.name)
-        midi_data, _ = await self._transcriber.transcribe(audio_path)
+        with metrics.stage("inference"):
+            midi_data, _ = await self._transcriber.transcribe(audio_path)
         logger.info("採譜完了: %d ノート検出", midi_data.note_count)
 
-        # 2. 共通前処理（16分音符への量子化 + 重複除去）
-        midi_data = preprocess_midi(midi_data)
+        # 2. テンポ・拍グリッド推定（Basic Pitch のテンポは既定値のため onset から推定）
+        with metrics.stage("tempo"):
+            midi_data = align_to_beat_grid(midi_data)
+        logger.info("テンポ推定完了: %.2f BPM", midi_data.tempo)
+
+        # 3. 共通前処理（16分音符への量子化 + 重複除去）
+        with metrics.stage("preprocess"):
+            midi_data = preprocess_midi(midi_data)
         logger.info("前処理完了: %d ノート", midi_data.note_count)
 
-        # 3. 難易度に応じた簡略化
-        simplified = simplify(midi_data, difficulty)
-        logger.info(
-            "簡略化完了 (%s): %d → %d ノート",
-            difficulty.value,
-            midi_data.note_count,
-            simplified.note_count,
-        )
+        # 難易度の変更で元MIDIを送り直さずに済むよう、前処理済みの元データを保持する
+        score_id = self._source_store.save(midi_data) if self._source_store is not None else None
+        return midi_data, score_id
 
-        # 4. MusicXML + MIDI Base64 を同一 Score から生成（一致保証）
-        musicxml, midi_base64 = self._sheet_music_generator.generate_musicxml_and_midi(simplified)
-        logger.info("MusicXML + MIDI 生成完了")
+    def render(
+        self, midi_data: MidiData, difficulty: Difficulty, score_id: str | None = None
+    ) -> TranscriptionResult:
+        """前処理済みの元MIDIデータを難易度に応じて簡略化し、楽譜を生成する
+
+        CPU-bound の同期処理のため、並行に実行する場合はワーカースレッドから呼ぶ。
+
+        Args:
+            midi_data: prepare() が返した前処理済みの元MIDIデータ
+            difficulty: 目標の難易度
+            score_id: prepare() が返した score_id
+        """
+        # 一括採譜ではワーカースレッド、1件の採譜ではイベントループのスレッドで実行される
+        with metrics.labels(difficulty=difficulty.value), profiling.profile_thread():
+            # 4. 難易度に応じた簡略化
+            with metrics.stage("simplify"):
+                simplified = simplify(midi_data, difficulty)
+            logger.info(
+                "簡略化完了 (%s): %d → %d ノート",
+                difficulty.value,
+                midi_data.note_count,
+                simplified.note_count,
+            )
 
-        # 5. メタデータ
+            # 5. MusicXML + MIDI Base64 を同一 Score から生成（一致保証）
+            generator = self._sheet_music_generator
+            musicxml, midi_base64 = generator.generate_musicxml_and_midi(simplified)
+            logger.info("MusicXML + MIDI 生成完了")
+            metrics.observe_score(simplified.note_count, musicxml, midi_base64)
+
+        # 6. メタデータ
         metadata = TranscriptionMetadata(
             duration_seconds=simplified.duration,
             note_count=simplified.note_count,
@@ -78,8 +129,13 @@ class TranscribeMusicUseCase:
             difficulty=difficulty,
         )
 
+        # 小節範囲で取得できるよう、描画したノートを保持する
+        result_id = self._result_store.save(simplified) if self._result_store is not None else None
+
         return TranscriptionResult(
             musicxml=musicxml,
             midi_base64=midi_base64,
             metadata=metadata,
+            result_id=result_id,
+            score_id=score_id,
         )
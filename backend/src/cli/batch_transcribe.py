@@ -0,0 +1,315 @@
+"""オフライン一括採譜 CLI
+
+ディレクトリ以下の音声ファイルを、HTTP API を通さずに TranscribeMusicUseCase で採譜し、
+ファイルごとに難易度ごとの MusicXML と MIDI を書き出す。
+採譜はプロセスプールで並列に行い、各プロセスは起動時にアダプタを1回だけ組み立てる。
+
+処理済みのファイルはマニフェスト（JSON Lines、1ファイル1行を追記）に記録し、
+再実行すると内容（サイズ・更新時刻）と難易度が変わっていないファイルを飛ばす。
+途中で止めても、記録済みのファイルから再開できる。
+
+使い方:
+    uv run python -m src.cli.batch_transcribe 入力ディレクトリ 出力ディレクトリ \\
+        [--difficulties original,beginner | all] [--workers N] [--retry-failed]
+
+出力:
+    出力ディレクトリ/<入力からの相対パス（拡張子なし）>/<難易度>.musicxml, <難易度>.mid
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+from src.application.ports.transcriber import TranscriberPort
+from src.application.usecases.transcribe_music import TranscribeMusicUseCase
+from src.core.config import settings
+from src.domain.entities import Difficulty
+
+logger = logging.getLogger(__name__)
+
+# 計測する段階（prepare: 推論・テンポ推定・前処理 / render: 簡略化・楽譜生成 / write: 書き出し）
+STAGES = ("prepare", "render", "write")
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# ワーカープロセスごとに1回だけ組み立てるユースケース
+_worker_usecase: TranscribeMusicUseCase | None = None
+
+
+def default_usecase(transcriber: TranscriberPort | None = None) -> TranscribeMusicUseCase:
+    """API と同じアダプタで採譜ユースケースを組み立てる（結果・元データは保持しない）
+
+    楽譜生成は API の get_sheet_music_generator() を使わず、ワーカーの中で直接動くものを
+    組み立てる。CLI はファイル単位でプロセスプールに分けているため、ワーカーごとに
+    さらにプロセスプール（ProcessSheetMusicGenerator・music21-parallel）を持つと
+    workers × CPU 数のプロセスができ、ワーカー終了時にも終了されずに残る。
+
+    Args:
+        transcriber: 採譜アダプタ（省略時は API と同じもの）
+    """
+    # TensorFlow の冗長ログを抑制
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+    logging.getLogger("tensorflow").setLevel(logging.ERROR)
+    from src.api.dependencies import (
+        build_sheet_music_generator,
+        get_measure_cache,
+        get_midi_processor,
+        get_transcriber,
+    )
+    from src.infrastructure.music21_generator import Music21Generator
+
+    if settings.sheet_music_engine == "music21-parallel":
+        sheet_music_generator = Music21Generator(measure_cache=get_measure_cache())
+    else:
+        sheet_music_generator = build_sheet_music_generator()
+    return TranscribeMusicUseCase(
+        transcriber=transcriber or get_transcriber(),
+        midi_processor=get_midi_processor(),
+        sheet_music_generator=sheet_music_generator,
+    )
+
+
+@dataclass
+class BatchReport:
+    """一括採譜の集計"""
+
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    audio_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    stage_seconds: dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+
+    def format(self) -> str:
+        """スループットと段階ごとの時間を表にする"""
+        wall = self.wall_seconds or 1e-9
+        lines = [
+            f"処理: {self.processed} 件 / スキップ: {self.skipped} 件 / 失敗: {self.failed} 件",
+            f"経過時間: {self.wall_seconds:.1f} 秒",
+            f"スループット: {self.processed / wall:.3f} ファイル/秒, "
+            f"音声 {self.audio_seconds / wall:.2f} 秒/秒",
+            "段階ごとの時間（全ワーカーの合計 / 1ファイル平均）:",
+        ]
+        for stage in STAGES:
+            total = self.stage_seconds[stage]
+            mean = total / self.processed if self.processed else 0.0
+            lines.append(f"  {stage:<8} {total:9.2f} 秒 {mean:8.3f} 秒")
+        return "\n".join(lines)
+
+
+def discover(input_dir: Path) -> list[Path]:
+    """対応する拡張子の音声ファイルを相対パス順に返す"""
+    return sorted(
+        path
+        for path in input_dir.rglob("*")
+        if path.is_file() and path.suffix.lower() in settings.allowed_extensions
+    )
+
+
+def load_manifest(manifest_path: Path) -> dict[str, dict]:
+    """マニフェストを読み、相対パス → 最後の記録を返す（途中で切れた行は無視する）"""
+    entries: dict[str, dict] = {}
+    if not manifest_path.exists():
+        return entries
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["file"]] = entry
+    return entries
+
+
+def run_batch(
+    input_dir: Path,
+    output_dir: Path,
+    difficulties: list[Difficulty],
+    workers: int = 1,
+    manifest_path: Path | None = None,
+    retry_failed: bool = False,
+    usecase_factory: Callable[[], TranscribeMusicUseCase] = default_usecase,
+    progress: TextIO | None = None,
+) -> BatchReport:
+    """input_dir 以下の音声ファイルを一括採譜する
+
+    Args:
+        input_dir: 入力ディレクトリ
+        output_dir: 出力ディレクトリ
+        difficulties: 書き出す難易度
+        workers: プロセス数
+        manifest_path: マニフェストのパス（省略時は出力ディレクトリの manifest.jsonl）
+        retry_failed: 失敗として記録されたファイルもやり直す
+        usecase_factory: ワーカーでユースケースを組み立てる関数（pickle できること）
+        progress: 1ファイルごとの進捗の出力先
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = manifest_path or output_dir / MANIFEST_NAME
+    done = load_manifest(manifest_path)
+    levels = [difficulty.value for difficulty in difficulties]
+
+    report = BatchReport()
+    pending: list[tuple[Path, str, dict]] = []
+    for path in discover(input_dir):
+        relative = path.relative_to(input_dir).as_posix()
+        stat = path.stat()
+        source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        entry = done.get(relative)
+        if entry is not None and _is_complete(entry, source, levels, retry_failed):
+            report.skipped += 1
+            continue
+        pending.append((path, relative, source))
+
+    started = time.perf_counter()
+    with (
+        ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            initializer=_init_worker,
+            initargs=(usecase_factory,),
+        ) as pool,
+        open(manifest_path, "a", encoding="utf-8") as manifest,
+    ):
+        futures = {
+            pool.submit(_process_file, path, relative, output_dir, levels): source
+            for path, relative, source in pending
+        }
+        for future in as_completed(futures):
+            entry = {**future.result(), **futures[future]}
+            # 1件ごとに書き切り、中断してもそこまでの記録が残るようにする
+            manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            manifest.flush()
+
+            if entry["status"] == "done":
+                report.processed += 1
+                report.audio_seconds += entry["duration_seconds"]
+                for stage in STAGES:
+                    report.stage_seconds[stage] += entry["timings"][stage]
+            else:
+                report.failed += 1
+            if progress is not None:
+                finished = report.processed + report.failed
+                status = "OK" if entry["status"] == "done" else f"失敗: {entry['error']}"
+                print(f"[{finished}/{len(pending)}] {entry['file']} {status}", file=progress)
+    report.wall_seconds = time.perf_counter() - started
+    return report
+
+
+def _is_complete(entry: dict, source: dict, levels: list[str], retry_failed: bool) -> bool:
+    """記録が現在のファイル・難易度に対して処理済み（または諦めた失敗）か"""
+    if entry.get("size") != source["size"] or entry.get("mtime_ns") != source["mtime_ns"]:
+        return False
+    if entry.get("status") == "failed":
+        return not retry_failed
+    return set(levels) <= set(entry.get("difficulties", []))
+
+
+def _init_worker(usecase_factory: Callable[[], TranscribeMusicUseCase]) -> None:
+    """ワーカープロセスの初期化（モデル・アダプタの読み込みを1回で済ませる）"""
+    global _worker_usecase
+    _worker_usecase = usecase_factory()
+
+
+def _process_file(path: Path, relative: str, output_dir: Path, levels: list[str]) -> dict:
+    """ワーカーで1ファイルを採譜して書き出し、マニフェストの記録を返す"""
+    usecase = _worker_usecase
+    if usecase is None:
+        raise RuntimeError("ワーカーが初期化されていません")
+    timings = dict.fromkeys(STAGES, 0.0)
+    try:
+        t0 = time.perf_counter()
+        midi_data, _ = asyncio.run(usecase.prepare(path))
+        timings["prepare"] = time.perf_counter() - t0
+
+        target = output_dir / Path(relative).with_suffix("")
+        target.mkdir(parents=True, exist_ok=True)
+        outputs = []
+        for level in levels:
+            t0 = time.perf_counter()
+            result = usecase.render(midi_data, Difficulty(level))
+            t1 = time.perf_counter()
+            for name, data in (
+                (f"{level}.musicxml", result.musicxml.encode("utf-8")),
+                (f"{level}.mid", base64.b64decode(result.midi_base64)),
+            ):
+                (target / name).write_bytes(data)
+                outputs.append((target / name).relative_to(output_dir).as_posix())
+            timings["render"] += t1 - t0
+            timings["write"] += time.perf_counter() - t1
+    except Exception as e:
+        logger.exception("採譜に失敗しました: %s", relative)
+        return {"file": relative, "status": "failed", "error": str(e) or type(e).__name__}
+    return {
+        "file": relative,
+        "status": "done",
+        "difficulties": levels,
+        "outputs": outputs,
+        "duration_seconds": midi_data.duration,
+        "note_count": midi_data.note_count,
+        "timings": timings,
+    }
+
+
+def _parse_difficulties(value: str) -> list[Difficulty]:
+    if value == "all":
+        return list(Difficulty)
+    try:
+        return list(dict.fromkeys(Difficulty(item.strip()) for item in value.split(",")))
+    except ValueError as e:
+        choices = ", ".join(d.value for d in Difficulty)
+        raise argparse.ArgumentTypeError(f"難易度は {choices} または all です") from e
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli.batch_transcribe",
+        description="ディレクトリ以下の音声ファイルを一括採譜する",
+    )
+    parser.add_argument("input_dir", type=Path, help="音声ファイルのディレクトリ")
+    parser.add_argument("output_dir", type=Path, help="MusicXML・MIDI の出力先")
+    parser.add_argument(
+        "--difficulties",
+        type=_parse_difficulties,
+        default=[Difficulty.ORIGINAL],
+        help="書き出す難易度（カンマ区切り、all で全難易度。既定: original）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.batch_workers or os.cpu_count() or 1,
+        help="プロセス数（既定: BATCH_WORKERS、0 なら CPU 数）",
+    )
+    parser.add_argument("--manifest", type=Path, help="マニフェストのパス")
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="失敗として記録されたファイルもやり直す"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.input_dir.is_dir():
+        parser.error(f"入力ディレクトリがありません: {args.input_dir}")
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    report = run_batch(
+        args.input_dir,
+        args.output_dir,
+        args.difficulties,
+        workers=args.workers,
+        manifest_path=args.manifest,
+        retry_failed=args.retry_failed,
+        progress=sys.stderr,
+    )
+    print(report.format())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 """アプリケーション設定管理"""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -24,12 +26,88 @@ class Settings(BaseSettings):
         "audio/x-wav",
     }
 
-    # レート制限
-    rate_limit: str = "3/minute"
+    # レート制限（リクエスト数。大量のリクエストを防ぐためのもので、処理量は下の割り当てで制限する）
+    rate_limit: str = "30/minute"
+
+    # 採譜の処理時間の割り当て（クライアントごとのトークンバケット、単位は処理時間の秒）。
+    # 容量・1秒あたりの補充量・音声1秒あたりの処理時間の初期見積もり・保持するクライアント数。
+    # 容量 0 で無効
+    quota_capacity_seconds: float = 600.0
+    quota_refill_per_second: float = 0.25
+    quota_initial_ratio: float = 0.3
+    quota_max_clients: int = 10000
+
+    # gzip 圧縮するレスポンスの最小サイズ（バイト）
+    gzip_minimum_size: int = 1024
+
+    # SSE の大きなイベント（完了イベント）を分けて流す1断片の文字数
+    sse_chunk_size: int = 64 * 1024
 
     # 同時処理制限
     max_concurrent_transcriptions: int = 1
 
+    # 一括採譜（/api/batch）の1リクエストあたりの音声ファイル数の上限（zip の中身を含む）と、
+    # 難易度ごとの楽譜生成を並行に行う数（0 なら CPU 数）
+    batch_max_files: int = 20
+    batch_workers: int = 0
+
+    # 楽譜生成エンジン（direct: MusicXML 直接書き出し / music21: music21 エクスポータ /
+    # music21-parallel: music21 を小節チャンクごとにプロセスプールで並列実行）
+    sheet_music_engine: Literal["direct", "music21", "music21-parallel"] = "direct"
+
+    # music21-parallel の1チャンクの小節数とプロセス数（0 なら CPU 数）
+    musicxml_chunk_measures: int = 16
+    musicxml_workers: int = 0
+
+    # 簡略化・楽譜ページ生成の実行枠（同時実行数。0 なら CPU 数）と空き待ちの上限件数。
+    # 一杯のときは 503（Retry-After 付き）で断る
+    cpu_workers: int = 0
+    cpu_max_queue: int = 16
+    # 楽譜生成の実行先（process: ワーカープロセス / thread: 呼び出し元のスレッド）。
+    # music21-parallel は自前のプロセスプールを使うため対象外
+    cpu_executor_backend: Literal["process", "thread"] = "process"
+
+    # music21 の書き出し済み小節キャッシュの上限（0 で無効）
+    measure_cache_size: int = 20000
+
+    # 小節範囲で取得するために保持する結果の件数上限と有効期間（秒）
+    result_store_size: int = 256
+    result_store_ttl_seconds: int = 3600
+
+    # 簡略化で MIDI の代わりに ID で参照するために保持する元MIDIデータの件数上限と有効期間（秒）
+    source_store_size: int = 256
+    source_store_ttl_seconds: int = 3600
+
+    # 結果・元MIDIデータの保持先（memory: プロセス内 / file: score_store_dir にノートパックで保存。
+    # file なら同じディレクトリを共有する複数ワーカーから参照できる）
+    score_store_backend: Literal["memory", "file"] = "memory"
+    # file の保存先（空なら一時ディレクトリの下）
+    score_store_dir: str = ""
+
+    # 内容アドレスの成果物（/api/artifacts/...）の保存先（空なら一時ディレクトリの下）と
+    # 合計サイズの上限（バイト、0 で無効）
+    artifact_store_dir: str = ""
+    artifact_store_max_bytes: int = 512 * 1024 * 1024
+
+    # PDF出力（LilyPond）の実行ファイル・ソースに書くバージョン
+    lilypond_executable: str = "lilypond"
+    lilypond_version: str = "2.24"
+
+    # LilyPond の同時実行数・空き待ちの上限件数・1件あたりのタイムアウト（秒）
+    pdf_max_processes: int = 2
+    pdf_max_queue: int = 8
+    pdf_timeout_seconds: float = 60.0
+
+    # 生成済み PDF のキャッシュ件数（0 で無効）
+    pdf_cache_size: int = 64
+
+    # デバッグ用の要求ごとのプロファイル。有効なら X-Profile ヘッダ付きの
+    # /api/transcribe・/api/simplify の処理段階と関数ごとの所要時間を返す。
+    # 保存先（空なら保存しない）・返す関数の件数
+    profiling_enabled: bool = False
+    profiling_dir: str = ""
+    profiling_top: int = 25
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
 
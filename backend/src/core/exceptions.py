@@ -39,7 +39,59 @@ class SimplificationError(TranscriptionAppError):
 
 
 class ServiceBusyError(TranscriptionAppError):
-    """同時処理上限到達"""
+    """同時処理上限到達（retry_after: 再試行までの目安の秒数。わからなければ None）"""
 
-    def __init__(self, message: str = "サーバーがビジーです。しばらく待ってから再試行してください"):
+    def __init__(
+        self,
+        message: str = "サーバーがビジーです。しばらく待ってから再試行してください",
+        retry_after: float | None = None,
+    ):
         super().__init__(message=message, code="SERVICE_BUSY")
+        self.retry_after = retry_after
+
+
+class QuotaExceededError(TranscriptionAppError):
+    """クライアントの処理時間の割り当てを使い切った（retry_after: 貯まるまでの秒数）"""
+
+    def __init__(
+        self,
+        message: str = "処理量の上限に達しました。しばらく待ってから再試行してください",
+        retry_after: float | None = None,
+    ):
+        super().__init__(message=message, code="QUOTA_EXCEEDED")
+        self.retry_after = retry_after
+
+
+class ScoreNotFoundError(TranscriptionAppError):
+    """保持した結果が見つからない（存在しない・期限切れ）"""
+
+    def __init__(self, message: str = "楽譜が見つかりません。再度採譜してください"):
+        super().__init__(message=message, code="SCORE_NOT_FOUND")
+
+
+class InvalidMeasureRangeError(TranscriptionAppError):
+    """小節範囲が不正"""
+
+    def __init__(self, message: str = "小節範囲が不正です"):
+        super().__init__(message=message, code="INVALID_MEASURE_RANGE")
+
+
+class PdfExportError(TranscriptionAppError):
+    """PDF生成エラー"""
+
+    def __init__(self, message: str = "PDF生成中にエラーが発生しました", code: str = "PDF_ERROR"):
+        super().__init__(message=message, code=code)
+
+
+class PdfTimeoutError(PdfExportError):
+    """PDF生成のタイムアウト"""
+
+    def __init__(self, message: str = "PDF生成が時間内に終わりませんでした"):
+        super().__init__(message=message, code="PDF_TIMEOUT")
+
+
+class InvalidMidiError(TranscriptionAppError):
+    """MIDIデータとして読み取れない入力"""
+
+    def __init__(self, message: str = "MIDIデータを読み取れません"):
+        super().__init__(message=message, code="INVALID_MIDI")
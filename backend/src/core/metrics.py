@@ -0,0 +1,215 @@
+"""処理段階ごとの所要時間・大きさの計測（Prometheus テキスト形式で書き出す）
+
+各層は stage() で処理段階を囲み、observe() でノート数・データの大きさを記録する。
+エンドポイント・難易度などのラベルは labels() で呼び出し元が付け、contextvars で
+スレッド（asyncio.to_thread・CpuExecutor）に引き継ぐ。計測はヒストグラムのバケットに
+加算するだけなので、処理への影響は1段階あたり数マイクロ秒に収まる。
+
+ワーカープロセスで行う処理は capture() で記録を集めて親プロセスに返し、
+replay() で親のラベルを付けて記録する。
+要求をプロファイル中（src.core.profiling）なら、処理段階の所要時間をそのプロファイルにも加える。
+"""
+
+import bisect
+import os
+import resource
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src.core import profiling
+
+# 処理段階の所要時間（秒）
+STAGE_SECONDS = "transcription_stage_seconds"
+# 楽譜のノート数
+NOTES = "transcription_notes"
+# アップロード・生成したデータの大きさ（バイト）
+PAYLOAD_BYTES = "transcription_payload_bytes"
+
+_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+_NOTES_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+_BYTES_BUCKETS = tuple(1024 * 4**i for i in range(11))  # 1KiB 〜 1GiB
+
+_HISTOGRAMS = {
+    STAGE_SECONDS: ("処理段階の所要時間（秒）", _SECONDS_BUCKETS),
+    NOTES: ("楽譜のノート数", _NOTES_BUCKETS),
+    PAYLOAD_BYTES: ("アップロード・生成したデータの大きさ（バイト）", _BYTES_BUCKETS),
+}
+
+# 呼び出し元が付けたラベル（エンドポイント・難易度）
+_labels: ContextVar[tuple[tuple[str, str], ...]] = ContextVar("metrics_labels", default=())
+# capture() 中の記録先（ワーカープロセス用）
+_captured: ContextVar[list[tuple[str, float, dict[str, str]]] | None] = ContextVar(
+    "metrics_captured", default=None
+)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """ラベルの組ごとにバケット数・合計・件数を持つヒストグラム（スレッドセーフ）"""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # ラベルの組 → [バケットごとの件数..., 合計, 件数]
+        self._series: dict[LabelKey, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: LabelKey) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self) -> dict[LabelKey, list[float]]:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def render(self) -> Iterator[str]:
+        """Prometheus テキスト形式の行を返す（バケットは累積）"""
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self.snapshot().items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series, strict=False):
+                cumulative += count
+                le = _format_labels((*labels, ("le", _format_value(bound))))
+                yield f"{self.name}_bucket{le} {_format_value(cumulative)}"
+            le = _format_labels((*labels, ("le", "+Inf")))
+            yield f"{self.name}_bucket{le} {_format_value(series[-1])}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(labels)} {_format_value(series[-1])}"
+
+
+class MetricsRegistry:
+    """ヒストグラムの集まり"""
+
+    def __init__(self):
+        self.histograms = {
+            name: Histogram(name, help_text, buckets)
+            for name, (help_text, buckets) in _HISTOGRAMS.items()
+        }
+
+    def observe(self, name: str, value: float, labels: LabelKey) -> None:
+        self.histograms[name].observe(value, labels)
+
+    def render(self) -> str:
+        lines = [line for histogram in self.histograms.values() for line in histogram.render()]
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """記録を消す（テスト用）"""
+        for name, histogram in self.histograms.items():
+            self.histograms[name] = Histogram(name, histogram.help_text, histogram.buckets)
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def labels(**values: str) -> Iterator[None]:
+    """囲んだ範囲の記録にラベルを付ける（外側のラベルに重ねる）"""
+    merged = dict(_labels.get())
+    merged.update(values)
+    token = _labels.set(tuple(sorted(merged.items())))
+    try:
+        yield
+    finally:
+        try:
+            _labels.reset(token)
+        except ValueError:
+            # 非同期ジェネレータが別のタスクで閉じられた場合（そのタスクには何も残らない）
+            pass
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """囲んだ処理段階の所要時間を記録する（例外で終わっても記録する）"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(STAGE_SECONDS, time.perf_counter() - started, stage=name)
+
+
+def observe(name: str, value: float, **extra: str) -> None:
+    """ヒストグラム name に値を記録する（extra は記録ごとのラベル）"""
+    captured = _captured.get()
+    if captured is not None:
+        captured.append((name, value, extra))
+        return
+    merged = dict(_labels.get())
+    merged.update(extra)
+    registry.observe(name, value, tuple(sorted(merged.items())))
+    if name == STAGE_SECONDS and (profile := profiling.current()) is not None:
+        profile.add_stage(extra["stage"], value)
+
+
+@contextmanager
+def capture() -> Iterator[list[tuple[str, float, dict[str, str]]]]:
+    """囲んだ範囲の記録を登録せずにリストに集める（ワーカープロセスで使い、親で replay する）"""
+    records: list[tuple[str, float, dict[str, str]]] = []
+    token = _captured.set(records)
+    try:
+        yield records
+    finally:
+        _captured.reset(token)
+
+
+def observe_score(note_count: int, musicxml: str, midi_base64: str) -> None:
+    """生成した楽譜のノート数と大きさを記録する（文字列の長さをバイト数とみなす）"""
+    observe(NOTES, note_count)
+    observe(PAYLOAD_BYTES, len(musicxml), kind="musicxml")
+    observe(PAYLOAD_BYTES, len(midi_base64), kind="midi")
+
+
+def replay(records: Iterable[tuple[str, float, dict[str, str]]]) -> None:
+    """capture() で集めた記録を、今のラベルを付けて記録する"""
+    for name, value, extra in records:
+        observe(name, value, **extra)
+
+
+def process_rss_bytes() -> int:
+    """このプロセスの常駐メモリ（バイト。/proc がなければ最大常駐メモリ）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS はバイト、Linux はキロバイト
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def render_gauges(
+    name: str, help_text: str, samples: Iterable[tuple[dict[str, str], float]], kind: str = "gauge"
+) -> str:
+    """その時点の値（ゲージ・カウンタ）を Prometheus テキスト形式にする"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for sample_labels, value in samples:
+        lines.append(f"{name}{_format_labels(tuple(sample_labels.items()))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(pairs: LabelKey) -> str:
+    if not pairs:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
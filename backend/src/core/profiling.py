@@ -0,0 +1,184 @@
+"""要求ごとのプロファイル（デバッグ用、設定で有効にしたときだけ使う）
+
+特定のファイルだけ遅い場合、アップロードは処理後すぐに削除するため後から再現できない。
+profile_request() で囲んだ要求の処理について、処理段階ごとの所要時間と
+関数ごとの呼び出し回数・所要時間（cProfile）を集める。
+
+cProfile は有効にしたスレッドの呼び出ししか記録しないため、処理を行うスレッド
+（推論・CpuExecutor・楽譜生成）の入口を profile_thread() で囲む。イベントループの
+スレッドを通して記録すると同時に処理中の他の要求も混ざるため、待ちの間は記録しない。
+ワーカープロセスで行う楽譜生成は、ワーカーで記録した統計を結果と一緒に返して加える。
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+# 処理中の要求のプロファイル
+_current: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+# このスレッドで cProfile を有効にしているか（入れ子で有効にしない）
+_thread = threading.local()
+
+
+class RequestProfile:
+    """1要求分の処理段階の所要時間と関数ごとの統計"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self._started = time.perf_counter()
+        self._stages: dict[str, list[float]] = {}
+        self._stats: pstats.Stats | None = None
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def add_stats(self, stats: dict) -> None:
+        """pstats の統計（Stats.stats の形式）を加える"""
+        if not stats:
+            return
+        with self._lock:
+            if self._stats is None:
+                self._stats = _stats_from_dict(stats)
+            else:
+                self._stats.add(_stats_from_dict(stats))
+
+    @property
+    def stages(self) -> dict[str, float]:
+        """処理段階 → 所要時間の合計（秒）"""
+        with self._lock:
+            return {name: seconds for name, (_, seconds) in self._stages.items()}
+
+    def summary(self, top: int = 25) -> dict[str, Any]:
+        """処理段階の所要時間と、自身の所要時間の長い順に top 件の関数を返す"""
+        with self._lock:
+            stages = {
+                name: {"count": count, "seconds": round(seconds, 6)}
+                for name, (count, seconds) in self._stages.items()
+            }
+            rows = self._stats.stats.items() if self._stats is not None else []
+            hotspots = sorted(rows, key=lambda item: item[1][2], reverse=True)[:top]
+        return {
+            "id": self.id,
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": stages,
+            "hotspots": [
+                {
+                    "function": _function_label(key),
+                    "calls": calls,
+                    "self_seconds": round(self_time, 6),
+                    "cumulative_seconds": round(cumulative, 6),
+                }
+                for key, (_, calls, self_time, cumulative, _) in hotspots
+            ],
+        }
+
+    def dump(self, directory: str | Path, top: int = 25) -> Path:
+        """<id>.json（summary）と <id>.prof（pstats 形式、snakeviz などで開ける）を保存する"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.id}.json"
+        path.write_text(json.dumps(self.summary(top), ensure_ascii=False, indent=2))
+        with self._lock:
+            if self._stats is not None:
+                self._stats.dump_stats(directory / f"{self.id}.prof")
+        return path
+
+
+@contextmanager
+def profile_request() -> Iterator[RequestProfile]:
+    """囲んだ範囲の処理（そこから呼ぶスレッド・ワーカーを含む）のプロファイルを集める"""
+    profile = RequestProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def current() -> RequestProfile | None:
+    """処理中の要求のプロファイル（プロファイルしていなければ None）"""
+    return _current.get()
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """プロファイル中の要求なら、囲んだ範囲のこのスレッドの呼び出しを記録する"""
+    profile = _current.get()
+    if profile is None or getattr(_thread, "active", False):
+        yield
+        return
+    _thread.active = True
+    stats: dict = {}
+    try:
+        with collect() as stats:
+            yield
+    finally:
+        _thread.active = False
+        profile.add_stats(stats)
+
+
+@contextmanager
+def collect() -> Iterator[dict]:
+    """囲んだ範囲のこのスレッドの呼び出しを記録し、終わったら統計を辞書に入れる
+
+    ワーカープロセスのように要求のプロファイルが見えない場所で使い、統計を呼び出し元に返す。
+    他のプロファイラ（デバッガなど）が有効なら何も記録しない。
+    """
+    stats: dict = {}
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        yield stats
+        return
+    try:
+        yield stats
+    finally:
+        profiler.disable()
+        stats.update(stats_of(profiler))
+
+
+def call(fn: Callable[..., Any], *args: Any) -> Any:
+    """fn(*args) を profile_thread() の中で呼ぶ（スレッドプールに渡す入口用）"""
+    with profile_thread():
+        return fn(*args)
+
+
+def stats_of(profiler: cProfile.Profile) -> dict:
+    """cProfile の統計を pickle できる辞書（Stats.stats の形式）にする"""
+    profiler.create_stats()
+    return profiler.stats
+
+
+def _stats_from_dict(stats: dict) -> pstats.Stats:
+    result = pstats.Stats()
+    result.stats = stats
+    result.get_top_level_stats()
+    return result
+
+
+def _function_label(key: tuple[str, int, str]) -> str:
+    """(ファイル, 行, 関数名) を 'パッケージ内の相対パス:行(関数名)' にする"""
+    filename, line, name = key
+    if filename == "~":
+        return name  # 組み込み関数
+    marker = f"site-packages{os.sep}"
+    index = filename.rfind(marker)
+    if index >= 0:
+        filename = filename[index + len(marker) :]
+    elif filename.startswith(os.getcwd() + os.sep):
+        filename = os.path.relpath(filename)
+    return f"{filename}:{line}({name})"
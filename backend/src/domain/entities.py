@@ -6,6 +6,8 @@
 from dataclasses import dataclass, field
 from enum import StrEnum
 
+from src.domain.interval_index import NoteIntervalIndex
+
 
 class Difficulty(StrEnum):
     """難易度レベル"""
@@ -16,6 +18,20 @@ class Difficulty(StrEnum):
     BEGINNER = "beginner"
 
 
+class RegionMode(StrEnum):
+    """小節範囲の簡略化結果の返し方"""
+
+    FRAGMENT = "fragment"  # 指定範囲だけの断片
+    SPLICE = "splice"  # 曲全体に差し戻したスコア
+
+
+class ScoreFormat(StrEnum):
+    """楽譜（MusicXML）の配信形式"""
+
+    MUSICXML = "musicxml"  # 非圧縮の MusicXML 文字列
+    MXL = "mxl"  # 圧縮 MusicXML（zip コンテナ、Base64）
+
+
 @dataclass(frozen=True)
 class NoteEvent:
     """単一のノートイベント
@@ -56,6 +72,9 @@ class MidiData:
     tempo: float = 120.0
     time_signature_numerator: int = 4
     time_signature_denominator: int = 4
+    _note_index: NoteIntervalIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def duration(self) -> float:
@@ -69,6 +88,26 @@ class MidiData:
         """ノート数"""
         return len(self.notes)
 
+    @property
+    def note_index(self) -> NoteIntervalIndex:
+        """ノートの区間インデックス（初回アクセス時に構築し、以降は再利用する）
+
+        notes を別のリストに差し替えたり要素数を変えたりした場合は自動で作り直す。
+        """
+        index = self._note_index
+        if index is None or not index.is_built_from(self.notes):
+            index = NoteIntervalIndex(self.notes)
+            self._note_index = index
+        return index
+
+    def notes_overlapping(self, t0: float, t1: float) -> list[NoteEvent]:
+        """区間 [t0, t1) と重なるノートを開始時刻順に返す（O(log n + k)）"""
+        return self.note_index.overlapping(t0, t1)
+
+    def notes_active_at(self, time: float) -> list[NoteEvent]:
+        """時刻 time で鳴っているノートを開始時刻順に返す（O(log n + k)）"""
+        return self.note_index.active_at(time)
+
 
 @dataclass(frozen=True)
 class TranscriptionMetadata:
@@ -82,8 +121,62 @@ class TranscriptionMetadata:
 
 @dataclass
 class TranscriptionResult:
-    """採譜の最終結果"""
+    """採譜の最終結果
+
+    Attributes:
+        result_id: サーバー側に保持した結果の ID（小節範囲の取得に使う。保持しない場合は None）
+        score_id: サーバー側に保持した前処理済みの元MIDIデータの ID
+            （簡略化で MIDI の代わりに渡す。保持しない場合は None）
+    """
 
     musicxml: str
     midi_base64: str
     metadata: TranscriptionMetadata
+    result_id: str | None = None
+    score_id: str | None = None
+
+
+@dataclass(frozen=True)
+class BatchItemResult:
+    """一括採譜の1項目（1ファイル × 1難易度）の結果
+
+    Attributes:
+        file_index: 入力ファイルの番号（0始まり）
+        filename: 入力ファイル名
+        difficulty: 難易度
+        result: 採譜結果（失敗した場合は None）
+        error_code: 失敗した場合のエラーコード
+        error_message: 失敗した場合のメッセージ
+    """
+
+    file_index: int
+    filename: str
+    difficulty: Difficulty
+    result: TranscriptionResult | None = None
+    error_code: str | None = None
+    error_message: str | None = None
+
+
+@dataclass(frozen=True)
+class ScoreIndex:
+    """保持した結果の小節索引（ページ単位で楽譜を取得するための軽量な情報）
+
+    Attributes:
+        measure_count: 小節数
+        measure_duration: 1小節の長さ（秒）
+        measure_offsets: 各小節の開始時刻（秒）
+        tempo: テンポ（BPM）
+        time_signature_numerator: 拍子の分子
+        time_signature_denominator: 拍子の分母
+        note_count: ノート数
+        duration_seconds: 楽曲の長さ（秒）
+    """
+
+    measure_count: int
+    measure_duration: float
+    measure_offsets: tuple[float, ...]
+    tempo: float
+    time_signature_numerator: int
+    time_signature_denominator: int
+    note_count: int
+    duration_seconds: float
@@ -0,0 +1,127 @@
+"""ノートイベントの区間インデックス（純粋ロジック、外部依存なし）
+
+中心区間木（centered interval tree）と開始時刻のソート済み配列を組み合わせ、
+「時刻 t で鳴っているノート」「[t0, t1) と重なるノート」を O(log n + k) で返す。
+小節単位のページング・部分再描画・区間限定の簡略化で使う。
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.domain.entities import NoteEvent
+
+
+@dataclass
+class _Node:
+    """区間木のノード
+
+    center を含むノートを開始時刻昇順・終了時刻降順の2通りで保持する。
+    left には center 以前に終わるノート、right には center より後に始まるノートが入る。
+    """
+
+    center: float
+    by_start: list[int]
+    by_end: list[int]
+    left: "_Node | None"
+    right: "_Node | None"
+
+
+class NoteIntervalIndex:
+    """ノートの区間インデックス
+
+    ノートは半開区間 [start, end) で発音しているとみなす。
+    構築後に元のノートリストを変更した場合は作り直すこと。
+    """
+
+    def __init__(self, notes: Sequence["NoteEvent"]):
+        self._source = notes
+        self._source_len = len(notes)
+        # 開始時刻順に並べ替えた位置をノートIDとして使う（結果の並びが時刻順になる）
+        self._notes = sorted(notes, key=lambda n: (n.start, n.pitch))
+        self._starts = [n.start for n in self._notes]
+        self._root = self._build(list(range(len(self._notes))))
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def is_built_from(self, notes: Sequence["NoteEvent"]) -> bool:
+        """notes から構築したインデックスがそのまま使えるか"""
+        return notes is self._source and len(notes) == self._source_len
+
+    def active_at(self, time: float) -> list["NoteEvent"]:
+        """時刻 time で鳴っているノート（start <= time < end）を開始時刻順に返す"""
+        ids = self._stab(time)
+        ids.sort()
+        return [self._notes[i] for i in ids]
+
+    def overlapping(self, t0: float, t1: float) -> list["NoteEvent"]:
+        """区間 [t0, t1) と重なるノート（start < t1 かつ end > t0）を開始時刻順に返す"""
+        if t1 <= t0:
+            return []
+        # t0 で鳴っているノート + (t0, t1) で始まるノート（両者は排他的）
+        ids = self._stab(t0)
+        ids.sort()
+        lo = bisect_right(self._starts, t0)
+        hi = bisect_left(self._starts, t1)
+        ids.extend(range(lo, hi))
+        return [self._notes[i] for i in ids]
+
+    def starting_in(self, t0: float, t1: float) -> list["NoteEvent"]:
+        """区間 [t0, t1) で始まるノートを開始時刻順に返す"""
+        lo = bisect_left(self._starts, t0)
+        hi = bisect_left(self._starts, t1)
+        return self._notes[lo:hi]
+
+    def _stab(self, time: float) -> list[int]:
+        """time を含むノートIDを返す（順不同）"""
+        result: list[int] = []
+        node = self._root
+        notes = self._notes
+        while node is not None:
+            if time < node.center:
+                # center を含むノートは end > center > time なので start だけ見ればよい
+                for i in node.by_start:
+                    if notes[i].start > time:
+                        break
+                    result.append(i)
+                node = node.left
+            else:
+                # center を含むノートは start <= center <= time なので end だけ見ればよい
+                for i in node.by_end:
+                    if notes[i].end <= time:
+                        break
+                    result.append(i)
+                node = node.right
+        return result
+
+    def _build(self, ids: list[int]) -> _Node | None:
+        """中心区間木を構築する"""
+        if not ids:
+            return None
+
+        notes = self._notes
+        # ids は開始時刻順なので中央要素の開始時刻を center にする
+        center = notes[ids[len(ids) // 2]].start
+
+        here: list[int] = []
+        left: list[int] = []
+        right: list[int] = []
+        for i in ids:
+            note = notes[i]
+            if note.end <= center and note.start < center:
+                left.append(i)
+            elif note.start > center:
+                right.append(i)
+            else:
+                here.append(i)
+
+        return _Node(
+            center=center,
+            by_start=here,
+            by_end=sorted(here, key=lambda i: notes[i].end, reverse=True),
+            left=self._build(left),
+            right=self._build(right),
+        )
@@ -0,0 +1,373 @@
+"""記譜レイアウトのビジネスルール（純粋ロジック、外部依存なし）
+
+量子化済みノートを右手・左手の譜表ごとに、小節・声部・和音・タイ・休符へ配置する。
+MusicXML や LilyPond など出力形式に依存しない中間表現で、
+各ライタはこのレイアウトを順に書き出すだけでよい。
+
+時間はすべて16分音符を1とする整数ステップで扱う。
+"""
+
+import math
+from dataclasses import dataclass, replace
+from enum import StrEnum
+
+from src.domain.entities import MidiData, NoteEvent
+
+# 右手に割り当てる最低音（ミドルC）
+RIGHT_HAND_MIN_PITCH = 60
+
+# 1つの音符で表せる長さ（16分音符単位）→ (基本音価, 付点数)
+# 基本音価: 1=16分, 2=8分, 4=4分, 8=2分, 16=全, 32=倍全
+NOTE_VALUES: dict[int, tuple[int, int]] = {
+    32: (32, 0),
+    28: (16, 2),
+    24: (16, 1),
+    16: (16, 0),
+    14: (8, 2),
+    12: (8, 1),
+    8: (8, 0),
+    7: (4, 2),
+    6: (4, 1),
+    4: (4, 0),
+    3: (2, 1),
+    2: (2, 0),
+    1: (1, 0),
+}
+
+
+class Clef(StrEnum):
+    """音部記号"""
+
+    TREBLE = "treble"
+    BASS = "bass"
+
+
+@dataclass(frozen=True)
+class NotatedEvent:
+    """小節内の1つの音符・和音・休符
+
+    Attributes:
+        offset: 小節頭からの位置（16分音符単位）
+        duration: 長さ（16分音符単位、NOTE_VALUES のいずれか）
+        pitches: 和音を構成するMIDIノート番号（昇順）。空なら休符
+        velocity: ベロシティ（休符は0）
+        tie_start: 次の音符へタイで続く
+        tie_stop: 前の音符からタイで続いている
+    """
+
+    offset: int
+    duration: int
+    pitches: tuple[int, ...] = ()
+    velocity: int = 0
+    tie_start: bool = False
+    tie_stop: bool = False
+
+    @property
+    def is_rest(self) -> bool:
+        """休符か"""
+        return not self.pitches
+
+
+@dataclass(frozen=True)
+class NotatedMeasure:
+    """1小節分の声部の並び
+
+    Attributes:
+        index: 曲頭からの小節番号（0始まり）
+        voices: 声部ごとのイベント列。第1声部は常に小節を埋め、
+            第2声部以降は音符のある小節にだけ現れる
+    """
+
+    index: int
+    voices: tuple[tuple[NotatedEvent, ...], ...]
+
+    @property
+    def number(self) -> int:
+        """楽譜上の小節番号（1始まり）"""
+        return self.index + 1
+
+
+@dataclass(frozen=True)
+class StaffLayout:
+    """1つの譜表（右手 or 左手）のレイアウト"""
+
+    name: str
+    clef: Clef
+    measures: tuple[NotatedMeasure, ...]
+
+
+@dataclass(frozen=True)
+class ScoreLayout:
+    """ピアノ譜（2譜表）のレイアウト
+
+    Attributes:
+        tempo: テンポ（BPM）
+        beats: 拍子の分子
+        beat_type: 拍子の分母
+        measure_length: 1小節の長さ（16分音符単位）
+        start_measure: 先頭小節の番号（0始まり）。部分レイアウトでは0以外
+        staves: (右手, 左手)
+    """
+
+    tempo: float
+    beats: int
+    beat_type: int
+    measure_length: int
+    start_measure: int
+    staves: tuple[StaffLayout, StaffLayout]
+
+    @property
+    def measure_count(self) -> int:
+        """小節数"""
+        return len(self.staves[0].measures)
+
+    def window(self, start: int, end: int) -> "ScoreLayout":
+        """このレイアウトの [start, end) 番目の小節だけを持つレイアウトを返す
+
+        タイはレイアウト全体で決まっているため、切り出した小節の
+        境界でもタイの始点・終点はそのまま保たれる。
+        """
+        staves = tuple(replace(staff, measures=staff.measures[start:end]) for staff in self.staves)
+        return replace(self, start_measure=self.start_measure + start, staves=staves)
+
+
+@dataclass(frozen=True)
+class _Chord:
+    """同時に始まり同時に終わるノートのまとまり（ステップ単位）"""
+
+    start: int
+    end: int
+    pitches: tuple[int, ...]
+    velocity: int
+    tie_in: bool
+    tie_out: bool
+
+
+def measure_length_steps(numerator: int, denominator: int) -> int:
+    """1小節の長さ（16分音符単位）"""
+    return max(1, numerator * 16 // denominator)
+
+
+def split_duration(duration: int) -> list[int]:
+    """長さを1つの音符で表せる長さの列に分割する（長い順）"""
+    parts: list[int] = []
+    remaining = duration
+    while remaining > 0:
+        part = next(value for value in NOTE_VALUES if value <= remaining)
+        parts.append(part)
+        remaining -= part
+    return parts
+
+
+def snap_to_layout_grid(midi_data: MidiData) -> MidiData:
+    """ノートを記譜レイアウトと同じ16分音符グリッドに揃える（最短1ステップ）
+
+    再生用 MIDI をこのノートから書き出せば、楽譜の表示と再生が一致する。
+    """
+    sixteenth = 60.0 / midi_data.tempo / 4.0
+    notes = []
+    for note in midi_data.notes:
+        start, end = _to_steps(note.start, note.end, sixteenth)
+        notes.append(NoteEvent(note.pitch, start * sixteenth, end * sixteenth, note.velocity))
+    return MidiData(
+        notes=notes,
+        tempo=midi_data.tempo,
+        time_signature_numerator=midi_data.time_signature_numerator,
+        time_signature_denominator=midi_data.time_signature_denominator,
+    )
+
+
+def layout_measure_count(midi_data: MidiData) -> int:
+    """layout_score() で曲全体をレイアウトしたときの小節数（最低1小節）
+
+    小節範囲ごとに描画する場合も、曲の終わりはこの小節数で判定する。
+    """
+    sixteenth = 60.0 / midi_data.tempo / 4.0
+    measure_length = measure_length_steps(
+        midi_data.time_signature_numerator, midi_data.time_signature_denominator
+    )
+    last_step = max((_to_steps(n.start, n.end, sixteenth)[1] for n in midi_data.notes), default=0)
+    return max(1, math.ceil(last_step / measure_length))
+
+
+def layout_score(
+    midi_data: MidiData,
+    start_measure: int = 0,
+    end_measure: int | None = None,
+) -> ScoreLayout:
+    """MIDIデータをピアノ譜のレイアウトに変換する
+
+    ノートは16分音符グリッドに丸め（最短1ステップ）、ミドルC以上を右手、
+    未満を左手に振り分ける。同じ位置・長さのノートは和音にまとめ、
+    重なるノートは別の声部に置く。小節線をまたぐ音や1つの音符で
+    表せない長さはタイで分割する。
+
+    Args:
+        midi_data: 量子化済みのMIDIデータ
+        start_measure: レイアウトする最初の小節（0始まり、含む）
+        end_measure: レイアウトする最後の小節（含まない）。None なら曲の終わりまで
+
+    Returns:
+        ピアノ譜のレイアウト
+    """
+    sixteenth = 60.0 / midi_data.tempo / 4.0
+    measure_length = measure_length_steps(
+        midi_data.time_signature_numerator, midi_data.time_signature_denominator
+    )
+
+    window_start = start_measure * measure_length
+    if end_measure is None:
+        notes = midi_data.notes
+        end_measure = max(start_measure + 1, layout_measure_count(midi_data))
+    else:
+        notes = midi_data.notes_overlapping(
+            window_start * sixteenth, end_measure * measure_length * sixteenth
+        )
+    window_end = end_measure * measure_length
+
+    right: dict[tuple[int, int, bool, bool], list] = {}
+    left: dict[tuple[int, int, bool, bool], list] = {}
+    for note in notes:
+        start, end = _to_steps(note.start, note.end, sixteenth)
+        if end <= window_start or start >= window_end:
+            continue
+        tie_in = start < window_start
+        tie_out = end > window_end
+        key = (max(start, window_start), min(end, window_end), tie_in, tie_out)
+        group = right if note.pitch >= RIGHT_HAND_MIN_PITCH else left
+        group.setdefault(key, []).append(note)
+
+    staves = (
+        StaffLayout(
+            name="Right Hand",
+            clef=Clef.TREBLE,
+            measures=_layout_staff(_to_chords(right), start_measure, end_measure, measure_length),
+        ),
+        StaffLayout(
+            name="Left Hand",
+            clef=Clef.BASS,
+            measures=_layout_staff(_to_chords(left), start_measure, end_measure, measure_length),
+        ),
+    )
+    return ScoreLayout(
+        tempo=midi_data.tempo,
+        beats=midi_data.time_signature_numerator,
+        beat_type=midi_data.time_signature_denominator,
+        measure_length=measure_length,
+        start_measure=start_measure,
+        staves=staves,
+    )
+
+
+def _to_steps(start: float, end: float, sixteenth: float) -> tuple[int, int]:
+    """秒を16分音符ステップに丸める（最短1ステップ）"""
+    start_step = max(0, round(start / sixteenth))
+    end_step = max(start_step + 1, round(end / sixteenth))
+    return start_step, end_step
+
+
+def _to_chords(groups: dict[tuple[int, int, bool, bool], list]) -> list[_Chord]:
+    """同じ位置・長さのノートを和音にまとめる"""
+    chords = []
+    for (start, end, tie_in, tie_out), notes in groups.items():
+        chords.append(
+            _Chord(
+                start=start,
+                end=end,
+                pitches=tuple(sorted({n.pitch for n in notes})),
+                velocity=max(n.velocity for n in notes),
+                tie_in=tie_in,
+                tie_out=tie_out,
+            )
+        )
+    return chords
+
+
+def _assign_voices(chords: list[_Chord]) -> list[list[_Chord]]:
+    """重ならないように和音を声部へ振り分ける（空いている最小番号の声部に入れる）"""
+    voices: list[list[_Chord]] = []
+    busy_until: list[int] = []
+    for chord in sorted(chords, key=lambda c: (c.start, -c.pitches[-1])):
+        for v, end in enumerate(busy_until):
+            if end <= chord.start:
+                voices[v].append(chord)
+                busy_until[v] = chord.end
+                break
+        else:
+            voices.append([chord])
+            busy_until.append(chord.end)
+    return voices
+
+
+def _layout_staff(
+    chords: list[_Chord],
+    start_measure: int,
+    end_measure: int,
+    measure_length: int,
+) -> tuple[NotatedMeasure, ...]:
+    """1譜表分の和音を小節・声部に配置する"""
+    measure_count = end_measure - start_measure
+    window_start = start_measure * measure_length
+    window_end = end_measure * measure_length
+
+    voices = _assign_voices(chords) or [[]]
+    # per_measure[小節][声部] = イベント列
+    per_measure: list[list[list[NotatedEvent]]] = [
+        [[] for _ in voices] for _ in range(measure_count)
+    ]
+    has_notes = [[False] * len(voices) for _ in range(measure_count)]
+
+    for v, voice in enumerate(voices):
+        cursor = window_start
+        for chord in voice:
+            if chord.start > cursor:
+                _emit(per_measure, v, cursor, chord.start, window_start, measure_length)
+            _emit(per_measure, v, chord.start, chord.end, window_start, measure_length, chord)
+            first = (chord.start - window_start) // measure_length
+            last = (chord.end - 1 - window_start) // measure_length
+            for m in range(first, last + 1):
+                has_notes[m][v] = True
+            cursor = chord.end
+        if cursor < window_end:
+            _emit(per_measure, v, cursor, window_end, window_start, measure_length)
+
+    measures = []
+    for m, voice_events in enumerate(per_measure):
+        kept = tuple(
+            tuple(events) for v, events in enumerate(voice_events) if v == 0 or has_notes[m][v]
+        )
+        measures.append(NotatedMeasure(index=start_measure + m, voices=kept))
+    return tuple(measures)
+
+
+def _emit(
+    per_measure: list[list[list[NotatedEvent]]],
+    voice: int,
+    start: int,
+    end: int,
+    window_start: int,
+    measure_length: int,
+    chord: _Chord | None = None,
+) -> None:
+    """[start, end) の音符（chord が None なら休符）を小節線と音価で分割して追加する"""
+    position = start
+    while position < end:
+        m = (position - window_start) // measure_length
+        bar_end = window_start + (m + 1) * measure_length
+        piece_end = min(end, bar_end)
+        offset = position - (window_start + m * measure_length)
+        for length in split_duration(piece_end - position):
+            if chord is None:
+                event = NotatedEvent(offset=offset, duration=length)
+            else:
+                event = NotatedEvent(
+                    offset=offset,
+                    duration=length,
+                    pitches=chord.pitches,
+                    velocity=chord.velocity,
+                    tie_start=position + length < end or chord.tie_out,
+                    tie_stop=position > chord.start or chord.tie_in,
+                )
+            per_measure[m][voice].append(event)
+            offset += length
+            position += length
@@ -0,0 +1,116 @@
+"""小節範囲（リージョン）の切り出しと差し戻し（純粋ロジック、外部依存なし）
+
+曲全体ではなく一部の小節だけを簡略化・再描画するためのビジネスルール。
+リージョン境界をまたぐノートは境界で分割し、差し戻し時に
+同じピッチで境界に接するノートは1つに結合する（不要な打鍵を増やさない）。
+"""
+
+import math
+
+from src.domain.entities import MidiData, NoteEvent
+
+# 境界判定の許容誤差（秒）
+_EPSILON = 1e-6
+
+
+def measure_duration(midi_data: MidiData) -> float:
+    """1小節の長さ（秒）"""
+    beats_per_measure = (
+        midi_data.time_signature_numerator * 4.0 / midi_data.time_signature_denominator
+    )
+    return beats_per_measure * 60.0 / midi_data.tempo
+
+
+def measure_count(midi_data: MidiData) -> int:
+    """曲全体の小節数（最低1小節）"""
+    return max(1, math.ceil(midi_data.duration / measure_duration(midi_data) - _EPSILON))
+
+
+def measure_window(
+    midi_data: MidiData, start_measure: int, end_measure: int
+) -> tuple[float, float]:
+    """小節範囲 [start_measure, end_measure)（0始まり）を時刻範囲 [t0, t1) に変換する"""
+    if start_measure < 0 or end_measure <= start_measure:
+        raise ValueError(f"小節範囲が不正です: [{start_measure}, {end_measure})")
+    length = measure_duration(midi_data)
+    return start_measure * length, end_measure * length
+
+
+def _with_notes(midi_data: MidiData, notes: list[NoteEvent]) -> MidiData:
+    return MidiData(
+        notes=notes,
+        tempo=midi_data.tempo,
+        time_signature_numerator=midi_data.time_signature_numerator,
+        time_signature_denominator=midi_data.time_signature_denominator,
+    )
+
+
+def extract_region(midi_data: MidiData, t0: float, t1: float) -> MidiData:
+    """区間 [t0, t1) のノートを切り出し、t0 を 0 秒とする断片を返す
+
+    境界をまたぐノートは区間内の部分だけを残す。
+    区間インデックスを使うため、コストは区間内のノート数に比例する。
+    """
+    notes = [
+        NoteEvent(
+            pitch=note.pitch,
+            start=max(note.start, t0) - t0,
+            end=min(note.end, t1) - t0,
+            velocity=note.velocity,
+        )
+        for note in midi_data.notes_overlapping(t0, t1)
+    ]
+    return _with_notes(midi_data, notes)
+
+
+def splice_region(midi_data: MidiData, t0: float, t1: float, fragment: MidiData) -> MidiData:
+    """区間 [t0, t1) を fragment（0 秒始まり）で置き換えた曲全体を返す
+
+    境界をまたいでいたノートは区間外の部分を残し、fragment 側に
+    同じピッチで境界から続くノートがあれば1つのノートに結合する。
+    """
+    inside = {id(note) for note in midi_data.notes_overlapping(t0, t1)}
+
+    outside: list[NoteEvent] = []
+    # 境界で切られたノート片（境界時刻に接する側）をピッチごとに保持する
+    heads: dict[int, NoteEvent] = {}  # t0 で終わる片
+    tails: dict[int, NoteEvent] = {}  # t1 から始まる片
+    for note in midi_data.notes:
+        if id(note) not in inside:
+            outside.append(note)
+            continue
+        if note.start < t0:
+            _keep_piece(heads, NoteEvent(note.pitch, note.start, t0, note.velocity), outside)
+        if note.end > t1:
+            _keep_piece(tails, NoteEvent(note.pitch, t1, note.end, note.velocity), outside)
+
+    merged: list[NoteEvent] = []
+    for note in fragment.notes:
+        start = note.start + t0
+        end = min(note.end + t0, t1)
+        if end <= start:
+            continue
+        velocity = note.velocity
+        head = heads.get(note.pitch)
+        if head is not None and abs(start - t0) < _EPSILON:
+            # 区間前から鳴り続けているノートの続き
+            start, velocity = head.start, head.velocity
+            del heads[note.pitch]
+        tail = tails.get(note.pitch)
+        if tail is not None and abs(end - t1) < _EPSILON:
+            # 区間後まで鳴り続けるノート
+            end = tail.end
+            del tails[note.pitch]
+        merged.append(NoteEvent(note.pitch, start, end, velocity))
+
+    notes = outside + list(heads.values()) + merged + list(tails.values())
+    notes.sort(key=lambda n: (n.start, n.pitch))
+    return _with_notes(midi_data, notes)
+
+
+def _keep_piece(pieces: dict[int, NoteEvent], piece: NoteEvent, outside: list[NoteEvent]) -> None:
+    """境界片をピッチごとに保持する（同一ピッチが重なる場合は先の片を確定させる）"""
+    previous = pieces.get(piece.pitch)
+    if previous is not None:
+        outside.append(previous)
+    pieces[piece.pitch] = piece
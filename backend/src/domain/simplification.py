@@ -4,6 +4,7 @@
 """
 
 from src.domain.entities import Difficulty, MidiData, NoteEvent
+from src.domain.piano_roll import PianoRoll
 
 
 def simplify_advanced(midi_data: MidiData) -> MidiData:
@@ -57,7 +58,7 @@ def simplify_intermediate(midi_data: MidiData) -> MidiData:
 
     # 同時発音数を4音に制限
     # 時間順にソートして、各タイムスタンプで4音以下にする
-    limited_notes = _limit_polyphony(range_filtered, max_voices=4)
+    limited_notes = _limit_polyphony(range_filtered, max_voices=4, tempo=data.tempo)
 
     return MidiData(
         notes=limited_notes,
@@ -81,7 +82,7 @@ def simplify_beginner(midi_data: MidiData) -> MidiData:
     range_filtered = [note for note in data.notes if 48 <= note.pitch <= 84]
 
     # 各タイムスタンプで最高音（メロディ）と最低音（ルート）のみ
-    melody_bass_notes = _extract_melody_and_bass(range_filtered)
+    melody_bass_notes = _extract_melody_and_bass(range_filtered, tempo=data.tempo)
 
     return MidiData(
         notes=melody_bass_notes,
@@ -91,15 +92,20 @@ def simplify_beginner(midi_data: MidiData) -> MidiData:
     )
 
 
-def _limit_polyphony(notes: list[NoteEvent], max_voices: int) -> list[NoteEvent]:
+def _limit_polyphony(
+    notes: list[NoteEvent], max_voices: int, tempo: float = 120.0
+) -> list[NoteEvent]:
     """同時発音数を制限する
 
     各時点で鳴っている音が max_voices を超える場合、
     高い音を優先して残す（メロディを保持するため）。
+    採用済みノートをピアノロールに書き込み、開始ステップの同時発音数を
+    O(1) で参照する（採用済みリストの再走査は行わない）。
 
     Args:
-        notes: ノートリスト
+        notes: 量子化済みのノートリスト
         max_voices: 最大同時発音数
+        tempo: テンポ（BPM）。16分音符グリッドの算出に使う
 
     Returns:
         制限後のノートリスト
@@ -110,22 +116,27 @@ def _limit_polyphony(notes: list[NoteEvent], max_voices: int) -> list[NoteEvent]
     # 開始時刻でソート
     sorted_notes = sorted(notes, key=lambda n: (n.start, -n.pitch))
 
-    # 各ノートについて、開始時点での同時発音を確認
+    roll = PianoRoll.for_tempo(tempo)
     result: list[NoteEvent] = []
     for note in sorted_notes:
-        # 現時点で鳴っているノート数をカウント
-        active = sum(1 for n in result if n.start <= note.start < n.end)
-        if active < max_voices:
+        start_step, end_step = roll.note_span(note)
+        # 現時点で鳴っているノート数
+        if roll.active_count(start_step) < max_voices:
+            roll.add(note.pitch, start_step, end_step)
             result.append(note)
 
     return result
 
 
-def _extract_melody_and_bass(notes: list[NoteEvent]) -> list[NoteEvent]:
-    """各タイムスロットでメロディ（最高音）とベース（最低音）を抽出する
+def _extract_melody_and_bass(notes: list[NoteEvent], tempo: float = 120.0) -> list[NoteEvent]:
+    """各16分音符ステップでメロディ（最高音）とベース（最低音）を抽出する
+
+    ノートの開始ステップだけをピアノロールに書き込み、同じステップで始まるノートを
+    和音とみなして、そのステップの最高音・最低音を参照する。
 
     Args:
-        notes: ノートリスト
+        notes: 量子化済みのノートリスト
+        tempo: テンポ（BPM）。16分音符グリッドの算出に使う
 
     Returns:
         メロディ＋ベースのノートリスト
@@ -133,33 +144,22 @@ def _extract_melody_and_bass(notes: list[NoteEvent]) -> list[NoteEvent]:
     if not notes:
         return []
 
-    # 開始時刻でグルーピング（16分音符分の許容範囲でグルーピング）
-    sorted_notes = sorted(notes, key=lambda n: n.start)
-    result: list[NoteEvent] = []
+    roll = PianoRoll.for_tempo(tempo)
+    # (開始ステップ, ピッチ) → ノート（同じピッチが重なった場合は先のノート）
+    onsets: dict[tuple[int, int], NoteEvent] = {}
+    for note in sorted(notes, key=lambda n: n.start):
+        step = roll.step_of(note.start)
+        if (step, note.pitch) not in onsets:
+            onsets[step, note.pitch] = note
+            roll.add(note.pitch, step, step + 1)
 
-    # 近いonset同士をグルーピング（0.05秒以内は同時と見なす）
-    groups: list[list[NoteEvent]] = []
-    current_group: list[NoteEvent] = [sorted_notes[0]]
-
-    for note in sorted_notes[1:]:
-        if note.start - current_group[0].start < 0.05:
-            current_group.append(note)
-        else:
-            groups.append(current_group)
-            current_group = [note]
-    groups.append(current_group)
-
-    for group in groups:
-        if len(group) == 1:
-            result.append(group[0])
-        else:
-            # 最高音（メロディ）
-            melody = max(group, key=lambda n: n.pitch)
-            # 最低音（ベース）
-            bass = min(group, key=lambda n: n.pitch)
-            result.append(melody)
-            if bass.pitch != melody.pitch:
-                result.append(bass)
+    result: list[NoteEvent] = []
+    for step in sorted({step for step, _ in onsets}):
+        melody = roll.highest_pitch(step)
+        bass = roll.lowest_pitch(step)
+        result.append(onsets[step, melody])
+        if bass != melody:
+            result.append(onsets[step, bass])
 
     return result
 
@@ -0,0 +1,122 @@
+"""音声ファイルの長さの見積もり（デコードせずヘッダだけを読む）
+
+受け付け時のコスト見積もりに使うため、ファイル全体は読まない。
+
+- WAV: fmt チャンクのバイトレートと data チャンクの大きさから求める
+- MP3: ID3v2 タグを飛ばした最初のフレームヘッダを読み、Xing/Info ヘッダに
+  フレーム数があればそれから（VBR でも正確）、なければビットレート一定として求める
+- 読み取れない場合は 128kbps の MP3 とみなしてファイルサイズから求める
+"""
+
+import struct
+from typing import BinaryIO
+
+# 読み取れない場合に仮定するビットレート（bit/s）
+_FALLBACK_BITRATE = 128_000
+
+# MPEG Audio Layer III のビットレート（kbit/s、インデックス 1〜14）
+_MPEG1_BITRATES = (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MPEG2_BITRATES = (8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_MPEG1_SAMPLE_RATES = (44100, 48000, 32000)
+
+# フレーム同期を探す範囲（ID3 タグの後、バイト）
+_SYNC_SEARCH = 64 * 1024
+
+
+def estimate_audio_seconds(file: BinaryIO, size: int) -> float:
+    """音声ファイルの長さ（秒）を見積もる（読み取り位置は先頭に戻す）
+
+    Args:
+        file: 音声ファイル（シーク可能）
+        size: ファイルサイズ（バイト）
+    """
+    try:
+        file.seek(0)
+        head = file.read(12)
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            seconds = _wav_seconds(file, size)
+        else:
+            seconds = _mp3_seconds(file, head, size)
+    except (OSError, struct.error):
+        seconds = None
+    finally:
+        file.seek(0)
+    if seconds is None:
+        return size * 8 / _FALLBACK_BITRATE
+    return seconds
+
+
+def _wav_seconds(file: BinaryIO, size: int) -> float | None:
+    """RIFF チャンクを順に読み、data の大きさ / バイトレートを返す"""
+    position = 12
+    byte_rate = 0
+    while position + 8 <= size:
+        file.seek(position)
+        chunk_id, length = struct.unpack("<4sI", file.read(8))
+        if chunk_id == b"fmt ":
+            _, _, _, byte_rate = struct.unpack("<HHII", file.read(12))
+        elif chunk_id == b"data":
+            if byte_rate <= 0:
+                return None
+            # 録音中のファイルなどで長さが実際より大きく書かれていることがある
+            return min(length, size - position - 8) / byte_rate
+        position += 8 + length + (length & 1)
+    return None
+
+
+def _mp3_seconds(file: BinaryIO, head: bytes, size: int) -> float | None:
+    """最初の MPEG Audio Layer III フレームから長さを求める"""
+    offset = 0
+    if head[:3] == b"ID3" and len(head) >= 10:
+        # ID3v2 の大きさは 7bit ずつの synchsafe 整数（フッタがあれば 10 バイト加える）
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        offset = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+    file.seek(offset)
+    window = file.read(_SYNC_SEARCH)
+    for i in range(len(window) - 4):
+        if window[i] != 0xFF or window[i + 1] & 0xE0 != 0xE0:
+            continue
+        frame = _parse_frame_header(window[i : i + 4])
+        if frame is None:
+            continue
+        bitrate, sample_rate, samples_per_frame, side_info = frame
+        frames = _xing_frames(window, i + 4 + side_info)
+        if frames is not None:
+            return frames * samples_per_frame / sample_rate
+        return (size - offset - i) * 8 / bitrate
+    return None
+
+
+def _parse_frame_header(header: bytes) -> tuple[int, int, int, int] | None:
+    """フレームヘッダを読む
+
+    Returns:
+        (ビットレート bit/s, サンプルレート, 1フレームのサンプル数, サイド情報長)。
+        Layer III 以外・予約値のヘッダは None
+    """
+    version = (header[1] >> 3) & 0x03  # 3: MPEG1, 2: MPEG2, 0: MPEG2.5
+    layer = (header[1] >> 1) & 0x03  # 1: Layer III
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    mono = header[3] >> 6 == 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    if version == 3:
+        bitrate = _MPEG1_BITRATES[bitrate_index - 1]
+        sample_rate = _MPEG1_SAMPLE_RATES[rate_index]
+        return bitrate * 1000, sample_rate, 1152, 17 if mono else 32
+    bitrate = _MPEG2_BITRATES[bitrate_index - 1]
+    sample_rate = _MPEG1_SAMPLE_RATES[rate_index] // (2 if version == 2 else 4)
+    return bitrate * 1000, sample_rate, 576, 9 if mono else 17
+
+
+def _xing_frames(window: bytes, position: int) -> int | None:
+    """Xing/Info ヘッダのフレーム数（なければ None）"""
+    if window[position : position + 4] not in (b"Xing", b"Info"):
+        return None
+    if len(window) < position + 12:
+        return None
+    flags, frames = struct.unpack_from(">II", window, position + 4)
+    return frames if flags & 0x01 and frames > 0 else None
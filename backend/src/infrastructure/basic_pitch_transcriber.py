@@ -8,6 +8,7 @@ import logging
 from pathlib import Path
 
 from src.application.ports.transcriber import ProgressEvent, TranscriberPort
+from src.core import profiling
 from src.core.exceptions import TranscriptionError
 from src.domain.entities import MidiData, NoteEvent
 
@@ -33,8 +34,8 @@ class BasicPitchTranscriber(TranscriberPort):
         )
 
         try:
-            # CPU-bound 処理をスレッドプールで実行
-            midi_data = await asyncio.to_thread(self._transcribe_sync, audio_path)
+            # CPU-bound 処理をスレッドプールで実行（プロファイル中ならスレッドでの呼び出しも記録）
+            midi_data = await asyncio.to_thread(profiling.call, self._transcribe_sync, audio_path)
         except Exception as e:
             logger.error("Basic Pitch 採譜エラー: %s", e)
             raise TranscriptionError(f"採譜処理に失敗しました: {e}") from e
@@ -81,11 +82,6 @@ class BasicPitchTranscriber(TranscriberPort):
                         )
                     )
 
-        # テンポ検出
-        tempo_times, tempos = midi_object.get_tempo_changes()
-        tempo = tempos[0] if len(tempos) > 0 else 120.0
-
-        return MidiData(
-            notes=notes,
-            tempo=float(tempo),
-        )
+        # Basic Pitch の出力テンポは実質的に既定値のため使わない。
+        # テンポと拍グリッドは TranscribeMusicUseCase で onset から推定する
+        return MidiData(notes=notes)
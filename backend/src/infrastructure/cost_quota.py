@@ -0,0 +1,127 @@
+"""処理コストによるクライアントごとの割り当て（トークンバケット）
+
+リクエスト数の制限は 10 秒のクリップと 30 分の演奏を同じ1件として数える。
+ここでは処理時間（秒）をトークンとし、クライアントごとのバケットから差し引く。
+
+1. 受け付け時に、音声の長さ × 処理時間の比率で処理時間を見積もって予約する。
+   残高が見積もりに足りなければ断り、貯まるまでの秒数を返す
+2. 処理後に実際の処理時間で精算し、見積もりとの差を返金・追加で差し引く
+   （残高は負になることがあり、その分は補充で返済する）
+
+見積もりの比率は、精算した実績（処理時間 / 音声の長さ）の指数移動平均で更新する。
+バケットの容量より大きな見積もりは、バケットが満杯なら受け付ける（長い曲も必ず処理できる）。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from src.core.exceptions import QuotaExceededError
+
+# 見積もりの比率を実績に寄せる重み
+_RATIO_SMOOTHING = 0.2
+
+
+class CostQuota:
+    """クライアントごとのトークンバケット（スレッドセーフ）
+
+    Args:
+        capacity_seconds: バケットの容量（処理時間の秒数）
+        refill_per_second: 1秒あたりに補充する処理時間（秒）
+        initial_ratio: 音声1秒あたりの処理時間の初期見積もり
+        max_clients: 保持するクライアント数（超えたら最後に使った時刻の古い順に忘れる）
+        clock: 現在時刻（秒）を返す関数（テスト用）
+    """
+
+    def __init__(
+        self,
+        capacity_seconds: float,
+        refill_per_second: float,
+        initial_ratio: float = 0.3,
+        max_clients: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._capacity = capacity_seconds
+        self._refill = refill_per_second
+        self._ratio = initial_ratio
+        self._max_clients = max(1, max_clients)
+        self._clock = clock
+        # クライアント → (残高, 最後に補充した時刻)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ratio(self) -> float:
+        """音声1秒あたりの処理時間の現在の見積もり"""
+        return self._ratio
+
+    def balance(self, client: str) -> float:
+        """クライアントの現在の残高（秒）"""
+        with self._lock:
+            return self._refilled(client, self._clock())
+
+    def reserve(self, client: str, audio_seconds: float) -> "QuotaReservation":
+        """音声の長さから処理時間を見積もって予約する
+
+        Raises:
+            QuotaExceededError: 残高が足りない場合（retry_after に貯まるまでの秒数）
+        """
+        with self._lock:
+            now = self._clock()
+            tokens = self._refilled(client, now)
+            cost = audio_seconds * self._ratio
+            required = min(cost, self._capacity)
+            if tokens < required:
+                self._buckets[client] = (tokens, now)
+                wait = (required - tokens) / self._refill if self._refill > 0 else None
+                raise QuotaExceededError(retry_after=wait)
+            self._buckets[client] = (tokens - cost, now)
+        return QuotaReservation(self, client, cost, audio_seconds)
+
+    def _settle(self, client: str, difference: float, audio_seconds: float, actual: float) -> None:
+        """見積もりとの差を残高に戻し、実績（actual > 0 のとき）で見積もりの比率を更新する"""
+        with self._lock:
+            now = self._clock()
+            self._buckets[client] = (self._refilled(client, now) + difference, now)
+            if audio_seconds > 0 and actual > 0:
+                observed = actual / audio_seconds
+                self._ratio += _RATIO_SMOOTHING * (observed - self._ratio)
+
+    def _refilled(self, client: str, now: float) -> float:
+        """補充後の残高を返し、クライアントを最近使ったものにする（ロック内で呼ぶ）"""
+        tokens, updated = self._buckets.get(client, (self._capacity, now))
+        if client in self._buckets:
+            self._buckets.move_to_end(client)
+        else:
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self._max_clients:
+                self._buckets.popitem(last=False)
+        return min(self._capacity, tokens + (now - updated) * self._refill)
+
+
+class QuotaReservation:
+    """予約した処理時間（処理後に settle() で精算する）"""
+
+    def __init__(self, quota: CostQuota, client: str, cost: float, audio_seconds: float):
+        self._quota = quota
+        self._client = client
+        self.cost = cost
+        self._audio_seconds = audio_seconds
+        self._settled = False
+
+    def settle(self, actual_seconds: float, completed: bool = True) -> None:
+        """実際の処理時間で精算する（2回目以降は何もしない）
+
+        処理しなかった場合は 0 を渡すと全額を返す。completed=False（途中で失敗した）の
+        処理時間は差し引くが、見積もりの比率の更新には使わない。
+        """
+        if self._settled:
+            return
+        self._settled = True
+        self._quota._settle(
+            self._client,
+            self.cost - actual_seconds,
+            self._audio_seconds,
+            actual_seconds if completed else 0.0,
+        )
@@ -0,0 +1,160 @@
+"""CPU バウンド処理（簡略化・楽譜生成）の実行枠
+
+asyncio.to_thread は既定のスレッドプールを他の処理と共有し、music21 の書き出しは
+GIL を保持するため、同時に来た簡略化は直列に進むだけでスレッドと待ち時間が積み上がる。
+CpuExecutor は専用のスレッドプールで max_workers 件までを同時に実行し、
+空き待ちは max_queue 件まで受け付けて、それを超えたら待たせずに断る。
+楽譜生成は ProcessSheetMusicGenerator でワーカープロセスに送るため、
+ここでのスレッドはプロセスの結果を待つだけで GIL を奪い合わない。
+
+実行中の処理は要求元が切断しても止められないため、実行枠はスレッドの処理が
+終わった時点で返す（切断が続いても同時実行数は max_workers を超えない）。
+"""
+
+import asyncio
+import contextvars
+import math
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from src.core import profiling
+from src.core.exceptions import ServiceBusyError
+
+# 完了した処理がまだないときの再試行までの目安（秒）
+_DEFAULT_RETRY_AFTER = 1.0
+
+
+@dataclass(frozen=True)
+class CpuExecutorStats:
+    """実行枠の統計（ある時点のスナップショット）
+
+    Attributes:
+        workers: 同時に実行できる件数
+        queued: 実行枠の空き待ちの件数
+        running: 実行中の件数
+        completed: 完了した件数
+        failed: 例外で終わった件数
+        rejected: 待ち行列が一杯で断った件数
+        wait_seconds_total: 実行枠の空き待ち時間の合計（秒）
+        busy_seconds_total: 実行時間の合計（秒）
+        utilization: 作成してからの稼働率（実行時間の合計 / (経過時間 × workers)）
+    """
+
+    workers: int
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    busy_seconds_total: float = 0.0
+    utilization: float = 0.0
+
+
+class CpuExecutor:
+    """同時実行数と待ち行列に上限のある専用の実行枠
+
+    Args:
+        max_workers: 同時に実行する件数（専用スレッドプールの大きさ）
+        max_queue: 実行枠の空き待ちにできる件数（超えたら ServiceBusyError）
+        clock: 経過時間（秒）を返す関数（テスト用）
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_queue: int = 16,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self._max_workers = max(1, max_workers)
+        self._max_queue = max(0, max_queue)
+        self._clock = clock
+        self._threads = ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="cpu-executor"
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._started_at = clock()
+        self._counts = dict.fromkeys(("completed", "failed", "rejected"), 0)
+        self._queued = 0
+        self._running = 0
+        self._wait_total = 0.0
+        self._busy_total = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """実行枠を待ってから fn(*args) を専用スレッドで実行する
+
+        Raises:
+            ServiceBusyError: 実行中と空き待ちが上限に達している場合（retry_after に目安）
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_workers)
+        if self._running + self._queued >= self._max_workers + self._max_queue:
+            self._counts["rejected"] += 1
+            raise ServiceBusyError(
+                "処理が混み合っています。しばらく待ってから再試行してください",
+                retry_after=self.retry_after(),
+            )
+
+        self._queued += 1
+        queued_at = self._clock()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        started_at = self._clock()
+        self._wait_total += started_at - queued_at
+
+        self._running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            # asyncio.to_thread と同じく、計測のラベルなどのコンテキストをスレッドに引き継ぐ
+            # （要求をプロファイル中なら、スレッドでの呼び出しも記録する）
+            context = contextvars.copy_context()
+            future = self._threads.submit(context.run, profiling.call, fn, *args)
+        except BaseException:
+            self._finish(started_at, failed=True)
+            raise
+        future.add_done_callback(
+            lambda done: loop.call_soon_threadsafe(self._on_done, done, started_at)
+        )
+        return await asyncio.wrap_future(future)
+
+    def retry_after(self) -> float:
+        """今の待ち行列がはけるまでの目安（秒、平均実行時間から見積もる）"""
+        finished = self._counts["completed"] + self._counts["failed"]
+        mean = self._busy_total / finished if finished else _DEFAULT_RETRY_AFTER
+        backlog = self._running + self._queued + 1
+        return max(1.0, math.ceil(mean * backlog / self._max_workers))
+
+    def stats(self) -> CpuExecutorStats:
+        """現在の統計を返す"""
+        elapsed = self._clock() - self._started_at
+        return CpuExecutorStats(
+            workers=self._max_workers,
+            **self._counts,
+            queued=self._queued,
+            running=self._running,
+            wait_seconds_total=self._wait_total,
+            busy_seconds_total=self._busy_total,
+            utilization=(
+                min(1.0, self._busy_total / (elapsed * self._max_workers)) if elapsed > 0 else 0.0
+            ),
+        )
+
+    def shutdown(self) -> None:
+        """専用スレッドプールを終了する（待ち中の処理は取り消す）"""
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, future: Future, started_at: float) -> None:
+        self._finish(started_at, failed=future.cancelled() or future.exception() is not None)
+
+    def _finish(self, started_at: float, failed: bool) -> None:
+        """実行枠を返して統計に加える（イベントループのスレッドで呼ぶ）"""
+        self._running -= 1
+        self._busy_total += self._clock() - started_at
+        self._counts["failed" if failed else "completed"] += 1
+        if self._slots is not None:
+            self._slots.release()
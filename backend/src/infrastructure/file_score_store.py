@@ -0,0 +1,107 @@
+"""ファイル（ノートパック）による ScoreStore ポートの実装
+
+MIDIデータを ID ごとのノートパック（src.infrastructure.note_pack）として
+ディレクトリに保存する。同じディレクトリを共有すれば複数ワーカー・プロセスから
+同じ結果を参照でき、メモリ上のオブジェクトとしては保持しない。
+
+有効期限はファイルの更新時刻で管理し、参照すると更新時刻を進めて延長する。
+件数の上限を超えたら更新時刻の古い順に捨てる。
+"""
+
+import logging
+import os
+import re
+import secrets
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from src.application.ports.score_store import ScoreStorePort
+from src.domain.entities import MidiData
+from src.infrastructure.note_pack import NotePackError, load_note_pack, write_note_pack
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".npk"
+
+# save() が発行する ID の形式（クライアントから受け取った ID をパスに使う前に検査する）
+_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class FileScoreStore(ScoreStorePort):
+    """ディレクトリにノートパックとして保存するストア
+
+    Args:
+        directory: 保存先ディレクトリ（なければ作る）
+        max_entries: 保持する最大件数
+        ttl_seconds: 最後に保存・参照してからの有効期間（秒）
+        clock: 現在時刻（UNIX 時間の秒）を返す関数（テスト用）
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl_seconds
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._directory.glob(f"*{_SUFFIX}"))
+
+    def save(self, midi_data: MidiData) -> str:
+        """MIDIデータを保存して推測困難な ID を返す"""
+        score_id = secrets.token_urlsafe(16)
+        path = self._path(score_id)
+        write_note_pack(path, midi_data)
+        now = self._clock()
+        os.utime(path, (now, now))
+        self._evict(now)
+        return score_id
+
+    def get(self, score_id: str) -> MidiData | None:
+        """ID のMIDIデータを返す（参照すると有効期限を延長する）"""
+        if not _ID_PATTERN.fullmatch(score_id):
+            return None
+        path = self._path(score_id)
+        now = self._clock()
+        try:
+            if path.stat().st_mtime + self._ttl <= now:
+                path.unlink(missing_ok=True)
+                return None
+            midi_data = load_note_pack(path).to_midi_data()
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            return None
+        except NotePackError:
+            logger.warning("壊れたノートパックを削除します: %s", path.name)
+            path.unlink(missing_ok=True)
+            return None
+        return midi_data
+
+    def _path(self, score_id: str) -> Path:
+        return self._directory / f"{score_id}{_SUFFIX}"
+
+    def _evict(self, now: float) -> None:
+        """期限切れのファイルと、件数の上限を超えた古いファイルを削除する"""
+        entries: list[tuple[float, Path]] = []
+        for entry in os.scandir(self._directory):
+            if not entry.name.endswith(_SUFFIX):
+                continue
+            try:
+                modified = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            entries.append((modified, Path(entry.path)))
+
+        entries.sort()
+        excess = len(entries) - self._max_entries
+        for i, (modified, path) in enumerate(entries):
+            if i >= excess and modified + self._ttl > now:
+                break
+            path.unlink(missing_ok=True)
@@ -0,0 +1,229 @@
+"""LilyPond による PdfEngine ポートの実装
+
+music21 の score.write("lily.pdf") は LilyPond をタイムアウトなしで同期実行し、
+出力ファイルを一時ディレクトリに残す。ここでは LilyPond ソースの生成
+（SheetMusicGenerator ポート）と LilyPond の実行を分け、次のように制御する。
+
+- 同じ内容（記譜グリッドに揃えたノート）の PDF は内容ハッシュをキーにキャッシュし、
+  生成中の同じ内容の要求は1回の生成に合流させる
+- 同時に動かす LilyPond は max_processes 個まで、待ちは max_queue 件まで（超えたら断る）
+- LilyPond は asyncio のサブプロセスで実行し、タイムアウトやキャンセル時は kill する
+- 入出力ファイルは要求ごとの一時ディレクトリに置き、終了時に必ず削除する
+"""
+
+import asyncio
+import hashlib
+import logging
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from src.application.ports.pdf_engine import PdfEnginePort, PdfEngineStats
+from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
+from src.core.exceptions import PdfExportError, PdfTimeoutError, ServiceBusyError
+from src.domain.entities import MidiData
+from src.domain.notation import snap_to_layout_grid
+from src.infrastructure.smf_encoder import encode_smf
+
+logger = logging.getLogger(__name__)
+
+# ログに残す LilyPond のエラー出力の長さ（末尾）
+_STDERR_TAIL = 2000
+
+
+class LilyPondPdfEngine(PdfEnginePort):
+    """LilyPond サブプロセスのプールで PDF を生成するエンジン
+
+    Args:
+        sheet_music_generator: LilyPond ソースの生成に使う
+        executable: LilyPond の実行ファイル
+        max_processes: 同時に実行する LilyPond の数
+        max_queue: 実行枠の空き待ちにできる件数（超えたら ServiceBusyError）
+        timeout_seconds: 1件あたりの LilyPond の実行時間の上限（秒）
+        cache_size: キャッシュする PDF の件数（0 で無効）
+        lilypond_version: ソースに書く \\version（インストールされた LilyPond に合わせる）
+    """
+
+    def __init__(
+        self,
+        sheet_music_generator: SheetMusicGeneratorPort,
+        executable: str = "lilypond",
+        max_processes: int = 2,
+        max_queue: int = 8,
+        timeout_seconds: float = 60.0,
+        cache_size: int = 64,
+        lilypond_version: str = "2.24",
+    ):
+        self._sheet_music_generator = sheet_music_generator
+        self._executable = executable
+        self._max_processes = max(1, max_processes)
+        self._max_queue = max(0, max_queue)
+        self._timeout = timeout_seconds
+        self._cache_size = cache_size
+        self._lilypond_version = lilypond_version
+
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[bytes]] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._counts = dict.fromkeys(
+            ("cache_hits", "cache_misses", "completed", "failed", "timed_out", "rejected"), 0
+        )
+        self._queued = 0
+        self._running = 0
+        self._wait_total = 0.0
+        self._render_total = 0.0
+
+    async def render_pdf(self, midi_data: MidiData) -> bytes:
+        """MIDIデータから PDF を生成する（キャッシュ・生成中の同じ内容があれば再利用）"""
+        key = pdf_cache_key(midi_data)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._counts["cache_hits"] += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            # 生成中のタスク数 = 実行中 + 空き待ち
+            if len(self._inflight) >= self._max_processes + self._max_queue:
+                self._counts["rejected"] += 1
+                raise ServiceBusyError(
+                    "PDF生成が混み合っています。しばらく待ってから再試行してください"
+                )
+            self._counts["cache_misses"] += 1
+            task = asyncio.create_task(self._produce(key, midi_data))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # 要求元が切断しても、合流している他の要求のために生成は続ける
+        return await asyncio.shield(task)
+
+    def stats(self) -> PdfEngineStats:
+        """現在の統計を返す"""
+        return PdfEngineStats(
+            **self._counts,
+            queued=self._queued,
+            running=self._running,
+            wait_seconds_total=self._wait_total,
+            render_seconds_total=self._render_total,
+        )
+
+    async def aclose(self) -> None:
+        """生成中のタスクをキャンセルする（LilyPond は kill され、一時ファイルは削除される）"""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._cache.clear()
+
+    async def _produce(self, key: str, midi_data: MidiData) -> bytes:
+        """実行枠を待ってから PDF を生成し、キャッシュに入れる"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_processes)
+
+        self._queued += 1
+        queued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        started_at = time.perf_counter()
+        self._wait_total += started_at - queued_at
+
+        self._running += 1
+        try:
+            # ソース生成（music21）も CPU を使うため実行枠の中で行い、スレッドの使用数を抑える
+            source = await asyncio.to_thread(self._lilypond_source, midi_data)
+            pdf = await self._run_lilypond(source)
+        except PdfTimeoutError:
+            self._counts["timed_out"] += 1
+            self._counts["failed"] += 1
+            raise
+        except PdfExportError:
+            self._counts["failed"] += 1
+            raise
+        except Exception as e:
+            self._counts["failed"] += 1
+            raise PdfExportError() from e
+        finally:
+            self._running -= 1
+            self._render_total += time.perf_counter() - started_at
+            self._slots.release()
+
+        self._counts["completed"] += 1
+        if self._cache_size > 0:
+            self._cache[key] = pdf
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        logger.info(
+            "PDF生成完了: %d バイト（待ち %.2f 秒、生成 %.2f 秒）",
+            len(pdf),
+            started_at - queued_at,
+            time.perf_counter() - started_at,
+        )
+        return pdf
+
+    def _lilypond_source(self, midi_data: MidiData) -> str:
+        """MIDIデータから LilyPond ソースを生成する"""
+        return self._sheet_music_generator.generate_lilypond(midi_data, self._lilypond_version)
+
+    async def _run_lilypond(self, source: str) -> bytes:
+        """一時ディレクトリで LilyPond を実行して PDF を読み出す（タイムアウトで kill）"""
+        with tempfile.TemporaryDirectory(prefix="lilypond-") as workdir:
+            source_path = Path(workdir) / "score.ly"
+            source_path.write_text(source, encoding="utf-8")
+            output_base = Path(workdir) / "score"
+
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    self._executable,
+                    "--pdf",
+                    "-dno-point-and-click",
+                    "-o",
+                    str(output_base),
+                    str(source_path),
+                    cwd=workdir,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except OSError as e:
+                raise PdfExportError(f"LilyPond を起動できません: {self._executable}") from e
+
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), self._timeout)
+            except TimeoutError as e:
+                await _kill(process)
+                logger.warning("LilyPond がタイムアウトしました（%.0f 秒）", self._timeout)
+                raise PdfTimeoutError() from e
+            except BaseException:
+                # キャンセル（要求の打ち切り・アプリ終了）でもプロセスを残さない
+                await _kill(process)
+                raise
+
+            pdf_path = output_base.with_suffix(".pdf")
+            if process.returncode != 0 or not pdf_path.exists():
+                logger.error(
+                    "LilyPond が失敗しました（終了コード %s）: %s",
+                    process.returncode,
+                    stderr.decode("utf-8", "replace")[-_STDERR_TAIL:],
+                )
+                raise PdfExportError()
+            return pdf_path.read_bytes()
+
+
+def pdf_cache_key(midi_data: MidiData) -> str:
+    """PDF キャッシュのキー（記譜グリッドに揃えたノートの SMF の SHA-256）
+
+    楽譜は16分音符グリッドに揃えてから記譜するため、グリッド未満の違いしかない
+    入力は同じ PDF になり、同じキーになる。
+    """
+    return hashlib.sha256(encode_smf(snap_to_layout_grid(midi_data))).hexdigest()
+
+
+async def _kill(process: asyncio.subprocess.Process) -> None:
+    """プロセスを kill して終了を待つ"""
+    if process.returncode is None:
+        process.kill()
+    await process.wait()
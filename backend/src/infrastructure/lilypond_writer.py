@@ -0,0 +1,105 @@
+"""記譜レイアウトからの LilyPond ソース直接書き出し
+
+music21 の Score 構築と LilyPond 変換器を通さず、記譜レイアウト
+（src.domain.notation）から2段のピアノ譜の .ly ソースを書き出す。
+絶対音高・小節ごとの小節線チェックだけの簡潔な出力にして、LilyPond 側の
+解析・組版の負荷も抑える。
+"""
+
+from collections.abc import Iterator
+from typing import TextIO
+
+from src.domain.notation import NOTE_VALUES, Clef, NotatedEvent, ScoreLayout, StaffLayout
+
+# music21・MusicXML 出力と同じ綴り（黒鍵は C# / E- / F# / G# / B-）
+_PITCH_NAMES = ("c", "cis", "d", "ees", "e", "f", "fis", "g", "gis", "a", "bes", "b")
+
+# 基本音価（16分音符単位）→ LilyPond の音価
+_DURATIONS = {32: "\\breve", 16: "1", 8: "2", 4: "4", 2: "8", 1: "16"}
+
+_CLEFS = {Clef.TREBLE: "treble", Clef.BASS: "bass"}
+
+# 2声部以上の譜表で声部ごとに使う符幹の向きの指定
+_VOICE_COMMANDS = ("\\voiceOne", "\\voiceTwo", "\\voiceThree", "\\voiceFour")
+_ONE_VOICE = "\\oneVoice"
+
+
+def write_lilypond(layout: ScoreLayout, out: TextIO, version: str = "2.24") -> None:
+    """記譜レイアウトを LilyPond ソースとして out に書き出す
+
+    各譜表の声部は小節内の位置（第1声部・第2声部…）ごとに1つの Voice にまとめ、
+    その声部がない小節は空白休符で埋める。
+
+    Args:
+        layout: ピアノ譜のレイアウト
+        out: 書き出し先
+        version: ソースに書く \\version
+    """
+    out.write(f'\\version "{version}"\n')
+    out.write('\\header { title = "Transcription" tagline = ##f }\n')
+    out.write("\\score {\n  \\new PianoStaff <<\n")
+    for i, staff in enumerate(layout.staves):
+        _write_staff(staff, layout, out, with_tempo=i == 0)
+    out.write("  >>\n  \\layout { }\n}\n")
+
+
+def _write_staff(staff: StaffLayout, layout: ScoreLayout, out: TextIO, with_tempo: bool) -> None:
+    voice_count = max((len(m.voices) for m in staff.measures), default=1)
+    out.write(f'    \\new Staff = "{staff.name}" <<\n')
+    for v in range(voice_count):
+        out.write("      \\new Voice {")
+        if v == 0:
+            out.write(f" \\clef {_CLEFS[staff.clef]} \\time {layout.beats}/{layout.beat_type}")
+            if with_tempo:
+                out.write(f" \\tempo 4 = {round(layout.tempo)}")
+            if layout.start_measure > 0:
+                out.write(f" \\set Score.currentBarNumber = #{layout.start_measure + 1}")
+        if 0 < v < len(_VOICE_COMMANDS):
+            out.write(f" {_VOICE_COMMANDS[v]}")
+        out.write("\n")
+        polyphonic = False
+        for measure in staff.measures:
+            out.write("        ")
+            if v == 0 and polyphonic != (len(measure.voices) > 1):
+                # 第1声部の符幹は、他の声部がある小節だけ上向きに固定する
+                polyphonic = not polyphonic
+                out.write(f"{_VOICE_COMMANDS[0] if polyphonic else _ONE_VOICE} ")
+            out.write(" ".join(_voice_tokens(measure.voices, v, layout)))
+            out.write(" |\n")
+        out.write("      }\n")
+    out.write("    >>\n")
+
+
+def _voice_tokens(
+    voices: tuple[tuple[NotatedEvent, ...], ...], v: int, layout: ScoreLayout
+) -> Iterator[str]:
+    """1小節分の第 v 声部のトークン列（声部がなければ空白休符）"""
+    measure_rest = "1" if layout.measure_length == 16 else f"1*{layout.beats}/{layout.beat_type}"
+    if v >= len(voices):
+        yield f"s{measure_rest}"
+        return
+    events = voices[v]
+    if len(voices) == 1 and all(event.is_rest for event in events):
+        yield f"R{measure_rest}"
+        return
+    for event in events:
+        yield _event_token(event)
+
+
+def _event_token(event: NotatedEvent) -> str:
+    """音符・和音・休符1つ分のトークン"""
+    base, dots = NOTE_VALUES[event.duration]
+    duration = _DURATIONS[base] + "." * dots
+    if event.is_rest:
+        return f"r{duration}"
+    tie = "~" if event.tie_start else ""
+    if len(event.pitches) == 1:
+        return f"{_pitch(event.pitches[0])}{duration}{tie}"
+    return f"<{' '.join(_pitch(p) for p in event.pitches)}>{duration}{tie}"
+
+
+def _pitch(pitch: int) -> str:
+    """MIDIノート番号 → 絶対音高の音名（c = C3、c' = ミドルC）"""
+    octave = pitch // 12 - 4
+    marks = "'" * octave if octave > 0 else "," * -octave
+    return _PITCH_NAMES[pitch % 12] + marks
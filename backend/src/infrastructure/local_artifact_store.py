@@ -0,0 +1,82 @@
+"""ローカルディレクトリによる ArtifactStore ポートの実装
+
+成果物を "<sha256>.<拡張子>" のファイルとして保存する。合計サイズの上限を超えたら
+最後に保存・参照した時刻（ファイルの更新時刻）の古い順に削除する。
+同じディレクトリを共有すれば複数ワーカーから同じ成果物を返せる。
+"""
+
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+from src.application.ports.artifact_store import ARTIFACT_MEDIA_TYPES, ArtifactStorePort
+
+_NAME_PATTERN = re.compile(r"[0-9a-f]{64}\.(?:" + "|".join(ARTIFACT_MEDIA_TYPES) + ")")
+
+
+class LocalArtifactStore(ArtifactStorePort):
+    """ディレクトリに成果物を保存するストア
+
+    Args:
+        directory: 保存先ディレクトリ（なければ作る）
+        max_bytes: 保持する成果物の合計サイズの上限（バイト）
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 512 * 1024 * 1024):
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes, extension: str) -> str:
+        """成果物を保存して名前を返す"""
+        if extension not in ARTIFACT_MEDIA_TYPES:
+            raise ValueError(f"対応していない成果物の種類です: {extension}")
+        name = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+        path = self._directory / name
+        with self._lock:
+            if path.exists():
+                os.utime(path)
+                return name
+            tmp_path = path.with_name(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._evict(keep=path)
+        return name
+
+    def get(self, name: str) -> bytes | None:
+        """名前の成果物を返す（参照すると追い出される順番を後ろにする）"""
+        if not _NAME_PATTERN.fullmatch(name):
+            return None
+        path = self._directory / name
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def _evict(self, keep: Path) -> None:
+        """合計サイズが上限を超えていれば古い順に削除する（ロック内で呼ぶ）"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self._directory):
+            if not _NAME_PATTERN.fullmatch(entry.name):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,54 @@
+"""書き出し済み小節 XML のキャッシュ
+
+難易度の切り替えや部分再描画では多くの小節が前回と同じ内容になるため、
+小節の音符内容と文脈（拍子・音部記号・テンポ）をキーに、書き出した
+XML 断片を再利用する。上限を超えたら最も長く使われていないものから捨てる。
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class MeasureCache:
+    """小節 XML 断片の LRU キャッシュ（スレッドセーフ）
+
+    Args:
+        max_entries: 保持する断片の最大数
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[Hashable, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> str | None:
+        """key の断片を返す（なければ None）"""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def put(self, key: Hashable, fragment: str) -> None:
+        """断片を保存する（上限を超えたら古いものから捨てる）"""
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """全断片と統計を破棄する"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -1,51 +1,98 @@
 """music21 による SheetMusicGenerator ポートの実装
 
 MIDIデータ（内部表現）から MusicXML 文字列を生成する。
+小節・声部・和音・タイは記譜レイアウト（src.domain.notation）から
+あらかじめ組み立て、music21 の makeNotation を経ずに書き出す。
+小節キャッシュを渡すと、前回までに書き出した小節の XML を再利用し、
+内容が変わった小節だけを music21 で書き出す。
 """
 
-import base64
 import logging
-from pathlib import Path
+import re
+from dataclasses import replace
 
 import music21
+from music21.lily import lilyObjects, translate
+from music21.musicxml.m21ToXml import GeneralObjectExporter
 
 from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
+from src.core import metrics
 from src.domain.entities import MidiData
+from src.domain.notation import (
+    Clef,
+    NotatedEvent,
+    NotatedMeasure,
+    ScoreLayout,
+    StaffLayout,
+    layout_score,
+    snap_to_layout_grid,
+)
+from src.infrastructure.measure_cache import MeasureCache
+from src.infrastructure.smf_encoder import encode_smf_base64
 
 logger = logging.getLogger(__name__)
 
+# 書き出した MusicXML 中の <measure> 要素（中身をグループ1に取る）
+_MEASURE_XML = re.compile(r"[ \t]*<measure [^>]*>\n(.*?)[ \t]*</measure>\n", re.DOTALL)
+# パート先頭の小節に付く divisions だけの <attributes>
+_DIVISIONS_ONLY = re.compile(r"[ \t]*<attributes>\s*<divisions>\d+</divisions>\s*</attributes>\n?")
+
 
 class Music21Generator(SheetMusicGeneratorPort):
-    """music21 を使った MusicXML 生成"""
+    """music21 を使った MusicXML 生成
+
+    Args:
+        measure_cache: 書き出し済み小節のキャッシュ（None なら毎回全体を書き出す）
+    """
+
+    def __init__(self, measure_cache: MeasureCache | None = None):
+        self._measure_cache = measure_cache
 
     def generate_musicxml(self, midi_data: MidiData) -> str:
         """MIDIデータから MusicXML を生成する"""
-        score = self._build_score(midi_data)
-        musicxml_str = score.write("musicxml").read_text()
+        with metrics.stage("score_build"):
+            layout = layout_score(midi_data)
+        with metrics.stage("musicxml_write"):
+            musicxml_str = self._render(layout)
         logger.info("MusicXML 生成完了: %d バイト", len(musicxml_str))
         return musicxml_str
 
     def generate_musicxml_and_midi(self, midi_data: MidiData) -> tuple[str, str]:
-        """同一のmusic21 Scoreから MusicXML と MIDI Base64 を生成する
+        """同じ譜面用にスナップしたノートから MusicXML と MIDI Base64 を生成する
 
-        これにより表示(OSMD)・再生(PianoPlayer)・ダウンロードの
-        すべてが同じデータソースから生成され、一致が保証される。
+        MusicXML は共通の譜面レイアウト（layout_score）から、MIDI は同じノートを
+        SMF エンコーダで書き出す。これにより表示(OSMD)・再生(PianoPlayer)・ダウンロードの
+        音の位置と長さが一致する。どちらもメモリ上で生成し、一時ファイルは使わない。
         """
-        score = self._build_score(midi_data)
+        with metrics.stage("score_build"):
+            notated = snap_to_layout_grid(midi_data)
+            layout = layout_score(notated)
 
         # MusicXML 生成
-        musicxml_str = score.write("musicxml").read_text()
+        with metrics.stage("musicxml_write"):
+            musicxml_str = self._render(layout)
         logger.info("MusicXML 生成完了: %d バイト", len(musicxml_str))
 
-        # MIDI 生成（同一Scoreから）
-        midi_path = Path(score.write("midi"))
-        midi_bytes = midi_path.read_bytes()
-        midi_path.unlink(missing_ok=True)
-        midi_base64 = base64.b64encode(midi_bytes).decode("utf-8")
+        # MIDI 生成（レイアウトに使ったのと同じノートから）
+        with metrics.stage("midi_write"):
+            midi_base64 = encode_smf_base64(notated)
         logger.info("MIDI Base64 生成完了: %d バイト", len(midi_base64))
 
         return musicxml_str, midi_base64
 
+    def generate_musicxml_page(
+        self, midi_data: MidiData, start_measure: int, end_measure: int
+    ) -> str:
+        """小節範囲 [start_measure, end_measure) だけの MusicXML を生成する"""
+        with metrics.stage("score_build"):
+            layout = layout_score(midi_data, start_measure, end_measure)
+        with metrics.stage("musicxml_write"):
+            return self._render(layout)
+
+    def generate_lilypond(self, midi_data: MidiData, lilypond_version: str = "2.24") -> str:
+        """music21 の LilyPond 変換器で LilyPond ソースを生成する"""
+        return music21_lilypond_source(self._build_score(midi_data), lilypond_version)
+
     def build_score(self, midi_data: MidiData) -> music21.stream.Score:
         """MIDIデータから music21 Score を構築する（公開API）
 
@@ -56,75 +103,279 @@ class Music21Generator(SheetMusicGeneratorPort):
 
     def _build_score(self, midi_data: MidiData) -> music21.stream.Score:
         """MIDIデータから music21 Score を構築する（内部実装）"""
-        score = music21.stream.Score()
+        return score_from_layout(layout_score(midi_data))
+
+    def _render(self, layout: ScoreLayout) -> str:
+        """レイアウトを MusicXML に書き出す（キャッシュがあれば小節単位で再利用）"""
+        if self._measure_cache is None or layout.measure_count <= 1:
+            return to_musicxml(score_from_layout(layout))
 
-        # メタデータ
-        score.insert(0, music21.metadata.Metadata())
-        score.metadata.title = "Transcription"
+        # 先頭小節（音部記号・拍子・テンポ付き）はスコアとして書き出して骨格にし、
+        # 2小節目以降を譜表ごとにキャッシュから組み立てて継ぎ足す
+        skeleton = to_musicxml(score_from_layout(layout.window(0, 1)))
+        fragments = [
+            self._render_staff_measures(staff, layout, staff.measures[1:])
+            for staff in layout.staves
+        ]
+        logger.debug(
+            "小節キャッシュ: hit=%d miss=%d",
+            self._measure_cache.hits,
+            self._measure_cache.misses,
+        )
+        return splice_measures(skeleton, fragments)
+
+    def _render_staff_measures(
+        self,
+        staff: StaffLayout,
+        layout: ScoreLayout,
+        measures: tuple[NotatedMeasure, ...],
+    ) -> str:
+        """1譜表分の小節を、キャッシュにない小節だけ music21 で書き出して連結する"""
+        cache = self._measure_cache
+        assert cache is not None
+        context = (layout.measure_length, layout.beats, layout.beat_type, staff.clef, layout.tempo)
+        keys = [(measure.voices, context) for measure in measures]
+        bodies = [cache.get(key) for key in keys]
 
-        # ノートを右手・左手に分割（ミドルC=60を基準）
-        right_hand_notes = [n for n in midi_data.notes if n.pitch >= 60]
-        left_hand_notes = [n for n in midi_data.notes if n.pitch < 60]
+        missing = [i for i, body in enumerate(bodies) if body is None]
+        if missing:
+            # 変わった小節だけを1つのパートにまとめて書き出す（小節番号は後で付け直す）
+            changed = replace(staff, measures=tuple(measures[i] for i in missing))
+            for i, body in zip(missing, export_measure_bodies(changed, layout), strict=True):
+                cache.put(keys[i], body)
+                bodies[i] = body
 
-        # テンポ設定・拍子記号（各パートの先頭に挿入して MusicXML に正しく書き込まれるようにする）
-        tempo_mark = music21.tempo.MetronomeMark(number=midi_data.tempo)
-        ts = music21.meter.TimeSignature(
-            f"{midi_data.time_signature_numerator}/{midi_data.time_signature_denominator}"
+        return "".join(
+            wrap_measure(measure.number, body)
+            for measure, body in zip(measures, bodies, strict=True)
         )
 
-        # 右手パート（高音部記号）
-        right_part = self._create_part(right_hand_notes, midi_data.tempo, "Right Hand", "treble")
-        right_part.insert(0, tempo_mark)
-        right_part.insert(0, ts)
-        score.insert(0, right_part)
 
-        # 左手パート（低音部記号）
-        left_part = self._create_part(left_hand_notes, midi_data.tempo, "Left Hand", "bass")
-        score.insert(0, left_part)
+def score_from_layout(layout: ScoreLayout) -> music21.stream.Score:
+    """記譜レイアウトから music21 Score を構築する"""
+    score = music21.stream.Score()
 
-        return score
+    # メタデータ
+    score.insert(0, music21.metadata.Metadata())
+    score.metadata.title = "Transcription"
 
-    def _create_part(
-        self,
-        notes: list,
-        tempo: float,
-        part_name: str,
-        clef_type: str,
-    ) -> music21.stream.Part:
-        """パート（右手 or 左手）を作成する"""
-        part = music21.stream.Part()
-        part.partName = part_name
-
-        # 音部記号設定
-        if clef_type == "treble":
-            part.insert(0, music21.clef.TrebleClef())
-        else:
-            part.insert(0, music21.clef.BassClef())
-
-        if not notes:
-            # 空パートには全休符を入れる
-            rest = music21.note.Rest(quarterLength=4.0)
-            part.append(rest)
-            return part
-
-        # 1拍の長さ（秒）
-        beat_duration = 60.0 / tempo
-
-        for note_event in notes:
-            # 長さを四分音符単位に変換
-            duration_quarters = note_event.duration / beat_duration
-            # 最小長：16分音符（0.25四分音符）
-            duration_quarters = max(0.25, duration_quarters)
-
-            n = music21.note.Note(note_event.pitch)
-            n.quarterLength = duration_quarters
-            n.volume.velocity = note_event.velocity
-
-            # オフセット（開始位置）を四分音符単位で設定
-            offset_quarters = note_event.start / beat_duration
-            part.insert(offset_quarters, n)
-
-        # ストリームを整形（タイ、小節線等を自動調整）
-        part.makeRests(fillGaps=True, inPlace=True)
-
-        return part
+    # 右手パート（高音部記号、テンポ記号付き）・左手パート（低音部記号）
+    right_staff, left_staff = layout.staves
+    score.insert(0, part_from_staff(right_staff, layout, with_tempo=True))
+    score.insert(0, part_from_staff(left_staff, layout, with_tempo=False))
+
+    return score
+
+
+def part_from_staff(
+    staff: StaffLayout,
+    layout: ScoreLayout,
+    with_tempo: bool,
+    with_attributes: bool = True,
+) -> music21.stream.Part:
+    """パート（右手 or 左手）を記譜済みの小節から作成する
+
+    要素は coreInsert でまとめて入れ、各ストリームで coreElementsChanged を
+    1回だけ呼ぶ（insert ごとのソート・キャッシュ破棄を避ける）。
+
+    Args:
+        staff: 譜表のレイアウト
+        layout: 拍子・テンポを参照するスコアのレイアウト
+        with_tempo: 先頭小節にテンポ記号を入れる
+        with_attributes: 先頭小節に音部記号・拍子記号を入れる
+            （途中の小節から続く断片では False）
+    """
+    part = music21.stream.Part()
+    part.partName = staff.name
+
+    bar_length = layout.measure_length / 4.0
+    for i, notated in enumerate(staff.measures):
+        measure = _create_measure(notated, layout.measure_length)
+        if i == 0 and with_attributes:
+            clef = (
+                music21.clef.TrebleClef() if staff.clef == Clef.TREBLE else music21.clef.BassClef()
+            )
+            measure.coreInsert(0, clef)
+            measure.coreInsert(0, music21.meter.TimeSignature(f"{layout.beats}/{layout.beat_type}"))
+            if with_tempo:
+                measure.coreInsert(0, music21.tempo.MetronomeMark(number=layout.tempo))
+            measure.coreElementsChanged()
+        part.coreInsert(i * bar_length, measure)
+    part.coreElementsChanged()
+
+    return part
+
+
+def _create_measure(notated: NotatedMeasure, measure_length: int) -> music21.stream.Measure:
+    """小節を作成する（声部が複数あれば Voice に分ける）"""
+    measure = music21.stream.Measure(number=notated.number)
+    notes = [
+        [_to_general_note(event, measure_length) for event in events] for events in notated.voices
+    ]
+    _set_accidental_display(notated, notes)
+    if len(notated.voices) == 1:
+        _insert_events(measure, notated.voices[0], notes[0])
+    else:
+        for v, (events, elements) in enumerate(zip(notated.voices, notes, strict=True), start=1):
+            voice = music21.stream.Voice(id=str(v))
+            _insert_events(voice, events, elements)
+            measure.coreInsert(0, voice)
+    measure.coreElementsChanged()
+    return measure
+
+
+def _insert_events(
+    container: music21.stream.Stream,
+    events: tuple[NotatedEvent, ...],
+    elements: list[music21.note.GeneralNote],
+) -> None:
+    """音符・和音・休符を container にまとめて挿入する"""
+    for event, element in zip(events, elements, strict=True):
+        container.coreInsert(event.offset / 4.0, element)
+    container.coreElementsChanged()
+
+
+def _set_accidental_display(
+    notated: NotatedMeasure,
+    elements: list[list[music21.note.GeneralNote]],
+) -> None:
+    """小節内の臨時記号の表示/非表示を決める（makeAccidentals の代わり）
+
+    調号はハ長調とし、同じ小節で同じ音名・オクターブに既に同じ変化が
+    付いていれば表示しない。タイで続く音には表示しない。
+    """
+    ordered = sorted(
+        (
+            (event.offset, event, element)
+            for events, voice_elements in zip(notated.voices, elements, strict=True)
+            for event, element in zip(events, voice_elements, strict=True)
+            if not event.is_rest
+        ),
+        key=lambda item: item[0],
+    )
+    state: dict[tuple[str, int], float] = {}
+    for _, event, element in ordered:
+        for pitch in element.pitches:
+            key = (pitch.step, pitch.octave)
+            alter = pitch.alter
+            display = not event.tie_stop and state.get(key, 0.0) != alter
+            state[key] = alter
+            if alter == 0.0:
+                pitch.accidental = music21.pitch.Accidental("natural") if display else None
+            if pitch.accidental is not None:
+                pitch.accidental.displayStatus = display
+
+
+def _to_general_note(event: NotatedEvent, measure_length: int) -> music21.note.GeneralNote:
+    """記譜イベントを music21 の Note / Chord / Rest に変換する"""
+    quarter_length = event.duration / 4.0
+    if event.is_rest:
+        rest = music21.note.Rest(quarterLength=quarter_length)
+        # 全小節休符かを明示する（"auto" だと書き出し時に拍子記号をスコア全体から探す）
+        rest.fullMeasure = event.duration == measure_length
+        return rest
+
+    pitches = [music21.pitch.Pitch(midi=p) for p in event.pitches]
+    if len(pitches) == 1:
+        element = music21.note.Note(pitches[0], quarterLength=quarter_length)
+    else:
+        element = music21.chord.Chord(pitches, quarterLength=quarter_length)
+    element.volume.velocity = event.velocity
+
+    if event.tie_start and event.tie_stop:
+        element.tie = music21.tie.Tie("continue")
+    elif event.tie_start:
+        element.tie = music21.tie.Tie("start")
+    elif event.tie_stop:
+        element.tie = music21.tie.Tie("stop")
+    return element
+
+
+def to_musicxml(score: music21.stream.Score) -> str:
+    """Score をメモリ上で MusicXML 文字列に変換する
+
+    score.write() の一時ファイルを使わず、小節・タイ・声部は組み立て済みのため
+    makeNotation も省略する。
+    """
+    exporter = GeneralObjectExporter(score)
+    exporter.makeNotation = False
+    return exporter.parse().decode("utf-8")
+
+
+def export_measure_bodies(staff: StaffLayout, layout: ScoreLayout) -> list[str]:
+    """譜表の小節を music21 で書き出し、各 <measure> 要素の中身を返す
+
+    曲の途中に継ぎ足す断片として書き出すため、音部記号・拍子記号・テンポは入れない。
+    """
+    score = music21.stream.Score()
+    score.insert(
+        0,
+        part_from_staff(staff, layout, with_tempo=False, with_attributes=False),
+    )
+    bodies = _MEASURE_XML.findall(to_musicxml(score))
+    if bodies:
+        # 骨格と同じ divisions のため、先頭小節に付く divisions だけの属性は不要
+        bodies[0] = _DIVISIONS_ONLY.sub("", bodies[0], count=1)
+    return bodies
+
+
+def wrap_measure(number: int, body: str) -> str:
+    """小節の中身を <measure> 要素で包む"""
+    return f'    <measure implicit="no" number="{number}">\n{body}    </measure>\n'
+
+
+def splice_measures(skeleton: str, fragments: list[str]) -> str:
+    """骨格文書の各パートの末尾（</part> の直前）に小節の並びを挿入する
+
+    Args:
+        skeleton: 先頭の小節だけを持つ MusicXML 文書
+        fragments: パート順の <measure> 要素列のテキスト
+
+    Returns:
+        継ぎ合わせた MusicXML 文書
+    """
+    pieces: list[str] = []
+    position = 0
+    for fragment in fragments:
+        close = skeleton.find("</part>", position)
+        if close < 0:
+            raise ValueError("骨格の MusicXML にパートが足りません")
+        # </part> の行頭（インデントの前）に挿入する
+        line_start = skeleton.rfind("\n", position, close) + 1
+        pieces.append(skeleton[position:line_start])
+        pieces.append(fragment)
+        position = line_start
+        pieces.append(skeleton[position : close + len("</part>")])
+        position = close + len("</part>")
+    pieces.append(skeleton[position:])
+    return "".join(pieces)
+
+
+def music21_lilypond_source(score: music21.stream.Score, lilypond_version: str) -> str:
+    """music21 Score を LilyPond ソースに変換する（LilyPond は起動しない）"""
+    converter = _SourceOnlyLilypondConverter(lilypond_version)
+    converter.loadFromMusic21Object(score)
+    return str(converter.topLevelObject)
+
+
+class _SourceOnlyLilypondConverter(translate.LilypondConverter):
+    """LilyPond の --version 呼び出しを行わない music21 LilyPond 変換器
+
+    標準の変換器は生成のたびに LilyPond を起動してバージョンを調べるため、
+    バージョンは設定値を使い、ソースの生成だけを行う。
+    """
+
+    def __init__(self, lilypond_version: str):
+        self._lilypond_version = lilypond_version
+        super().__init__()
+
+    def setupTools(self) -> None:  # noqa: N802 (music21 のメソッド名)
+        major, minor = self._lilypond_version.split(".")[:2]
+        self.majorVersion = major
+        self.minorVersion = minor
+        top = self.topLevelObject
+        self.versionString = f"{top.backslash}version {top.quoteString(f'{major}.{minor}')}"
+        self.versionScheme = lilyObjects.LyEmbeddedScm(self.versionString)
+        self.headerScheme = lilyObjects.LyEmbeddedScm(self.bookHeader)
+        self.backend = "ps"
+        self.backendString = "-dbackend="
@@ -0,0 +1,66 @@
+"""MusicXML の配信用変換（圧縮 .mxl コンテナ・ミニファイ）
+
+採譜結果の MusicXML は長い曲で数MBになるため、配信時に
+.mxl（zip コンテナ）への格納や、冗長な空白・既定値要素の除去を行う。
+"""
+
+import io
+import re
+import zipfile
+
+# .mxl 内の楽譜ファイル名
+MXL_SCORE_NAME = "score.musicxml"
+
+_CONTAINER_XML = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    "<container>\n"
+    "  <rootfiles>\n"
+    f'    <rootfile full-path="{MXL_SCORE_NAME}" '
+    'media-type="application/vnd.recordare.musicxml+xml"/>\n'
+    "  </rootfiles>\n"
+    "</container>\n"
+)
+
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+# 改行を含むタグ間の空白（インデント）。改行のない空白は <words> </words> などの中身でありうる
+_BETWEEN_TAGS = re.compile(r">[^\S\n]*\n\s*<")
+# 省略しても意味が変わらない既定値（変化記号なし・暗黙でない小節）
+_DEFAULTS = re.compile(r'<alter>0</alter>| implicit="no"')
+
+
+def to_mxl(musicxml: str) -> bytes:
+    """MusicXML を圧縮 MusicXML（.mxl）の zip コンテナに格納する
+
+    mimetype は仕様どおり先頭に無圧縮で置き、楽譜本体は deflate で圧縮する。
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "mimetype", "application/vnd.recordare.musicxml", compress_type=zipfile.ZIP_STORED
+        )
+        archive.writestr(
+            "META-INF/container.xml", _CONTAINER_XML, compress_type=zipfile.ZIP_DEFLATED
+        )
+        archive.writestr(MXL_SCORE_NAME, musicxml, compress_type=zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+def from_mxl(data: bytes) -> str:
+    """.mxl コンテナから楽譜本体の MusicXML を取り出す"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        container = archive.read("META-INF/container.xml").decode("utf-8")
+        match = re.search(r'full-path="([^"]+)"', container)
+        name = match.group(1) if match else MXL_SCORE_NAME
+        return archive.read(name).decode("utf-8")
+
+
+def minify_musicxml(musicxml: str) -> str:
+    """MusicXML からコメント・タグ間の改行とインデント・既定値の要素/属性を取り除く
+
+    テキストノードの中身（歌詞・曲名など）は変更しない。改行を含まない空白だけの
+    テキストノード（<words> </words> など）も残す。
+    """
+    minified = _COMMENT.sub("", musicxml)
+    minified = _BETWEEN_TAGS.sub("><", minified)
+    minified = _DEFAULTS.sub("", minified)
+    return minified.strip() + "\n"
@@ -0,0 +1,223 @@
+"""MusicXML 直接書き出しによる SheetMusicGenerator ポートの実装
+
+music21 の Score 構築・makeNotation・エクスポータを通さず、
+記譜レイアウト（src.domain.notation）から MusicXML を小節単位で
+テキストバッファへ直接書き出す。
+"""
+
+import io
+import logging
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
+from src.core import metrics
+from src.domain.entities import MidiData
+from src.domain.notation import (
+    NOTE_VALUES,
+    Clef,
+    NotatedEvent,
+    NotatedMeasure,
+    ScoreLayout,
+    layout_score,
+    snap_to_layout_grid,
+)
+from src.infrastructure.lilypond_writer import write_lilypond
+from src.infrastructure.smf_encoder import encode_smf_base64
+
+logger = logging.getLogger(__name__)
+
+# 四分音符あたりの分割数（16分音符 = 1）
+DIVISIONS = 4
+
+# music21 と同じ綴り（黒鍵は C# / E- / F# / G# / B-）
+_PITCH_SPELLING: tuple[tuple[str, int], ...] = (
+    ("C", 0),
+    ("C", 1),
+    ("D", 0),
+    ("E", -1),
+    ("E", 0),
+    ("F", 0),
+    ("F", 1),
+    ("G", 0),
+    ("G", 1),
+    ("A", 0),
+    ("B", -1),
+    ("B", 0),
+)
+
+# 基本音価（16分音符単位）→ MusicXML の type
+_NOTE_TYPES = {32: "breve", 16: "whole", 8: "half", 4: "quarter", 2: "eighth", 1: "16th"}
+
+_CLEF_XML = {
+    Clef.TREBLE: "<clef><sign>G</sign><line>2</line></clef>",
+    Clef.BASS: "<clef><sign>F</sign><line>4</line></clef>",
+}
+
+_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 4.0 Partwise//EN" '
+    '"http://www.musicxml.org/dtds/partwise.dtd">\n'
+    '<score-partwise version="4.0">\n'
+    "  <work><work-title>Transcription</work-title></work>\n"
+)
+
+
+class DirectMusicXmlGenerator(SheetMusicGeneratorPort):
+    """記譜レイアウトから MusicXML を直接書き出す楽譜生成
+
+    Args:
+        score_builder: build_score()（music21 Score）の委譲先
+    """
+
+    def __init__(self, score_builder: SheetMusicGeneratorPort):
+        self._score_builder = score_builder
+
+    def generate_musicxml(self, midi_data: MidiData) -> str:
+        """MIDIデータから MusicXML を生成する"""
+        with metrics.stage("score_build"):
+            layout = layout_score(midi_data)
+        with metrics.stage("musicxml_write"):
+            buffer = io.StringIO()
+            write_musicxml(layout, buffer)
+            musicxml_str = buffer.getvalue()
+        logger.info("MusicXML 生成完了: %d バイト", len(musicxml_str))
+        return musicxml_str
+
+    def generate_musicxml_and_midi(self, midi_data: MidiData) -> tuple[str, str]:
+        """MusicXML と MIDI Base64 を同じ記譜レイアウト上のノートから生成する
+
+        MIDI は楽譜と同じ16分音符グリッドに揃えたノートから書き出すため、
+        表示と再生の内容が一致する。
+        """
+        musicxml_str = self.generate_musicxml(midi_data)
+        with metrics.stage("midi_write"):
+            midi_base64 = encode_smf_base64(snap_to_layout_grid(midi_data))
+        logger.info("MIDI Base64 生成完了: %d バイト", len(midi_base64))
+        return musicxml_str, midi_base64
+
+    def generate_musicxml_page(
+        self, midi_data: MidiData, start_measure: int, end_measure: int
+    ) -> str:
+        """小節範囲 [start_measure, end_measure) だけの MusicXML を生成する"""
+        with metrics.stage("score_build"):
+            layout = layout_score(midi_data, start_measure, end_measure)
+        with metrics.stage("musicxml_write"):
+            buffer = io.StringIO()
+            write_musicxml(layout, buffer)
+            return buffer.getvalue()
+
+    def generate_lilypond(self, midi_data: MidiData, lilypond_version: str = "2.24") -> str:
+        """記譜レイアウトから LilyPond ソースを直接書き出す（music21 を通さない）"""
+        buffer = io.StringIO()
+        write_lilypond(layout_score(midi_data), buffer, lilypond_version)
+        return buffer.getvalue()
+
+    def build_score(self, midi_data: MidiData) -> Any:
+        """music21 Score を構築する（music21 実装に委譲）"""
+        return self._score_builder.build_score(midi_data)
+
+
+def write_musicxml(layout: ScoreLayout, out: TextIO) -> None:
+    """記譜レイアウトを MusicXML として out に書き出す（小節ごとに逐次書き込み）"""
+    out.write(_HEADER)
+    out.write("  <part-list>\n")
+    for i, staff in enumerate(layout.staves, start=1):
+        out.write(f'    <score-part id="P{i}"><part-name>{staff.name}</part-name></score-part>\n')
+    out.write("  </part-list>\n")
+
+    for i, staff in enumerate(layout.staves, start=1):
+        out.write(f'  <part id="P{i}">\n')
+        for j, measure in enumerate(staff.measures):
+            out.write(
+                render_measure(
+                    measure,
+                    layout,
+                    clef=staff.clef if j == 0 else None,
+                    with_tempo=i == 1 and j == 0,
+                )
+            )
+        out.write("  </part>\n")
+    out.write("</score-partwise>\n")
+
+
+def render_measure(
+    measure: NotatedMeasure,
+    layout: ScoreLayout,
+    clef: Clef | None = None,
+    with_tempo: bool = False,
+) -> str:
+    """1小節分の <measure> 要素を返す
+
+    Args:
+        measure: 小節のレイアウト
+        layout: 拍子・テンポを参照するスコアのレイアウト
+        clef: 指定時は小節頭に divisions・拍子・音部記号の <attributes> を書く
+        with_tempo: 小節頭にテンポ記号を書く
+    """
+    return "".join(_measure_parts(measure, layout, clef, with_tempo))
+
+
+def _measure_parts(
+    measure: NotatedMeasure,
+    layout: ScoreLayout,
+    clef: Clef | None,
+    with_tempo: bool,
+) -> Iterator[str]:
+    yield f'    <measure number="{measure.number}">\n'
+    if clef is not None:
+        yield (
+            f"      <attributes><divisions>{DIVISIONS}</divisions>"
+            f"<time><beats>{layout.beats}</beats><beat-type>{layout.beat_type}</beat-type></time>"
+            f"{_CLEF_XML[clef]}</attributes>\n"
+        )
+    if with_tempo:
+        tempo = _format_tempo(layout.tempo)
+        yield (
+            '      <direction placement="above"><direction-type><metronome>'
+            f"<beat-unit>quarter</beat-unit><per-minute>{tempo}</per-minute>"
+            f'</metronome></direction-type><sound tempo="{tempo}"/></direction>\n'
+        )
+    for v, events in enumerate(measure.voices, start=1):
+        if v > 1:
+            yield f"      <backup><duration>{layout.measure_length}</duration></backup>\n"
+        for event in events:
+            yield from _event_parts(event, v)
+    yield "    </measure>\n"
+
+
+def _event_parts(event: NotatedEvent, voice: int) -> Iterator[str]:
+    """音符・和音・休符の <note> 要素列"""
+    base, dots = NOTE_VALUES[event.duration]
+    tail = f"<voice>{voice}</voice><type>{_NOTE_TYPES[base]}</type>" + "<dot/>" * dots
+
+    if event.is_rest:
+        yield f"      <note><rest/><duration>{event.duration}</duration>{tail}</note>\n"
+        return
+
+    ties = ""
+    tied = ""
+    if event.tie_stop:
+        ties += '<tie type="stop"/>'
+        tied += '<tied type="stop"/>'
+    if event.tie_start:
+        ties += '<tie type="start"/>'
+        tied += '<tied type="start"/>'
+    notations = f"<notations>{tied}</notations>" if tied else ""
+    dynamics = f"{event.velocity / 90 * 100:.2f}"
+
+    for i, pitch in enumerate(event.pitches):
+        step, alter = _PITCH_SPELLING[pitch % 12]
+        alter_xml = f"<alter>{alter}</alter>" if alter else ""
+        chord = "<chord/>" if i > 0 else ""
+        yield (
+            f'      <note dynamics="{dynamics}">{chord}'
+            f"<pitch><step>{step}</step>{alter_xml}<octave>{pitch // 12 - 1}</octave></pitch>"
+            f"<duration>{event.duration}</duration>{ties}{tail}{notations}</note>\n"
+        )
+
+
+def _format_tempo(tempo: float) -> str:
+    """テンポ表記（整数なら整数、そうでなければ小数2桁まで）"""
+    rounded = round(tempo, 2)
+    return str(int(rounded)) if rounded == int(rounded) else f"{rounded:g}"
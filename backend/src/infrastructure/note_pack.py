@@ -0,0 +1,177 @@
+"""ノートパック: MidiData の固定幅バイナリ形式
+
+NoteEvent のリストは1ノートあたり数百バイトの Python オブジェクトになり、
+MIDI ファイルは読み込みのたびに可変長のイベント列を走査する必要がある。
+ノートパックはヘッダの後に列ごとの固定幅の配列を連続して並べるだけの形式で、
+numpy.frombuffer でコピーなしに読め、ファイルを mmap してそのまま使える。
+
+レイアウト（リトルエンディアン、各配列は要素サイズの境界に揃う）:
+
+    オフセット  内容
+    0           マジック "NPAK"
+    4           バージョン (u16)
+    6           ヘッダ長 (u16、現在は 32)
+    8           ノート数 n (u32)
+    12          拍子の分子 (u16)
+    14          拍子の分母 (u16)
+    16          テンポ BPM (f64)
+    24          予約 (8 バイト、0)
+    32          開始時刻 f64[n]（秒）
+    32 + 8n     終了時刻 f64[n]（秒）
+    32 + 16n    ピッチ u8[n]
+    32 + 17n    ベロシティ u8[n]
+
+ノートの順序は MidiData.notes の順序のまま保存する。
+"""
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from src.domain.entities import MidiData, NoteEvent
+
+# ノートパックの MIME タイプ
+NOTE_PACK_MEDIA_TYPE = "application/vnd.transcription-app.note-pack"
+
+NOTE_PACK_VERSION = 1
+
+_MAGIC = b"NPAK"
+_HEADER = struct.Struct("<4sHHIHHd8x")
+_TIME_DTYPE = np.dtype("<f8")
+_BYTE_DTYPE = np.dtype("u1")
+# 1ノートあたりのバイト数（開始・終了 f64 + ピッチ・ベロシティ u8）
+_NOTE_SIZE = 2 * _TIME_DTYPE.itemsize + 2 * _BYTE_DTYPE.itemsize
+
+
+class NotePackError(ValueError):
+    """ノートパックとして読み取れないバイト列"""
+
+
+@dataclass(frozen=True)
+class NotePack:
+    """ノートパックの列（元のバッファを参照する読み取り専用の配列）
+
+    Attributes:
+        starts: 開始時刻（秒）
+        ends: 終了時刻（秒）
+        pitches: MIDIノート番号
+        velocities: ベロシティ
+        tempo: テンポ（BPM）
+        time_signature: 拍子（分子, 分母）
+    """
+
+    starts: np.ndarray
+    ends: np.ndarray
+    pitches: np.ndarray
+    velocities: np.ndarray
+    tempo: float
+    time_signature: tuple[int, int]
+
+    @property
+    def note_count(self) -> int:
+        return len(self.starts)
+
+    def to_midi_data(self) -> MidiData:
+        """MIDIデータに変換する（ここで初めてノートのオブジェクトを作る）"""
+        numerator, denominator = self.time_signature
+        return MidiData(
+            notes=[
+                NoteEvent(pitch, start, end, velocity)
+                for pitch, start, end, velocity in zip(
+                    self.pitches.tolist(),
+                    self.starts.tolist(),
+                    self.ends.tolist(),
+                    self.velocities.tolist(),
+                    strict=True,
+                )
+            ],
+            tempo=self.tempo,
+            time_signature_numerator=numerator,
+            time_signature_denominator=denominator,
+        )
+
+
+def pack_notes(midi_data: MidiData) -> bytes:
+    """MIDIデータをノートパックに変換する"""
+    notes = midi_data.notes
+    header = _HEADER.pack(
+        _MAGIC,
+        NOTE_PACK_VERSION,
+        _HEADER.size,
+        len(notes),
+        midi_data.time_signature_numerator,
+        midi_data.time_signature_denominator,
+        midi_data.tempo,
+    )
+    return b"".join(
+        (
+            header,
+            np.fromiter((n.start for n in notes), _TIME_DTYPE, len(notes)).tobytes(),
+            np.fromiter((n.end for n in notes), _TIME_DTYPE, len(notes)).tobytes(),
+            np.fromiter((n.pitch for n in notes), _BYTE_DTYPE, len(notes)).tobytes(),
+            np.fromiter((n.velocity for n in notes), _BYTE_DTYPE, len(notes)).tobytes(),
+        )
+    )
+
+
+def unpack_notes(buffer) -> NotePack:
+    """ノートパックを列に分解する（コピーせずバッファを参照する）
+
+    Args:
+        buffer: bytes・memoryview・mmap などバッファプロトコルを持つオブジェクト
+
+    Raises:
+        NotePackError: ノートパックとして読み取れない場合
+    """
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise NotePackError("ノートパックのヘッダがありません")
+    magic, version, header_size, count, numerator, denominator, tempo = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise NotePackError("ノートパックではありません")
+    if version != NOTE_PACK_VERSION:
+        raise NotePackError(f"対応していないノートパックのバージョンです: {version}")
+    if header_size < _HEADER.size or len(view) < header_size + count * _NOTE_SIZE:
+        raise NotePackError("ノートパックが途中で終わっています")
+
+    offset = header_size
+    columns = []
+    for dtype in (_TIME_DTYPE, _TIME_DTYPE, _BYTE_DTYPE, _BYTE_DTYPE):
+        columns.append(np.frombuffer(view, dtype=dtype, count=count, offset=offset))
+        offset += count * dtype.itemsize
+    starts, ends, pitches, velocities = columns
+    return NotePack(
+        starts=starts,
+        ends=ends,
+        pitches=pitches,
+        velocities=velocities,
+        tempo=tempo,
+        time_signature=(numerator, denominator),
+    )
+
+
+def write_note_pack(path: Path, midi_data: MidiData) -> None:
+    """ノートパックをファイルに書き出す（一時ファイルから置き換えるため、読み手は途中の内容を見ない）"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(pack_notes(midi_data))
+    os.replace(tmp_path, path)
+
+
+def load_note_pack(path: Path) -> NotePack:
+    """ノートパックのファイルを mmap して列を返す
+
+    配列は mmap を参照し、配列が使われなくなるとマップも解放される。
+
+    Raises:
+        NotePackError: ノートパックとして読み取れない場合
+        FileNotFoundError: ファイルがない場合
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise NotePackError("ノートパックが空です")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return unpack_notes(mapped)
@@ -0,0 +1,147 @@
+"""小節チャンク並列の music21 による SheetMusicGenerator ポートの実装
+
+music21 の Score 構築と書き出しは CPU バウンドかつ GIL を保持したままなので、
+長い曲では右手・左手の譜表をそれぞれ小節チャンクに分け、
+プロセスプールで並列に書き出してから1つの MusicXML に継ぎ合わせる。
+
+継ぎ合わせの手順:
+1. 先頭チャンク（両譜表）を通常の Score として書き出し、文書の骨格にする
+   （ヘッダ・part-list・パートID・先頭小節の拍子/音部記号/テンポはここに入る）
+2. 残りのチャンクは譜表ごとに属性なしのパートとして書き出し、
+   <measure> 要素だけを取り出して骨格の対応する </part> の直前に挿入する
+
+タイ・声部・小節番号は曲全体の記譜レイアウトで決めてから分割するため、
+チャンク境界をまたぐタイもそのまま続く。
+"""
+
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+
+from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
+from src.core import metrics
+from src.domain.entities import MidiData
+from src.domain.notation import ScoreLayout, layout_score, snap_to_layout_grid
+from src.infrastructure.music21_generator import (
+    Music21Generator,
+    export_measure_bodies,
+    score_from_layout,
+    splice_measures,
+    to_musicxml,
+    wrap_measure,
+)
+from src.infrastructure.smf_encoder import encode_smf_base64
+
+logger = logging.getLogger(__name__)
+
+
+class ParallelMusic21Generator(SheetMusicGeneratorPort):
+    """小節チャンクごとにプロセスプールで MusicXML を書き出す music21 楽譜生成
+
+    Args:
+        chunk_measures: 1チャンクの小節数。曲がこれ以下なら並列化しない
+        max_workers: プロセス数（None なら CPU 数）
+        executor: 使用する Executor（テスト用。None なら初回使用時にプロセスプールを作る）
+    """
+
+    def __init__(
+        self,
+        chunk_measures: int = 16,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+    ):
+        self._chunk_measures = max(1, chunk_measures)
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._executor = executor
+        self._serial = Music21Generator()
+
+    def generate_musicxml(self, midi_data: MidiData) -> str:
+        """MIDIデータから MusicXML を生成する"""
+        with metrics.stage("score_build"):
+            layout = layout_score(midi_data)
+        with metrics.stage("musicxml_write"):
+            musicxml_str = self._render(layout)
+        logger.info("MusicXML 生成完了: %d バイト", len(musicxml_str))
+        return musicxml_str
+
+    def generate_musicxml_and_midi(self, midi_data: MidiData) -> tuple[str, str]:
+        """MusicXML と MIDI Base64 を同じ16分音符グリッド上のノートから生成する"""
+        notated = snap_to_layout_grid(midi_data)
+        musicxml_str = self.generate_musicxml(notated)
+        with metrics.stage("midi_write"):
+            midi_base64 = encode_smf_base64(notated)
+        logger.info("MIDI Base64 生成完了: %d バイト", len(midi_base64))
+        return musicxml_str, midi_base64
+
+    def generate_musicxml_page(
+        self, midi_data: MidiData, start_measure: int, end_measure: int
+    ) -> str:
+        """小節範囲 [start_measure, end_measure) だけの MusicXML を生成する
+
+        範囲がチャンクより長ければ全体の生成と同じく並列に書き出す。
+        """
+        with metrics.stage("score_build"):
+            layout = layout_score(midi_data, start_measure, end_measure)
+        with metrics.stage("musicxml_write"):
+            return self._render(layout)
+
+    def generate_lilypond(self, midi_data: MidiData, lilypond_version: str = "2.24") -> str:
+        """LilyPond ソースを生成する（直列で生成する）"""
+        return self._serial.generate_lilypond(midi_data, lilypond_version)
+
+    def build_score(self, midi_data: MidiData) -> Any:
+        """music21 Score を構築する（PDF出力用、直列で構築する）"""
+        return self._serial.build_score(midi_data)
+
+    def shutdown(self) -> None:
+        """自前で作ったプロセスプールを終了する"""
+        if isinstance(self._executor, ProcessPoolExecutor):
+            self._executor.shutdown(cancel_futures=True)
+        self._executor = None
+
+    def _render(self, layout: ScoreLayout) -> str:
+        """レイアウトをチャンクに分けて並列に書き出し、継ぎ合わせる"""
+        size = self._chunk_measures
+        total = layout.measure_count
+        if total <= size:
+            return render_skeleton(layout)
+
+        executor = self._get_executor()
+        skeleton = executor.submit(render_skeleton, layout.window(0, size))
+        fragments = [
+            [
+                executor.submit(render_staff_measures, layout.window(start, start + size), staff)
+                for start in range(size, total, size)
+            ]
+            for staff in range(len(layout.staves))
+        ]
+        logger.info(
+            "MusicXML 並列生成: %d 小節を %d チャンク × %d 譜表に分割",
+            total,
+            len(fragments[0]) + 1,
+            len(layout.staves),
+        )
+        return splice_measures(
+            skeleton.result(),
+            ["".join(future.result() for future in staff_futures) for staff_futures in fragments],
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._executor
+
+
+def render_skeleton(layout: ScoreLayout) -> str:
+    """レイアウトを完全な MusicXML 文書として書き出す（継ぎ合わせの骨格）"""
+    return to_musicxml(score_from_layout(layout))
+
+
+def render_staff_measures(layout: ScoreLayout, staff: int) -> str:
+    """1譜表分のチャンクを書き出し、<measure> 要素の並びを返す"""
+    measures = layout.staves[staff].measures
+    bodies = export_measure_bodies(layout.staves[staff], layout)
+    return "".join(
+        wrap_measure(measure.number, body) for measure, body in zip(measures, bodies, strict=True)
+    )
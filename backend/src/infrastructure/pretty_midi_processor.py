@@ -20,21 +20,24 @@ class PrettyMidiProcessor(MidiProcessorPort):
 
     def to_base64(self, midi_data: MidiData) -> str:
         """MIDIデータを Base64 エンコードされた MIDI ファイルに変換する"""
+        return base64.b64encode(self.to_bytes(midi_data)).decode("utf-8")
+
+    def from_base64(self, midi_base64: str) -> MidiData:
+        """Base64 エンコードされた MIDI ファイルを MIDIデータに変換する"""
+        return self.from_bytes(base64.b64decode(midi_base64))
+
+    def to_bytes(self, midi_data: MidiData) -> bytes:
+        """MIDIデータを MIDI ファイルのバイト列に変換する"""
         pm = self._to_pretty_midi(midi_data)
 
         # メモリ上に MIDI ファイルを書き出す
         buffer = io.BytesIO()
         pm.write(buffer)
-        buffer.seek(0)
-
-        return base64.b64encode(buffer.read()).decode("utf-8")
-
-    def from_base64(self, midi_base64: str) -> MidiData:
-        """Base64 エンコードされた MIDI ファイルを MIDIデータに変換する"""
-        raw = base64.b64decode(midi_base64)
-        buffer = io.BytesIO(raw)
+        return buffer.getvalue()
 
-        pm = pretty_midi.PrettyMIDI(buffer)
+    def from_bytes(self, data: bytes) -> MidiData:
+        """MIDI ファイルのバイト列を MIDIデータに変換する"""
+        pm = pretty_midi.PrettyMIDI(io.BytesIO(data))
 
         notes: list[NoteEvent] = []
         for instrument in pm.instruments:
@@ -0,0 +1,115 @@
+"""ワーカープロセスで楽譜を生成する SheetMusicGenerator ポートの実装
+
+music21 の Score 構築・書き出しは GIL を保持したまま数百ミリ秒〜数秒かかるため、
+スレッドから呼ぶと同時に来た要求は直列に進み、イベントループの応答も遅くなる。
+ここでは楽譜生成をプロセスプールのワーカーに送り、呼び出し元のスレッドは結果を待つだけにする。
+
+各ワーカーは起動時に factory で実際の楽譜生成（DirectMusicXmlGenerator など）を1回だけ組み立て、
+以後の呼び出しでは MIDIデータ（pickle）だけを受け渡す。
+ワーカーで計測した処理段階の所要時間は結果と一緒に返し、呼び出し元のラベルで記録する。
+要求をプロファイル中なら、ワーカーでの呼び出しの統計も返して要求のプロファイルに加える。
+"""
+
+import logging
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+
+from src.application.ports.sheet_music_generator import SheetMusicGeneratorPort
+from src.core import metrics, profiling
+from src.domain.entities import MidiData
+
+logger = logging.getLogger(__name__)
+
+# ワーカープロセスごとに1回だけ組み立てる楽譜生成
+_worker_generator: SheetMusicGeneratorPort | None = None
+
+
+class ProcessSheetMusicGenerator(SheetMusicGeneratorPort):
+    """楽譜生成をプロセスプールで実行する楽譜生成
+
+    Args:
+        factory: ワーカーで楽譜生成を組み立てる関数（pickle できるモジュールレベルの関数）
+        max_workers: プロセス数
+        executor: 使用する Executor（テスト用。None なら初回使用時にプロセスプールを作る）
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], SheetMusicGeneratorPort],
+        max_workers: int = 1,
+        executor: Executor | None = None,
+    ):
+        self._factory = factory
+        self._max_workers = max(1, max_workers)
+        self._executor = executor
+        self._local: SheetMusicGeneratorPort | None = None
+
+    def generate_musicxml(self, midi_data: MidiData) -> str:
+        """MIDIデータから MusicXML を生成する"""
+        return self._call("generate_musicxml", midi_data)
+
+    def generate_musicxml_and_midi(self, midi_data: MidiData) -> tuple[str, str]:
+        """MusicXML と MIDI Base64 を同じノートから生成する"""
+        return self._call("generate_musicxml_and_midi", midi_data)
+
+    def generate_musicxml_page(
+        self, midi_data: MidiData, start_measure: int, end_measure: int
+    ) -> str:
+        """小節範囲 [start_measure, end_measure) だけの MusicXML を生成する"""
+        return self._call("generate_musicxml_page", midi_data, start_measure, end_measure)
+
+    def generate_lilypond(self, midi_data: MidiData, lilypond_version: str = "2.24") -> str:
+        """LilyPond ソースを生成する"""
+        return self._call("generate_lilypond", midi_data, lilypond_version)
+
+    def build_score(self, midi_data: MidiData) -> Any:
+        """music21 Score を構築する（Score はプロセス間で受け渡さず、呼び出し元で構築する）"""
+        if self._local is None:
+            self._local = self._factory()
+        return self._local.build_score(midi_data)
+
+    def shutdown(self) -> None:
+        """自前で作ったプロセスプールを終了する"""
+        if isinstance(self._executor, ProcessPoolExecutor):
+            self._executor.shutdown(cancel_futures=True)
+        self._executor = None
+
+    def _call(self, method: str, *args: Any) -> Any:
+        """ワーカーで楽譜生成のメソッドを呼び、結果を待つ"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                initializer=init_worker,
+                initargs=(self._factory,),
+            )
+        profile = profiling.current()
+        future = self._executor.submit(call_generator, method, *args, profile=profile is not None)
+        result, records, stats = future.result()
+        metrics.replay(records)
+        if profile is not None:
+            profile.add_stats(stats)
+        return result
+
+
+def init_worker(factory: Callable[[], SheetMusicGeneratorPort]) -> None:
+    """ワーカープロセスの初期化（楽譜生成を組み立てる）"""
+    global _worker_generator
+    _worker_generator = factory()
+
+
+def call_generator(method: str, *args: Any, profile: bool = False) -> tuple[Any, list, dict]:
+    """ワーカーの楽譜生成のメソッドを呼び、(結果, 計測の記録, プロファイルの統計) を返す
+
+    profile=False なら統計は空。
+    """
+    if _worker_generator is None:
+        raise RuntimeError("ワーカーが初期化されていません")
+    stats: dict = {}
+    with metrics.capture() as records:
+        if profile:
+            with profiling.collect() as stats:
+                result = getattr(_worker_generator, method)(*args)
+        else:
+            result = getattr(_worker_generator, method)(*args)
+    return result, records, stats
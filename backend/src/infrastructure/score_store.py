@@ -0,0 +1,73 @@
+"""メモリ上の ScoreStore ポートの実装
+
+件数の上限（LRU）と有効期限（TTL）で古いデータを捨てる。
+プロセス内でのみ共有されるため、複数ワーカー構成ではワーカーごとに別のストアになる。
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from src.application.ports.score_store import ScoreStorePort
+from src.domain.entities import MidiData
+
+
+class InMemoryScoreStore(ScoreStorePort):
+    """LRU + TTL のメモリ上ストア（スレッドセーフ）
+
+    Args:
+        max_entries: 保持する最大件数
+        ttl_seconds: 最後に保存・参照してからの有効期間（秒）
+        clock: 現在時刻（秒）を返す関数（テスト用）
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, MidiData]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self, midi_data: MidiData) -> str:
+        """MIDIデータを保存して推測困難な ID を返す"""
+        score_id = secrets.token_urlsafe(16)
+        with self._lock:
+            self._evict_expired()
+            self._entries[score_id] = (self._clock() + self._ttl, midi_data)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return score_id
+
+    def get(self, score_id: str) -> MidiData | None:
+        """ID のMIDIデータを返す（参照すると有効期限を延長する）"""
+        with self._lock:
+            entry = self._entries.get(score_id)
+            if entry is None:
+                return None
+            expires_at, midi_data = entry
+            now = self._clock()
+            if expires_at <= now:
+                del self._entries[score_id]
+                return None
+            self._entries[score_id] = (now + self._ttl, midi_data)
+            self._entries.move_to_end(score_id)
+            return midi_data
+
+    def _evict_expired(self) -> None:
+        """期限切れのデータを古い順に捨てる（ロック内で呼ぶ）"""
+        now = self._clock()
+        while self._entries:
+            score_id, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[score_id]
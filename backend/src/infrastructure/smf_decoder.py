@@ -0,0 +1,268 @@
+"""Standard MIDI File（SMF）の軽量デコーダ
+
+SMF のバイト列を1回走査し、ノートの開始・終了ティック・ピッチ・ベロシティを
+列ごとの配列に、テンポと拍子のイベントを別の列に取り出す。
+ティックから秒への変換はテンポマップに対する numpy の二分探索でまとめて行う。
+pretty_midi のようにイベントごとの Python オブジェクトや
+ティック→時刻の全表を作らないため、デコードのコストはほぼバイト数に比例する。
+
+ノートの対応付けは pretty_midi と同じ規則に従う:
+- ベロシティ0のノートオンはノートオフとして扱う
+- ノートオフは同じチャンネル・ピッチで前のティックまでに始まった
+  すべての発音を閉じる（同じティックで始まった発音は残す）
+- 閉じられなかった発音は捨てる
+"""
+
+import struct
+from array import array
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.domain.entities import MidiData, NoteEvent
+
+# テンポイベントがない場合のテンポ（四分音符あたりのマイクロ秒、120BPM）
+_DEFAULT_TEMPO = 500_000
+
+_META_TEMPO = 0x51
+_META_TIME_SIGNATURE = 0x58
+
+# ステータスバイトの上位4ビット → データバイト数
+_DATA_LENGTHS = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+
+
+class SmfDecodeError(ValueError):
+    """SMF として読み取れないバイト列"""
+
+
+@dataclass(frozen=True)
+class SmfNotes:
+    """デコードしたノート列（列ごとの配列、開始時刻・ピッチ順）
+
+    Attributes:
+        starts: 開始時刻（秒）
+        ends: 終了時刻（秒）
+        pitches: MIDIノート番号
+        velocities: ベロシティ
+        tempo: 曲頭のテンポ（BPM）
+        time_signature: 曲頭の拍子（分子, 分母）
+    """
+
+    starts: np.ndarray
+    ends: np.ndarray
+    pitches: np.ndarray
+    velocities: np.ndarray
+    tempo: float
+    time_signature: tuple[int, int]
+
+
+def decode_smf(data: bytes) -> MidiData:
+    """SMF のバイト列を MIDIデータに変換する
+
+    Raises:
+        SmfDecodeError: SMF として読み取れない場合
+    """
+    notes = decode_smf_columns(data)
+    numerator, denominator = notes.time_signature
+    return MidiData(
+        notes=[
+            NoteEvent(pitch, start, end, velocity)
+            for pitch, start, end, velocity in zip(
+                notes.pitches.tolist(),
+                notes.starts.tolist(),
+                notes.ends.tolist(),
+                notes.velocities.tolist(),
+                strict=True,
+            )
+        ],
+        tempo=notes.tempo,
+        time_signature_numerator=numerator,
+        time_signature_denominator=denominator,
+    )
+
+
+def decode_smf_columns(data: bytes) -> SmfNotes:
+    """SMF のバイト列をノートの列とテンポ・拍子に変換する
+
+    Raises:
+        SmfDecodeError: SMF として読み取れない場合
+    """
+    view = memoryview(data)
+    if len(view) < 14 or view[:4] != b"MThd":
+        raise SmfDecodeError("SMF のヘッダがありません")
+    header_length, _, track_count, division = struct.unpack_from(">IHHH", view, 4)
+
+    start_ticks = array("q")
+    end_ticks = array("q")
+    pitches = array("B")
+    velocities = array("B")
+    # (ティック, 四分音符あたりのマイクロ秒)
+    tempos: list[tuple[int, int]] = []
+    # (ティック, 分子, 分母)
+    time_signatures: list[tuple[int, int, int]] = []
+
+    position = 8 + header_length
+    for _ in range(track_count):
+        if position + 8 > len(view):
+            break
+        chunk_type = bytes(view[position : position + 4])
+        (length,) = struct.unpack_from(">I", view, position + 4)
+        body_start = position + 8
+        position = body_start + length
+        if chunk_type != b"MTrk":
+            continue
+        _decode_track(
+            view[body_start : min(position, len(view))],
+            start_ticks,
+            end_ticks,
+            pitches,
+            velocities,
+            tempos,
+            time_signatures,
+        )
+
+    # 同じティックのイベントは後のものが有効になるよう、ティックだけで安定ソートする
+    tempo_map = sorted(tempos, key=lambda change: change[0])
+    if not tempo_map or tempo_map[0][0] != 0:
+        tempo_map.insert(0, (0, _DEFAULT_TEMPO))
+    tempo_at_start = [us for tick, us in tempo_map if tick == 0][-1]
+    numerator, denominator = 4, 4
+    for tick, beats, beat_type in sorted(time_signatures, key=lambda change: change[0]):
+        if tick > 0:
+            break
+        numerator, denominator = beats, beat_type
+
+    tick_to_seconds = _tick_converter(division, tempo_map)
+    starts = np.frombuffer(start_ticks, dtype=np.int64)
+    note_pitches = np.frombuffer(pitches, dtype=np.uint8).astype(np.int64)
+    order = np.lexsort((note_pitches, starts))
+
+    return SmfNotes(
+        starts=tick_to_seconds(starts[order]),
+        ends=tick_to_seconds(np.frombuffer(end_ticks, dtype=np.int64)[order]),
+        pitches=note_pitches[order],
+        velocities=np.frombuffer(velocities, dtype=np.uint8).astype(np.int64)[order],
+        tempo=60_000_000 / tempo_at_start,
+        time_signature=(numerator, denominator),
+    )
+
+
+def _decode_track(
+    track: memoryview,
+    start_ticks: array,
+    end_ticks: array,
+    pitches: array,
+    velocities: array,
+    tempos: list[tuple[int, int]],
+    time_signatures: list[tuple[int, int, int]],
+) -> None:
+    """1トラックのイベントを走査してノート・テンポ・拍子を追加する"""
+    # (チャンネル << 7 | ピッチ) → [(開始ティック, ベロシティ), ...]
+    open_notes: dict[int, list[tuple[int, int]]] = {}
+    size = len(track)
+    i = 0
+    tick = 0
+    status = 0
+    try:
+        while i < size:
+            # デルタタイム（可変長数値）
+            delta = 0
+            while True:
+                byte = track[i]
+                i += 1
+                delta = (delta << 7) | (byte & 0x7F)
+                if byte < 0x80:
+                    break
+            tick += delta
+
+            byte = track[i]
+            if byte >= 0x80:
+                status = byte
+                i += 1
+            elif status == 0 or status >= 0xF0:
+                raise SmfDecodeError("ランニングステータスの前にステータスバイトがありません")
+
+            if status == 0xFF:
+                kind = track[i]
+                length, i = _read_variable_length(track, i + 1)
+                if kind == _META_TEMPO and length == 3:
+                    microseconds = int.from_bytes(track[i : i + 3], "big")
+                    if microseconds > 0:
+                        tempos.append((tick, microseconds))
+                elif kind == _META_TIME_SIGNATURE and length >= 2 and track[i] > 0:
+                    time_signatures.append((tick, track[i], 1 << track[i + 1]))
+                i += length
+                status = 0  # メタイベントの後はランニングステータスを使えない
+                continue
+            if status in (0xF0, 0xF7):
+                length, i = _read_variable_length(track, i)
+                i += length
+                status = 0
+                continue
+
+            command = status & 0xF0
+            if command == 0x90 or command == 0x80:
+                key = ((status & 0x0F) << 7) | track[i]
+                velocity = track[i + 1]
+                i += 2
+                if command == 0x90 and velocity > 0:
+                    open_notes.setdefault(key, []).append((tick, velocity))
+                    continue
+                started = open_notes.get(key)
+                if not started:
+                    continue
+                kept = []
+                for start, start_velocity in started:
+                    if start == tick:
+                        kept.append((start, start_velocity))
+                        continue
+                    start_ticks.append(start)
+                    end_ticks.append(tick)
+                    pitches.append(key & 0x7F)
+                    velocities.append(start_velocity)
+                open_notes[key] = kept
+            else:
+                i += _DATA_LENGTHS.get(command, 0)
+    except IndexError as e:
+        raise SmfDecodeError("トラックが途中で終わっています") from e
+
+
+def _read_variable_length(track: memoryview, i: int) -> tuple[int, int]:
+    """可変長数値を読み、(値, 次の位置) を返す"""
+    value = 0
+    while True:
+        byte = track[i]
+        i += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, i
+
+
+def _tick_converter(division: int, tempo_map: list[tuple[int, int]]):
+    """ティック配列を秒の配列に変換する関数を返す（テンポマップに対する二分探索）
+
+    Args:
+        division: ヘッダの時間単位
+        tempo_map: ティック順の (ティック, 四分音符あたりのマイクロ秒)。先頭はティック0
+    """
+    if division & 0x8000:
+        # SMPTE: 上位バイトが -fps、下位バイトがフレームあたりのティック
+        fps = 256 - (division >> 8)
+        ticks_per_second = fps * (division & 0xFF)
+        return lambda ticks: ticks / float(ticks_per_second)
+
+    ticks_per_quarter = division or 480
+    change_ticks = np.array([tick for tick, _ in tempo_map], dtype=np.int64)
+    seconds_per_tick = np.array([us for _, us in tempo_map], dtype=np.float64) / (
+        1_000_000.0 * ticks_per_quarter
+    )
+    # 各テンポ区間の先頭の時刻（秒）
+    change_seconds = np.concatenate(
+        ([0.0], np.cumsum(np.diff(change_ticks) * seconds_per_tick[:-1]))
+    )
+
+    def convert(ticks: np.ndarray) -> np.ndarray:
+        segment = np.searchsorted(change_ticks, ticks, side="right") - 1
+        return change_seconds[segment] + (ticks - change_ticks[segment]) * seconds_per_tick[segment]
+
+    return convert
@@ -0,0 +1,97 @@
+"""Standard MIDI File（SMF）のメモリ上エンコーダ
+
+楽譜生成に使ったのと同じ量子化済みノートから、フォーマット0
+（1トラック）の SMF バイト列を直接組み立てる。music21 の MIDI 書き出しのような
+一時ファイルの書き込み・読み戻しを行わない。
+"""
+
+import base64
+import struct
+
+from src.domain.entities import MidiData
+
+# 四分音符あたりのティック数
+TICKS_PER_QUARTER = 480
+
+_NOTE_ON = 0x90
+_NOTE_OFF = 0x80
+_PROGRAM_CHANGE = 0xC0
+_META = 0xFF
+_META_TRACK_NAME = 0x03
+_META_TEMPO = 0x51
+_META_TIME_SIGNATURE = 0x58
+_META_END_OF_TRACK = 0x2F
+
+
+def encode_smf(midi_data: MidiData, ticks_per_quarter: int = TICKS_PER_QUARTER) -> bytes:
+    """MIDIデータを SMF（フォーマット0）のバイト列に変換する
+
+    ノートの秒単位の時刻は midi_data.tempo でティックに換算する。
+    同じティックではノートオフをノートオンより先に置く（同音の連打が途切れない）。
+
+    Args:
+        midi_data: 量子化済みのMIDIデータ
+        ticks_per_quarter: 分解能（四分音符あたりのティック数）
+
+    Returns:
+        SMF のバイト列
+    """
+    ticks_per_second = midi_data.tempo / 60.0 * ticks_per_quarter
+
+    # (ティック, 並び順, イベントバイト列)。並び順 0=ノートオフ, 1=ノートオン
+    events: list[tuple[int, int, bytes]] = []
+    for note in midi_data.notes:
+        start = max(0, round(note.start * ticks_per_second))
+        end = max(start + 1, round(note.end * ticks_per_second))
+        pitch = min(127, max(0, note.pitch))
+        velocity = min(127, max(1, note.velocity))
+        events.append((start, 1, bytes((_NOTE_ON, pitch, velocity))))
+        events.append((end, 0, bytes((_NOTE_OFF, pitch, 0))))
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    track = bytearray()
+    track += _meta(_META_TRACK_NAME, b"Piano")
+    microseconds = round(60_000_000 / midi_data.tempo)
+    track += _meta(_META_TEMPO, microseconds.to_bytes(3, "big"))
+    track += _meta(
+        _META_TIME_SIGNATURE,
+        bytes(
+            (
+                midi_data.time_signature_numerator,
+                max(0, midi_data.time_signature_denominator.bit_length() - 1),
+                24,
+                8,
+            )
+        ),
+    )
+    track += b"\x00" + bytes((_PROGRAM_CHANGE, 0))
+
+    previous = 0
+    for tick, _, data in events:
+        track += _variable_length(tick - previous)
+        track += data
+        previous = tick
+    track += _meta(_META_END_OF_TRACK, b"")
+
+    header = b"MThd" + struct.pack(">IHHH", 6, 0, 1, ticks_per_quarter)
+    return header + b"MTrk" + struct.pack(">I", len(track)) + bytes(track)
+
+
+def encode_smf_base64(midi_data: MidiData) -> str:
+    """MIDIデータを Base64 エンコードされた SMF に変換する"""
+    return base64.b64encode(encode_smf(midi_data)).decode("utf-8")
+
+
+def _meta(kind: int, data: bytes) -> bytes:
+    """デルタタイム0のメタイベント"""
+    return b"\x00" + bytes((_META, kind)) + _variable_length(len(data)) + data
+
+
+def _variable_length(value: int) -> bytes:
+    """可変長数値（7ビットずつ、最終バイト以外は最上位ビットを立てる）"""
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(out))
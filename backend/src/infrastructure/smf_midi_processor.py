@@ -0,0 +1,56 @@
+"""SMF エンコーダ/デコーダによる MidiProcessor ポートの実装
+
+pretty_midi を使わず、SMF のバイト列と MIDIデータを直接相互変換する。
+/api/simplify や /api/export-pdf のたびに行う Base64 MIDI のデコードを軽くする。
+"""
+
+import base64
+import binascii
+import logging
+
+from src.application.ports.midi_processor import MidiProcessorPort
+from src.core.exceptions import InvalidMidiError
+from src.domain.entities import MidiData
+from src.infrastructure.smf_decoder import SmfDecodeError, decode_smf
+from src.infrastructure.smf_encoder import encode_smf, encode_smf_base64
+
+logger = logging.getLogger(__name__)
+
+
+class SmfMidiProcessor(MidiProcessorPort):
+    """軽量 SMF エンコーダ/デコーダを使った MIDI データ加工"""
+
+    def to_base64(self, midi_data: MidiData) -> str:
+        """MIDIデータを Base64 エンコードされた MIDI ファイルに変換する"""
+        return encode_smf_base64(midi_data)
+
+    def from_base64(self, midi_base64: str) -> MidiData:
+        """Base64 エンコードされた MIDI ファイルを MIDIデータに変換する（拍子も保持する）
+
+        Raises:
+            InvalidMidiError: Base64 または SMF として読み取れない場合
+        """
+        try:
+            raw = base64.b64decode(midi_base64, validate=True)
+        except binascii.Error as e:
+            raise InvalidMidiError(f"MIDIデータを読み取れません: {e}") from e
+        return self.from_bytes(raw)
+
+    def to_bytes(self, midi_data: MidiData) -> bytes:
+        """MIDIデータを SMF のバイト列に変換する"""
+        return encode_smf(midi_data)
+
+    def from_bytes(self, data: bytes) -> MidiData:
+        """SMF のバイト列を MIDIデータに変換する（拍子も保持する）
+
+        Raises:
+            InvalidMidiError: SMF として読み取れない場合
+        """
+        try:
+            return decode_smf(data)
+        except SmfDecodeError as e:
+            raise InvalidMidiError(f"MIDIデータを読み取れません: {e}") from e
+
+    def detect_tempo(self, midi_data: MidiData) -> float:
+        """テンポを返す（既にMidiDataに含まれている）"""
+        return midi_data.tempo
@@ -0,0 +1,39 @@
+"""条件付き GET・Range 要求の解釈のテスト"""
+
+import pytest
+
+from src.api.http_cache import RangeNotSatisfiableError, etag_matches, parse_range
+
+
+class TestEtagMatches:
+    def test_matches(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('"x", W/"abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+
+    def test_not_matches(self):
+        assert not etag_matches(None, '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+
+
+class TestParseRange:
+    def test_ranges(self):
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=-1000", 100) == (0, 99)
+        assert parse_range("bytes=50-1000", 100) == (50, 99)
+
+    def test_ignored(self):
+        assert parse_range(None, 100) is None
+        assert parse_range("items=0-9", 100) is None
+        assert parse_range("bytes=0-9,20-29", 100) is None
+        assert parse_range("bytes=9-0", 100) is None
+        assert parse_range("bytes=a-b", 100) is None
+        assert parse_range("bytes=-", 100) is None
+
+    def test_not_satisfiable(self):
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range("bytes=100-", 100)
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range("bytes=-0", 100)
@@ -0,0 +1,39 @@
+"""MIDI バイナリ転送（フレーム形式・Accept 判定）のテスト"""
+
+import pytest
+
+from src.api.midi_transport import FRAMES_MEDIA_TYPE, accepts_frames, decode_frames, encode_frames
+
+
+class TestFrames:
+    def test_round_trip(self):
+        frames = [("metadata", b'{"a": 1}'), ("score", b"<score/>"), ("midi", b"MThd\x00")]
+        data = encode_frames(frames)
+        assert data.startswith(b"TAFR\x01\x03")
+        assert decode_frames(data) == dict(frames)
+
+    def test_empty_frame(self):
+        assert decode_frames(encode_frames([("midi", b"")])) == {"midi": b""}
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"", b"XXXX\x01\x00", b"TAFR\x02\x00", encode_frames([("midi", b"abc")])[:-1]],
+    )
+    def test_rejects_invalid_data(self, data):
+        with pytest.raises(ValueError):
+            decode_frames(data)
+
+
+class TestAcceptsFrames:
+    @pytest.mark.parametrize(
+        ("accept", "expected"),
+        [
+            (None, False),
+            ("application/json", False),
+            (FRAMES_MEDIA_TYPE, True),
+            (f"application/json;q=0.5, {FRAMES_MEDIA_TYPE};q=1", True),
+            ("*/*", False),
+        ],
+    )
+    def test_accept_header(self, accept, expected):
+        assert accepts_frames(accept) is expected
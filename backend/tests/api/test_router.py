@@ -1,16 +1,38 @@
 """API エンドポイントの統合テスト"""
 
 import asyncio
+import base64
+import io
+import json
+import struct
+import zipfile
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
 
+from src.api.midi_transport import FRAMES_MEDIA_TYPE, decode_frames
+from src.core.exceptions import (
+    InvalidMeasureRangeError,
+    InvalidMidiError,
+    PdfTimeoutError,
+    ScoreNotFoundError,
+    ServiceBusyError,
+)
 from src.domain.entities import (
+    BatchItemResult,
     Difficulty,
+    MidiData,
+    NoteEvent,
+    ScoreIndex,
     TranscriptionMetadata,
     TranscriptionResult,
 )
+from src.infrastructure.cost_quota import CostQuota
+from src.infrastructure.cpu_executor import CpuExecutor
+from src.infrastructure.local_artifact_store import LocalArtifactStore
+from src.infrastructure.musicxml_packaging import from_mxl
+from src.infrastructure.note_pack import NOTE_PACK_MEDIA_TYPE, unpack_notes
 
 
 @pytest.fixture(autouse=True)
@@ -63,16 +85,117 @@ def mock_simplify_usecase():
         ),
     )
     usecase.execute.return_value = result
+    usecase.execute_region.return_value = result
+    return usecase
+
+
+@pytest.fixture
+def mock_score_pages_usecase():
+    usecase = MagicMock()
+    usecase.index.return_value = ScoreIndex(
+        measure_count=3,
+        measure_duration=2.0,
+        measure_offsets=(0.0, 2.0, 4.0),
+        tempo=120.0,
+        time_signature_numerator=4,
+        time_signature_denominator=4,
+        note_count=12,
+        duration_seconds=5.5,
+    )
+    usecase.page.return_value = ("<score-partwise/>", 1, 3)
+    return usecase
+
+
+@pytest.fixture
+def mock_export_pdf_usecase():
+    usecase = AsyncMock()
+    usecase.execute.return_value = b"%PDF-1.4"
+    return usecase
+
+
+@pytest.fixture
+def mock_batch_usecase(mock_transcribe_usecase):
+    """受け取った入力を記録し、最初のファイルの最初の難易度だけ失敗させる一括採譜"""
+    usecase = MagicMock()
+    usecase.inputs = []
+
+    async def execute(files, difficulties):
+        usecase.inputs = [(name, path.read_bytes()) for name, path in files]
+        usecase.difficulties = difficulties
+        result = mock_transcribe_usecase.execute.return_value
+        for index, (name, _) in enumerate(files):
+            for difficulty in difficulties:
+                if index == 0 and difficulty == difficulties[0]:
+                    yield BatchItemResult(
+                        index, name, difficulty, error_code="TRANSCRIPTION_ERROR", error_message="x"
+                    )
+                else:
+                    yield BatchItemResult(index, name, difficulty, result=result)
+
+    usecase.execute = execute
     return usecase
 
 
 @pytest.fixture
-def client(mock_transcribe_usecase, mock_simplify_usecase):
+def cpu_executor():
+    executor = CpuExecutor(max_workers=2, max_queue=2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def artifact_store(tmp_path):
+    return LocalArtifactStore(tmp_path / "artifacts")
+
+
+@pytest.fixture
+def cost_quota():
+    """容量 10 秒・毎秒 0.5 秒補充・音声1秒あたり1秒の割り当て（時刻は止めておく）"""
+    return CostQuota(
+        capacity_seconds=10, refill_per_second=0.5, initial_ratio=1.0, clock=lambda: 0.0
+    )
+
+
+def _wav(seconds: int, byte_rate: int = 100) -> bytes:
+    """byte_rate バイト/秒で seconds 秒分の data を持つ WAV"""
+    data = b"\x00" * (seconds * byte_rate)
+    fmt = struct.pack("<HHIIHH", 1, 1, byte_rate, byte_rate, 1, 8)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    body += b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+@pytest.fixture
+def client(
+    mock_transcribe_usecase,
+    mock_simplify_usecase,
+    mock_score_pages_usecase,
+    mock_export_pdf_usecase,
+    mock_batch_usecase,
+    artifact_store,
+    cpu_executor,
+    cost_quota,
+):
     from main import app
-    from src.api.dependencies import get_simplify_usecase, get_transcribe_usecase
+    from src.api.dependencies import (
+        get_artifact_store,
+        get_batch_transcribe_usecase,
+        get_cost_quota,
+        get_cpu_executor,
+        get_export_pdf_usecase,
+        get_score_pages_usecase,
+        get_simplify_usecase,
+        get_transcribe_usecase,
+    )
 
     app.dependency_overrides[get_transcribe_usecase] = lambda: mock_transcribe_usecase
     app.dependency_overrides[get_simplify_usecase] = lambda: mock_simplify_usecase
+    app.dependency_overrides[get_score_pages_usecase] = lambda: mock_score_pages_usecase
+    app.dependency_overrides[get_export_pdf_usecase] = lambda: mock_export_pdf_usecase
+    app.dependency_overrides[get_artifact_store] = lambda: artifact_store
+    app.dependency_overrides[get_batch_transcribe_usecase] = lambda: mock_batch_usecase
+    app.dependency_overrides[get_cpu_executor] = lambda: cpu_executor
+    app.dependency_overrides[get_cost_quota] = lambda: cost_quota
 
     with TestClient(app) as c:
         yield c
@@ -147,6 +270,263 @@ class TestTranscribeEndpoint:
         assert "event: complete" in body
         assert "event: progress" in body
 
+    def test_sse_is_gzipped_when_accepted(self, client):
+        content = b"ID3" + b"\x00" * 100
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.mp3", content, "audio/mpeg")},
+            data={"difficulty": "original"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "event: complete" in resp.text
+
+    def test_sse_is_plain_without_accept_encoding(self, client):
+        content = b"ID3" + b"\x00" * 100
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.mp3", content, "audio/mpeg")},
+            data={"difficulty": "original"},
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert "content-encoding" not in resp.headers
+        assert "event: complete" in resp.text
+
+    def test_sse_complete_event_with_mxl(self, client):
+        content = b"ID3" + b"\x00" * 100
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.mp3", content, "audio/mpeg")},
+            data={"difficulty": "original", "score_format": "mxl"},
+        )
+        complete = resp.text.split("event: complete\ndata: ")[1].split("\n")[0]
+        data = json.loads(complete)
+        assert data["score_format"] == "mxl"
+        assert data["musicxml"] == ""
+        assert from_mxl(base64.b64decode(data["mxl_base64"])) == "<score/>"
+
+    def test_sse_complete_event_with_midi_url(self, client, mock_transcribe_usecase):
+        mock_transcribe_usecase.execute.return_value.result_id = "abc"
+        content = b"ID3" + b"\x00" * 100
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.mp3", content, "audio/mpeg")},
+            data={"difficulty": "original", "include_midi": "false"},
+        )
+        complete = resp.text.split("event: complete\ndata: ")[1].split("\n")[0]
+        data = json.loads(complete)
+        assert data["midi_base64"] is None
+        assert data["midi_url"] == "/api/scores/abc/midi"
+
+    def test_sse_embeds_midi_without_result_id(self, client):
+        content = b"ID3" + b"\x00" * 100
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.mp3", content, "audio/mpeg")},
+            data={"difficulty": "original", "include_midi": "false"},
+        )
+        complete = resp.text.split("event: complete\ndata: ")[1].split("\n")[0]
+        data = json.loads(complete)
+        assert data["midi_base64"] == "dGVzdA=="
+        assert data["midi_url"] is None
+
+    def test_sse_split_artifacts(self, client, mock_transcribe_usecase):
+        mock_transcribe_usecase.execute.return_value.musicxml = "<note/>" * 20000
+        content = b"ID3" + b"\x00" * 100
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.mp3", content, "audio/mpeg")},
+            data={"difficulty": "original", "split_artifacts": "true"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        events = [
+            (event, json.loads(data))
+            for event, data in (
+                block.split("\ndata: ", 1) for block in resp.text.strip().split("\n\n")
+            )
+        ]
+        artifacts = {
+            data["name"]: data["data"] for event, data in events if event == "event: artifact"
+        }
+        assert artifacts == {"musicxml": "<note/>" * 20000, "midi_base64": "dGVzdA=="}
+        event, complete = events[-1]
+        assert event == "event: complete"
+        assert complete["artifacts"] == ["musicxml", "midi_base64"]
+        assert complete["musicxml"] == ""
+        assert complete["midi_base64"] is None
+        assert complete["metadata"]["note_count"] == 50
+
+    def test_profile_event(self, client, monkeypatch):
+        from src.core.config import settings
+
+        monkeypatch.setattr(settings, "profiling_enabled", True)
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _wav(1), "audio/wav")},
+            data={"difficulty": "original"},
+            headers={"X-Profile": "1"},
+        )
+        events = _sse_events(resp.text)
+        names = [event for event, _ in events]
+        assert names.index("profile") < names.index("complete")
+        profile = dict(events)["profile"]
+        assert set(profile) == {"id", "wall_seconds", "stages", "hotspots"}
+
+
+def _sse_events(text: str) -> list[tuple[str, dict]]:
+    return [
+        (event.removeprefix("event: "), json.loads(data))
+        for event, data in (block.split("\ndata: ", 1) for block in text.strip().split("\n\n"))
+    ]
+
+
+class TestBatchEndpoint:
+    def test_streams_items(self, client, mock_batch_usecase):
+        resp = client.post(
+            "/api/batch",
+            files=[
+                ("files", ("a.mp3", b"ID3" + b"\x00" * 10, "audio/mpeg")),
+                ("files", ("b.wav", b"RIFF" + b"\x00" * 10, "audio/wav")),
+            ],
+            data={"difficulties": ["original", "beginner", "original"]},
+        )
+        assert resp.status_code == 200
+        assert [name for name, _ in mock_batch_usecase.inputs] == ["a.mp3", "b.wav"]
+        assert mock_batch_usecase.inputs[1][1] == b"RIFF" + b"\x00" * 10
+        assert mock_batch_usecase.difficulties == [Difficulty.ORIGINAL, Difficulty.BEGINNER]
+
+        events = _sse_events(resp.text)
+        items = [data for event, data in events if event == "item"]
+        errors = [data for event, data in events if event == "item_error"]
+        assert len(items) == 3
+        assert items[0]["file"] == "a.mp3" and items[0]["difficulty"] == "beginner"
+        assert items[0]["musicxml"] == "<score/>"
+        assert items[-1]["completed"] == items[-1]["total"] == 4
+        assert errors == [
+            {
+                "index": 0,
+                "file": "a.mp3",
+                "difficulty": "original",
+                "completed": 1,
+                "total": 4,
+                "code": "TRANSCRIPTION_ERROR",
+                "message": "x",
+            }
+        ]
+        assert events[-1] == ("complete", {"items": 4, "failed": 1})
+
+    def test_accepts_zip(self, client, mock_batch_usecase):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("set/one.mp3", b"ID3" + b"\x00" * 10)
+            archive.writestr("set/notes.txt", b"ignored")
+            archive.writestr("set/two.wav", b"RIFF" + b"\x00" * 10)
+        resp = client.post(
+            "/api/batch",
+            files=[("files", ("set.zip", buffer.getvalue(), "application/zip"))],
+        )
+        assert resp.status_code == 200
+        assert [name for name, _ in mock_batch_usecase.inputs] == ["one.mp3", "two.wav"]
+        assert mock_batch_usecase.difficulties == [Difficulty.ORIGINAL]
+
+    def test_rejects_invalid_member(self, client):
+        resp = client.post(
+            "/api/batch",
+            files=[
+                ("files", ("a.mp3", b"ID3" + b"\x00" * 10, "audio/mpeg")),
+                ("files", ("b.mp3", b"\x00" * 10, "audio/mpeg")),
+            ],
+        )
+        assert resp.status_code == 400
+
+    def test_rejects_broken_zip(self, client):
+        resp = client.post(
+            "/api/batch", files=[("files", ("set.zip", b"not a zip", "application/zip"))]
+        )
+        assert resp.status_code == 400
+
+    def test_rejects_too_many_files(self, client, monkeypatch):
+        from src.core.config import settings
+
+        monkeypatch.setattr(settings, "batch_max_files", 1)
+        resp = client.post(
+            "/api/batch",
+            files=[
+                ("files", ("a.mp3", b"ID3" + b"\x00" * 10, "audio/mpeg")),
+                ("files", ("b.mp3", b"ID3" + b"\x00" * 10, "audio/mpeg")),
+            ],
+        )
+        assert resp.status_code == 400
+
+
+class TestCostQuota:
+    def test_transcribe_refunds_unused_estimate(self, client, cost_quota):
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _wav(8), "audio/wav")},
+            data={"difficulty": "original"},
+        )
+        assert resp.status_code == 200
+        assert "complete" in resp.text
+        # モックの採譜は一瞬で終わるため、8 秒の見積もりはほぼ全額戻る
+        assert cost_quota.balance("testclient") > 9.9
+
+    def test_transcribe_rejects_when_exhausted(self, client, cost_quota, mock_transcribe_usecase):
+        cost_quota.reserve("testclient", 10)
+        resp = client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _wav(2), "audio/wav")},
+            data={"difficulty": "original"},
+        )
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "4"
+        mock_transcribe_usecase.execute.assert_not_called()
+
+    def test_refunds_when_stream_never_starts(self, cost_quota):
+        """切断などでストリームが始まらなくても、レスポンス後のタスクで予約を返す"""
+        from starlette.requests import Request
+
+        from src.api.router import _event_stream_response
+
+        async def body():
+            yield "data: never\n\n"
+
+        reservation = cost_quota.reserve("testclient", 8)
+        request = Request({"type": "http", "headers": []})
+        response = _event_stream_response(request, body(), reservation)
+        asyncio.run(response.background())
+        assert cost_quota.balance("testclient") == 10
+
+    def test_batch_charges_per_difficulty(self, client, cost_quota, mock_batch_usecase):
+        # 6 秒 × 2 難易度 = 12 秒は容量（10 秒）を超えるが、満杯なら受け付ける
+        resp = client.post(
+            "/api/batch",
+            files=[("files", ("a.wav", _wav(6), "audio/wav"))],
+            data={"difficulties": ["original", "beginner"]},
+        )
+        assert resp.status_code == 200
+        assert cost_quota.balance("testclient") > 9.9
+
+    def test_batch_does_not_update_ratio(self, client, cost_quota, mock_batch_usecase):
+        resp = client.post(
+            "/api/batch",
+            files=[("files", ("a.wav", _wav(6), "audio/wav"))],
+            data={"difficulties": ["original", "beginner"]},
+        )
+        assert "complete" in resp.text
+        assert cost_quota.ratio == 1.0
+
+    def test_batch_rejects_when_exhausted(self, client, cost_quota, mock_batch_usecase):
+        cost_quota.reserve("testclient", 10)
+        resp = client.post(
+            "/api/batch",
+            files=[("files", ("a.wav", _wav(1), "audio/wav"))],
+            data={"difficulties": ["original", "beginner"]},
+        )
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "4"
+        assert mock_batch_usecase.inputs == []
+
 
 class TestSimplifyEndpoint:
     def test_simplify_success(self, client):
@@ -160,9 +540,425 @@ class TestSimplifyEndpoint:
         assert "midi_base64" in data
         assert data["metadata"]["difficulty"] == "beginner"
 
+    def test_simplify_mxl(self, client):
+        resp = client.post(
+            "/api/simplify",
+            json={"midi_base64": "dGVzdA==", "difficulty": "beginner", "score_format": "mxl"},
+        )
+        data = resp.json()
+        assert data["score_format"] == "mxl"
+        assert from_mxl(base64.b64decode(data["mxl_base64"])) == "<score/>"
+
+    def test_simplify_minify(self, client, mock_simplify_usecase):
+        mock_simplify_usecase.execute.return_value.musicxml = (
+            "<score>\n  <!-- c -->\n  <a/>\n</score>"
+        )
+        resp = client.post(
+            "/api/simplify",
+            json={"midi_base64": "dGVzdA==", "difficulty": "beginner", "minify": True},
+        )
+        assert resp.json()["musicxml"] == "<score><a/></score>\n"
+
+    def test_large_json_is_gzipped(self, client, mock_simplify_usecase):
+        mock_simplify_usecase.execute.return_value.musicxml = "<note/>" * 2000
+        resp = client.post(
+            "/api/simplify",
+            json={"midi_base64": "dGVzdA==", "difficulty": "beginner"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.json()["musicxml"] == "<note/>" * 2000
+
     def test_simplify_invalid_difficulty(self, client):
         resp = client.post(
             "/api/simplify",
             json={"midi_base64": "dGVzdA==", "difficulty": "invalid"},
         )
         assert resp.status_code == 422
+
+    def test_simplify_octet_stream(self, client, mock_simplify_usecase):
+        resp = client.post(
+            "/api/simplify",
+            params={"difficulty": "beginner"},
+            content=b"MThd-raw",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["midi_base64"] == "bmV3"
+        mock_simplify_usecase.execute.assert_called_once_with(
+            b"MThd-raw", Difficulty.BEGINNER, None
+        )
+
+    def test_simplify_multipart(self, client, mock_simplify_usecase):
+        resp = client.post(
+            "/api/simplify",
+            files={"file": ("score.mid", b"MThd-raw", "audio/midi")},
+            data={"difficulty": "beginner", "score_format": "mxl"},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["score_format"] == "mxl"
+        mock_simplify_usecase.execute.assert_called_once_with(
+            b"MThd-raw", Difficulty.BEGINNER, None
+        )
+
+    def test_simplify_octet_stream_invalid_params(self, client):
+        resp = client.post(
+            "/api/simplify",
+            params={"difficulty": "invalid"},
+            content=b"MThd-raw",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert resp.status_code == 422
+
+    def test_simplify_multipart_without_file(self, client):
+        resp = client.post(
+            "/api/simplify",
+            files={"other": ("x", b"x")},
+            data={"difficulty": "beginner"},
+        )
+        assert resp.status_code == 422
+
+    def test_simplify_by_score_id(self, client, mock_simplify_usecase):
+        mock_simplify_usecase.execute.return_value.score_id = "sid"
+        resp = client.post("/api/simplify", json={"score_id": "sid", "difficulty": "beginner"})
+        assert resp.status_code == 200
+        assert resp.json()["score_id"] == "sid"
+        mock_simplify_usecase.execute.assert_called_once_with(None, Difficulty.BEGINNER, "sid")
+
+    def test_simplify_by_score_id_in_query(self, client, mock_simplify_usecase):
+        resp = client.post(
+            "/api/simplify",
+            params={"score_id": "sid", "difficulty": "beginner"},
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert resp.status_code == 200
+        mock_simplify_usecase.execute.assert_called_once_with(None, Difficulty.BEGINNER, "sid")
+
+    def test_simplify_expired_score_id(self, client, mock_simplify_usecase):
+        mock_simplify_usecase.execute.side_effect = ScoreNotFoundError()
+        resp = client.post("/api/simplify", json={"score_id": "old", "difficulty": "beginner"})
+        assert resp.status_code == 404
+
+    def test_simplify_requires_midi_or_score_id(self, client):
+        resp = client.post("/api/simplify", json={"difficulty": "beginner"})
+        assert resp.status_code == 422
+
+    def test_simplify_profile(self, client, monkeypatch, tmp_path):
+        from src.core.config import settings
+
+        body = {"midi_base64": "dGVzdA==", "difficulty": "beginner"}
+        resp = client.post("/api/simplify", json=body, headers={"X-Profile": "1"})
+        assert "server-timing" not in resp.headers
+
+        monkeypatch.setattr(settings, "profiling_enabled", True)
+        monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+        resp = client.post("/api/simplify", json=body, headers={"X-Profile": "1"})
+        assert resp.status_code == 200
+        assert "total;dur=" in resp.headers["server-timing"]
+        assert isinstance(json.loads(resp.headers["x-profile-summary"])["hotspots"], list)
+        assert (tmp_path / f"{resp.headers['x-profile-id']}.json").exists()
+
+        resp = client.post(
+            "/api/simplify",
+            json=body,
+            headers={"X-Profile": "1", "Accept": FRAMES_MEDIA_TYPE},
+        )
+        assert "x-profile-id" in resp.headers
+
+    def test_simplify_frames_response(self, client):
+        resp = client.post(
+            "/api/simplify",
+            json={"midi_base64": "dGVzdA==", "difficulty": "beginner"},
+            headers={"Accept": FRAMES_MEDIA_TYPE},
+        )
+        assert resp.headers["content-type"] == FRAMES_MEDIA_TYPE
+        frames = decode_frames(resp.content)
+        metadata = json.loads(frames["metadata"])
+        assert metadata["score_format"] == "musicxml"
+        assert metadata["metadata"]["difficulty"] == "beginner"
+        assert frames["score"] == b"<score/>"
+        assert frames["midi"] == b"new"
+
+    def test_simplify_frames_response_mxl(self, client):
+        resp = client.post(
+            "/api/simplify",
+            params={"difficulty": "beginner", "score_format": "mxl"},
+            content=b"MThd-raw",
+            headers={"Content-Type": "audio/midi", "Accept": FRAMES_MEDIA_TYPE},
+        )
+        frames = decode_frames(resp.content)
+        assert from_mxl(frames["score"]) == "<score/>"
+
+
+class TestSimplifyRegionEndpoint:
+    def test_simplify_region_success(self, client, mock_simplify_usecase):
+        resp = client.post(
+            "/api/simplify-region",
+            json={
+                "midi_base64": "dGVzdA==",
+                "difficulty": "beginner",
+                "start_measure": 4,
+                "end_measure": 8,
+            },
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["start_measure"] == 4
+        assert data["end_measure"] == 8
+        assert data["mode"] == "fragment"
+        assert "musicxml" in data
+        mock_simplify_usecase.execute_region.assert_called_once()
+
+    def test_simplify_region_octet_stream_frames(self, client, mock_simplify_usecase):
+        resp = client.post(
+            "/api/simplify-region",
+            params={"difficulty": "beginner", "start_measure": 4, "end_measure": 8},
+            content=b"MThd-raw",
+            headers={"Content-Type": "application/octet-stream", "Accept": FRAMES_MEDIA_TYPE},
+        )
+        assert resp.status_code == 200
+        metadata = json.loads(decode_frames(resp.content)["metadata"])
+        assert (metadata["start_measure"], metadata["end_measure"]) == (4, 8)
+        assert metadata["mode"] == "fragment"
+        assert mock_simplify_usecase.execute_region.call_args.args[0] == b"MThd-raw"
+
+    def test_simplify_region_rejects_empty_range(self, client):
+        resp = client.post(
+            "/api/simplify-region",
+            json={
+                "midi_base64": "dGVzdA==",
+                "difficulty": "beginner",
+                "start_measure": 4,
+                "end_measure": 4,
+            },
+        )
+        assert resp.status_code == 422
+
+
+class TestScorePagesEndpoint:
+    def test_index(self, client, mock_score_pages_usecase):
+        resp = client.get("/api/scores/abc/index")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["result_id"] == "abc"
+        assert data["measure_count"] == 3
+        assert data["measure_offsets"] == [0.0, 2.0, 4.0]
+        mock_score_pages_usecase.index.assert_called_once_with("abc")
+
+    def test_index_not_found(self, client, mock_score_pages_usecase):
+        mock_score_pages_usecase.index.side_effect = ScoreNotFoundError()
+        resp = client.get("/api/scores/missing/index")
+        assert resp.status_code == 404
+
+    def test_measures(self, client, mock_score_pages_usecase):
+        resp = client.get("/api/scores/abc/measures", params={"start": 1, "end": 5})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/vnd.recordare.musicxml+xml")
+        assert resp.headers["x-measure-start"] == "1"
+        assert resp.headers["x-measure-end"] == "3"
+        assert resp.text == "<score-partwise/>"
+        mock_score_pages_usecase.page.assert_called_once_with("abc", 1, 5)
+
+    def test_measures_invalid_range(self, client, mock_score_pages_usecase):
+        mock_score_pages_usecase.page.side_effect = InvalidMeasureRangeError()
+        resp = client.get("/api/scores/abc/measures", params={"start": 9})
+        assert resp.status_code == 400
+
+    def test_measures_rejects_negative_start(self, client):
+        resp = client.get("/api/scores/abc/measures", params={"start": -1})
+        assert resp.status_code == 422
+
+    def test_midi(self, client, mock_score_pages_usecase):
+        mock_score_pages_usecase.midi.return_value = b"MThd-raw"
+        resp = client.get("/api/scores/abc/midi")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "audio/midi"
+        assert resp.content == b"MThd-raw"
+        mock_score_pages_usecase.midi.assert_called_once_with("abc")
+
+    def test_notes(self, client, mock_score_pages_usecase):
+        mock_score_pages_usecase.notes.return_value = MidiData(
+            notes=[NoteEvent(pitch=60, start=0.0, end=0.5, velocity=80)], tempo=90.0
+        )
+        resp = client.get("/api/scores/abc/notes")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == NOTE_PACK_MEDIA_TYPE
+        pack = unpack_notes(resp.content)
+        assert pack.pitches.tolist() == [60]
+        assert pack.tempo == 90.0
+
+    def test_notes_not_found(self, client, mock_score_pages_usecase):
+        mock_score_pages_usecase.notes.side_effect = ScoreNotFoundError()
+        resp = client.get("/api/scores/missing/notes")
+        assert resp.status_code == 404
+
+    def test_midi_not_found(self, client, mock_score_pages_usecase):
+        mock_score_pages_usecase.midi.side_effect = ScoreNotFoundError()
+        resp = client.get("/api/scores/missing/midi")
+        assert resp.status_code == 404
+
+    def test_simplify_returns_result_id(self, client, mock_simplify_usecase):
+        mock_simplify_usecase.execute.return_value.result_id = "abc"
+        resp = client.post(
+            "/api/simplify", json={"midi_base64": "dGVzdA==", "difficulty": "beginner"}
+        )
+        assert resp.json()["result_id"] == "abc"
+
+    def test_simplify_busy_returns_retry_after(self, client, mock_simplify_usecase):
+        mock_simplify_usecase.execute.side_effect = ServiceBusyError(retry_after=2.5)
+        resp = client.post(
+            "/api/simplify", json={"midi_base64": "dGVzdA==", "difficulty": "beginner"}
+        )
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "3"
+
+    def test_stats(self, client):
+        client.post("/api/simplify", json={"midi_base64": "dGVzdA==", "difficulty": "beginner"})
+        data = client.get("/api/stats").json()
+        assert data["cpu"]["workers"] == 2
+        assert data["cpu"]["completed"] == 1
+        assert "cache_hits" in data["pdf"]
+
+    def test_metrics(self, client):
+        client.post(
+            "/api/transcribe",
+            files={"file": ("test.wav", _wav(1), "audio/wav")},
+            data={"difficulty": "original"},
+        )
+        resp = client.get("/api/metrics")
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        lines = resp.text.splitlines()
+        assert any(
+            line.startswith(
+                'transcription_stage_seconds_count{endpoint="transcribe",stage="upload"}'
+            )
+            for line in lines
+        )
+        assert "cpu_executor_workers 2" in lines
+        assert "# TYPE cpu_executor_completed_total counter" in lines
+        assert "# TYPE pdf_engine_render_seconds_total counter" in lines
+        assert 'transcription_slots{state="in_use"} 0' in lines
+        assert any(line.startswith("process_resident_memory_bytes ") for line in lines)
+
+    def test_simplify_returns_artifact_urls(self, client):
+        resp = client.post(
+            "/api/simplify", json={"midi_base64": "dGVzdA==", "difficulty": "beginner"}
+        )
+        urls = resp.json()["artifact_urls"]
+        assert urls["musicxml"].endswith(".musicxml")
+        assert client.get(urls["musicxml"]).content == b"<score/>"
+        assert client.get(urls["mid"]).content == b"new"
+
+
+class TestExportPdfEndpoint:
+    def test_export_pdf(self, client, mock_export_pdf_usecase):
+        resp = client.post("/api/export-pdf", json={"midi_base64": "dGVzdA=="})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/pdf"
+        assert resp.content == b"%PDF-1.4"
+        mock_export_pdf_usecase.execute.assert_awaited_once_with("dGVzdA==", None)
+
+    def test_export_pdf_references_artifact(self, client):
+        resp = client.post("/api/export-pdf", json={"midi_base64": "dGVzdA=="})
+        location = resp.headers["content-location"]
+        assert location.startswith("/api/artifacts/") and location.endswith(".pdf")
+        artifact = client.get(location)
+        assert artifact.content == b"%PDF-1.4"
+        assert artifact.headers["etag"] == resp.headers["etag"]
+
+    def test_export_pdf_octet_stream(self, client, mock_export_pdf_usecase):
+        resp = client.post(
+            "/api/export-pdf",
+            content=b"MThd-raw",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        assert resp.content == b"%PDF-1.4"
+        mock_export_pdf_usecase.execute.assert_awaited_once_with(b"MThd-raw", None)
+
+    def test_export_pdf_by_result_id(self, client, mock_export_pdf_usecase):
+        resp = client.post("/api/export-pdf", json={"result_id": "abc"})
+        assert resp.status_code == 200
+        mock_export_pdf_usecase.execute.assert_awaited_once_with(None, "abc")
+
+    def test_export_pdf_expired_result_id(self, client, mock_export_pdf_usecase):
+        mock_export_pdf_usecase.execute.side_effect = ScoreNotFoundError()
+        resp = client.post("/api/export-pdf", json={"result_id": "old"})
+        assert resp.status_code == 404
+
+    def test_export_pdf_rejects_empty_body(self, client):
+        resp = client.post(
+            "/api/export-pdf", content=b"", headers={"Content-Type": "application/octet-stream"}
+        )
+        assert resp.status_code == 422
+
+    def test_export_pdf_busy(self, client, mock_export_pdf_usecase):
+        mock_export_pdf_usecase.execute.side_effect = ServiceBusyError()
+        resp = client.post("/api/export-pdf", json={"midi_base64": "dGVzdA=="})
+        assert resp.status_code == 503
+
+    def test_export_pdf_timeout(self, client, mock_export_pdf_usecase):
+        mock_export_pdf_usecase.execute.side_effect = PdfTimeoutError()
+        resp = client.post("/api/export-pdf", json={"midi_base64": "dGVzdA=="})
+        assert resp.status_code == 504
+
+    def test_export_pdf_invalid_midi(self, client, mock_export_pdf_usecase):
+        mock_export_pdf_usecase.execute.side_effect = InvalidMidiError()
+        resp = client.post("/api/export-pdf", json={"midi_base64": "!!"})
+        assert resp.status_code == 400
+
+
+class TestArtifactEndpoint:
+    @pytest.fixture
+    def pdf_name(self, artifact_store):
+        return artifact_store.put(b"%PDF-0123456789", "pdf")
+
+    def test_get_artifact(self, client, pdf_name):
+        resp = client.get(f"/api/artifacts/{pdf_name}")
+        assert resp.status_code == 200
+        assert resp.content == b"%PDF-0123456789"
+        assert resp.headers["content-type"] == "application/pdf"
+        assert resp.headers["etag"] == f'"{pdf_name.split(".")[0]}"'
+        assert "immutable" in resp.headers["cache-control"]
+        assert resp.headers["accept-ranges"] == "bytes"
+
+    def test_not_gzipped(self, client, artifact_store):
+        """gzip を受け付けるクライアントにも、保存された内容のまま返す（Range と一致させる）"""
+        data = b"<score-partwise>" + b"<measure/>" * 1000 + b"</score-partwise>"
+        name = artifact_store.put(data, "musicxml")
+        resp = client.get(f"/api/artifacts/{name}", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "identity"
+        assert resp.headers["content-length"] == str(len(data))
+        assert resp.content == data
+
+    def test_if_none_match(self, client, pdf_name):
+        etag = client.get(f"/api/artifacts/{pdf_name}").headers["etag"]
+        resp = client.get(f"/api/artifacts/{pdf_name}", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+    def test_range(self, client, pdf_name):
+        resp = client.get(f"/api/artifacts/{pdf_name}", headers={"Range": "bytes=5-8"})
+        assert resp.status_code == 206
+        assert resp.content == b"0123"
+        assert resp.headers["content-range"] == "bytes 5-8/15"
+
+    def test_range_ignored_when_if_range_differs(self, client, pdf_name):
+        resp = client.get(
+            f"/api/artifacts/{pdf_name}", headers={"Range": "bytes=5-8", "If-Range": '"other"'}
+        )
+        assert resp.status_code == 200
+        assert resp.content == b"%PDF-0123456789"
+
+    def test_range_not_satisfiable(self, client, pdf_name):
+        resp = client.get(f"/api/artifacts/{pdf_name}", headers={"Range": "bytes=100-"})
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == "bytes */15"
+
+    def test_missing_artifact(self, client):
+        resp = client.get(f"/api/artifacts/{'0' * 64}.pdf")
+        assert resp.status_code == 404
+
+    def test_invalid_name(self, client):
+        assert client.get("/api/artifacts/..%2Fsecret.pdf").status_code == 404
+        assert client.get("/api/artifacts/abc.exe").status_code == 404
@@ -0,0 +1,28 @@
+"""SSE イベントの分割書き出しのテスト"""
+
+import pytest
+
+from src.api.sse import sse_event, sse_event_chunks
+
+
+async def _collect(event: str, data: dict, chunk_size: int) -> list[str]:
+    return [chunk async for chunk in sse_event_chunks(event, data, chunk_size)]
+
+
+class TestSseEventChunks:
+    @pytest.mark.asyncio
+    async def test_small_event_matches_sse_event(self):
+        data = {"musicxml": "<score/>", "midi_base64": None, "metadata": {"tempo": 120.0}}
+        chunks = await _collect("complete", data, 1024)
+        assert "".join(chunks) == sse_event("complete", data)
+
+    @pytest.mark.asyncio
+    async def test_large_strings_are_split(self):
+        musicxml = '<note a="1">\n\t\\ 音符  </note>' * 500
+        data = {"musicxml": musicxml, "midi_base64": "QUJD" * 300, "result_id": None}
+        chunks = await _collect("complete", data, 256)
+        assert "".join(chunks) == sse_event("complete", data)
+        assert max(len(chunk) for chunk in chunks) <= 256 + len('"musicxml": "')
+        assert len(chunks) > 50
+        # data 行は1行のまま（改行はエスケープされる）
+        assert "".join(chunks).count("\n") == 3
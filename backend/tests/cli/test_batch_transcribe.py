@@ -0,0 +1,134 @@
+"""オフライン一括採譜 CLI のテスト（採譜はスタブ、プロセスプールは実物）"""
+
+import os
+import threading
+from functools import partial
+
+import pytest
+
+from src.cli.batch_transcribe import default_usecase, load_manifest, main, run_batch
+from src.core.config import settings
+from src.domain.entities import Difficulty, MidiData, NoteEvent
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+from src.infrastructure.smf_midi_processor import SmfMidiProcessor
+
+
+class _StubTranscriber:
+    """ファイル名に broken を含むものは失敗させる"""
+
+    async def transcribe(self, audio_path):
+        if "broken" in audio_path.name:
+            raise ValueError("壊れた音声")
+        notes = [NoteEvent(pitch=60 + i, start=i * 0.5, end=i * 0.5 + 0.5) for i in range(8)]
+        return MidiData(notes=notes, tempo=120.0), []
+
+
+def _stub_usecase():
+    from src.application.usecases.transcribe_music import TranscribeMusicUseCase
+
+    return TranscribeMusicUseCase(
+        transcriber=_StubTranscriber(),
+        midi_processor=SmfMidiProcessor(),
+        sheet_music_generator=DirectMusicXmlGenerator(score_builder=Music21Generator()),
+    )
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    root = tmp_path / "in"
+    (root / "set").mkdir(parents=True)
+    (root / "a.mp3").write_bytes(b"ID3a")
+    (root / "set" / "b.wav").write_bytes(b"RIFFb")
+    (root / "set" / "notes.txt").write_text("ignored")
+    return root
+
+
+def _run(input_dir, output_dir, difficulties=(Difficulty.ORIGINAL,), **kwargs):
+    return run_batch(
+        input_dir, output_dir, list(difficulties), usecase_factory=_stub_usecase, **kwargs
+    )
+
+
+class TestRunBatch:
+    def test_writes_scores_and_manifest(self, input_dir, tmp_path):
+        out = tmp_path / "out"
+        report = _run(input_dir, out, [Difficulty.ORIGINAL, Difficulty.BEGINNER], workers=2)
+
+        assert (report.processed, report.skipped, report.failed) == (2, 0, 0)
+        for stem in ("a", "set/b"):
+            for level in ("original", "beginner"):
+                assert (out / stem / f"{level}.musicxml").read_text().startswith("<?xml")
+                assert (out / stem / f"{level}.mid").read_bytes().startswith(b"MThd")
+        manifest = load_manifest(out / "manifest.jsonl")
+        assert set(manifest) == {"a.mp3", "set/b.wav"}
+        assert manifest["a.mp3"]["status"] == "done"
+        assert set(manifest["a.mp3"]["timings"]) == {"prepare", "render", "write"}
+        assert report.audio_seconds > 0
+
+    def test_resumes_from_manifest(self, input_dir, tmp_path):
+        out = tmp_path / "out"
+        _run(input_dir, out)
+
+        assert _run(input_dir, out).skipped == 2
+        # 内容が変わったファイルと、新しい難易度を求められたファイルはやり直す
+        changed = input_dir / "a.mp3"
+        changed.write_bytes(b"ID3changed")
+        os.utime(changed, ns=(0, 0))
+        report = _run(input_dir, out)
+        assert (report.processed, report.skipped) == (1, 1)
+        report = _run(input_dir, out, [Difficulty.ORIGINAL, Difficulty.BEGINNER])
+        assert report.processed == 2
+
+    def test_records_failures(self, input_dir, tmp_path):
+        (input_dir / "broken.mp3").write_bytes(b"ID3x")
+        out = tmp_path / "out"
+        report = _run(input_dir, out)
+
+        assert (report.processed, report.failed) == (2, 1)
+        entry = load_manifest(out / "manifest.jsonl")["broken.mp3"]
+        assert entry["status"] == "failed"
+        assert "壊れた音声" in entry["error"]
+        # 失敗は既定では飛ばし、retry_failed でやり直す
+        assert _run(input_dir, out).skipped == 3
+        assert _run(input_dir, out, retry_failed=True).failed == 1
+
+    def test_ignores_truncated_manifest_line(self, input_dir, tmp_path):
+        out = tmp_path / "out"
+        _run(input_dir, out)
+        with open(out / "manifest.jsonl", "a") as f:
+            f.write('{"file": "a.mp3", "sta')
+        assert _run(input_dir, out).skipped == 2
+
+    @pytest.mark.parametrize("engine", ["direct", "music21", "music21-parallel"])
+    def test_default_wiring_finishes(self, input_dir, tmp_path, monkeypatch, engine):
+        """既定の組み立て（採譜だけスタブ）でも、ワーカーが入れ子のプールを残さず終わる"""
+        monkeypatch.setattr(settings, "sheet_music_engine", engine)
+        assert settings.cpu_executor_backend == "process"
+        out = tmp_path / "out"
+        factory = partial(default_usecase, transcriber=_StubTranscriber())
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.update(
+                report=run_batch(input_dir, out, [Difficulty.ORIGINAL], 2, usecase_factory=factory)
+            ),
+            daemon=True,
+        )
+        thread.start()
+        thread.join(timeout=120)
+
+        assert not thread.is_alive()
+        assert result["report"].processed == 2
+        assert (out / "a" / "original.musicxml").read_text().startswith("<?xml")
+
+
+class TestMain:
+    def test_rejects_unknown_difficulty(self, input_dir, tmp_path):
+        with pytest.raises(SystemExit):
+            main([str(input_dir), str(tmp_path / "out"), "--difficulties", "expert"])
+
+    def test_report_format(self, input_dir, tmp_path):
+        report = _run(input_dir, tmp_path / "out")
+        text = report.format()
+        assert "処理: 2 件" in text
+        assert "prepare" in text and "render" in text and "write" in text
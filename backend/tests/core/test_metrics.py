@@ -0,0 +1,79 @@
+"""処理段階の計測のテスト"""
+
+import asyncio
+
+import pytest
+
+from src.core import metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    metrics.registry.clear()
+    yield
+    metrics.registry.clear()
+
+
+def _series(name: str) -> dict:
+    return metrics.registry.histograms[name].snapshot()
+
+
+class TestMetrics:
+    def test_stage_records_with_labels(self):
+        with metrics.labels(endpoint="simplify"):
+            with metrics.labels(difficulty="beginner"), metrics.stage("simplify"):
+                pass
+            with metrics.stage("decode"):
+                pass
+        series = _series(metrics.STAGE_SECONDS)
+        assert set(series) == {
+            (("difficulty", "beginner"), ("endpoint", "simplify"), ("stage", "simplify")),
+            (("endpoint", "simplify"), ("stage", "decode")),
+        }
+
+    def test_stage_records_on_error(self):
+        with pytest.raises(ValueError), metrics.stage("inference"):
+            raise ValueError
+        [series] = _series(metrics.STAGE_SECONDS).values()
+        assert series[-1] == 1
+
+    @pytest.mark.asyncio
+    async def test_labels_follow_worker_threads(self):
+        with metrics.labels(endpoint="transcribe"):
+            await asyncio.to_thread(metrics.observe, metrics.NOTES, 120)
+        assert set(_series(metrics.NOTES)) == {(("endpoint", "transcribe"),)}
+
+    def test_capture_and_replay(self):
+        with metrics.capture() as records:
+            metrics.observe(metrics.PAYLOAD_BYTES, 2048, kind="musicxml")
+        assert _series(metrics.PAYLOAD_BYTES) == {}
+
+        with metrics.labels(endpoint="simplify"):
+            metrics.replay(records)
+        assert set(_series(metrics.PAYLOAD_BYTES)) == {
+            (("endpoint", "simplify"), ("kind", "musicxml"))
+        }
+
+    def test_render_cumulative_buckets(self):
+        for value in (0.003, 0.2, 500):
+            metrics.observe(metrics.STAGE_SECONDS, value, stage='a"b')
+        lines = metrics.registry.render().splitlines()
+        assert "# TYPE transcription_stage_seconds histogram" in lines
+        assert 'transcription_stage_seconds_bucket{stage="a\\"b",le="0.005"} 1' in lines
+        assert 'transcription_stage_seconds_bucket{stage="a\\"b",le="0.25"} 2' in lines
+        assert 'transcription_stage_seconds_bucket{stage="a\\"b",le="120"} 2' in lines
+        assert 'transcription_stage_seconds_bucket{stage="a\\"b",le="+Inf"} 3' in lines
+        assert 'transcription_stage_seconds_count{stage="a\\"b"} 3' in lines
+        assert 'transcription_stage_seconds_sum{stage="a\\"b"} 500.203' in lines
+
+    def test_render_gauges(self):
+        text = metrics.render_gauges("queue", "待ち", [({"pool": "cpu"}, 2), ({}, 0.5)])
+        assert text.splitlines() == [
+            "# HELP queue 待ち",
+            "# TYPE queue gauge",
+            'queue{pool="cpu"} 2',
+            "queue 0.5",
+        ]
+
+    def test_process_rss_bytes(self):
+        assert metrics.process_rss_bytes() > 0
@@ -0,0 +1,58 @@
+"""要求ごとのプロファイルのテスト"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.core import metrics, profiling
+
+
+def _work(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def _functions(profile: profiling.RequestProfile) -> set[str]:
+    return {row["function"] for row in profile.summary(top=1000)["hotspots"]}
+
+
+class TestProfiling:
+    def test_no_op_outside_request(self):
+        assert profiling.current() is None
+        with profiling.profile_thread():
+            _work(10)
+
+    def test_records_thread_calls(self):
+        with profiling.profile_request() as profile:
+            assert profiling.current() is profile
+            with profiling.profile_thread(), profiling.profile_thread():  # 入れ子は外側だけ
+                _work(1000)
+        assert profiling.current() is None
+        assert any(name.endswith("(_work)") for name in _functions(profile))
+
+    @pytest.mark.asyncio
+    async def test_records_worker_thread_and_stages(self):
+        with profiling.profile_request() as profile:
+            with metrics.stage("simplify"):
+                await asyncio.to_thread(profiling.call, _work, 1000)
+            await asyncio.to_thread(profiling.call, _work, 1000)
+        summary = profile.summary()
+        assert summary["stages"]["simplify"]["count"] == 1
+        assert summary["stages"]["simplify"]["seconds"] > 0
+        [work] = [row for row in summary["hotspots"] if row["function"].endswith("(_work)")]
+        assert work["calls"] == 2
+
+    def test_collect_returns_stats(self):
+        with profiling.collect() as stats:
+            _work(1000)
+        with profiling.profile_request() as profile:
+            profile.add_stats(stats)
+        assert any(name.endswith("(_work)") for name in _functions(profile))
+
+    def test_dump(self, tmp_path):
+        with profiling.profile_request() as profile, profiling.profile_thread():
+            _work(1000)
+        path = profile.dump(tmp_path / "profiles", top=5)
+        assert path == tmp_path / "profiles" / f"{profile.id}.json"
+        assert len(json.loads(path.read_text())["hotspots"]) <= 5
+        assert (tmp_path / "profiles" / f"{profile.id}.prof").exists()
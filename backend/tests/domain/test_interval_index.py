@@ -0,0 +1,82 @@
+"""ノート区間インデックスのテスト"""
+
+import random
+
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.interval_index import NoteIntervalIndex
+
+
+def _random_notes(count: int, seed: int = 0) -> list[NoteEvent]:
+    rng = random.Random(seed)
+    notes = []
+    for _ in range(count):
+        start = rng.randint(0, 200) * 0.125
+        length = rng.randint(0, 16) * 0.125
+        notes.append(NoteEvent(pitch=rng.randint(21, 108), start=start, end=start + length))
+    return notes
+
+
+class TestNoteIntervalIndex:
+    def test_active_at_half_open(self):
+        index = NoteIntervalIndex([NoteEvent(pitch=60, start=1.0, end=2.0)])
+        assert len(index.active_at(1.0)) == 1
+        assert len(index.active_at(1.5)) == 1
+        assert index.active_at(2.0) == []
+        assert index.active_at(0.99) == []
+
+    def test_overlapping_excludes_touching(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=1.0),
+            NoteEvent(pitch=62, start=1.0, end=2.0),
+            NoteEvent(pitch=64, start=2.0, end=3.0),
+        ]
+        index = NoteIntervalIndex(notes)
+        assert [n.pitch for n in index.overlapping(1.0, 2.0)] == [62]
+        assert [n.pitch for n in index.overlapping(0.5, 2.5)] == [60, 62, 64]
+        assert index.overlapping(2.0, 2.0) == []
+
+    def test_starting_in(self):
+        notes = [NoteEvent(pitch=60, start=t * 0.5, end=t * 0.5 + 2.0) for t in range(8)]
+        index = NoteIntervalIndex(notes)
+        assert [n.start for n in index.starting_in(1.0, 2.0)] == [1.0, 1.5]
+
+    def test_matches_linear_scan(self):
+        notes = _random_notes(500)
+        index = NoteIntervalIndex(notes)
+        for t in [x * 0.0625 for x in range(0, 460, 7)]:
+            expected = sorted(
+                (n for n in notes if n.start <= t < n.end), key=lambda n: (n.start, n.pitch)
+            )
+            assert sorted(index.active_at(t), key=lambda n: (n.start, n.pitch)) == expected
+
+            t1 = t + 1.3
+            expected = [n for n in notes if n.start < t1 and n.end > t]
+            assert sorted(index.overlapping(t, t1), key=lambda n: (n.start, n.pitch)) == sorted(
+                expected, key=lambda n: (n.start, n.pitch)
+            )
+
+    def test_results_in_start_order(self):
+        index = NoteIntervalIndex(_random_notes(200, seed=3))
+        result = index.overlapping(5.0, 9.0)
+        assert [n.start for n in result] == sorted(n.start for n in result)
+
+    def test_empty(self):
+        index = NoteIntervalIndex([])
+        assert index.active_at(0.0) == []
+        assert index.overlapping(0.0, 10.0) == []
+
+
+class TestMidiDataIndex:
+    def test_lazy_and_cached(self):
+        midi = MidiData(notes=_random_notes(50))
+        assert midi._note_index is None
+        index = midi.note_index
+        assert midi.note_index is index
+
+    def test_rebuilt_after_notes_change(self):
+        midi = MidiData(notes=[NoteEvent(pitch=60, start=0.0, end=1.0)])
+        assert len(midi.notes_active_at(0.5)) == 1
+        midi.notes.append(NoteEvent(pitch=64, start=0.0, end=1.0))
+        assert len(midi.notes_active_at(0.5)) == 2
+        midi.notes = []
+        assert midi.notes_overlapping(0.0, 1.0) == []
@@ -0,0 +1,112 @@
+"""記譜レイアウトのテスト"""
+
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.notation import (
+    Clef,
+    layout_measure_count,
+    layout_score,
+    measure_length_steps,
+    split_duration,
+)
+
+
+def _make_midi(notes: list[NoteEvent], numerator: int = 4, denominator: int = 4) -> MidiData:
+    # 120BPM → 16分音符 = 0.125s、4/4 の1小節 = 2.0s
+    return MidiData(
+        notes=notes,
+        tempo=120.0,
+        time_signature_numerator=numerator,
+        time_signature_denominator=denominator,
+    )
+
+
+def _voice_length(events) -> int:
+    return sum(e.duration for e in events)
+
+
+class TestDurations:
+    def test_measure_length(self):
+        assert measure_length_steps(4, 4) == 16
+        assert measure_length_steps(3, 4) == 12
+        assert measure_length_steps(6, 8) == 12
+
+    def test_split_duration(self):
+        assert split_duration(4) == [4]
+        assert split_duration(5) == [4, 1]
+        assert split_duration(11) == [8, 3]
+
+
+class TestLayoutScore:
+    def test_hand_split_and_clefs(self):
+        notes = [
+            NoteEvent(pitch=72, start=0.0, end=0.5),
+            NoteEvent(pitch=48, start=0.0, end=0.5),
+        ]
+        layout = layout_score(_make_midi(notes))
+        right, left = layout.staves
+        assert right.clef == Clef.TREBLE and left.clef == Clef.BASS
+        assert right.measures[0].voices[0][0].pitches == (72,)
+        assert left.measures[0].voices[0][0].pitches == (48,)
+
+    def test_chord_grouping(self):
+        notes = [NoteEvent(pitch=p, start=0.0, end=0.5) for p in (67, 60, 64)]
+        layout = layout_score(_make_midi(notes))
+        first = layout.staves[0].measures[0].voices[0][0]
+        assert first.pitches == (60, 64, 67)
+
+    def test_tie_across_barline(self):
+        notes = [NoteEvent(pitch=60, start=1.5, end=2.5)]  # 3拍目裏〜次小節1拍目
+        layout = layout_score(_make_midi(notes))
+        m1, m2 = layout.staves[0].measures
+        last = m1.voices[0][-1]
+        first = m2.voices[0][0]
+        assert last.pitches == (60,) and last.tie_start and not last.tie_stop
+        assert first.pitches == (60,) and first.tie_stop and not first.tie_start
+
+    def test_rests_fill_measures(self):
+        notes = [NoteEvent(pitch=60, start=0.5, end=0.75)]
+        layout = layout_score(_make_midi(notes, 3, 4))
+        for staff in layout.staves:
+            for measure in staff.measures:
+                for voice in measure.voices:
+                    assert _voice_length(voice) == 12
+
+    def test_overlapping_notes_use_second_voice(self):
+        notes = [
+            NoteEvent(pitch=72, start=0.0, end=2.0),
+            NoteEvent(pitch=76, start=0.0, end=0.5),
+        ]
+        measure = layout_score(_make_midi(notes)).staves[0].measures[0]
+        assert len(measure.voices) == 2
+        assert all(_voice_length(v) == 16 for v in measure.voices)
+
+    def test_second_voice_only_where_needed(self):
+        notes = [
+            NoteEvent(pitch=72, start=0.0, end=0.5),
+            NoteEvent(pitch=76, start=0.0, end=0.25),
+            NoteEvent(pitch=72, start=2.0, end=2.5),
+        ]
+        m1, m2 = layout_score(_make_midi(notes)).staves[0].measures
+        assert len(m1.voices) == 2
+        assert len(m2.voices) == 1
+
+    def test_both_staves_have_same_measure_count(self):
+        notes = [NoteEvent(pitch=72, start=0.0, end=7.0)]
+        layout = layout_score(_make_midi(notes))
+        assert layout.measure_count == 4
+        assert len(layout.staves[1].measures) == 4
+
+    def test_window_marks_cut_notes_as_tied(self):
+        notes = [NoteEvent(pitch=60, start=1.0, end=5.0)]  # 小節 0〜2 にまたがる
+        layout = layout_score(_make_midi(notes), start_measure=1, end_measure=2)
+        assert layout.start_measure == 1
+        (measure,) = layout.staves[0].measures
+        assert measure.number == 2
+        (event,) = measure.voices[0]
+        assert event.duration == 16 and event.tie_stop and event.tie_start
+
+    def test_layout_measure_count_matches_full_layout(self):
+        notes = [NoteEvent(pitch=72, start=0.0, end=7.0), NoteEvent(pitch=48, start=8.0, end=8.1)]
+        midi = _make_midi(notes)
+        assert layout_measure_count(midi) == layout_score(midi).measure_count == 5
+        assert layout_measure_count(_make_midi([])) == 1
@@ -0,0 +1,76 @@
+"""ピアノロール（16分音符グリッド）のテスト"""
+
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.piano_roll import PianoRoll
+from src.domain.simplification import _limit_polyphony
+
+
+class TestPianoRoll:
+    def test_step_conversion(self):
+        roll = PianoRoll.for_tempo(120.0)  # 16分 = 0.125s
+        assert roll.step_of(0.5) == 4
+        assert roll.time_of(4) == 0.5
+
+    def test_active_queries(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5),  # ステップ 0-3
+            NoteEvent(pitch=72, start=0.25, end=1.0),  # ステップ 2-7
+        ]
+        roll = PianoRoll.from_midi(MidiData(notes=notes, tempo=120.0))
+        assert roll.active_pitches(0) == [60]
+        assert roll.active_pitches(2) == [60, 72]
+        assert roll.active_count(3) == 2
+        assert roll.active_count(4) == 1  # 終了は半開区間
+        assert roll.highest_pitch(2) == 72
+        assert roll.lowest_pitch(2) == 60
+        assert roll.is_active(72, 7)
+        assert not roll.is_active(72, 8)
+
+    def test_out_of_range_is_silent(self):
+        roll = PianoRoll.for_tempo(120.0)
+        assert roll.active_count(100) == 0
+        assert roll.active_pitches(-1) == []
+        assert roll.highest_pitch(5) is None
+
+    def test_counts_overlapping_same_pitch(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5),
+            NoteEvent(pitch=60, start=0.0, end=0.25),
+        ]
+        roll = PianoRoll.from_midi(MidiData(notes=notes, tempo=120.0))
+        assert roll.active_count(0) == 2
+        assert roll.active_pitches(0) == [60]
+        assert roll.max_polyphony() == 2
+
+    def test_zero_length_note_occupies_one_step(self):
+        roll = PianoRoll.for_tempo(120.0)
+        roll.add_note(NoteEvent(pitch=64, start=0.5, end=0.5))
+        assert roll.active_count(4) == 1
+
+    def test_grows_on_demand(self):
+        roll = PianoRoll.for_tempo(120.0, num_steps=1)
+        roll.add(50, 1000, 1004)
+        assert roll.num_steps == 1004
+        assert roll.is_active(50, 1003)
+
+    def test_memory_for_long_piece(self):
+        """30分・120BPMでも 1MB 未満"""
+        steps = 30 * 60 * 8
+        roll = PianoRoll.for_tempo(120.0, num_steps=steps)
+        assert roll.nbytes < 1024 * 1024
+
+
+class TestLimitPolyphonyWithRoll:
+    def test_keeps_highest_notes(self):
+        notes = [NoteEvent(pitch=60 + i, start=0.0, end=1.0) for i in range(6)]
+        result = _limit_polyphony(notes, max_voices=4, tempo=120.0)
+        assert sorted(n.pitch for n in result) == [62, 63, 64, 65]
+
+    def test_released_voice_is_reusable(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5),
+            NoteEvent(pitch=64, start=0.0, end=1.0),
+            NoteEvent(pitch=67, start=0.5, end=1.0),  # 60 が離鍵済みなので採用
+        ]
+        result = _limit_polyphony(notes, max_voices=2, tempo=120.0)
+        assert len(result) == 3
@@ -0,0 +1,85 @@
+"""小節範囲の切り出し・差し戻しのテスト"""
+
+import pytest
+
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.region import (
+    extract_region,
+    measure_count,
+    measure_duration,
+    measure_window,
+    splice_region,
+)
+
+
+def _make_midi(notes: list[NoteEvent]) -> MidiData:
+    # 120BPM・4/4 → 1小節 = 2.0s
+    return MidiData(notes=notes, tempo=120.0)
+
+
+class TestMeasures:
+    def test_measure_duration(self):
+        assert measure_duration(_make_midi([])) == 2.0
+        midi = MidiData(tempo=120.0, time_signature_numerator=6, time_signature_denominator=8)
+        assert measure_duration(midi) == 1.5
+
+    def test_measure_count(self):
+        assert measure_count(_make_midi([])) == 1
+        assert measure_count(_make_midi([NoteEvent(pitch=60, start=0.0, end=4.0)])) == 2
+        assert measure_count(_make_midi([NoteEvent(pitch=60, start=0.0, end=4.5)])) == 3
+
+    def test_measure_window(self):
+        assert measure_window(_make_midi([]), 1, 3) == (2.0, 6.0)
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            measure_window(_make_midi([]), 3, 3)
+
+
+class TestExtractRegion:
+    def test_shifts_and_clips(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=1.0),  # 範囲外
+            NoteEvent(pitch=62, start=1.5, end=2.5),  # 開始境界をまたぐ
+            NoteEvent(pitch=64, start=3.0, end=5.0),  # 終了境界をまたぐ
+        ]
+        region = extract_region(_make_midi(notes), 2.0, 4.0)
+        assert [(n.pitch, n.start, n.end) for n in region.notes] == [
+            (62, 0.0, 0.5),
+            (64, 1.0, 2.0),
+        ]
+        assert region.tempo == 120.0
+
+
+class TestSpliceRegion:
+    def test_identity_splice_restores_notes(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=1.0),
+            NoteEvent(pitch=62, start=1.5, end=2.5),
+            NoteEvent(pitch=64, start=3.0, end=5.0),
+            NoteEvent(pitch=67, start=1.0, end=7.0),  # 範囲全体をまたぐ
+        ]
+        midi = _make_midi(notes)
+        spliced = splice_region(midi, 2.0, 4.0, extract_region(midi, 2.0, 4.0))
+        assert sorted((n.pitch, n.start, n.end) for n in spliced.notes) == sorted(
+            (n.pitch, n.start, n.end) for n in notes
+        )
+
+    def test_replaces_region(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=1.0),
+            NoteEvent(pitch=62, start=2.0, end=3.0),
+            NoteEvent(pitch=64, start=4.0, end=5.0),
+        ]
+        fragment = _make_midi([NoteEvent(pitch=72, start=0.5, end=1.0)])
+        spliced = splice_region(_make_midi(notes), 2.0, 4.0, fragment)
+        assert [(n.pitch, n.start, n.end) for n in spliced.notes] == [
+            (60, 0.0, 1.0),
+            (72, 2.5, 3.0),
+            (64, 4.0, 5.0),
+        ]
+
+    def test_keeps_outside_part_of_removed_crossing_note(self):
+        notes = [NoteEvent(pitch=60, start=1.0, end=3.0)]
+        spliced = splice_region(_make_midi(notes), 2.0, 4.0, _make_midi([]))
+        assert [(n.pitch, n.start, n.end) for n in spliced.notes] == [(60, 1.0, 2.0)]
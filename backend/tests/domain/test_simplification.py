@@ -90,6 +90,24 @@ class TestSimplifyBeginner:
         assert 72 in pitches  # melody
         assert 48 in pitches  # bass
 
+    def test_groups_chords_by_sixteenth_step(self):
+        """同じ16分音符ステップで始まるノートを和音とみなし、次のステップとは分ける"""
+        sixteenth = 60.0 / 120.0 / 4.0
+        notes = [
+            NoteEvent(pitch=48, start=0.0, end=0.5),
+            NoteEvent(pitch=60, start=0.0, end=0.5),
+            NoteEvent(pitch=72, start=0.0, end=0.5),
+            NoteEvent(pitch=67, start=sixteenth, end=0.5),
+            NoteEvent(pitch=64, start=sixteenth, end=0.5),
+        ]
+        result = simplify_beginner(_make_midi(notes))
+        assert [(n.pitch, n.start) for n in result.notes] == [
+            (72, 0.0),
+            (48, 0.0),
+            (67, sixteenth),
+            (64, sixteenth),
+        ]
+
 
 class TestSimplifyDispatcher:
     def test_original_returns_unchanged(self):
@@ -0,0 +1,87 @@
+"""テンポ推定・拍グリッド量子化のテスト"""
+
+import random
+
+import numpy as np
+
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.tempo import (
+    BeatGrid,
+    align_to_beat_grid,
+    estimate_tempo,
+)
+from src.domain.transcription import quantize_to_sixteenth
+
+
+def _performed_onsets(tempo: float, count: int, offset: float = 0.0, seed: int = 0) -> np.ndarray:
+    """16分音符単位のランダムなリズムを揺らぎ付きで演奏した onset 列"""
+    rng = np.random.default_rng(seed)
+    steps = np.cumsum(rng.choice([1, 2, 2, 4, 4, 8], size=count))
+    return offset + steps * (15.0 / tempo) + rng.normal(0.0, 0.01, count)
+
+
+class TestEstimateTempo:
+    def test_recovers_tempo(self):
+        for tempo in (90.0, 100.0, 128.0, 150.0):
+            estimated = estimate_tempo(_performed_onsets(tempo, 800))
+            assert abs(estimated - tempo) < 0.05
+
+    def test_folds_into_preferred_octave(self):
+        estimated = estimate_tempo(_performed_onsets(70.0, 800))
+        assert abs(estimated - 140.0) < 0.1
+
+    def test_fast_tempo_keeps_sixteenth_grid(self):
+        """MAX_BPM を超える曲は、半分に折り返した値の裏拍で打ち消し合わず元のテンポになる"""
+        for tempo in (165.0, 175.0, 190.0):
+            for seed in range(3):
+                estimated = estimate_tempo(_performed_onsets(tempo, 800, seed=seed))
+                assert abs(estimated - tempo) < 0.05
+
+    def test_long_piece_has_no_drift(self):
+        """長い曲でも最後の onset までグリッドがずれない"""
+        tempo = 97.0
+        onsets = _performed_onsets(tempo, 10000, seed=2)
+        estimated = estimate_tempo(onsets)
+        drift = abs(onsets[-1] * (estimated - tempo) / tempo)
+        assert drift < 15.0 / tempo / 2
+
+    def test_too_few_onsets_returns_default(self):
+        assert estimate_tempo([0.0, 0.5, 1.0], default=111.0) == 111.0
+
+
+class TestBeatGrid:
+    def test_uniform_sixteenths(self):
+        grid = BeatGrid.uniform(120.0, 1.0)
+        np.testing.assert_allclose(grid.sixteenth_times[:5], [0.0, 0.125, 0.25, 0.375, 0.5])
+
+    def test_sixteenth_times_computed_once(self):
+        grid = BeatGrid.uniform(120.0, 1.0)
+        assert grid.sixteenth_times is grid.sixteenth_times
+
+    def test_quantize_matches_scalar_quantizer(self):
+        rng = random.Random(0)
+        times = [rng.uniform(0.0, 30.0) for _ in range(2000)]
+        for tempo in (120.0, 97.0):
+            grid = BeatGrid.uniform(tempo, 30.0)
+            expected = [quantize_to_sixteenth(t, tempo) for t in times]
+            np.testing.assert_allclose(grid.quantize(times), expected, atol=1e-9)
+
+    def test_next_step(self):
+        grid = BeatGrid.uniform(120.0, 1.0)
+        np.testing.assert_allclose(grid.next_step([0.0, 0.125]), [0.125, 0.25])
+
+
+class TestAlignToBeatGrid:
+    def test_sets_tempo_and_aligns_onsets(self):
+        onsets = _performed_onsets(100.0, 400, offset=0.07)
+        notes = [NoteEvent(pitch=60, start=t, end=t + 0.2) for t in onsets]
+        aligned = align_to_beat_grid(MidiData(notes=notes))
+        assert abs(aligned.tempo - 100.0) < 0.05
+
+        sixteenth = 15.0 / aligned.tempo
+        position = np.array([n.start for n in aligned.notes]) / sixteenth
+        assert np.median(np.abs(position - np.rint(position))) < 0.1
+
+    def test_few_notes_unchanged(self):
+        midi = MidiData(notes=[NoteEvent(pitch=60, start=0.0, end=0.5)], tempo=120.0)
+        assert align_to_beat_grid(midi) is midi
@@ -0,0 +1,60 @@
+"""音声ファイルの長さの見積もりのテスト"""
+
+import io
+import struct
+
+import pytest
+
+from src.infrastructure.audio_duration import estimate_audio_seconds
+
+
+def _estimate(content: bytes) -> float:
+    file = io.BytesIO(content)
+    seconds = estimate_audio_seconds(file, len(content))
+    assert file.tell() == 0
+    return seconds
+
+
+def _wav(data_bytes: int, byte_rate: int = 1000, extra_chunk: bytes = b"") -> bytes:
+    fmt = struct.pack("<HHIIHH", 1, 1, byte_rate, byte_rate, 1, 8)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra_chunk
+    body += b"data" + struct.pack("<I", data_bytes) + b"\x00" * data_bytes
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+# MPEG1 Layer III・128kbps・44.1kHz・ステレオのフレームヘッダ
+_MP3_HEADER = b"\xff\xfb\x90\x00"
+
+
+class TestEstimateAudioSeconds:
+    def test_wav(self):
+        assert _estimate(_wav(3000)) == 3.0
+
+    def test_wav_skips_other_chunks(self):
+        # 奇数長のチャンクは1バイトの詰め物が続く
+        extra = b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+        assert _estimate(_wav(2000, extra_chunk=extra)) == 2.0
+
+    def test_wav_with_oversized_data_length(self):
+        content = bytearray(_wav(1000))
+        data_at = content.index(b"data")
+        content[data_at + 4 : data_at + 8] = struct.pack("<I", 0xFFFFFFFF)
+        assert _estimate(bytes(content)) == 1.0
+
+    def test_mp3_constant_bitrate(self):
+        content = _MP3_HEADER + b"\x00" * (16000 - 4)
+        assert _estimate(content) == pytest.approx(1.0)
+
+    def test_mp3_skips_id3_tag(self):
+        tag = b"ID3\x03\x00\x00" + bytes([0, 0, 1, 0]) + b"\xff" * 128
+        content = tag + _MP3_HEADER + b"\x00" * (32000 - 4)
+        assert _estimate(content) == pytest.approx(2.0)
+
+    def test_mp3_xing_frame_count(self):
+        # ステレオの MPEG1 はサイド情報 32 バイトの後に Xing ヘッダ
+        xing = b"Xing" + struct.pack(">II", 0x01, 1000)
+        content = _MP3_HEADER + b"\x00" * 32 + xing + b"\x00" * 400
+        assert _estimate(content) == pytest.approx(1000 * 1152 / 44100)
+
+    def test_fallback_assumes_128kbps(self):
+        assert _estimate(b"\x00" * 32000) == pytest.approx(2.0)
@@ -0,0 +1,78 @@
+"""処理コストによる割り当てのテスト"""
+
+import pytest
+
+from src.core.exceptions import QuotaExceededError
+from src.infrastructure.cost_quota import CostQuota
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def quota(clock):
+    return CostQuota(capacity_seconds=10, refill_per_second=1, initial_ratio=0.5, clock=clock)
+
+
+class TestCostQuota:
+    def test_reserve_deducts_estimate(self, quota):
+        reservation = quota.reserve("a", 8)
+        assert reservation.cost == 4
+        assert quota.balance("a") == 6
+        assert quota.balance("b") == 10
+
+    def test_rejects_with_retry_after(self, quota):
+        quota.reserve("a", 16)
+        with pytest.raises(QuotaExceededError) as exc_info:
+            quota.reserve("a", 6)
+        assert exc_info.value.code == "QUOTA_EXCEEDED"
+        assert exc_info.value.retry_after == 1
+
+    def test_refills_up_to_capacity(self, quota, clock):
+        quota.reserve("a", 20)
+        clock.now = 4
+        assert quota.balance("a") == 4
+        clock.now = 100
+        assert quota.balance("a") == 10
+
+    def test_admits_cost_above_capacity_when_full(self, quota, clock):
+        quota.reserve("a", 40)
+        assert quota.balance("a") == -10
+        with pytest.raises(QuotaExceededError) as exc_info:
+            quota.reserve("a", 40)
+        assert exc_info.value.retry_after == 20
+
+    def test_settle_refunds_and_charges_difference(self, quota):
+        quota.reserve("a", 8).settle(0)
+        assert quota.balance("a") == 10
+        assert quota.ratio == 0.5
+
+        reservation = quota.reserve("a", 8)
+        reservation.settle(7)
+        reservation.settle(7)  # 2回目は何もしない
+        assert quota.balance("a") == 3
+
+    def test_settle_updates_ratio(self, quota):
+        quota.reserve("a", 10).settle(10)
+        assert quota.ratio == pytest.approx(0.6)
+        # 失敗した処理の時間は差し引くが、比率には使わない
+        quota.reserve("b", 10).settle(10, completed=False)
+        assert quota.ratio == pytest.approx(0.6)
+        assert quota.balance("b") == 0
+
+    def test_forgets_least_recently_used_clients(self, clock):
+        quota = CostQuota(capacity_seconds=10, refill_per_second=1, max_clients=2, clock=clock)
+        quota.reserve("a", 30)
+        quota.reserve("b", 30)
+        quota.reserve("c", 30)
+        assert quota.balance("a") == 10
@@ -0,0 +1,89 @@
+"""CPU バウンド処理の実行枠のテスト"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.core.exceptions import ServiceBusyError
+from src.infrastructure.cpu_executor import CpuExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = CpuExecutor(max_workers=1, max_queue=1)
+    yield executor
+    executor.shutdown()
+
+
+def _blocking(release: threading.Event) -> str:
+    release.wait(5)
+    return threading.current_thread().name
+
+
+class TestCpuExecutor:
+    @pytest.mark.asyncio
+    async def test_runs_on_dedicated_thread(self, executor):
+        name = await executor.run(lambda: threading.current_thread().name)
+        assert name.startswith("cpu-executor")
+        stats = executor.stats()
+        assert (stats.completed, stats.running, stats.queued) == (1, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self, executor):
+        release = threading.Event()
+        running = asyncio.create_task(executor.run(_blocking, release))
+        queued = asyncio.create_task(executor.run(_blocking, release))
+        await asyncio.sleep(0.01)
+        assert (executor.stats().running, executor.stats().queued) == (1, 1)
+
+        with pytest.raises(ServiceBusyError) as exc_info:
+            await executor.run(_blocking, release)
+        assert exc_info.value.retry_after >= 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        stats = executor.stats()
+        assert (stats.completed, stats.rejected) == (2, 1)
+        assert stats.wait_seconds_total > 0
+
+    @pytest.mark.asyncio
+    async def test_counts_failures(self, executor):
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        assert executor.stats().failed == 1
+
+    @pytest.mark.asyncio
+    async def test_keeps_slot_until_cancelled_work_finishes(self, executor):
+        release = threading.Event()
+        task = asyncio.create_task(executor.run(_blocking, release))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.sleep(0.01)
+        # 要求元は切断しても、スレッドの処理が終わるまで実行枠は空かない
+        assert executor.stats().running == 1
+
+        release.set()
+        assert await executor.run(lambda: "next") == "next"
+        assert executor.stats().running == 0
+
+    def test_utilization(self):
+        now = [0.0]
+        executor = CpuExecutor(max_workers=2, clock=lambda: now[0])
+        try:
+
+            async def scenario():
+                def work():
+                    now[0] += 4.0
+
+                await executor.run(work)
+
+            asyncio.run(scenario())
+            now[0] = 10.0
+            # 10 秒 × 2 ワーカーのうち 4 秒稼働
+            assert executor.stats().utilization == pytest.approx(0.2)
+        finally:
+            executor.shutdown()
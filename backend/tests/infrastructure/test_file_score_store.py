@@ -0,0 +1,68 @@
+"""ファイル（ノートパック）による結果ストアのテスト"""
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.file_score_store import FileScoreStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _midi(pitch: int = 60) -> MidiData:
+    return MidiData(notes=[NoteEvent(pitch=pitch, start=0.0, end=0.5)], tempo=90.0)
+
+
+class TestFileScoreStore:
+    def test_save_and_get(self, tmp_path):
+        store = FileScoreStore(tmp_path)
+        score_id = store.save(_midi())
+        assert store.get(score_id) == _midi()
+        assert store.get("missing") is None
+
+    def test_shared_between_instances(self, tmp_path):
+        score_id = FileScoreStore(tmp_path).save(_midi(64))
+        assert FileScoreStore(tmp_path).get(score_id) == _midi(64)
+
+    def test_rejects_path_like_ids(self, tmp_path):
+        (tmp_path / "secret.npk").write_bytes(b"")
+        store = FileScoreStore(tmp_path / "store")
+        assert store.get("../secret") is None
+        assert store.get("") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        clock = _Clock()
+        store = FileScoreStore(tmp_path, max_entries=2, clock=clock)
+        first = store.save(_midi(60))
+        clock.now += 1
+        second = store.save(_midi(62))
+        clock.now += 1
+        store.get(first)  # first を最近使ったことにする
+        clock.now += 1
+        third = store.save(_midi(64))
+        assert store.get(second) is None
+        assert store.get(first) is not None
+        assert store.get(third) is not None
+        assert len(store) == 2
+
+    def test_expires_after_ttl(self, tmp_path):
+        clock = _Clock()
+        store = FileScoreStore(tmp_path, ttl_seconds=10, clock=clock)
+        score_id = store.save(_midi())
+        clock.now += 9
+        assert store.get(score_id) is not None  # 参照で期限が延びる
+        clock.now += 9
+        assert store.get(score_id) is not None
+        clock.now += 12
+        assert store.get(score_id) is None
+        assert len(store) == 0
+
+    def test_corrupt_file_is_discarded(self, tmp_path):
+        store = FileScoreStore(tmp_path)
+        score_id = store.save(_midi())
+        (tmp_path / f"{score_id}.npk").write_bytes(b"garbage")
+        assert store.get(score_id) is None
+        assert len(store) == 0
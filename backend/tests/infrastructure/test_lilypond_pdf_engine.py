@@ -0,0 +1,125 @@
+"""LilyPond PDF エンジンのテスト（LilyPond の代わりに同じ引数を受け取るスクリプトを使う）"""
+
+import asyncio
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from src.core.exceptions import PdfExportError, PdfTimeoutError, ServiceBusyError
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.lilypond_pdf_engine import LilyPondPdfEngine, pdf_cache_key
+from src.infrastructure.music21_generator import Music21Generator
+
+
+def _fake_lilypond(tmp_path: Path, body: str) -> str:
+    """`lilypond --pdf ... -o <base> <source>` と同じ引数で動くスクリプトを作る"""
+    script = tmp_path / "fake-lilypond"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import pathlib, sys, time\n"
+        "base = pathlib.Path(sys.argv[sys.argv.index('-o') + 1])\n"
+        "source = pathlib.Path(sys.argv[-1])\n" + textwrap.dedent(body)
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+_WRITE_PDF = "base.with_suffix('.pdf').write_bytes(b'%PDF-' + str(base).encode())\n"
+
+
+def _midi(pitch: int = 60) -> MidiData:
+    return MidiData(notes=[NoteEvent(pitch=pitch, start=0.0, end=0.5)])
+
+
+def _engine(executable: str, **kwargs) -> LilyPondPdfEngine:
+    return LilyPondPdfEngine(Music21Generator(), executable=executable, **kwargs)
+
+
+class TestLilyPondPdfEngine:
+    @pytest.mark.asyncio
+    async def test_renders_and_removes_temp_files(self, tmp_path):
+        engine = _engine(_fake_lilypond(tmp_path, _WRITE_PDF))
+        pdf = await engine.render_pdf(_midi())
+        assert pdf.startswith(b"%PDF-")
+        # 出力先の一時ディレクトリは削除されている
+        assert not Path(pdf[len(b"%PDF-") :].decode()).parent.exists()
+        assert engine.stats().completed == 1
+
+    @pytest.mark.asyncio
+    async def test_source_is_lilypond(self, tmp_path):
+        body = "base.with_suffix('.pdf').write_bytes(source.read_bytes())\n"
+        engine = _engine(_fake_lilypond(tmp_path, body), lilypond_version="2.22")
+        source = (await engine.render_pdf(_midi())).decode()
+        assert source.startswith('\\version "2.22"')
+        assert "\\score" in source
+
+    @pytest.mark.asyncio
+    async def test_cache_hit(self, tmp_path):
+        engine = _engine(_fake_lilypond(tmp_path, _WRITE_PDF))
+        first = await engine.render_pdf(_midi())
+        second = await engine.render_pdf(_midi())
+        assert first == second
+        stats = engine.stats()
+        assert (stats.cache_misses, stats.cache_hits, stats.completed) == (1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_render(self, tmp_path):
+        engine = _engine(_fake_lilypond(tmp_path, "time.sleep(0.2)\n" + _WRITE_PDF))
+        results = await asyncio.gather(*(engine.render_pdf(_midi()) for _ in range(3)))
+        assert len(set(results)) == 1
+        assert engine.stats().completed == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process(self, tmp_path):
+        engine = _engine(_fake_lilypond(tmp_path, "time.sleep(30)\n"), timeout_seconds=0.3)
+        with pytest.raises(PdfTimeoutError):
+            await engine.render_pdf(_midi())
+        stats = engine.stats()
+        assert (stats.timed_out, stats.failed, stats.running) == (1, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self, tmp_path):
+        engine = _engine(
+            _fake_lilypond(tmp_path, "time.sleep(0.3)\n" + _WRITE_PDF),
+            max_processes=1,
+            max_queue=0,
+        )
+        results = await asyncio.gather(
+            engine.render_pdf(_midi(60)), engine.render_pdf(_midi(62)), return_exceptions=True
+        )
+        assert isinstance(results[0], bytes)
+        assert isinstance(results[1], ServiceBusyError)
+        assert engine.stats().rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_run(self, tmp_path):
+        engine = _engine(_fake_lilypond(tmp_path, "sys.exit(1)\n"))
+        with pytest.raises(PdfExportError):
+            await engine.render_pdf(_midi())
+        assert engine.stats().failed == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_executable(self, tmp_path):
+        engine = _engine(str(tmp_path / "missing"))
+        with pytest.raises(PdfExportError):
+            await engine.render_pdf(_midi())
+
+    @pytest.mark.asyncio
+    async def test_aclose_cancels_running_render(self, tmp_path):
+        engine = _engine(_fake_lilypond(tmp_path, "time.sleep(30)\n"))
+        request = asyncio.ensure_future(engine.render_pdf(_midi()))
+        await asyncio.sleep(0.5)
+        await engine.aclose()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        assert engine.stats().running == 0
+
+
+class TestPdfCacheKey:
+    def test_sub_grid_differences_share_a_key(self):
+        a = MidiData(notes=[NoteEvent(pitch=60, start=0.0, end=0.5)])
+        b = MidiData(notes=[NoteEvent(pitch=60, start=0.01, end=0.49)])
+        assert pdf_cache_key(a) == pdf_cache_key(b)
+        assert pdf_cache_key(a) != pdf_cache_key(_midi(62))
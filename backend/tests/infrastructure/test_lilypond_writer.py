@@ -0,0 +1,114 @@
+"""LilyPond ソース直接書き出しのテスト"""
+
+import io
+import re
+
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.notation import layout_score
+from src.infrastructure.lilypond_writer import write_lilypond
+
+_DURATION = re.compile(r"^(?:<[^>]*>|[a-gsrR][a-z,']*)(\\breve|\d+)(\.*)(?:\*(\d+)/(\d+))?~?$")
+
+
+def _source(notes: list[NoteEvent], numerator: int = 4, **kwargs) -> str:
+    midi = MidiData(notes=notes, tempo=120.0, time_signature_numerator=numerator)
+    buffer = io.StringIO()
+    write_lilypond(layout_score(midi, **kwargs), buffer)
+    return buffer.getvalue()
+
+
+def _measures(source: str) -> list[list[str]]:
+    """小節線チェック（|）で終わる行を小節ごとのトークン列にする"""
+    lines = [line.strip() for line in source.splitlines() if line.rstrip().endswith("|")]
+    return [line[:-1].split() for line in lines]
+
+
+def _length(tokens: list[str]) -> float:
+    """トークン列の長さ（全音符 = 1）"""
+    total = 0.0
+    for token in tokens:
+        if token.startswith("\\"):
+            continue
+        match = _DURATION.match(token)
+        assert match, token
+        base, dots, num, den = match.groups()
+        value = 2.0 if base == "\\breve" else 1.0 / int(base)
+        value *= 2 - 0.5 ** len(dots)
+        if num:
+            value *= int(num) / int(den)
+        total += value
+    return total
+
+
+def _chord_tokens(tokens: list[str]) -> list[str]:
+    """'<c' e'>4' のように分かれた和音を1トークンに戻す"""
+    merged: list[str] = []
+    buffer: list[str] = []
+    for token in tokens:
+        if buffer or token.startswith("<"):
+            buffer.append(token)
+            if ">" in token:
+                merged.append(" ".join(buffer))
+                buffer = []
+        else:
+            merged.append(token)
+    return merged
+
+
+class TestWriteLilypond:
+    def test_header_and_staves(self):
+        source = _source([NoteEvent(pitch=60, start=0.0, end=0.5)])
+        assert source.startswith('\\version "2.24"')
+        assert "\\new PianoStaff" in source
+        assert "\\clef treble \\time 4/4 \\tempo 4 = 120" in source
+        assert "\\clef bass \\time 4/4" in source
+
+    def test_absolute_pitches(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5),
+            NoteEvent(pitch=73, start=0.5, end=1.0),
+            NoteEvent(pitch=36, start=0.0, end=0.5),
+            NoteEvent(pitch=58, start=0.5, end=1.0),
+        ]
+        right, left = _measures(_source(notes))
+        assert right[:2] == ["c'4", "cis''4"]
+        assert left[:2] == ["c,4", "bes4"]
+
+    def test_chord_and_tie_across_barline(self):
+        notes = [NoteEvent(pitch=p, start=1.5, end=2.5) for p in (64, 67)]
+        first, second, _, _ = _measures(_source(notes))
+        assert first == ["r2.", "<e'", "g'>4~"]
+        assert second == ["<e'", "g'>4", "r2."]
+
+    def test_full_measure_rests(self):
+        measures = _measures(_source([NoteEvent(pitch=72, start=0.0, end=0.5)], numerator=3))
+        # 左手はノートがないので小節全体の休符
+        assert measures[1] == ["R1*3/4"]
+
+    def test_every_measure_is_full(self):
+        notes = [
+            NoteEvent(pitch=60 + (i * 7) % 24, start=i * 0.375, end=i * 0.375 + 0.875)
+            for i in range(40)
+        ]
+        measures = _measures(_source(notes))
+        assert measures
+        for tokens in measures:
+            assert _length(_chord_tokens(tokens)) == 1.0
+
+    def test_missing_voice_is_padded_with_spacers(self):
+        notes = [
+            NoteEvent(pitch=72, start=0.0, end=2.0),
+            NoteEvent(pitch=76, start=0.5, end=1.0),  # 重なるので第2声部
+            NoteEvent(pitch=72, start=2.0, end=4.0),
+        ]
+        source = _source(notes)
+        assert "\\voiceTwo" in source
+        assert "s1 |" in source
+        # 2小節目は単声に戻る
+        assert "\\oneVoice c''1 |" in source
+
+    def test_page_sets_bar_number(self):
+        notes = [NoteEvent(pitch=60, start=i * 2.0, end=i * 2.0 + 1.0) for i in range(6)]
+        source = _source(notes, start_measure=3, end_measure=5)
+        assert "\\set Score.currentBarNumber = #4" in source
+        assert len(_measures(source)) == 4  # 2小節 × 2譜表
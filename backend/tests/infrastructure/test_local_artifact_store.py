@@ -0,0 +1,50 @@
+"""ローカルディレクトリの成果物ストアのテスト"""
+
+import hashlib
+import os
+
+import pytest
+
+from src.infrastructure.local_artifact_store import LocalArtifactStore
+
+
+class TestLocalArtifactStore:
+    def test_put_and_get(self, tmp_path):
+        store = LocalArtifactStore(tmp_path)
+        name = store.put(b"<score/>", "musicxml")
+        assert name == f"{hashlib.sha256(b'<score/>').hexdigest()}.musicxml"
+        assert store.get(name) == b"<score/>"
+        assert store.get(f"{'0' * 64}.musicxml") is None
+
+    def test_same_content_same_name(self, tmp_path):
+        store = LocalArtifactStore(tmp_path)
+        assert store.put(b"data", "mid") == store.put(b"data", "mid")
+        assert store.put(b"data", "mid") != store.put(b"data", "pdf")
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_rejects_unknown_extension(self, tmp_path):
+        with pytest.raises(ValueError):
+            LocalArtifactStore(tmp_path).put(b"data", "exe")
+
+    def test_rejects_path_like_names(self, tmp_path):
+        (tmp_path / "secret.pdf").write_bytes(b"secret")
+        store = LocalArtifactStore(tmp_path / "store")
+        assert store.get("../secret.pdf") is None
+        assert store.get("secret.pdf") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        store = LocalArtifactStore(tmp_path, max_bytes=10)
+        first = store.put(b"aaaa", "mid")
+        second = store.put(b"bbbb", "mid")
+        os.utime(tmp_path / first, (1, 1))
+        os.utime(tmp_path / second, (2, 2))
+        # 参照した成果物は後回しになる
+        store.get(first)
+        store.put(b"cccc", "mid")
+        assert store.get(second) is None
+        assert store.get(first) == b"aaaa"
+
+    def test_keeps_artifact_larger_than_limit(self, tmp_path):
+        store = LocalArtifactStore(tmp_path, max_bytes=2)
+        name = store.put(b"large", "pdf")
+        assert store.get(name) == b"large"
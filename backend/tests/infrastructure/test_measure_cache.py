@@ -0,0 +1,30 @@
+"""小節キャッシュのテスト"""
+
+from src.infrastructure.measure_cache import MeasureCache
+
+
+class TestMeasureCache:
+    def test_get_put_and_stats(self):
+        cache = MeasureCache()
+        assert cache.get("a") is None
+        cache.put("a", "<note/>")
+        assert cache.get("a") == "<note/>"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = MeasureCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")  # a を最近使ったことにする
+        cache.put("c", "C")
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert len(cache) == 2
+
+    def test_clear(self):
+        cache = MeasureCache()
+        cache.put("a", "A")
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 0)
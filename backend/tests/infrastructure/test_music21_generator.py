@@ -0,0 +1,119 @@
+"""music21 生成（記譜済みスコアの構築）のテスト"""
+
+import music21
+import pytest
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.measure_cache import MeasureCache
+from src.infrastructure.music21_generator import Music21Generator
+
+
+@pytest.fixture
+def generator():
+    return Music21Generator()
+
+
+class TestBuildScore:
+    def test_parts_are_split_into_measures(self, generator):
+        notes = [
+            NoteEvent(pitch=72, start=0.0, end=3.0),
+            NoteEvent(pitch=48, start=0.0, end=0.5),
+        ]
+        score = generator.build_score(MidiData(notes=notes))
+        right, left = score.parts
+        assert right.partName == "Right Hand" and left.partName == "Left Hand"
+        assert len(right.getElementsByClass("Measure")) == 2
+        assert len(left.getElementsByClass("Measure")) == 2
+
+    def test_ties_across_barline(self, generator):
+        notes = [NoteEvent(pitch=72, start=1.5, end=2.5)]
+        score = generator.build_score(MidiData(notes=notes))
+        tied = [n for n in score.parts[0].recurse().notes]
+        assert [n.tie.type for n in tied] == ["start", "stop"]
+
+    def test_chords_and_voices(self, generator):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5),
+            NoteEvent(pitch=64, start=0.0, end=0.5),
+            NoteEvent(pitch=72, start=0.0, end=2.0),
+        ]
+        measure = generator.build_score(MidiData(notes=notes)).parts[0].measure(1)
+        assert len(measure.voices) == 2
+        chords = list(measure.recurse().getElementsByClass("Chord"))
+        assert [p.midi for p in chords[0].pitches] == [60, 64]
+
+    def test_repeated_accidental_is_hidden(self, generator):
+        notes = [
+            NoteEvent(pitch=61, start=0.0, end=0.5),
+            NoteEvent(pitch=61, start=0.5, end=1.0),
+            NoteEvent(pitch=60, start=1.0, end=1.5),
+        ]
+        measure = generator.build_score(MidiData(notes=notes)).parts[0].measure(1)
+        shown = [n.pitch.accidental.displayStatus for n in measure.notes]
+        assert shown == [True, False, True]
+
+
+class TestExport:
+    def test_export_skips_make_notation(self, generator, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("makeNotation を呼んではいけない")
+
+        monkeypatch.setattr(music21.stream.Stream, "makeNotation", fail)
+        notes = [NoteEvent(pitch=67, start=0.25, end=2.5), NoteEvent(pitch=40, start=0.0, end=1.0)]
+        musicxml = generator.generate_musicxml(MidiData(notes=notes))
+
+        parsed = music21.converter.parse(musicxml, format="musicxml")
+        right = parsed.parts[0].stripTies().flatten().notes
+        assert [(float(n.offset), n.pitch.midi, float(n.quarterLength)) for n in right] == [
+            (0.5, 67, 4.5)
+        ]
+
+    def test_empty_hand_gets_full_measure_rest(self, generator):
+        notes = [NoteEvent(pitch=72, start=0.0, end=0.5)]
+        musicxml = generator.generate_musicxml(MidiData(notes=notes))
+        assert '<rest measure="yes"' in musicxml
+
+    def test_page_keeps_measure_numbers(self, generator):
+        notes = [NoteEvent(pitch=60 + i % 12, start=i * 0.5, end=i * 0.5 + 0.5) for i in range(32)]
+        page = generator.generate_musicxml_page(MidiData(notes=notes), 2, 4)
+        parsed = music21.converter.parse(page, format="musicxml")
+        for part in parsed.parts:
+            measures = part.getElementsByClass("Measure")
+            assert [m.number for m in measures] == [3, 4]
+            assert measures[0].timeSignature is not None
+
+
+class TestMeasureCache:
+    def _piece(self, extra: list[NoteEvent] | None = None) -> MidiData:
+        notes = [NoteEvent(pitch=60 + i % 12, start=i * 0.5, end=i * 0.5 + 0.5) for i in range(32)]
+        notes += [NoteEvent(pitch=43, start=i * 2.0, end=i * 2.0 + 1.5) for i in range(8)]
+        return MidiData(notes=notes + (extra or []))
+
+    def test_cached_output_matches_uncached(self):
+        midi = self._piece()
+        cached = Music21Generator(measure_cache=MeasureCache()).generate_musicxml(midi)
+        plain = Music21Generator().generate_musicxml(midi)
+
+        def notes(xml):
+            score = music21.converter.parse(xml, format="musicxml")
+            return [
+                [
+                    (m.number, float(n.offset), n.pitches, float(n.quarterLength))
+                    for m in part.getElementsByClass("Measure")
+                    for n in m.recurse().notesAndRests
+                ]
+                for part in score.parts
+            ]
+
+        assert notes(cached) == notes(plain)
+
+    def test_only_changed_measures_are_rendered(self):
+        cache = MeasureCache()
+        generator = Music21Generator(measure_cache=cache)
+        generator.generate_musicxml(self._piece())
+        rendered = cache.misses
+
+        # 5小節目（8.0秒〜）の右手に1音足す → 変わるのはその1小節だけ
+        generator.generate_musicxml(self._piece([NoteEvent(pitch=84, start=8.0, end=8.5)]))
+        assert cache.misses == rendered + 1
+        assert cache.hits == rendered - 1
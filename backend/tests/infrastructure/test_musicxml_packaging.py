@@ -0,0 +1,68 @@
+"""MusicXML 配信用変換のテスト"""
+
+import io
+import zipfile
+
+import music21
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.musicxml_packaging import from_mxl, minify_musicxml, to_mxl
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+
+
+def _musicxml() -> str:
+    notes = [
+        NoteEvent(pitch=p, start=i * 0.25, end=i * 0.25 + 0.5) for i, p in enumerate(range(48, 84))
+    ]
+    return DirectMusicXmlGenerator(score_builder=Music21Generator()).generate_musicxml(
+        MidiData(notes=notes)
+    )
+
+
+class TestMxl:
+    def test_roundtrip_and_layout(self):
+        musicxml = _musicxml()
+        data = to_mxl(musicxml)
+        assert from_mxl(data) == musicxml
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            first = archive.infolist()[0]
+            assert first.filename == "mimetype"
+            assert first.compress_type == zipfile.ZIP_STORED
+        assert len(data) < len(musicxml.encode("utf-8")) / 3
+
+    def test_music21_can_read_mxl(self, tmp_path):
+        path = tmp_path / "score.mxl"
+        path.write_bytes(to_mxl(_musicxml()))
+        score = music21.converter.parse(path)
+        assert len(score.parts) == 2
+
+
+class TestMinify:
+    def test_strips_whitespace_comments_and_defaults(self):
+        musicxml = (
+            '<?xml version="1.0"?>\n<score>\n  <!-- Part 1 -->\n'
+            '  <measure implicit="no" number="1">\n'
+            "    <pitch><step>C</step><alter>0</alter><octave>4</octave></pitch>\n"
+            "  </measure>\n</score>\n"
+        )
+        assert minify_musicxml(musicxml) == (
+            '<?xml version="1.0"?><score><measure number="1">'
+            "<pitch><step>C</step><octave>4</octave></pitch></measure></score>\n"
+        )
+
+    def test_keeps_whitespace_only_text(self):
+        musicxml = "<direction>\n  <words> </words>\n</direction>\n"
+        assert minify_musicxml(musicxml) == "<direction><words> </words></direction>\n"
+
+    def test_music21_output_keeps_same_notes(self):
+        notes = [NoteEvent(pitch=61, start=0.0, end=0.5), NoteEvent(pitch=60, start=0.5, end=1.0)]
+        musicxml = Music21Generator().generate_musicxml(MidiData(notes=notes))
+        minified = minify_musicxml(musicxml)
+        assert len(minified) < len(musicxml)
+
+        def pitches(xml):
+            score = music21.converter.parse(xml, format="musicxml")
+            return [(float(n.offset), n.pitch.midi) for n in score.flatten().notes]
+
+        assert pitches(minified) == pitches(musicxml)
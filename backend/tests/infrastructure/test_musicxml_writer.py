@@ -0,0 +1,148 @@
+"""MusicXML 直接書き出しのテスト（music21 出力とのパリティ）"""
+
+import random
+import xml.etree.ElementTree as ET
+
+import music21
+import pytest
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+from src.infrastructure.pretty_midi_processor import PrettyMidiProcessor
+
+
+@pytest.fixture
+def generator():
+    return DirectMusicXmlGenerator(score_builder=Music21Generator())
+
+
+def _sounding_notes(musicxml: str) -> list[tuple[list[tuple[int, int]], list[tuple[int, int]]]]:
+    """パートごとの (発音開始, 鳴っている16分音符) をピッチ付きで返す
+
+    和音のタイは stripTies() の結合結果が曖昧になるため、
+    ピッチごとにタイの有無から打鍵位置と鳴っている区間を比較する。
+    """
+    score = music21.converter.parse(musicxml, format="musicxml")
+    parts = []
+    for part in score.parts:
+        onsets: list[tuple[int, int]] = []
+        sounding: list[tuple[int, int]] = []
+        for element in part.flatten().notes:
+            start = round(float(element.offset) * 4)
+            length = round(float(element.duration.quarterLength) * 4)
+            members = element.notes if element.isChord else [element]
+            for member in members:
+                midi = member.pitch.midi
+                tie = member.tie if member.tie is not None else element.tie
+                if tie is None or tie.type == "start":
+                    onsets.append((start, midi))
+                sounding.extend((step, midi) for step in range(start, start + length))
+        parts.append((sorted(onsets), sorted(sounding)))
+    return parts
+
+
+def _assert_parity(generator, midi_data: MidiData) -> None:
+    expected = _sounding_notes(Music21Generator().generate_musicxml(midi_data))
+    actual = _sounding_notes(generator.generate_musicxml(midi_data))
+    assert actual == expected
+
+
+class TestParityWithMusic21:
+    def test_single_notes_and_rests(self, generator):
+        notes = [
+            NoteEvent(pitch=60, start=0.5, end=1.0),
+            NoteEvent(pitch=64, start=1.5, end=1.75),
+            NoteEvent(pitch=48, start=0.0, end=1.0),
+        ]
+        _assert_parity(generator, MidiData(notes=notes, tempo=120.0))
+
+    def test_chords(self, generator):
+        notes = [NoteEvent(pitch=p, start=0.0, end=0.5) for p in (60, 64, 67, 72)]
+        notes += [NoteEvent(pitch=p, start=0.0, end=1.0) for p in (36, 43)]
+        _assert_parity(generator, MidiData(notes=notes, tempo=120.0))
+
+    def test_ties_across_barlines(self, generator):
+        notes = [
+            NoteEvent(pitch=67, start=1.5, end=4.75),
+            NoteEvent(pitch=40, start=0.25, end=2.25),
+        ]
+        _assert_parity(generator, MidiData(notes=notes, tempo=120.0))
+
+    def test_three_four_time(self, generator):
+        notes = [NoteEvent(pitch=65, start=1.0, end=2.0), NoteEvent(pitch=50, start=0.0, end=3.0)]
+        midi = MidiData(
+            notes=notes,
+            tempo=120.0,
+            time_signature_numerator=3,
+            time_signature_denominator=4,
+        )
+        _assert_parity(generator, midi)
+
+    def test_random_piece(self, generator):
+        rng = random.Random(7)
+        notes = []
+        for _ in range(120):
+            start = rng.randint(0, 64) * 0.125
+            notes.append(
+                NoteEvent(
+                    pitch=rng.randint(40, 84),
+                    start=start,
+                    end=start + rng.choice([1, 2, 3, 4, 6, 8, 12]) * 0.125,
+                )
+            )
+        _assert_parity(generator, MidiData(notes=notes, tempo=120.0))
+
+
+class TestDocumentStructure:
+    def test_well_formed_with_two_parts(self, generator):
+        notes = [NoteEvent(pitch=60, start=0.0, end=0.5)]
+        root = ET.fromstring(generator.generate_musicxml(MidiData(notes=notes)).split("\n", 2)[2])
+        parts = root.findall("part")
+        assert [p.get("id") for p in parts] == ["P1", "P2"]
+        assert len(parts[0].findall("measure")) == len(parts[1].findall("measure"))
+
+    def test_empty_score(self, generator):
+        parts = _sounding_notes(generator.generate_musicxml(MidiData()))
+        assert parts == [([], []), ([], [])]
+
+    def test_generates_midi(self, generator):
+        notes = [NoteEvent(pitch=60, start=0.0, end=0.5)]
+        musicxml, midi_base64 = generator.generate_musicxml_and_midi(MidiData(notes=notes))
+        decoded = PrettyMidiProcessor().from_base64(midi_base64)
+        assert decoded.note_count == 1
+        assert "<score-partwise" in musicxml
+
+
+class TestPage:
+    def test_page_has_only_requested_measures(self, generator):
+        notes = [NoteEvent(pitch=60 + i % 12, start=i * 0.5, end=i * 0.5 + 0.5) for i in range(64)]
+        page = generator.generate_musicxml_page(MidiData(notes=notes), 4, 6)
+        root = ET.fromstring(page.split("\n", 2)[2])
+        for part in root.findall("part"):
+            measures = part.findall("measure")
+            assert [m.get("number") for m in measures] == ["5", "6"]
+            assert measures[0].find("attributes") is not None
+
+    def test_page_matches_full_score(self, generator):
+        rng = random.Random(7)
+        notes = []
+        for _ in range(200):
+            start = rng.randrange(0, 256) * 0.125
+            notes.append(
+                NoteEvent(rng.randrange(40, 84), start, start + rng.randrange(1, 12) * 0.125)
+            )
+        midi = MidiData(notes=notes)
+        full = _sounding_notes(generator.generate_musicxml(midi))
+        page = _sounding_notes(generator.generate_musicxml_page(midi, 3, 7))
+
+        # 声部の割り当ては範囲内のノートだけで決まるため、鳴る音で比較する
+        lo, hi = 3 * 16, 7 * 16
+        for (full_onsets, full_sounding), (page_onsets, page_sounding) in zip(
+            full, page, strict=True
+        ):
+            shifted = sorted((step + lo, midi) for step, midi in page_sounding)
+            assert shifted == sorted(s for s in full_sounding if lo <= s[0] < hi)
+            assert {(step + lo, midi) for step, midi in page_onsets} == {
+                o for o in full_onsets if lo <= o[0] < hi
+            }
@@ -0,0 +1,81 @@
+"""ノートパック形式のテスト"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.note_pack import (
+    NotePackError,
+    load_note_pack,
+    pack_notes,
+    unpack_notes,
+    write_note_pack,
+)
+
+
+def _midi() -> MidiData:
+    return MidiData(
+        notes=[
+            NoteEvent(pitch=60, start=0.0, end=0.5, velocity=80),
+            NoteEvent(pitch=127, start=0.25, end=1.125, velocity=1),
+            NoteEvent(pitch=0, start=1.0, end=1.5, velocity=127),
+        ],
+        tempo=97.5,
+        time_signature_numerator=3,
+        time_signature_denominator=8,
+    )
+
+
+class TestNotePack:
+    def test_round_trip(self):
+        assert unpack_notes(pack_notes(_midi())).to_midi_data() == _midi()
+
+    def test_fixed_width_layout(self):
+        data = pack_notes(_midi())
+        assert len(data) == 32 + 18 * 3
+        assert data[:4] == b"NPAK"
+        assert struct.unpack_from("<d", data, 16)[0] == 97.5
+        # 開始時刻の列はヘッダの直後に f64 のまま並ぶ
+        assert np.frombuffer(data, "<f8", 3, 32).tolist() == [0.0, 0.25, 1.0]
+
+    def test_columns_share_buffer(self):
+        buffer = bytearray(pack_notes(_midi()))
+        pack = unpack_notes(buffer)
+        buffer[32 + 16 * 3] = 61  # 1つ目のピッチ
+        assert pack.pitches[0] == 61
+        assert pack.time_signature == (3, 8)
+        assert pack.note_count == 3
+
+    def test_empty(self):
+        pack = unpack_notes(pack_notes(MidiData()))
+        assert pack.note_count == 0
+        assert pack.to_midi_data() == MidiData()
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"",
+            b"XXXX" + pack_notes(_midi())[4:],
+            pack_notes(_midi())[:-1],
+            pack_notes(_midi())[:4] + b"\x02\x00" + pack_notes(_midi())[6:],
+        ],
+    )
+    def test_rejects_invalid_data(self, data):
+        with pytest.raises(NotePackError):
+            unpack_notes(data)
+
+    def test_file_is_memory_mapped(self, tmp_path):
+        path = tmp_path / "score.npk"
+        write_note_pack(path, _midi())
+        pack = load_note_pack(path)
+        assert pack.to_midi_data() == _midi()
+        assert not pack.starts.flags.writeable
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.npk"
+        path.write_bytes(b"")
+        with pytest.raises(NotePackError):
+            load_note_pack(path)
@@ -0,0 +1,110 @@
+"""小節チャンク並列の music21 楽譜生成のテスト"""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import music21
+import pytest
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.parallel_music21_generator import (
+    ParallelMusic21Generator,
+    splice_measures,
+)
+
+
+def _random_piece(seed: int, measures: int) -> MidiData:
+    rng = random.Random(seed)
+    notes = []
+    for _ in range(measures * 6):
+        start = rng.randint(0, measures * 16 - 1) * 0.125
+        length = rng.choice([1, 2, 3, 4, 6, 8, 12, 24]) * 0.125
+        notes.append(NoteEvent(pitch=rng.randint(40, 84), start=start, end=start + length))
+    return MidiData(notes=notes, tempo=120.0)
+
+
+def _measures(musicxml: str) -> list[list[tuple]]:
+    """パートごとの (小節番号, 要素の種類, 長さ, ピッチ, タイ) の並び"""
+    score = music21.converter.parse(musicxml, format="musicxml")
+    parts = []
+    for part in score.parts:
+        rows = []
+        for measure in part.getElementsByClass("Measure"):
+            for element in measure.recurse().notesAndRests:
+                tie = element.tie.type if element.tie is not None else None
+                pitches = tuple(p.midi for p in element.pitches)
+                rows.append((measure.number, float(element.quarterLength), pitches, tie))
+        parts.append(rows)
+    return parts
+
+
+@pytest.fixture
+def thread_pool():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+class TestParallelGeneration:
+    def test_matches_serial_output(self, thread_pool):
+        midi = _random_piece(3, measures=11)
+        generator = ParallelMusic21Generator(chunk_measures=3, executor=thread_pool)
+        assert _measures(generator.generate_musicxml(midi)) == _measures(
+            Music21Generator().generate_musicxml(midi)
+        )
+
+    def test_single_header_and_attributes(self, thread_pool):
+        midi = _random_piece(5, measures=9)
+        musicxml = ParallelMusic21Generator(
+            chunk_measures=2, executor=thread_pool
+        ).generate_musicxml(midi)
+        assert musicxml.count("<score-partwise") == 1
+        assert musicxml.count("<time>") == 2  # 各パートの先頭小節だけ
+        assert musicxml.count("<per-minute>") == 1
+        assert musicxml.count("<divisions>") == 2
+
+        score = music21.converter.parse(musicxml, format="musicxml")
+        for part in score.parts:
+            numbers = [m.number for m in part.getElementsByClass("Measure")]
+            assert numbers == list(range(1, len(numbers) + 1))
+            assert len(numbers) >= 9
+
+    def test_tie_continues_across_chunk_boundary(self, thread_pool):
+        # 2小節目の後半から3小節目へ（チャンク境界）タイで続く
+        midi = MidiData(notes=[NoteEvent(pitch=72, start=3.0, end=5.0)])
+        musicxml = ParallelMusic21Generator(
+            chunk_measures=2, executor=thread_pool
+        ).generate_musicxml(midi)
+        notes = music21.converter.parse(musicxml, format="musicxml").parts[0].stripTies()
+        (note,) = notes.flatten().notes
+        assert (float(note.offset), float(note.quarterLength)) == (6.0, 4.0)
+
+    def test_short_piece_is_not_split(self):
+        generator = ParallelMusic21Generator(chunk_measures=8)
+        musicxml = generator.generate_musicxml(_random_piece(1, measures=4))
+        assert generator._executor is None  # プールを作らない
+        assert "<score-partwise" in musicxml
+
+    def test_process_pool(self):
+        midi = _random_piece(9, measures=6)
+        generator = ParallelMusic21Generator(chunk_measures=2, max_workers=2)
+        try:
+            musicxml, midi_base64 = generator.generate_musicxml_and_midi(midi)
+        finally:
+            generator.shutdown()
+        assert _measures(musicxml) == _measures(Music21Generator().generate_musicxml(midi))
+        assert midi_base64
+
+
+class TestSpliceMeasures:
+    def test_inserts_before_each_part_end(self):
+        skeleton = '<a>\n  <part id="P1">\n  </part>\n  <part id="P2">\n  </part>\n</a>\n'
+        result = splice_measures(skeleton, ["    <m1/>\n", "    <m2/>\n"])
+        assert result == (
+            '<a>\n  <part id="P1">\n    <m1/>\n  </part>\n'
+            '  <part id="P2">\n    <m2/>\n  </part>\n</a>\n'
+        )
+
+    def test_missing_part_raises(self):
+        with pytest.raises(ValueError):
+            splice_measures("<a></a>", ["<m/>"])
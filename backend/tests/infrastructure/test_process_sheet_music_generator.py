@@ -0,0 +1,64 @@
+"""ワーカープロセスで楽譜を生成する楽譜生成のテスト"""
+
+import pytest
+
+from src.core import metrics, profiling
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.musicxml_writer import DirectMusicXmlGenerator
+from src.infrastructure.process_sheet_music_generator import ProcessSheetMusicGenerator
+
+
+def _direct_generator() -> DirectMusicXmlGenerator:
+    return DirectMusicXmlGenerator(score_builder=Music21Generator())
+
+
+@pytest.fixture
+def midi_data():
+    notes = [NoteEvent(pitch=60 + i % 12, start=i * 0.5, end=i * 0.5 + 0.5) for i in range(24)]
+    return MidiData(notes=notes, tempo=120.0)
+
+
+@pytest.fixture
+def generator():
+    generator = ProcessSheetMusicGenerator(factory=_direct_generator, max_workers=1)
+    yield generator
+    generator.shutdown()
+
+
+class TestProcessSheetMusicGenerator:
+    def test_matches_in_process_generator(self, generator, midi_data):
+        local = _direct_generator()
+        assert generator.generate_musicxml_and_midi(midi_data) == (
+            local.generate_musicxml_and_midi(midi_data)
+        )
+        assert generator.generate_musicxml_page(midi_data, 1, 2) == (
+            local.generate_musicxml_page(midi_data, 1, 2)
+        )
+
+    def test_build_score_in_caller(self, generator, midi_data):
+        score = generator.build_score(midi_data)
+        assert len(score.parts) == 2
+
+    def test_shutdown_recreates_pool(self, generator, midi_data):
+        first = generator.generate_musicxml(midi_data)
+        generator.shutdown()
+        assert generator.generate_musicxml(midi_data) == first
+
+    def test_records_worker_stages_with_caller_labels(self, generator, midi_data):
+        metrics.registry.clear()
+        with metrics.labels(endpoint="simplify"):
+            generator.generate_musicxml_and_midi(midi_data)
+        stages = {
+            dict(labels)["stage"]
+            for labels in metrics.registry.histograms[metrics.STAGE_SECONDS].snapshot()
+            if dict(labels).get("endpoint") == "simplify"
+        }
+        assert stages == {"score_build", "musicxml_write", "midi_write"}
+
+    def test_returns_worker_profile(self, generator, midi_data):
+        with profiling.profile_request() as profile:
+            generator.generate_musicxml(midi_data)
+        functions = [row["function"] for row in profile.summary(top=1000)["hotspots"]]
+        assert any(name.endswith("(write_musicxml)") for name in functions)
+        assert "musicxml_write" in profile.stages
@@ -0,0 +1,52 @@
+"""メモリ上の結果ストアのテスト"""
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.score_store import InMemoryScoreStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _midi(pitch: int = 60) -> MidiData:
+    return MidiData(notes=[NoteEvent(pitch=pitch, start=0.0, end=0.5)])
+
+
+class TestInMemoryScoreStore:
+    def test_save_and_get(self):
+        store = InMemoryScoreStore()
+        midi = _midi()
+        score_id = store.save(midi)
+        assert store.get(score_id) is midi
+        assert store.get("missing") is None
+
+    def test_ids_are_unique(self):
+        store = InMemoryScoreStore()
+        assert store.save(_midi()) != store.save(_midi())
+
+    def test_evicts_least_recently_used(self):
+        store = InMemoryScoreStore(max_entries=2)
+        first = store.save(_midi(60))
+        second = store.save(_midi(62))
+        store.get(first)  # first を最近使ったことにする
+        third = store.save(_midi(64))
+        assert store.get(second) is None
+        assert store.get(first) is not None
+        assert store.get(third) is not None
+        assert len(store) == 2
+
+    def test_expires_after_ttl(self):
+        clock = _Clock()
+        store = InMemoryScoreStore(ttl_seconds=10, clock=clock)
+        score_id = store.save(_midi())
+        clock.now = 9.0
+        assert store.get(score_id) is not None  # 参照で期限が延びる
+        clock.now = 18.0
+        assert store.get(score_id) is not None
+        clock.now = 30.0
+        assert store.get(score_id) is None
+        assert len(store) == 0
@@ -0,0 +1,125 @@
+"""軽量 SMF デコーダのテスト（pretty_midi の解釈とのパリティ）"""
+
+import base64
+import random
+import struct
+
+import pytest
+
+from src.core.exceptions import InvalidMidiError
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.pretty_midi_processor import PrettyMidiProcessor
+from src.infrastructure.smf_decoder import SmfDecodeError, decode_smf, decode_smf_columns
+from src.infrastructure.smf_encoder import encode_smf
+from src.infrastructure.smf_midi_processor import SmfMidiProcessor
+
+
+def _smf(track: bytes, division: int = 480) -> bytes:
+    header = b"MThd" + struct.pack(">IHHH", 6, 0, 1, division)
+    return header + b"MTrk" + struct.pack(">I", len(track)) + track
+
+
+def _key(note: NoteEvent) -> tuple:
+    return (note.start, note.pitch, note.end, note.velocity)
+
+
+def _random_midi(seed: int = 0) -> MidiData:
+    rng = random.Random(seed)
+    notes = []
+    for _ in range(500):
+        start = rng.random() * 60
+        notes.append(NoteEvent(rng.randint(30, 90), start, start + rng.random() * 2 + 0.01, 80))
+    return MidiData(notes=notes, tempo=97.3, time_signature_numerator=3)
+
+
+class TestDecodeSmf:
+    @pytest.mark.parametrize("writer", ["smf_encoder", "pretty_midi"])
+    def test_matches_pretty_midi(self, writer):
+        midi = _random_midi()
+        if writer == "smf_encoder":
+            raw = encode_smf(midi)
+        else:
+            raw = base64.b64decode(PrettyMidiProcessor().to_base64(midi))
+
+        decoded = decode_smf(raw)
+        expected = PrettyMidiProcessor().from_base64(base64.b64encode(raw).decode())
+        assert sorted(map(_key, decoded.notes)) == sorted(map(_key, expected.notes))
+        assert decoded.tempo == pytest.approx(expected.tempo)
+
+    def test_preserves_time_signature(self):
+        midi = MidiData(
+            notes=[NoteEvent(60, 0.0, 0.5)],
+            time_signature_numerator=6,
+            time_signature_denominator=8,
+        )
+        decoded = decode_smf(encode_smf(midi))
+        assert (decoded.time_signature_numerator, decoded.time_signature_denominator) == (6, 8)
+
+    def test_tempo_change_and_running_status(self):
+        track = (
+            b"\x00\xff\x51\x03\x07\xa1\x20"  # 120BPM
+            b"\x00\x90\x3c\x64"  # ノートオン C4
+            b"\x83\x60\x3c\x00"  # 480 ティック後、ランニングステータスでベロシティ0（オフ）
+            b"\x00\xff\x51\x03\x0f\x42\x40"  # 60BPM
+            b"\x00\x90\x3e\x50"
+            b"\x83\x60\x80\x3e\x00"  # 480 ティック後にノートオフ
+            b"\x00\xff\x2f\x00"
+        )
+        columns = decode_smf_columns(_smf(track))
+        assert columns.tempo == pytest.approx(120.0)
+        assert columns.pitches.tolist() == [60, 62]
+        assert columns.starts.tolist() == pytest.approx([0.0, 0.5])
+        assert columns.ends.tolist() == pytest.approx([0.5, 1.5])
+        assert columns.velocities.tolist() == [100, 80]
+
+    def test_note_off_keeps_note_started_on_same_tick(self):
+        track = (
+            b"\x00\x90\x3c\x64"
+            b"\x83\x60\x90\x3c\x00"  # 480: 最初のノートを閉じる
+            b"\x00\x90\x3c\x50"  # 480: 同じピッチで再発音
+            b"\x83\x60\x80\x3c\x00"  # 960: 2つ目を閉じる
+            b"\x00\x90\x40\x64"  # 閉じられないノートは捨てる
+            b"\x00\xff\x2f\x00"
+        )
+        decoded = decode_smf(_smf(track))
+        assert [(n.start, n.end, n.velocity) for n in decoded.notes] == [
+            (0.0, 0.5, 100),
+            (0.5, 1.0, 80),
+        ]
+
+    def test_defaults_without_meta_events(self):
+        decoded = decode_smf(_smf(b"\x00\x90\x3c\x64\x60\x80\x3c\x00"))
+        assert decoded.tempo == 120.0
+        assert (decoded.time_signature_numerator, decoded.time_signature_denominator) == (4, 4)
+
+    @pytest.mark.parametrize(
+        "raw",
+        [b"", b"RIFF0000000000", _smf(b"\x00\x90\x3c"), _smf(b"\x00\x3c\x64")],
+    )
+    def test_invalid_data(self, raw):
+        with pytest.raises(SmfDecodeError):
+            decode_smf(raw)
+
+
+class TestSmfMidiProcessor:
+    def test_round_trip(self):
+        processor = SmfMidiProcessor()
+        midi = MidiData(notes=[NoteEvent(64, 0.5, 1.0, 90)], tempo=100.0)
+        decoded = processor.from_base64(processor.to_base64(midi))
+        assert [_key(n) for n in decoded.notes] == [pytest.approx((0.5, 64, 1.0, 90))]
+        assert decoded.tempo == pytest.approx(100.0)
+
+    @pytest.mark.parametrize("payload", ["not base64!", base64.b64encode(b"garbage").decode()])
+    def test_invalid_input(self, payload):
+        with pytest.raises(InvalidMidiError):
+            SmfMidiProcessor().from_base64(payload)
+
+    def test_bytes_round_trip(self):
+        processor = SmfMidiProcessor()
+        midi = MidiData(notes=[NoteEvent(64, 0.5, 1.0, 90)], tempo=100.0)
+        raw = processor.to_bytes(midi)
+        assert raw.startswith(b"MThd")
+        decoded = processor.from_bytes(raw)
+        assert [_key(n) for n in decoded.notes] == [pytest.approx((0.5, 64, 1.0, 90))]
+        with pytest.raises(InvalidMidiError):
+            processor.from_bytes(b"garbage")
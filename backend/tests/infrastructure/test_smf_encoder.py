@@ -0,0 +1,81 @@
+"""SMF エンコーダと music21 生成のメモリ上出力のテスト"""
+
+import io
+
+import pretty_midi
+import pytest
+
+from src.domain.entities import MidiData, NoteEvent
+from src.infrastructure.music21_generator import Music21Generator
+from src.infrastructure.pretty_midi_processor import PrettyMidiProcessor
+from src.infrastructure.smf_encoder import _variable_length, encode_smf
+
+
+def _decode(data: bytes) -> pretty_midi.PrettyMIDI:
+    return pretty_midi.PrettyMIDI(io.BytesIO(data))
+
+
+class TestEncodeSmf:
+    def test_header_and_track(self):
+        data = encode_smf(MidiData())
+        assert data[:4] == b"MThd"
+        assert data[14:18] == b"MTrk"
+        assert data.endswith(b"\x00\xff\x2f\x00")
+
+    def test_variable_length(self):
+        assert _variable_length(0) == b"\x00"
+        assert _variable_length(0x7F) == b"\x7f"
+        assert _variable_length(0x80) == b"\x81\x00"
+        assert _variable_length(0x0FFFFFFF) == b"\xff\xff\xff\x7f"
+
+    def test_roundtrip_notes_tempo_and_meter(self):
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5, velocity=80),
+            NoteEvent(pitch=64, start=0.5, end=1.5, velocity=100),
+            NoteEvent(pitch=48, start=0.0, end=2.0, velocity=64),
+        ]
+        midi = MidiData(
+            notes=notes,
+            tempo=90.0,
+            time_signature_numerator=3,
+            time_signature_denominator=4,
+        )
+        pm = _decode(encode_smf(midi))
+
+        decoded = sorted((n.pitch, n.start, n.end, n.velocity) for n in pm.instruments[0].notes)
+        expected = sorted((n.pitch, n.start, n.end, n.velocity) for n in notes)
+        for got, want in zip(decoded, expected, strict=True):
+            assert got[0] == want[0] and got[3] == want[3]
+            assert got[1] == pytest.approx(want[1], abs=1e-3)
+            assert got[2] == pytest.approx(want[2], abs=1e-3)
+        assert pm.get_tempo_changes()[1][0] == pytest.approx(90.0, abs=0.01)
+        ts = pm.time_signature_changes[0]
+        assert (ts.numerator, ts.denominator) == (3, 4)
+
+    def test_repeated_note_is_not_cut(self):
+        # 同じティックのノートオフとノートオンは オフ→オン の順
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5),
+            NoteEvent(pitch=60, start=0.5, end=1.0),
+        ]
+        pm = _decode(encode_smf(MidiData(notes=notes)))
+        assert len(pm.instruments[0].notes) == 2
+
+
+class TestMusic21InMemoryOutput:
+    def test_does_not_write_temp_files(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("一時ファイルを書き出してはいけない")
+
+        monkeypatch.setattr("music21.stream.Score.write", fail)
+        notes = [
+            NoteEvent(pitch=60, start=0.0, end=0.5),
+            NoteEvent(pitch=43, start=0.0, end=0.01),
+        ]
+        musicxml, midi_base64 = Music21Generator().generate_musicxml_and_midi(MidiData(notes=notes))
+        assert "<score-partwise" in musicxml
+
+        decoded = PrettyMidiProcessor().from_base64(midi_base64)
+        durations = sorted(round(n.duration, 3) for n in decoded.notes)
+        # 楽譜と同じく最短16分音符（120BPM で 0.125 秒）に揃う
+        assert durations == [0.125, 0.5]
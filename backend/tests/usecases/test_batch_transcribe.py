@@ -0,0 +1,121 @@
+"""一括採譜ユースケースのテスト（ポートをモック）"""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.application.usecases.batch_transcribe import BatchTranscribeUseCase
+from src.application.usecases.transcribe_music import TranscribeMusicUseCase
+from src.core.exceptions import TranscriptionError
+from src.domain.entities import Difficulty, MidiData, NoteEvent
+from src.infrastructure.score_store import InMemoryScoreStore
+
+_FILES = [("a.mp3", Path("/tmp/a.mp3")), ("b.mp3", Path("/tmp/b.mp3"))]
+_LEVELS = [Difficulty.ORIGINAL, Difficulty.BEGINNER]
+
+
+@pytest.fixture
+def mock_transcriber():
+    transcriber = AsyncMock()
+    notes = [
+        NoteEvent(pitch=60, start=0.0, end=0.5, velocity=80),
+        NoteEvent(pitch=64, start=0.5, end=1.0, velocity=80),
+    ]
+    transcriber.transcribe.return_value = (MidiData(notes=notes, tempo=120.0), [])
+    return transcriber
+
+
+@pytest.fixture
+def mock_sheet_music_generator():
+    generator = MagicMock()
+    generator.generate_musicxml_and_midi.return_value = ("<score-partwise/>", "dGVzdA==")
+    return generator
+
+
+@pytest.fixture
+def transcribe_usecase(mock_transcriber, mock_sheet_music_generator):
+    return TranscribeMusicUseCase(
+        transcriber=mock_transcriber,
+        midi_processor=MagicMock(),
+        sheet_music_generator=mock_sheet_music_generator,
+        source_store=InMemoryScoreStore(),
+    )
+
+
+async def _collect(usecase, files=_FILES, difficulties=_LEVELS):
+    return [item async for item in usecase.execute(files, difficulties)]
+
+
+class TestBatchTranscribeUseCase:
+    @pytest.mark.asyncio
+    async def test_all_files_and_difficulties(self, transcribe_usecase):
+        items = await _collect(BatchTranscribeUseCase(transcribe_usecase, max_workers=2))
+
+        assert {(item.file_index, item.difficulty) for item in items} == {
+            (0, Difficulty.ORIGINAL),
+            (0, Difficulty.BEGINNER),
+            (1, Difficulty.ORIGINAL),
+            (1, Difficulty.BEGINNER),
+        }
+        assert len(items) == 4
+        assert all(item.result is not None and item.error_code is None for item in items)
+        assert {item.result.metadata.difficulty for item in items} == set(_LEVELS)
+
+    @pytest.mark.asyncio
+    async def test_transcribes_each_file_once(
+        self, transcribe_usecase, mock_transcriber, mock_sheet_music_generator
+    ):
+        items = await _collect(BatchTranscribeUseCase(transcribe_usecase))
+
+        # 推論・前処理はファイルごとに1回、楽譜生成は項目ごと
+        assert mock_transcriber.transcribe.await_count == 2
+        assert mock_sheet_music_generator.generate_musicxml_and_midi.call_count == 4
+        # 同じファイルの項目は同じ元MIDIデータ（score_id）を共有する
+        score_ids = {item.file_index: item.result.score_id for item in items}
+        assert all(item.result.score_id == score_ids[item.file_index] for item in items)
+        assert score_ids[0] != score_ids[1]
+
+    @pytest.mark.asyncio
+    async def test_failed_file_reports_every_difficulty(self, transcribe_usecase, mock_transcriber):
+        ok = mock_transcriber.transcribe.return_value
+        mock_transcriber.transcribe.side_effect = [TranscriptionError(), ok]
+
+        items = await _collect(BatchTranscribeUseCase(transcribe_usecase))
+
+        failed = [item for item in items if item.result is None]
+        assert {(item.file_index, item.error_code) for item in failed} == {
+            (0, "TRANSCRIPTION_ERROR")
+        }
+        assert len(failed) == 2
+        assert sum(item.result is not None for item in items) == 2
+
+    @pytest.mark.asyncio
+    async def test_unexpected_render_error(self, transcribe_usecase, mock_sheet_music_generator):
+        mock_sheet_music_generator.generate_musicxml_and_midi.side_effect = RuntimeError("boom")
+
+        items = await _collect(BatchTranscribeUseCase(transcribe_usecase), files=_FILES[:1])
+
+        assert [item.error_code for item in items] == ["INTERNAL_ERROR", "INTERNAL_ERROR"]
+
+    @pytest.mark.asyncio
+    async def test_yields_items_as_they_complete(self, transcribe_usecase, mock_transcriber):
+        release = asyncio.Event()
+        ok = mock_transcriber.transcribe.return_value
+
+        async def transcribe(audio_path):
+            if audio_path.name == "b.mp3":
+                await release.wait()
+            return ok
+
+        mock_transcriber.transcribe.side_effect = transcribe
+        items = BatchTranscribeUseCase(transcribe_usecase).execute(_FILES, _LEVELS[:1])
+
+        # 2件目の推論が終わる前に1件目の結果が届く
+        first = await anext(items)
+        assert first.filename == "a.mp3"
+        release.set()
+        second = await anext(items)
+        assert second.filename == "b.mp3"
+        await items.aclose()
@@ -0,0 +1,83 @@
+"""楽譜ページ取得ユースケースのテスト（楽譜生成ポートをモック）"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.application.usecases.score_pages import ScorePagesUseCase
+from src.core.exceptions import InvalidMeasureRangeError, ScoreNotFoundError
+from src.domain.entities import MidiData, NoteEvent
+from src.domain.notation import snap_to_layout_grid
+from src.infrastructure.score_store import InMemoryScoreStore
+from src.infrastructure.smf_encoder import encode_smf
+from src.infrastructure.smf_midi_processor import SmfMidiProcessor
+
+
+@pytest.fixture
+def store():
+    return InMemoryScoreStore()
+
+
+@pytest.fixture
+def generator():
+    generator = MagicMock()
+    generator.generate_musicxml_page.return_value = "<page/>"
+    return generator
+
+
+@pytest.fixture
+def result_id(store):
+    # 120BPM・4/4 → 1小節 2.0 秒。10 小節分
+    notes = [NoteEvent(pitch=60, start=i * 2.0, end=i * 2.0 + 1.0) for i in range(10)]
+    return store.save(MidiData(notes=notes, tempo=120.0))
+
+
+class TestScorePagesUseCase:
+    def test_index(self, store, generator, result_id):
+        index = ScorePagesUseCase(store, generator, SmfMidiProcessor()).index(result_id)
+        assert index.measure_count == 10
+        assert index.measure_duration == pytest.approx(2.0)
+        assert index.measure_offsets[:3] == pytest.approx((0.0, 2.0, 4.0))
+        assert len(index.measure_offsets) == 10
+        assert index.note_count == 10
+        generator.generate_musicxml_page.assert_not_called()
+
+    def test_page(self, store, generator, result_id):
+        musicxml, start, end = ScorePagesUseCase(store, generator, SmfMidiProcessor()).page(
+            result_id, 2, 5
+        )
+        assert (musicxml, start, end) == ("<page/>", 2, 5)
+        midi_data, *measures = generator.generate_musicxml_page.call_args.args
+        assert measures == [2, 5]
+        assert midi_data.note_count == 10
+
+    def test_page_end_is_clamped(self, store, generator, result_id):
+        _, start, end = ScorePagesUseCase(store, generator, SmfMidiProcessor()).page(
+            result_id, 8, 100
+        )
+        assert (start, end) == (8, 10)
+        _, start, end = ScorePagesUseCase(store, generator, SmfMidiProcessor()).page(result_id, 3)
+        assert (start, end) == (3, 10)
+
+    def test_page_out_of_range(self, store, generator, result_id):
+        usecase = ScorePagesUseCase(store, generator, SmfMidiProcessor())
+        with pytest.raises(InvalidMeasureRangeError):
+            usecase.page(result_id, 10, 12)
+        with pytest.raises(InvalidMeasureRangeError):
+            usecase.page(result_id, 4, 4)
+
+    def test_missing_result(self, store, generator):
+        usecase = ScorePagesUseCase(store, generator, SmfMidiProcessor())
+        with pytest.raises(ScoreNotFoundError):
+            usecase.index("missing")
+        with pytest.raises(ScoreNotFoundError):
+            usecase.page("missing", 0, 1)
+
+    def test_midi_matches_rendered_notes(self, store, generator):
+        # 16分音符グリッドからずれたノートは楽譜と同じく揃えてから書き出す
+        midi_data = MidiData(notes=[NoteEvent(pitch=64, start=0.03, end=0.52)], tempo=120.0)
+        result_id = store.save(midi_data)
+        usecase = ScorePagesUseCase(store, generator, SmfMidiProcessor())
+        assert usecase.midi(result_id) == encode_smf(snap_to_layout_grid(midi_data))
+        with pytest.raises(ScoreNotFoundError):
+            usecase.midi("missing")
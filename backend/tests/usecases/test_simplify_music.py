@@ -2,8 +2,12 @@
 
 from unittest.mock import MagicMock
 
+import pytest
+
 from src.application.usecases.simplify_music import SimplifyMusicUseCase
-from src.domain.entities import Difficulty, MidiData, NoteEvent
+from src.core.exceptions import ScoreNotFoundError, SimplificationError
+from src.domain.entities import Difficulty, MidiData, NoteEvent, RegionMode
+from src.infrastructure.score_store import InMemoryScoreStore
 
 
 def _make_mock_processor():
@@ -49,3 +53,106 @@ class TestSimplifyMusicUseCase:
         assert result.metadata.difficulty == Difficulty.BEGINNER
         # 初級は簡略化されるのでノート数が減る可能性がある
         assert result.metadata.note_count >= 0
+
+    def test_execute_region_fragment(self):
+        processor = _make_mock_processor()
+        generator = MagicMock()
+        generator.generate_musicxml_and_midi.return_value = ("<xml/>", "bmV3X21pZGk=")
+
+        usecase = SimplifyMusicUseCase(
+            midi_processor=processor,
+            sheet_music_generator=generator,
+        )
+        # 120BPM・4/4 → 小節 0 は [0, 2.0s)
+        result = usecase.execute_region("dGVzdA==", Difficulty.ORIGINAL, 0, 1)
+
+        rendered = generator.generate_musicxml_and_midi.call_args.args[0]
+        assert rendered.note_count == 3
+        assert result.metadata.note_count == 3
+
+    def test_execute_region_splice_keeps_outside_notes(self):
+        processor = _make_mock_processor()
+        generator = MagicMock()
+        generator.generate_musicxml_and_midi.return_value = ("<xml/>", "bmV3X21pZGk=")
+
+        usecase = SimplifyMusicUseCase(
+            midi_processor=processor,
+            sheet_music_generator=generator,
+        )
+        # 範囲にノートのない小節 5 を差し替えても元のノートは残る
+        usecase.execute_region("dGVzdA==", Difficulty.BEGINNER, 5, 6, RegionMode.SPLICE)
+
+        rendered = generator.generate_musicxml_and_midi.call_args.args[0]
+        assert rendered.note_count == 3
+
+    def test_execute_region_invalid_range(self):
+        usecase = SimplifyMusicUseCase(
+            midi_processor=_make_mock_processor(),
+            sheet_music_generator=MagicMock(),
+        )
+        with pytest.raises(SimplificationError):
+            usecase.execute_region("dGVzdA==", Difficulty.BEGINNER, 2, 2)
+
+    def test_stores_rendered_notes(self):
+        generator = MagicMock()
+        generator.generate_musicxml_and_midi.return_value = ("<xml/>", "bmV3X21pZGk=")
+        store = InMemoryScoreStore()
+
+        usecase = SimplifyMusicUseCase(
+            midi_processor=_make_mock_processor(),
+            sheet_music_generator=generator,
+            result_store=store,
+        )
+        result = usecase.execute("dGVzdA==", Difficulty.ORIGINAL)
+
+        rendered = generator.generate_musicxml_and_midi.call_args.args[0]
+        assert result.result_id is not None
+        assert store.get(result.result_id) is rendered
+
+    def test_no_result_id_without_store(self):
+        generator = MagicMock()
+        generator.generate_musicxml_and_midi.return_value = ("<xml/>", "bmV3X21pZGk=")
+        usecase = SimplifyMusicUseCase(
+            midi_processor=_make_mock_processor(),
+            sheet_music_generator=generator,
+        )
+        assert usecase.execute("dGVzdA==", Difficulty.ORIGINAL).result_id is None
+
+    def test_reuses_source_by_score_id(self):
+        processor = _make_mock_processor()
+        generator = MagicMock()
+        generator.generate_musicxml_and_midi.return_value = ("<xml/>", "bmV3X21pZGk=")
+        usecase = SimplifyMusicUseCase(
+            midi_processor=processor,
+            sheet_music_generator=generator,
+            source_store=InMemoryScoreStore(),
+        )
+
+        first = usecase.execute("dGVzdA==", Difficulty.ORIGINAL)
+        assert first.score_id is not None
+
+        second = usecase.execute(None, Difficulty.BEGINNER, first.score_id)
+        assert second.score_id == first.score_id
+        # 2回目は保持した前処理済みのデータを使い、デコードしない
+        processor.from_base64.assert_called_once()
+
+        region = usecase.execute_region(None, Difficulty.ORIGINAL, 0, 1, score_id=first.score_id)
+        assert region.metadata.note_count == 3
+        processor.from_base64.assert_called_once()
+
+    def test_unknown_score_id_falls_back_to_midi(self):
+        processor = _make_mock_processor()
+        generator = MagicMock()
+        generator.generate_musicxml_and_midi.return_value = ("<xml/>", "bmV3X21pZGk=")
+        usecase = SimplifyMusicUseCase(
+            midi_processor=processor,
+            sheet_music_generator=generator,
+            source_store=InMemoryScoreStore(),
+        )
+
+        result = usecase.execute("dGVzdA==", Difficulty.ORIGINAL, "expired")
+        processor.from_base64.assert_called_once_with("dGVzdA==")
+        assert result.score_id not in (None, "expired")
+
+        with pytest.raises(ScoreNotFoundError):
+            usecase.execute(None, Difficulty.ORIGINAL, "expired")
@@ -7,6 +7,7 @@ import pytest
 
 from src.application.usecases.transcribe_music import TranscribeMusicUseCase
 from src.domain.entities import Difficulty, MidiData, NoteEvent
+from src.infrastructure.score_store import InMemoryScoreStore
 
 
 @pytest.fixture
@@ -70,3 +71,20 @@ class TestTranscribeMusicUseCase:
         # 全ポートが呼ばれている
         mock_transcriber.transcribe.assert_called_once()
         mock_sheet_music_generator.generate_musicxml_and_midi.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_registers_preprocessed_source(
+        self, mock_transcriber, mock_midi_processor, mock_sheet_music_generator
+    ):
+        source_store = InMemoryScoreStore()
+        usecase = TranscribeMusicUseCase(
+            transcriber=mock_transcriber,
+            midi_processor=mock_midi_processor,
+            sheet_music_generator=mock_sheet_music_generator,
+            source_store=source_store,
+        )
+        result = await usecase.execute(Path("/tmp/test.mp3"), Difficulty.BEGINNER)
+
+        assert result.score_id is not None
+        # 簡略化前の（前処理済み）ノートを保持する
+        assert source_store.get(result.score_id).note_count == 2